@@ -27,6 +27,10 @@ from online_store_backend.orders.api.admin_views import ShippingStatusWebhookVie
 from online_store_backend.orders.api.admin_views import AdminYearlyReportView
 from online_store_backend.orders.api.admin_views import AdminYearlyReportXlsxView
 from online_store_backend.orders.api.payment_views import CheckoutPaymentMethodsView
+from online_store_backend.jobs.api.views import AdminJobCancelView
+from online_store_backend.jobs.api.views import AdminJobDetailView
+from online_store_backend.jobs.api.views import AdminJobFileView
+from online_store_backend.jobs.api.views import AdminJobListCreateView
 from online_store_backend.orders.api.payment_views import PaymentCreateView
 from online_store_backend.orders.api.payment_views import PaymentWebhookView
 from online_store_backend.orders.api.checkout_views import CheckoutConfirmView
@@ -40,10 +44,12 @@ from online_store_backend.orders.api.views import EligibleReviewProductsView
 from online_store_backend.orders.api.views import ProductRatingSummaryView
 from online_store_backend.orders.api.views import ReviewCreateView
 from online_store_backend.orders.api.views import ReviewSummaryView
+from online_store_backend.products.api.admin_views import CatalogMetricsView
 from online_store_backend.products.api.admin_views import CategoryAdminViewSet
 from online_store_backend.products.api.admin_views import ProductAdminViewSet
 from online_store_backend.products.api.views import CategoryViewSet
 from online_store_backend.products.api.views import ProductViewSet
+from online_store_backend.products.api.webhook_views import StrapiWebhookView
 from online_store_backend.users.api.admin_views import AdminUserViewSet
 from online_store_backend.users.api.views import UserViewSet
 
@@ -72,6 +78,7 @@ urlpatterns = [
     path("shipping/<str:provider_id>/pickup-points/", ShippingPickupPointsView.as_view(), name="shipping-pickup-points"),
     path("shipping/<str:provider_id>/quote/", ShippingQuoteView.as_view(), name="shipping-quote"),
     path("shipping/webhook/<str:provider_id>/", ShippingStatusWebhookView.as_view(), name="shipping-webhook"),
+    path("catalog/webhook/strapi/", StrapiWebhookView.as_view(), name="catalog-strapi-webhook"),
     path("shop/appearance/", ShopAppearancePublicView.as_view(), name="shop-appearance-public"),
     path("payments/", PaymentCreateView.as_view(), name="payments-create"),
     path("payments/webhook/<str:provider_id>/", PaymentWebhookView.as_view(), name="payments-webhook"),
@@ -108,6 +115,11 @@ urlpatterns = [
         AdminIntegrationTestConnectionView.as_view(),
         name="admin-integration-test",
     ),
+    path("admin/jobs/", AdminJobListCreateView.as_view(), name="admin-jobs"),
+    path("admin/jobs/<int:job_id>/", AdminJobDetailView.as_view(), name="admin-jobs-detail"),
+    path("admin/jobs/<int:job_id>/cancel/", AdminJobCancelView.as_view(), name="admin-jobs-cancel"),
+    path("admin/jobs/<int:job_id>/file/", AdminJobFileView.as_view(), name="admin-jobs-file"),
+    path("admin/catalog/metrics/", CatalogMetricsView.as_view(), name="admin-catalog-metrics"),
     path("admin/catalog/", include(admin_catalog_router.urls)),
     path("admin/", include(admin_user_router.urls)),
     *router.urls,
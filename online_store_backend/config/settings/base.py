@@ -69,6 +69,7 @@ DJANGO_APPS = [
     "django.contrib.staticfiles",
     # "django.contrib.humanize", # Handy template tags
     "django.contrib.admin",
+    "django.contrib.postgres",
     "django.forms",
 ]
 THIRD_PARTY_APPS = [
@@ -90,6 +91,7 @@ LOCAL_APPS = [
     "online_store_backend.products",
     "online_store_backend.integrations",
     "online_store_backend.appearance",
+    "online_store_backend.jobs",
     # Your stuff: custom apps go here
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
@@ -289,6 +291,16 @@ LOGGING = {
 
 REDIS_URL = env("REDIS_URL", default="redis://redis:6379/0")
 REDIS_SSL = REDIS_URL.startswith("rediss://")
+# Фоновые задания (`run_job_worker`): число потоков воркера, как долго поток ждет сигнал
+# Redis о новом задании перед опросом базы, как часто обновляется heartbeat, через сколько
+# секунд без heartbeat задание возвращается в очередь (не больше JOBS_MAX_ATTEMPTS
+# запусков) и сколько дней хранятся завершенные задания.
+JOBS_WORKER_CONCURRENCY = env.int("JOBS_WORKER_CONCURRENCY", default=2)
+JOBS_POLL_SECONDS = env.float("JOBS_POLL_SECONDS", default=5.0)
+JOBS_HEARTBEAT_SECONDS = env.float("JOBS_HEARTBEAT_SECONDS", default=10.0)
+JOBS_STALE_SECONDS = env.int("JOBS_STALE_SECONDS", default=120)
+JOBS_MAX_ATTEMPTS = env.int("JOBS_MAX_ATTEMPTS", default=3)
+JOBS_RETENTION_DAYS = env.int("JOBS_RETENTION_DAYS", default=14)
 
 
 # django-allauth
@@ -317,7 +329,13 @@ REST_FRAMEWORK = {
         "rest_framework_simplejwt.authentication.JWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "online_store_backend.utils.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    # Число доверенных прокси перед приложением: клиентский IP для лимитов берется из X-Forwarded-For.
+    "NUM_PROXIES": env.int("DJANGO_NUM_PROXIES", default=None),
 }
 
 # django-cors-headers - https://github.com/adamchainz/django-cors-headers#setup
@@ -345,6 +363,91 @@ STRAPI_PUBLIC_URL = env(
 STRAPI_TIMEOUT_SECONDS = env.int("STRAPI_TIMEOUT_SECONDS", default=5)
 STRAPI_READ_API_TOKEN = env("STRAPI_READ_API_TOKEN")
 STRAPI_ADMIN_API_TOKEN = env("STRAPI_ADMIN_API_TOKEN")
+# Пул keep-alive соединений к Strapi (на каждый gunicorn-воркер).
+STRAPI_POOL_CONNECTIONS = env.int("STRAPI_POOL_CONNECTIONS", default=4)
+STRAPI_POOL_MAXSIZE = env.int("STRAPI_POOL_MAXSIZE", default=16)
+STRAPI_POOL_BLOCK = env.bool("STRAPI_POOL_BLOCK", default=False)
+# Ретраи идемпотентных GET-запросов к Strapi.
+STRAPI_RETRY_TOTAL = env.int("STRAPI_RETRY_TOTAL", default=2)
+STRAPI_RETRY_BACKOFF_FACTOR = env.float("STRAPI_RETRY_BACKOFF_FACTOR", default=0.2)
+STRAPI_RETRY_BACKOFF_JITTER = env.float("STRAPI_RETRY_BACKOFF_JITTER", default=0.1)
+# Circuit breaker запросов к Strapi (на воркер).
+STRAPI_BREAKER_ENABLED = env.bool("STRAPI_BREAKER_ENABLED", default=True)
+STRAPI_BREAKER_WINDOW_SIZE = env.int("STRAPI_BREAKER_WINDOW_SIZE", default=20)
+STRAPI_BREAKER_MIN_CALLS = env.int("STRAPI_BREAKER_MIN_CALLS", default=5)
+STRAPI_BREAKER_FAILURE_RATE = env.float("STRAPI_BREAKER_FAILURE_RATE", default=0.5)
+STRAPI_BREAKER_SLOW_CALL_SECONDS = env.float("STRAPI_BREAKER_SLOW_CALL_SECONDS", default=2.0)
+STRAPI_BREAKER_OPEN_SECONDS = env.float("STRAPI_BREAKER_OPEN_SECONDS", default=15.0)
+# Максимум одновременных запросов асинхронного клиента Strapi (не больше STRAPI_POOL_MAXSIZE).
+STRAPI_ASYNC_CONCURRENCY = env.int("STRAPI_ASYNC_CONCURRENCY", default=8)
+# Размер чанка для пакетной загрузки товаров по documentId.
+STRAPI_BATCH_SIZE = env.int("STRAPI_BATCH_SIZE", default=50)
+# Read-through кэш товаров для внутренних потребителей (корзина, checkout, отчеты).
+STRAPI_PRODUCT_CACHE_TTL_SECONDS = env.int("STRAPI_PRODUCT_CACHE_TTL_SECONDS", default=30)
+# Сколько помнить отсутствующие товары/slug'и (отрицательные записи кэша каталога).
+STRAPI_PRODUCT_NOT_FOUND_TTL_SECONDS = env.int("STRAPI_PRODUCT_NOT_FOUND_TTL_SECONDS", default=10)
+# Источник публичного чтения каталога: "strapi" (прокси) или "mirror" (локальное зеркало).
+CATALOG_READ_MODE = env("CATALOG_READ_MODE", default="strapi")
+# Поиск `?search=` по списку товаров: "strapi" (подстрока в Strapi) или "index"
+# (полнотекстовый и триграммный индекс зеркала). В режиме чтения "mirror" индекс
+# используется всегда.
+CATALOG_SEARCH_BACKEND = env("CATALOG_SEARCH_BACKEND", default="strapi")
+# Single-flight перестроение кэша каталога и ранний refresh горячих ключей.
+CATALOG_CACHE_LOCK_SECONDS = env.int("CATALOG_CACHE_LOCK_SECONDS", default=10)
+CATALOG_CACHE_WAIT_SECONDS = env.float("CATALOG_CACHE_WAIT_SECONDS", default=2.0)
+CATALOG_CACHE_STALE_SECONDS = env.int("CATALOG_CACHE_STALE_SECONDS", default=300)
+CATALOG_CACHE_EARLY_REFRESH_BETA = env.float("CATALOG_CACHE_EARLY_REFRESH_BETA", default=1.0)
+# TTL кэша публичных категорий; записи версионируются тегами и сбрасываются
+# при изменениях из админки и webhook'ах Strapi, поэтому TTL может быть долгим.
+CATALOG_CATEGORIES_CACHE_TTL_SECONDS = env.int("CATALOG_CATEGORIES_CACHE_TTL_SECONDS", default=21600)
+# Прогрев кэша каталога после сброса версии: первые страницы списка товаров по
+# категориям и сортировкам (пустая строка — сортировка по умолчанию) и карточки
+# самых просматриваемых товаров за окно в днях.
+CATALOG_WARM_ON_INVALIDATE = env.bool("CATALOG_WARM_ON_INVALIDATE", default=True)
+CATALOG_WARM_LIST_PAGES = env.int("CATALOG_WARM_LIST_PAGES", default=2)
+CATALOG_WARM_ORDERINGS = env.list("CATALOG_WARM_ORDERINGS", default=["", "price", "-price"])
+CATALOG_WARM_TOP_PRODUCTS = env.int("CATALOG_WARM_TOP_PRODUCTS", default=50)
+CATALOG_WARM_VIEW_WINDOW_DAYS = env.int("CATALOG_WARM_VIEW_WINDOW_DAYS", default=7)
+# Сколько записей прогревается одновременно (запросов к Strapi/зеркалу).
+CATALOG_WARM_CONCURRENCY = env.int("CATALOG_WARM_CONCURRENCY", default=4)
+# Индекс подсказок поиска в памяти воркера: как часто сверяться с журналом изменений
+# товаров (секунды), через сколько секунд пересобирать целиком и за сколько дней
+# считать просмотры для ранжирования.
+CATALOG_SUGGEST_REFRESH_SECONDS = env.float("CATALOG_SUGGEST_REFRESH_SECONDS", default=1.0)
+CATALOG_SUGGEST_REBUILD_SECONDS = env.int("CATALOG_SUGGEST_REBUILD_SECONDS", default=3600)
+CATALOG_SUGGEST_POPULARITY_DAYS = env.int("CATALOG_SUGGEST_POPULARITY_DAYS", default=30)
+# Фоновые задания скидок категорий: сколько товаров обновляется одновременно, сколько
+# товаров в пачке между сохранениями прогресса, сколько попыток на товар при сбоях
+# Strapi (пауза между попытками удваивается).
+CATALOG_DISCOUNT_JOB_CONCURRENCY = env.int("CATALOG_DISCOUNT_JOB_CONCURRENCY", default=8)
+CATALOG_DISCOUNT_JOB_BATCH_SIZE = env.int("CATALOG_DISCOUNT_JOB_BATCH_SIZE", default=50)
+CATALOG_DISCOUNT_JOB_MAX_ATTEMPTS = env.int("CATALOG_DISCOUNT_JOB_MAX_ATTEMPTS", default=3)
+CATALOG_DISCOUNT_JOB_RETRY_BACKOFF_SECONDS = env.float("CATALOG_DISCOUNT_JOB_RETRY_BACKOFF_SECONDS", default=0.5)
+# Массовое изменение товаров: сколько PUT-запросов измененных товаров отправляется в Strapi
+# одновременно (товары читаются пачками по STRAPI_BATCH_SIZE).
+CATALOG_BULK_UPDATE_CONCURRENCY = env.int("CATALOG_BULK_UPDATE_CONCURRENCY", default=8)
+# Импорт товаров из CSV/XLSX: сколько товаров создается или обновляется в Strapi одновременно
+# (строки обрабатываются окнами по STRAPI_BATCH_SIZE).
+CATALOG_IMPORT_CONCURRENCY = env.int("CATALOG_IMPORT_CONCURRENCY", default=8)
+# Лимит запросов карточек товаров, закончившихся 404, на клиента (IP или пользователя);
+# после исчерпания поиск товаров отвечает 429. Пустое значение отключает лимит.
+CATALOG_NOT_FOUND_RATE = env("CATALOG_NOT_FOUND_RATE", default="60/min") or None
+# Сколько хранить last-known-good копии ответов каталога на случай недоступности Strapi.
+CATALOG_LAST_KNOWN_GOOD_SECONDS = env.int("CATALOG_LAST_KNOWN_GOOD_SECONDS", default=86400)
+# Кэш готовых (отрендеренных и сжатых gzip/br) ответов публичного каталога.
+CATALOG_RENDERED_CACHE_ENABLED = env.bool("CATALOG_RENDERED_CACHE_ENABLED", default=True)
+# Ответы короче этого порога хранятся и отдаются без сжатия.
+CATALOG_RENDERED_MIN_COMPRESS_BYTES = env.int("CATALOG_RENDERED_MIN_COMPRESS_BYTES", default=1024)
+# Значения кэша каталога короче этого порога хранятся в Redis без сжатия.
+CATALOG_CACHE_COMPRESS_MIN_BYTES = env.int("CATALOG_CACHE_COMPRESS_MIN_BYTES", default=256)
+# Локальный LRU-уровень воркера перед Redis для горячих ключей (каталог, оформление,
+# конфигурации интеграций); копии сбрасываются через Redis pub/sub.
+LOCAL_CACHE_ENABLED = env.bool("LOCAL_CACHE_ENABLED", default=True)
+LOCAL_CACHE_MAX_ENTRIES = env.int("LOCAL_CACHE_MAX_ENTRIES", default=512)
+# Предельное время жизни локальной копии на случай потерянного сообщения инвалидации.
+LOCAL_CACHE_TTL_SECONDS = env.float("LOCAL_CACHE_TTL_SECONDS", default=5.0)
+# Secret для webhook'ов Strapi (заголовок `Authorization: Bearer ...` или `X-Webhook-Secret`).
+STRAPI_WEBHOOK_SECRET = env("STRAPI_WEBHOOK_SECRET", default="")
 YANDEX_NDD_BASE_URL = env(
     "YANDEX_NDD_BASE_URL",
     default="https://b2b.taxi.tst.yandex.net",
@@ -31,6 +31,18 @@ CACHES = {
             "IGNORE_EXCEPTIONS": True,
         },
     },
+    # Ключи каталога (products:*, categories:*) в том же Redis, но в компактном
+    # кодеке: msgpack/pickle + zstd сжатие крупных значений.
+    "catalog": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": REDIS_URL,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "SERIALIZER": "online_store_backend.products.cache_codec.CatalogSerializer",
+            "COMPRESSOR": "online_store_backend.products.cache_codec.CatalogCompressor",
+            "IGNORE_EXCEPTIONS": True,
+        },
+    },
 }
 
 # SECURITY
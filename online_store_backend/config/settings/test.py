@@ -36,3 +36,7 @@ TEMPLATES[0]["OPTIONS"]["debug"] = True  # type: ignore[index]
 MEDIA_URL = "http://media.testserver/"
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Тесты очищают общий кэш между собой; локальный уровень включается явно.
+LOCAL_CACHE_ENABLED = False
+# Фоновый прогрев кэша каталога после сброса версии в тестах запускается явно.
+CATALOG_WARM_ON_INVALIDATE = False
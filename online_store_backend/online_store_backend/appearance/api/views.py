@@ -8,20 +8,27 @@ from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from online_store_backend.utils.conditional import apply_cache_headers
+from online_store_backend.utils.conditional import make_etag
+from online_store_backend.utils.conditional import not_modified_response
+
 from ..models import AppearanceBanner
 from ..models import AppearancePreset
 from ..models import PresetType
 from ..models import ShopAppearanceSettings
+from ..services import cached_public_appearance_payload
 from ..services import ensure_shop_appearance_initialized
+from ..services import get_appearance_version
 from ..services import get_scope_settings
 from ..services import publish_draft_to_live
-from ..services import public_appearance_payload
 from ..services import reset_draft_from_live
 from ..services import serialize_settings
 from .serializers import AppearanceBannerSerializer
 from .serializers import AppearancePresetSerializer
 from .serializers import DraftAppearanceSettingsSerializer
 
+PUBLIC_APPEARANCE_CACHE_CONTROL = {"public": True, "max_age": 60, "stale_while_revalidate": 300}
+
 
 class ShopAppearancePublicView(APIView):
     """Публичный endpoint опубликованных настроек оформления витрины."""
@@ -29,9 +36,23 @@ class ShopAppearancePublicView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request):
-        """Вернуть текущие live-настройки оформления для storefront."""
-        payload = public_appearance_payload(request=request)
-        return Response(payload, status=status.HTTP_200_OK)
+        """Вернуть текущие live-настройки оформления для storefront.
+
+        ETag строится из версии оформления и базового URL (от него зависит
+        `logo_url`), поэтому 304 отдается без запросов к БД; сам payload
+        берется из двухуровневого кэша по тем же версии и URL.
+        """
+        version = get_appearance_version()
+        validators = {
+            "etag": make_etag("appearance", version, request.build_absolute_uri("/")),
+            "last_modified": version / 1000,
+            "cache_control": PUBLIC_APPEARANCE_CACHE_CONTROL,
+        }
+        not_modified = not_modified_response(request, **validators)
+        if not_modified is not None:
+            return not_modified
+        payload = cached_public_appearance_payload(version, request)
+        return apply_cache_headers(Response(payload, status=status.HTTP_200_OK), **validators)
 
 
 class AdminAppearanceDraftView(APIView):
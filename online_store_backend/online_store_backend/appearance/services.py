@@ -6,6 +6,10 @@ from copy import deepcopy
 
 from django.db import transaction
 
+from online_store_backend.utils.conditional import bump_clock_version
+from online_store_backend.utils.conditional import get_clock_version
+from online_store_backend.utils.local_cache import shared_cache
+
 from .models import AppearanceBanner
 from .models import AppearancePreset
 from .models import LayoutMode
@@ -14,6 +18,11 @@ from .models import PresetType
 from .models import ShopAppearanceSettings
 from .models import ThemeMode
 
+APPEARANCE_VERSION_KEY = "appearance:version"
+PUBLIC_APPEARANCE_PAYLOAD_PREFIX = "appearance:public:"
+PUBLIC_APPEARANCE_PAYLOAD_KEY = PUBLIC_APPEARANCE_PAYLOAD_PREFIX + "{version}:{base_url}"
+PUBLIC_APPEARANCE_PAYLOAD_TTL_SECONDS = 3600
+
 BLOCK_TYPES = (
     "title",
     "price",
@@ -320,6 +329,40 @@ def public_appearance_payload(request=None):
     }
 
 
+def get_appearance_version() -> int:
+    """Вернуть версию оформления (время последнего изменения в мс) для ETag/Last-Modified."""
+    return get_clock_version(APPEARANCE_VERSION_KEY)
+
+
+def cached_public_appearance_payload(version: int, request):
+    """Вернуть публичные настройки оформления из двухуровневого кэша.
+
+    Ключ включает версию оформления и базовый URL (от него зависит `logo_url`),
+    поэтому после публикации старые копии просто перестают читаться.
+    """
+    key = PUBLIC_APPEARANCE_PAYLOAD_KEY.format(version=version, base_url=request.build_absolute_uri("/"))
+    return shared_cache.get_or_set(
+        key,
+        lambda: public_appearance_payload(request=request),
+        timeout=PUBLIC_APPEARANCE_PAYLOAD_TTL_SECONDS,
+    )
+
+
+def _mark_appearance_changed():
+    bump_clock_version(APPEARANCE_VERSION_KEY)
+    shared_cache.invalidate_local(prefixes=(PUBLIC_APPEARANCE_PAYLOAD_PREFIX,))
+
+
+def bump_appearance_version():
+    """Отметить изменение оформления сразу и повторно после фиксации транзакции.
+
+    Повторная отметка после commit не дает закрепиться под новой версией
+    payload'у, который конкурентный запрос собрал до фиксации изменений.
+    """
+    _mark_appearance_changed()
+    transaction.on_commit(_mark_appearance_changed)
+
+
 def _copy_scope(source_is_published: bool, target_is_published: bool):
     """Скопировать настройки/пресеты/баннеры между draft и published областями."""
     source_settings = get_scope_settings(source_is_published)
@@ -339,6 +382,8 @@ def _copy_scope(source_is_published: bool, target_is_published: bool):
 
     AppearancePreset.objects.filter(is_published=target_is_published).delete()
     AppearanceBanner.objects.filter(is_published=target_is_published).delete()
+    # bulk_create не отправляет post_save, поэтому версия оформления сбрасывается явно.
+    bump_appearance_version()
 
     cloned_presets = AppearancePreset.objects.bulk_create(
         [
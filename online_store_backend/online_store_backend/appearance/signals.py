@@ -2,9 +2,15 @@
 
 import logging
 
+from django.db.models.signals import post_delete
 from django.db.models.signals import post_migrate
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from .models import AppearanceBanner
+from .models import AppearancePreset
+from .models import ShopAppearanceSettings
+from .services import bump_appearance_version
 from .services import ensure_shop_appearance_initialized
 
 logger = logging.getLogger(__name__)
@@ -19,3 +25,14 @@ def init_shop_appearance_defaults(sender, **kwargs):
         ensure_shop_appearance_initialized()
     except Exception:  # pragma: no cover - defensive logging only
         logger.exception("Failed to initialize shop appearance defaults after migrate.")
+
+
+@receiver(post_save, sender=ShopAppearanceSettings)
+@receiver(post_save, sender=AppearancePreset)
+@receiver(post_save, sender=AppearanceBanner)
+@receiver(post_delete, sender=ShopAppearanceSettings)
+@receiver(post_delete, sender=AppearancePreset)
+@receiver(post_delete, sender=AppearanceBanner)
+def invalidate_public_appearance(sender, **kwargs):
+    """Сбрасывает ETag публичного оформления при любом изменении его моделей."""
+    bump_appearance_version()
@@ -14,6 +14,7 @@ from rest_framework.viewsets import GenericViewSet
 from online_store_backend.products.strapi_client import StrapiNotFoundError
 from online_store_backend.products.strapi_client import StrapiUnavailableError
 from online_store_backend.products.strapi_client import get_product
+from online_store_backend.products.strapi_client import get_products
 
 from .models import CartItem
 from .models import CartStatus
@@ -36,8 +37,12 @@ def _build_cart_payload(cart):
     subtotal_final = Decimal("0.00")
     total_quantity = 0
 
-    for item in cart.items.all():
-        product = get_product(item.product_id)
+    cart_items = list(cart.items.all())
+    products = get_products([item.product_id for item in cart_items])
+    for item in cart_items:
+        product = products.get(str(item.product_id))
+        if product is None:
+            raise StrapiNotFoundError
         try:
             unit_price_original = Decimal(product.get("price", "0.00"))
         except (InvalidOperation, TypeError):
@@ -8,3 +8,7 @@ class IntegrationsConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "online_store_backend.integrations"
+
+    def ready(self):
+        """Подключает signal-хендлеры после инициализации приложения."""
+        from . import signals  # noqa: F401
@@ -0,0 +1,36 @@
+"""Кэш активных конфигураций интеграций в памяти воркера.
+
+Конфигурации содержат credentials, поэтому хранятся только в локальном
+LRU-уровне процесса и не попадают в Redis. Изменения моделей сбрасывают
+копии во всех воркерах через канал инвалидации `utils.local_cache`.
+"""
+
+from copy import deepcopy
+
+from django.db import transaction
+
+from online_store_backend.utils.local_cache import TieredCache
+
+from .models import IntegrationConfig
+
+INTEGRATIONS_KEY_PREFIX = "integrations:enabled:"
+
+integration_cache = TieredCache("integrations", None, local_prefixes=(INTEGRATIONS_KEY_PREFIX,))
+
+
+def get_enabled_integration_config(kind: str, provider_id: str) -> IntegrationConfig | None:
+    """Вернуть включенную конфигурацию провайдера или `None`.
+
+    Возвращается копия, чтобы изменения вызывающего кода не попадали в кэш.
+    """
+    config = integration_cache.get_or_set(
+        f"{INTEGRATIONS_KEY_PREFIX}{kind}:{provider_id}",
+        lambda: IntegrationConfig.objects.filter(kind=kind, provider_id=provider_id, enabled=True).first(),
+    )
+    return deepcopy(config)
+
+
+def invalidate_integration_configs():
+    """Сбросить кэш конфигураций сразу и повторно после фиксации транзакции."""
+    integration_cache.invalidate_local(prefixes=(INTEGRATIONS_KEY_PREFIX,))
+    transaction.on_commit(lambda: integration_cache.invalidate_local(prefixes=(INTEGRATIONS_KEY_PREFIX,)))
@@ -0,0 +1,15 @@
+"""Signals приложения интеграций."""
+
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_integration_configs
+from .models import IntegrationConfig
+
+
+@receiver(post_save, sender=IntegrationConfig)
+@receiver(post_delete, sender=IntegrationConfig)
+def invalidate_cached_integration_configs(sender, **kwargs):
+    """Сбрасывает закэшированные конфигурации при изменении любой из них."""
+    invalidate_integration_configs()
@@ -0,0 +1,14 @@
+"""Настройки Django admin для фоновых заданий."""
+
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Админ-таблица фоновых заданий."""
+
+    list_display = ("id", "kind", "status", "attempts", "worker", "created_at", "started_at", "finished_at")
+    list_filter = ("kind", "status")
+    exclude = ("result_file",)
@@ -0,0 +1 @@
+"""Jobs API package."""
@@ -0,0 +1,28 @@
+"""Сериализаторы админского API фоновых заданий."""
+
+from rest_framework import serializers
+
+from ..registry import get_job_kind
+
+
+class JobEnqueueSerializer(serializers.Serializer):
+    """Тип задания и его параметры, проверенные сериализатором типа."""
+
+    kind = serializers.CharField(max_length=64)
+    params = serializers.DictField(required=False, default=dict)
+
+    def validate_kind(self, value):
+        """Принимает только зарегистрированные типы заданий."""
+        if get_job_kind(value) is None:
+            raise serializers.ValidationError("Unknown job kind.")
+        return value
+
+    def validate(self, attrs):
+        """Проверяет параметры сериализатором выбранного типа задания."""
+        params_serializer = get_job_kind(attrs["kind"]).params_serializer
+        if params_serializer is not None:
+            serializer = params_serializer(data=attrs["params"])
+            if not serializer.is_valid():
+                raise serializers.ValidationError({"params": serializer.errors})
+            attrs["params"] = serializer.validated_data
+        return attrs
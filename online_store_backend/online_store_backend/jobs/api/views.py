@@ -0,0 +1,118 @@
+"""Админские API фоновых заданий: постановка, опрос, отмена и файл результата."""
+
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..models import Job
+from ..models import JobStatus
+from ..runner import cancel_job
+from ..runner import enqueue_job
+from ..runner import serialize_job
+from .serializers import JobEnqueueSerializer
+
+DEFAULT_JOBS_PAGE_SIZE = 20
+MAX_JOBS_PAGE_SIZE = 100
+
+
+def _positive_int(value, default):
+    """Преобразует значение в положительное целое или возвращает default."""
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError):
+        return default
+    if parsed < 1:
+        return default
+    return parsed
+
+
+def _jobs_queryset():
+    return Job.objects.defer("result_file")
+
+
+class AdminJobListCreateView(APIView):
+    """Список заданий и постановка нового задания в очередь."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Отдает пагинированный список заданий с фильтрами `kind` и `status`."""
+        queryset = _jobs_queryset()
+        kind = (request.query_params.get("kind") or "").strip()
+        if kind:
+            queryset = queryset.filter(kind=kind)
+        job_status = (request.query_params.get("status") or "").strip()
+        if job_status:
+            if job_status not in JobStatus.values:
+                return Response(
+                    {"detail": f"Invalid status. Allowed: {', '.join(JobStatus.values)}."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = queryset.filter(status=job_status)
+        page = _positive_int(request.query_params.get("page"), 1)
+        page_size = min(
+            _positive_int(request.query_params.get("page_size"), DEFAULT_JOBS_PAGE_SIZE),
+            MAX_JOBS_PAGE_SIZE,
+        )
+        total = queryset.count()
+        offset = (page - 1) * page_size
+        return Response(
+            {
+                "results": [serialize_job(job) for job in queryset[offset : offset + page_size]],
+                "pagination": {"page": page, "page_size": page_size, "total": total},
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    def post(self, request):
+        """Ставит задание в очередь; воркер начнет его после фиксации запроса."""
+        serializer = JobEnqueueSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue_job(serializer.validated_data["kind"], serializer.validated_data["params"], user=request.user)
+        return Response(serialize_job(job), status=status.HTTP_202_ACCEPTED)
+
+
+class AdminJobDetailView(APIView):
+    """Состояние, прогресс и результат задания."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, job_id):
+        """Отдает задание для опроса прогресса."""
+        job = _jobs_queryset().filter(pk=job_id).first()
+        if job is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(serialize_job(job), status=status.HTTP_200_OK)
+
+
+class AdminJobCancelView(APIView):
+    """Отмена задания."""
+
+    permission_classes = [IsAdminUser]
+
+    def post(self, request, job_id):
+        """Отменяет задание очереди сразу, выполняющееся — в ближайшей безопасной точке."""
+        job = _jobs_queryset().filter(pk=job_id).first()
+        if job is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        cancelled = cancel_job(job)
+        if cancelled is None:
+            return Response({"detail": "Job is already finished."}, status=status.HTTP_409_CONFLICT)
+        return Response(serialize_job(cancelled), status=status.HTTP_200_OK)
+
+
+class AdminJobFileView(APIView):
+    """Файл результата задания (например, XLSX-выгрузка)."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, job_id):
+        """Отдает файл результата как вложение."""
+        job = Job.objects.filter(pk=job_id).only("result_file", "result_filename", "result_content_type").first()
+        if job is None or job.result_file is None or not job.result_filename:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        response = HttpResponse(bytes(job.result_file), content_type=job.result_content_type)
+        response["Content-Disposition"] = f'attachment; filename="{job.result_filename}"'
+        return response
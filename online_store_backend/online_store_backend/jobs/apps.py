@@ -0,0 +1,12 @@
+"""Конфигурация Django-приложения фоновых заданий."""
+
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class JobsConfig(AppConfig):
+    """Регистрация приложения jobs в Django."""
+
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "online_store_backend.jobs"
+    verbose_name = _("Jobs")
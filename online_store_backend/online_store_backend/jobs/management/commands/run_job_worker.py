@@ -0,0 +1,31 @@
+"""Команда воркера фоновых заданий."""
+
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from online_store_backend.jobs.runner import requeue_stale_jobs
+from online_store_backend.jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    """Выполняет задания из очереди до SIGTERM/SIGINT."""
+
+    help = "Run the background job worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=None, help="Jobs executed at the same time.")
+        parser.add_argument("--once", action="store_true", help="Run queued jobs one by one and exit.")
+
+    def handle(self, *args, **options):
+        worker = Worker(options["concurrency"] or settings.JOBS_WORKER_CONCURRENCY)
+        if options["once"]:
+            requeue_stale_jobs()
+            self.stdout.write(f"processed={worker.run_pending()}")
+            return
+        signal.signal(signal.SIGTERM, lambda *args: worker.stop())
+        signal.signal(signal.SIGINT, lambda *args: worker.stop())
+        self.stdout.write(f"Job worker {worker.name} started with concurrency={worker.concurrency}.")
+        worker.serve()
+        self.stdout.write("Job worker stopped.")
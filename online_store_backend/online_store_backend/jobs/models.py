@@ -0,0 +1,53 @@
+"""Фоновые задания: состояние, прогресс и результат выполнения."""
+
+from django.conf import settings
+from django.db import models
+
+
+class JobStatus(models.TextChoices):
+    """Статусы жизненного цикла фонового задания."""
+
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    SUCCEEDED = "succeeded", "Succeeded"
+    FAILED = "failed", "Failed"
+    CANCELLED = "cancelled", "Cancelled"
+
+
+ACTIVE_JOB_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+class Job(models.Model):
+    """Задание для воркера `run_job_worker`.
+
+    `params` — входные данные обработчика вида `kind`, `progress` — последний
+    отчет о прогрессе, `result` — итог выполнения. Файл результата (например,
+    XLSX-выгрузка) хранится в `result_file`, чтобы его мог отдать любой воркер.
+    """
+
+    kind = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=16, choices=JobStatus.choices, default=JobStatus.QUEUED)
+    params = models.JSONField(default=dict, blank=True)
+    progress = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True, default="")
+    cancel_requested = models.BooleanField(default=False)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=128, blank=True, default="")
+    result_file = models.BinaryField(null=True, blank=True)
+    result_filename = models.CharField(max_length=255, blank=True, default="")
+    result_content_type = models.CharField(max_length=128, blank=True, default="")
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="jobs_job_status_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Job #{self.pk} ({self.kind}: {self.status})"
@@ -0,0 +1,40 @@
+"""Сигналы о новых заданиях через Redis.
+
+Источник истины — таблица `Job`: воркер забирает самое старое задание в
+статусе `queued` (`SELECT ... FOR UPDATE SKIP LOCKED`), поэтому потерянный
+сигнал лишь откладывает задание до следующего опроса базы. Список Redis
+`QUEUE_KEY` будит ожидающий поток воркера сразу после постановки задания.
+Без django-redis (LocMem в разработке и тестах) воркер только опрашивает базу
+раз в `JOBS_POLL_SECONDS`.
+"""
+
+import logging
+
+from online_store_backend.utils.local_cache import _redis_connection
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "jobs:queue"
+
+
+def notify(job_id):
+    """Будит один ожидающий поток воркера."""
+    redis = _redis_connection()
+    if redis is None:
+        return
+    try:
+        redis.lpush(QUEUE_KEY, job_id)
+    except Exception:  # noqa: BLE001 - задание заберет опрос базы
+        logger.warning("Failed to signal job %s to workers.", job_id, exc_info=True)
+
+
+def wait_for_signal(timeout, stop_event):
+    """Ждет сигнал о новом задании не дольше `timeout` секунд или до `stop_event`."""
+    redis = _redis_connection()
+    if redis is not None:
+        try:
+            redis.brpop(QUEUE_KEY, timeout=max(1, round(timeout)))
+            return
+        except Exception:  # noqa: BLE001 - переходим на опрос базы
+            logger.warning("Failed to wait for job signals in Redis.", exc_info=True)
+    stop_event.wait(timeout)
@@ -0,0 +1,40 @@
+"""Реестр типов фоновых заданий.
+
+Приложения регистрируют обработчики в `ready()` декоратором `job_handler`.
+Обработчик получает `JobContext` и возвращает JSON-совместимый результат;
+необязательный сериализатор проверяет параметры при постановке в очередь.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class JobKind:
+    """Тип задания: имя, обработчик и сериализатор параметров."""
+
+    name: str
+    handler: object
+    params_serializer: type | None = None
+
+
+_kinds = {}
+
+
+def job_handler(name, *, params_serializer=None):
+    """Регистрирует обработчик заданий типа `name`."""
+
+    def decorator(handler):
+        _kinds[name] = JobKind(name=name, handler=handler, params_serializer=params_serializer)
+        return handler
+
+    return decorator
+
+
+def get_job_kind(name):
+    """Возвращает тип задания или `None`, если он не зарегистрирован."""
+    return _kinds.get(name)
+
+
+def job_kind_names():
+    """Имена зарегистрированных типов заданий."""
+    return sorted(_kinds)
@@ -0,0 +1,201 @@
+"""Постановка, захват, выполнение и отмена фоновых заданий.
+
+Задание ставится в очередь из запроса (`enqueue_job`) и выполняется воркером
+`run_job_worker`: поток воркера захватывает задание (`claim_next_job`),
+вызывает обработчик его типа с `JobContext` и сохраняет результат. Отмена
+очередного задания действует сразу, выполняющегося — в ближайшей точке
+`JobContext.check_cancelled()` обработчика. Задания воркера, пропавшего без
+heartbeat дольше `JOBS_STALE_SECONDS`, возвращаются в очередь (не больше
+`JOBS_MAX_ATTEMPTS` запусков).
+"""
+
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ACTIVE_JOB_STATUSES
+from .models import Job
+from .models import JobStatus
+from .queue import notify
+from .registry import get_job_kind
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Задание отменено; обработчик прерывается в безопасной точке."""
+
+
+class JobError(Exception):
+    """Ошибка задания с сообщением для администратора."""
+
+
+class JobContext:
+    """Доступ обработчика к параметрам, прогрессу, отмене и файлу результата задания."""
+
+    def __init__(self, job):
+        self.job = job
+
+    @property
+    def params(self):
+        return self.job.params
+
+    def set_progress(self, **progress):
+        """Дополняет прогресс задания и обновляет heartbeat."""
+        self.job.progress = {**self.job.progress, **progress}
+        self.job.heartbeat_at = timezone.now()
+        Job.objects.filter(pk=self.job.pk).update(progress=self.job.progress, heartbeat_at=self.job.heartbeat_at)
+
+    def check_cancelled(self):
+        """Прерывает обработчик `JobCancelled`, если задание отменили."""
+        if Job.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            raise JobCancelled
+
+    def attach_file(self, filename, content_type, content):
+        """Сохраняет файл результата, который отдает `admin/jobs/<id>/file/`."""
+        Job.objects.filter(pk=self.job.pk).update(
+            result_file=content,
+            result_filename=filename,
+            result_content_type=content_type,
+        )
+        self.job.result_filename = filename
+        self.job.result_content_type = content_type
+
+
+def _json_safe(value):
+    """Приводит параметры (Decimal, даты) к JSON-совместимому виду."""
+    return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+
+def enqueue_job(kind, params=None, user=None):
+    """Создает задание и будит воркер после фиксации транзакции."""
+    if get_job_kind(kind) is None:
+        raise ValueError(f"Unknown job kind: {kind}")
+    job = Job.objects.create(
+        kind=kind,
+        params=_json_safe(params or {}),
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    transaction.on_commit(lambda: notify(job.pk))
+    return job
+
+
+def cancel_job(job):
+    """Отменяет задание; возвращает обновленное задание или `None`, если оно уже завершено."""
+    with transaction.atomic():
+        job = Job.objects.select_for_update().defer("result_file").get(pk=job.pk)
+        if job.status not in ACTIVE_JOB_STATUSES:
+            return None
+        job.cancel_requested = True
+        update_fields = ["cancel_requested"]
+        if job.status == JobStatus.QUEUED:
+            job.status = JobStatus.CANCELLED
+            job.finished_at = timezone.now()
+            update_fields += ["status", "finished_at"]
+        job.save(update_fields=update_fields)
+    return job
+
+
+def claim_next_job(worker_name):
+    """Захватывает самое старое задание очереди; `None`, если очередь пуста."""
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .defer("result_file")
+            .filter(status=JobStatus.QUEUED)
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        now = timezone.now()
+        job.status = JobStatus.RUNNING
+        job.started_at = job.started_at or now
+        job.heartbeat_at = now
+        job.attempts += 1
+        job.worker = worker_name
+        job.save(update_fields=["status", "started_at", "heartbeat_at", "attempts", "worker"])
+    return job
+
+
+def _finish(job, status, *, result=None, error=""):
+    job.status = status
+    job.result = result
+    job.error = error[:255]
+    job.finished_at = timezone.now()
+    job.heartbeat_at = job.finished_at
+    job.save(update_fields=["status", "result", "error", "finished_at", "heartbeat_at"])
+
+
+def run_job(job):
+    """Выполняет захваченное задание обработчиком его типа и сохраняет итог."""
+    kind = get_job_kind(job.kind)
+    if kind is None:
+        _finish(job, JobStatus.FAILED, error=f"Unknown job kind: {job.kind}")
+        return job
+    try:
+        result = kind.handler(JobContext(job))
+    except JobCancelled:
+        _finish(job, JobStatus.CANCELLED)
+    except JobError as exc:
+        _finish(job, JobStatus.FAILED, error=str(exc))
+    except Exception:
+        logger.exception("Job %s (%s) failed.", job.pk, job.kind)
+        _finish(job, JobStatus.FAILED, error="Internal error")
+    else:
+        _finish(job, JobStatus.SUCCEEDED, result=_json_safe(result))
+    return job
+
+
+def requeue_stale_jobs():
+    """Возвращает в очередь задания без heartbeat; возвращает число обработанных заданий."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_STALE_SECONDS)
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .defer("result_file")
+            .filter(status=JobStatus.RUNNING, heartbeat_at__lt=cutoff)
+        )
+        for job in jobs:
+            if job.cancel_requested:
+                _finish(job, JobStatus.CANCELLED)
+            elif job.attempts >= settings.JOBS_MAX_ATTEMPTS:
+                _finish(job, JobStatus.FAILED, error="Worker lost")
+            else:
+                logger.warning("Requeueing job %s (%s) left without heartbeat.", job.pk, job.kind)
+                job.status = JobStatus.QUEUED
+                job.save(update_fields=["status"])
+                transaction.on_commit(lambda job_id=job.pk: notify(job_id))
+    return len(jobs)
+
+
+def purge_finished_jobs():
+    """Удаляет завершенные задания старше `JOBS_RETENTION_DAYS`; возвращает их число."""
+    cutoff = timezone.now() - timedelta(days=settings.JOBS_RETENTION_DAYS)
+    deleted, _ = Job.objects.exclude(status__in=ACTIVE_JOB_STATUSES).filter(finished_at__lt=cutoff).delete()
+    return deleted
+
+
+def serialize_job(job):
+    """Представление задания для админского API."""
+    return {
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "params": job.params,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error or None,
+        "cancel_requested": job.cancel_requested,
+        "attempts": job.attempts,
+        "file_url": reverse("api:admin-jobs-file", args=[job.pk]) if job.result_filename else None,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
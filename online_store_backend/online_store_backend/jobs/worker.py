@@ -0,0 +1,115 @@
+"""Воркер фоновых заданий: пул потоков, heartbeat и возврат потерянных заданий."""
+
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .models import Job
+from .models import JobStatus
+from .queue import wait_for_signal
+from .runner import claim_next_job
+from .runner import purge_finished_jobs
+from .runner import requeue_stale_jobs
+from .runner import run_job
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL_SECONDS = 3600
+
+
+def _close_old_connections():
+    """Как `close_old_connections` у веб-потоков: закрывает разорванные и отжившие `CONN_MAX_AGE` соединения.
+
+    Соединения внутри открытой транзакции не трогаются — их закрытие оборвало бы ее.
+    """
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close_if_unusable_or_obsolete()
+
+
+class Worker:
+    """Выполняет задания очереди в `concurrency` потоках.
+
+    Главный поток раз в `JOBS_HEARTBEAT_SECONDS` обновляет heartbeat
+    выполняемых заданий, возвращает в очередь задания пропавших воркеров и
+    раз в час удаляет старые завершенные задания.
+    """
+
+    def __init__(self, concurrency, name=None):
+        self.concurrency = max(1, concurrency)
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._running = set()
+
+    def stop(self):
+        """Просит потоки завершиться после текущих заданий."""
+        self._stop.set()
+
+    def run_pending(self):
+        """Выполняет задания очереди в текущем потоке, пока она не опустеет; возвращает их число."""
+        processed = 0
+        while not self._stop.is_set():
+            _close_old_connections()
+            job = claim_next_job(self.name)
+            if job is None:
+                break
+            with self._lock:
+                self._running.add(job.pk)
+            try:
+                run_job(job)
+            finally:
+                with self._lock:
+                    self._running.discard(job.pk)
+                _close_old_connections()
+            processed += 1
+        return processed
+
+    def _loop(self):
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.run_pending()
+                except Exception:
+                    logger.exception("Job worker thread failed to process the queue.")
+                wait_for_signal(settings.JOBS_POLL_SECONDS, self._stop)
+        finally:
+            connections.close_all()
+
+    def _heartbeat(self):
+        with self._lock:
+            job_ids = list(self._running)
+        if job_ids:
+            Job.objects.filter(pk__in=job_ids, status=JobStatus.RUNNING).update(heartbeat_at=timezone.now())
+
+    def serve(self):
+        """Запускает потоки и обслуживает очередь до вызова `stop()`."""
+        threads = [
+            threading.Thread(target=self._loop, name=f"job-worker-{index}", daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        last_purge = None
+        try:
+            while not self._stop.wait(settings.JOBS_HEARTBEAT_SECONDS):
+                _close_old_connections()
+                try:
+                    self._heartbeat()
+                    requeue_stale_jobs()
+                    if last_purge is None or time.monotonic() - last_purge >= PURGE_INTERVAL_SECONDS:
+                        purge_finished_jobs()
+                        last_purge = time.monotonic()
+                except Exception:
+                    logger.exception("Job worker housekeeping failed.")
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            connections.close_all()
@@ -33,13 +33,14 @@ from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from online_store_backend.integrations.cache import get_enabled_integration_config
 from online_store_backend.integrations.models import IntegrationConfig
 from online_store_backend.integrations.models import IntegrationKind
 from online_store_backend.integrations.providers import get_shipping_providers
-from online_store_backend.products.strapi_client import StrapiNotFoundError
 from online_store_backend.products.strapi_client import StrapiUnavailableError
-from online_store_backend.products.strapi_client import get_product
+from online_store_backend.products.strapi_client import get_products
 
+from ..cache import bump_reviews_version
 from ..models import Order
 from ..models import OrderDeliveryStatus
 from ..models import OrderStatus
@@ -168,21 +169,19 @@ def _apply_sort(queryset, sort):
 def _load_products(product_ids):
     """Загружает из каталога метаданные товаров для списка отзывов."""
     products = {}
-    catalog_unavailable = False
+    try:
+        catalog = get_products(product_ids)
+    except StrapiUnavailableError:
+        logger.warning("Catalog service unavailable while enriching admin reviews.")
+        return products
     for product_id in product_ids:
-        if catalog_unavailable:
-            break
-        try:
-            product = get_product(product_id)
-            products[product_id] = {
-                "title": product.get("title"),
-                "image_url": product.get("image_url"),
-            }
-        except StrapiNotFoundError:
+        product = catalog.get(str(product_id))
+        if product is None:
             continue
-        except StrapiUnavailableError:
-            catalog_unavailable = True
-            logger.warning("Catalog service unavailable while enriching admin reviews.")
+        products[product_id] = {
+            "title": product.get("title"),
+            "image_url": product.get("image_url"),
+        }
     return products
 
 
@@ -284,6 +283,8 @@ class AdminReviewModerationBulkView(APIView):
             moderated_at=timezone.now(),
             moderated_by=request.user,
         )
+        if updated:
+            bump_reviews_version()
         return Response({"updated": updated}, status=status.HTTP_200_OK)
 
 
@@ -577,11 +578,7 @@ class ShippingStatusWebhookView(APIView):
         if provider_id not in get_shipping_providers():
             return Response({"detail": "Unknown shipping provider."}, status=status.HTTP_404_NOT_FOUND)
 
-        config = IntegrationConfig.objects.filter(
-            kind=IntegrationKind.SHIPPING,
-            provider_id=provider_id,
-            enabled=True,
-        ).first()
+        config = get_enabled_integration_config(IntegrationKind.SHIPPING, provider_id)
         if not config:
             return Response({"detail": "Shipping provider is disabled."}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -758,18 +755,16 @@ def _build_report_payload(period_from, period_to):
 
     product_ids = set(views_by_product.keys()) | set(sales_by_product.keys())
 
-    for product_id in sorted(product_ids):
-        if titles_by_product.get(product_id):
-            continue
+    missing_title_ids = [product_id for product_id in sorted(product_ids) if not titles_by_product.get(product_id)]
+    if missing_title_ids:
         try:
-            product = get_product(product_id)
-            title = str(product.get("title") or "").strip()
-        except StrapiNotFoundError:
-            title = ""
+            catalog = get_products(missing_title_ids)
         except StrapiUnavailableError:
             logger.warning("Catalog service unavailable while enriching report titles.")
-            title = ""
-        titles_by_product[product_id] = title
+            catalog = {}
+        for product_id in missing_title_ids:
+            product = catalog.get(product_id) or {}
+            titles_by_product[product_id] = str(product.get("title") or "").strip()
 
     results = []
     total_views = 0
@@ -836,13 +831,12 @@ def _available_month_periods():
     return years, {str(year): sorted(months_by_year[year]) for year in years}
 
 
-def _xlsx_response(payload, filename: str):
-    """Формирует и возвращает XLSX-файл с данными отчета."""
-    try:
-        from openpyxl import Workbook
-    except ImportError:
-        logger.exception("openpyxl is not installed.")
-        return Response({"detail": "Excel export dependency is not installed."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _build_xlsx(payload) -> bytes:
+    """Формирует XLSX-файл с данными отчета; без openpyxl пробрасывает `ImportError`."""
+    from openpyxl import Workbook
 
     workbook = Workbook()
     worksheet = workbook.active
@@ -862,12 +856,18 @@ def _xlsx_response(payload, filename: str):
 
     stream = BytesIO()
     workbook.save(stream)
-    stream.seek(0)
+    return stream.getvalue()
 
-    response = HttpResponse(
-        stream.getvalue(),
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    )
+
+def _xlsx_response(payload, filename: str):
+    """Формирует и возвращает XLSX-файл с данными отчета."""
+    try:
+        content = _build_xlsx(payload)
+    except ImportError:
+        logger.exception("openpyxl is not installed.")
+        return Response({"detail": "Excel export dependency is not installed."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    response = HttpResponse(content, content_type=XLSX_CONTENT_TYPE)
     response["Content-Disposition"] = f'attachment; filename="{filename}"'
     return response
 
@@ -12,14 +12,14 @@ from rest_framework.views import APIView
 
 from online_store_backend.cart.models import CartStatus
 from online_store_backend.cart.utils import get_active_cart
+from online_store_backend.integrations.cache import get_enabled_integration_config
 from online_store_backend.integrations.models import IntegrationConfig
 from online_store_backend.integrations.models import IntegrationKind
 from online_store_backend.integrations.providers import get_shipping_providers
 from online_store_backend.integrations.providers import ShippingProviderResponseError
 from online_store_backend.integrations.providers import ShippingProviderUnavailableError
-from online_store_backend.products.strapi_client import StrapiNotFoundError
 from online_store_backend.products.strapi_client import StrapiUnavailableError
-from online_store_backend.products.strapi_client import get_product
+from online_store_backend.products.strapi_client import get_products
 
 from ..models import Order
 from ..models import OrderItem
@@ -64,11 +64,7 @@ class ShippingPickupPointsView(APIView):
         if not provider:
             return Response({"detail": "Shipping provider not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        config = IntegrationConfig.objects.filter(
-            kind=IntegrationKind.SHIPPING,
-            provider_id=provider_id,
-            enabled=True,
-        ).first()
+        config = get_enabled_integration_config(IntegrationKind.SHIPPING, provider_id)
         try:
             if provider_id == "yandex_ndd":
                 if not config:
@@ -114,30 +110,32 @@ def _get_shipping_adapter_and_config(provider_id: str):
     if not adapter:
         raise serializers.ValidationError({"detail": ["Shipping provider not found."]})
 
-    config = IntegrationConfig.objects.filter(
-        kind=IntegrationKind.SHIPPING,
-        provider_id=provider_id,
-        enabled=True,
-    ).first()
+    config = get_enabled_integration_config(IntegrationKind.SHIPPING, provider_id)
     if not config:
         raise serializers.ValidationError({"detail": ["Shipping provider is disabled."]})
 
     return adapter, config
 
 
-def _build_priced_items(cart_items):
-    """Переоценить позиции корзины по актуальному каталогу и посчитать итог товаров."""
+def _build_priced_items(cart_items, *, fresh=False):
+    """Переоценить позиции корзины по актуальному каталогу и посчитать итог товаров.
+
+    `fresh=True` запрашивает цены напрямую из Strapi в обход кэша каталога.
+    """
     priced_items = []
     items_total = Decimal("0.00")
     currency = "RUB"
 
+    cart_items = list(cart_items)
+    try:
+        products = get_products([item.product_id for item in cart_items], fresh=fresh)
+    except StrapiUnavailableError:
+        raise serializers.ValidationError({"detail": ["Catalog service unavailable"]})
+
     for item in cart_items:
-        try:
-            product = get_product(item.product_id)
-        except StrapiNotFoundError:
+        product = products.get(str(item.product_id))
+        if product is None:
             raise serializers.ValidationError({"detail": [f"Product {item.product_id} not found."]})
-        except StrapiUnavailableError:
-            raise serializers.ValidationError({"detail": ["Catalog service unavailable"]})
 
         try:
             unit_price_original = Decimal(product.get("price", "0.00"))
@@ -288,7 +286,7 @@ class CheckoutConfirmView(APIView):
             return Response({"detail": "Cart is empty."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            priced_items, items_total, currency = _build_priced_items(cart_items)
+            priced_items, items_total, currency = _build_priced_items(cart_items, fresh=True)
             shipping_price = _shipping_quote(
                 provider_id=shipping_provider,
                 shipping_type=shipping_type,
@@ -13,6 +13,7 @@ from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from online_store_backend.integrations.cache import get_enabled_integration_config
 from online_store_backend.integrations.models import IntegrationConfig
 from online_store_backend.integrations.models import IntegrationKind
 from online_store_backend.integrations.providers import PaymentProviderUnavailableError
@@ -124,11 +125,7 @@ class PaymentCreateView(APIView):
             status_code = status.HTTP_404_NOT_FOUND if "detail" in detail else status.HTTP_400_BAD_REQUEST
             return Response(detail, status=status_code)
 
-        config = IntegrationConfig.objects.filter(
-            kind=IntegrationKind.PAYMENT,
-            provider_id=provider_id,
-            enabled=True,
-        ).first()
+        config = get_enabled_integration_config(IntegrationKind.PAYMENT, provider_id)
         if not config:
             return Response({"detail": "Payment provider is not available."}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -20,10 +20,13 @@ from rest_framework.viewsets import ReadOnlyModelViewSet
 
 from online_store_backend.cart.models import CartStatus
 from online_store_backend.cart.utils import get_active_cart
-from online_store_backend.products.strapi_client import StrapiNotFoundError
 from online_store_backend.products.strapi_client import StrapiUnavailableError
-from online_store_backend.products.strapi_client import get_product
+from online_store_backend.products.strapi_client import get_products
+from online_store_backend.utils.conditional import apply_cache_headers
+from online_store_backend.utils.conditional import make_etag
+from online_store_backend.utils.conditional import not_modified_response
 
+from ..cache import get_reviews_version
 from ..models import Order
 from ..models import OrderItem
 from ..models import Review
@@ -40,6 +43,7 @@ from .serializers import ReviewSerializer
 DEFAULT_REVIEWS_PAGE_SIZE = 10
 MAX_REVIEWS_PAGE_SIZE = 50
 ALLOWED_REVIEW_SORTS = {"created_desc", "created_asc", "rating_desc", "rating_asc"}
+REVIEW_SUMMARY_CACHE_CONTROL = {"public": True, "max_age": 60}
 
 
 class OrderPagination(PageNumberPagination):
@@ -233,10 +237,20 @@ class ReviewSummaryView(APIView):
                 {"detail": "product_ids query param is required."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        return Response(
+        version = get_reviews_version()
+        validators = {
+            "etag": make_etag("review-summary", version, ",".join(product_ids)),
+            "last_modified": version / 1000,
+            "cache_control": REVIEW_SUMMARY_CACHE_CONTROL,
+        }
+        not_modified = not_modified_response(request, **validators)
+        if not_modified is not None:
+            return not_modified
+        response = Response(
             {"results": _review_summaries(product_ids)},
             status=status.HTTP_200_OK,
         )
+        return apply_cache_headers(response, **validators)
 
 
 class ProductRatingSummaryView(APIView):
@@ -280,20 +294,26 @@ class EligibleReviewProductsView(APIView):
                 return Response({"detail": "Order not found."}, status=status.HTTP_404_NOT_FOUND)
             items_queryset = OrderItem.objects.filter(order=order, review_left_at__isnull=True).select_related("order").order_by("-id")
 
+        unique_items = []
         seen_products = set()
-        payload = []
         for item in items_queryset:
             if item.product_id in seen_products:
                 continue
             seen_products.add(item.product_id)
+            unique_items.append(item)
+        try:
+            products = get_products([item.product_id for item in unique_items])
+        except StrapiUnavailableError:
+            products = {}
+
+        payload = []
+        for item in unique_items:
             title = item.product_title_snapshot
             image_url = item.image_url_snapshot
-            try:
-                product = get_product(item.product_id)
+            product = products.get(str(item.product_id))
+            if product:
                 title = product.get("title") or title
                 image_url = product.get("image_url") or image_url
-            except (StrapiNotFoundError, StrapiUnavailableError):
-                pass
             payload.append(
                 {
                     "product_id": item.product_id,
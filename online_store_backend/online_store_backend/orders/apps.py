@@ -10,3 +10,8 @@ class OrdersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "online_store_backend.orders"
     verbose_name = _("Orders")
+
+    def ready(self):
+        """Подключает signal-хендлеры и обработчики фоновых заданий после инициализации приложения."""
+        from . import jobs  # noqa: F401
+        from . import signals  # noqa: F401
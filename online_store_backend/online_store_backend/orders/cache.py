@@ -0,0 +1,18 @@
+"""Версии данных заказов и отзывов для условных GET-запросов."""
+
+from django.db import transaction
+
+from online_store_backend.utils.conditional import bump_clock_version
+from online_store_backend.utils.conditional import get_clock_version
+
+REVIEWS_VERSION_KEY = "reviews:version"
+
+
+def get_reviews_version() -> int:
+    """Вернуть версию отзывов (время последнего изменения в мс)."""
+    return get_clock_version(REVIEWS_VERSION_KEY)
+
+
+def bump_reviews_version():
+    """Отметить изменение отзывов после фиксации текущей транзакции."""
+    transaction.on_commit(lambda: bump_clock_version(REVIEWS_VERSION_KEY))
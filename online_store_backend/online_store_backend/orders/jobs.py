@@ -0,0 +1,39 @@
+"""Обработчики фоновых заданий заказов: XLSX-выгрузки отчетов."""
+
+from online_store_backend.jobs.registry import job_handler
+from online_store_backend.jobs.runner import JobError
+
+from .api.admin_views import XLSX_CONTENT_TYPE
+from .api.admin_views import MonthlyReportQuerySerializer
+from .api.admin_views import YearlyReportQuerySerializer
+from .api.admin_views import _build_report_payload
+from .api.admin_views import _build_xlsx
+from .api.admin_views import _resolve_month_period
+from .api.admin_views import _resolve_year_period
+
+
+def _attach_report(context, payload, filename):
+    """Сохраняет XLSX-отчет файлом результата задания."""
+    context.set_progress(rows=len(payload["results"]))
+    try:
+        content = _build_xlsx(payload)
+    except ImportError as exc:
+        raise JobError("Excel export dependency is not installed.") from exc
+    context.attach_file(filename, XLSX_CONTENT_TYPE, content)
+    return {"rows": len(payload["results"]), "totals": payload["totals"]}
+
+
+@job_handler("orders.monthly_report_xlsx", params_serializer=MonthlyReportQuerySerializer)
+def monthly_report_xlsx(context):
+    """Формирует XLSX-отчет за месяц (`year`, `month`)."""
+    year, month, period_from, period_to = _resolve_month_period(context.params)
+    payload = _build_report_payload(period_from, period_to)
+    return _attach_report(context, payload, f"monthly_report_{year}_{month:02}.xlsx")
+
+
+@job_handler("orders.yearly_report_xlsx", params_serializer=YearlyReportQuerySerializer)
+def yearly_report_xlsx(context):
+    """Формирует XLSX-отчет за год (`year`)."""
+    year, period_from, period_to = _resolve_year_period(context.params)
+    payload = _build_report_payload(period_from, period_to)
+    return _attach_report(context, payload, f"yearly_report_{year}.xlsx")
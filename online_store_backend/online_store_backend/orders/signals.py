@@ -0,0 +1,15 @@
+"""Signals приложения заказов."""
+
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .cache import bump_reviews_version
+from .models import Review
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review_summaries(sender, **kwargs):
+    """Сбрасывает ETag сводок отзывов при изменении любого отзыва."""
+    bump_reviews_version()
@@ -0,0 +1,23 @@
+"""Настройки Django admin для локального зеркала каталога."""
+
+from django.contrib import admin
+
+from .models import CatalogCategory
+from .models import CatalogProduct
+
+
+@admin.register(CatalogCategory)
+class CatalogCategoryAdmin(admin.ModelAdmin):
+    """Админ-таблица категорий зеркала."""
+
+    list_display = ("document_id", "slug", "title", "strapi_updated_at", "synced_at")
+    search_fields = ("document_id", "slug", "title")
+
+
+@admin.register(CatalogProduct)
+class CatalogProductAdmin(admin.ModelAdmin):
+    """Админ-таблица товаров зеркала."""
+
+    list_display = ("document_id", "slug", "title", "price", "discount_percent", "category_slug", "strapi_updated_at")
+    list_filter = ("category_slug",)
+    search_fields = ("document_id", "slug", "title")
@@ -0,0 +1,79 @@
+"""Сборка payload'ов записи товаров в Strapi из сырых атрибутов и данных админки."""
+
+import logging
+from decimal import Decimal, InvalidOperation
+
+logger = logging.getLogger(__name__)
+
+
+def _extract_category_document_id(category):
+    """Достает category documentId/id из разных форматов payload."""
+    if not category:
+        return None
+    if isinstance(category, dict) and "data" in category:
+        category = category["data"]
+    if not isinstance(category, dict):
+        return None
+    return category.get("documentId") or category.get("id")
+
+
+def _extract_media_ids(image):
+    """Извлекает numeric media id из relation-представления Strapi, сохраняя порядок."""
+    if not image:
+        return []
+    if isinstance(image, dict) and "data" in image:
+        image = image["data"]
+    items = image if isinstance(image, list) else [image]
+    result = []
+    seen = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        attrs = item.get("attributes") if isinstance(item.get("attributes"), dict) else item
+        candidate = attrs.get("id") if isinstance(attrs, dict) else item.get("id")
+        if candidate in (None, ""):
+            candidate = item.get("id")
+        try:
+            numeric = int(candidate)
+        except (TypeError, ValueError):
+            continue
+        if numeric <= 0 or numeric in seen:
+            continue
+        seen.add(numeric)
+        result.append(numeric)
+    return result
+
+
+def _extract_media_id(image):
+    """Извлекает numeric id первого изображения."""
+    image_ids = _extract_media_ids(image)
+    return image_ids[0] if image_ids else None
+
+
+def _normalize_price_value(value):
+    """Приводит цену к строке формата `0.00` для API Strapi."""
+    if value is None:
+        return None
+    try:
+        decimal_value = Decimal(str(value)).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        logger.warning("Invalid price value from Strapi: %r", value)
+        return None
+    return format(decimal_value, "f")
+
+
+def _build_product_payload(attrs):
+    """Формирует payload товара в формате, ожидаемом Strapi."""
+    payload = {
+        "title": attrs.get("title"),
+        "slug": attrs.get("slug"),
+        "description": attrs.get("description"),
+        "price": _normalize_price_value(attrs.get("price")),
+        "currency": attrs.get("currency") or "RUB",
+        "category": _extract_category_document_id(attrs.get("category")),
+        "discount_percent": attrs.get("discount_percent") or 0,
+        "publishedAt": attrs.get("publishedAt"),
+    }
+    image_ids = _extract_media_ids(attrs.get("image"))
+    payload["image"] = image_ids
+    return payload
@@ -24,6 +24,7 @@ class CategoryAdminSerializer(serializers.Serializer):
     slug = serializers.CharField(allow_null=True, allow_blank=True, required=False)
     title = serializers.CharField(allow_null=True, allow_blank=True, required=False)
     product_count = serializers.IntegerField(required=False)
+    discount_percents = serializers.ListField(child=serializers.IntegerField(), required=False)
     derived_discount_percent = serializers.IntegerField(required=False, allow_null=True)
     derived_discount_is_mixed = serializers.BooleanField(required=False)
 
@@ -216,3 +217,40 @@ class BulkUpdateSerializer(serializers.Serializer):
                 {"operation": {"value": "Must be greater than or equal to 0."}}
             )
         return attrs
+
+
+IMPORT_FILE_EXTENSIONS = (".csv", ".xlsx")
+IMPORT_STORAGE_PREFIX = "imports/"
+
+
+class ProductImportSerializer(serializers.Serializer):
+    """Загрузка файла импорта товаров (CSV или XLSX)."""
+
+    file = serializers.FileField()
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate_file(self, value):
+        """Принимает только файлы `.csv` и `.xlsx`."""
+        if not str(value.name or "").lower().endswith(IMPORT_FILE_EXTENSIONS):
+            raise serializers.ValidationError("Only .csv and .xlsx files are allowed.")
+        return value
+
+
+class ProductImportParamsSerializer(serializers.Serializer):
+    """Параметры задания импорта: сохраненный файл в хранилище и режим проверки."""
+
+    path = serializers.CharField()
+    filename = serializers.CharField()
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate_path(self, value):
+        """Разрешает только файлы из каталога загрузок импорта."""
+        if not value.startswith(IMPORT_STORAGE_PREFIX) or ".." in value:
+            raise serializers.ValidationError("Invalid import file path.")
+        return value
+
+    def validate_filename(self, value):
+        """Принимает только файлы `.csv` и `.xlsx`."""
+        if not value.lower().endswith(IMPORT_FILE_EXTENSIONS):
+            raise serializers.ValidationError("Only .csv and .xlsx files are allowed.")
+        return value
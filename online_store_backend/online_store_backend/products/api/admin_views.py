@@ -2,27 +2,41 @@
 
 import json
 import logging
-from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 
+from django.core.files.storage import default_storage
+from django.db import IntegrityError
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework import parsers
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ViewSet
 
+from online_store_backend.jobs.runner import enqueue_job
+from online_store_backend.jobs.runner import serialize_job
+from online_store_backend.utils.local_cache import tiered_cache_stats
+
 from .admin_serializers import CategoryAdminSerializer
 from .admin_serializers import CategoryDiscountApplySerializer
 from .admin_serializers import BulkUpdateSerializer
+from .admin_serializers import IMPORT_STORAGE_PREFIX
 from .admin_serializers import CategoryUpsertSerializer
 from .admin_serializers import ProductAdminSerializer
+from .admin_serializers import ProductImportSerializer
 from .admin_serializers import ProductUpdateSerializer
 from .admin_serializers import ProductUpsertSerializer
+from ..admin_payloads import _extract_category_document_id
+from ..admin_payloads import _extract_media_ids
+from ..admin_payloads import _normalize_price_value
 from ..cache import bump_products_cache_version
+from ..cache import invalidate_categories
+from ..cache import invalidate_product
 from ..strapi_client import StrapiNotFoundError
 from ..strapi_client import StrapiRequestError
 from ..strapi_client import StrapiUnavailableError
+from ..strapi_client import _normalize_category
 from ..strapi_client import create_category_admin
 from ..strapi_client import create_product_admin
 from ..strapi_client import delete_category_admin
@@ -33,15 +47,32 @@ from ..strapi_client import list_categories_admin
 from ..strapi_client import list_products_admin
 from ..strapi_client import get_product_admin_raw
 from ..strapi_client import update_category_admin
-from ..strapi_client import update_product_admin_raw
 from ..strapi_client import update_product_admin_flat
 from ..strapi_client import upload_product_image_admin
+from ..catalog_cache import catalog_cache_stats
+from ..catalog_cache import sample_namespace_memory
+from ..circuit_breaker import strapi_breaker
+from ..discount_jobs import active_discount_job
+from ..discount_jobs import discount_job_status
+from ..discount_jobs import resume_discount_job
+from ..discount_jobs import start_discount_job
+from ..discount_stats import category_discount_stats
+from ..discount_stats import detach_category
+from ..discount_stats import forget_products
+from ..discount_stats import payload_discount_state
+from ..discount_stats import record_product_discounts
+from ..strapi_session import get_pool_stats
+from ..models import CategoryDiscountJob
+from ..models import DiscountJobAction
+from ..slug_index import index_product_slug
+from ..slug_index import unindex_product
+from ..suggest import suggest_service
+from ..warmer import last_warm_report
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
-CATEGORY_PRODUCTS_PAGE_SIZE = 100
 
 
 def _positive_int(value, default):
@@ -69,62 +100,6 @@ def _published_at(publish):
     return timezone.now().isoformat() if publish else None
 
 
-def _extract_category_document_id(category):
-    """Достает category documentId/id из разных форматов payload."""
-    if not category:
-        return None
-    if isinstance(category, dict) and "data" in category:
-        category = category["data"]
-    if not isinstance(category, dict):
-        return None
-    return category.get("documentId") or category.get("id")
-
-
-def _extract_media_ids(image):
-    """Извлекает numeric media id из relation-представления Strapi, сохраняя порядок."""
-    if not image:
-        return []
-    if isinstance(image, dict) and "data" in image:
-        image = image["data"]
-    items = image if isinstance(image, list) else [image]
-    result = []
-    seen = set()
-    for item in items:
-        if not isinstance(item, dict):
-            continue
-        attrs = item.get("attributes") if isinstance(item.get("attributes"), dict) else item
-        candidate = attrs.get("id") if isinstance(attrs, dict) else item.get("id")
-        if candidate in (None, ""):
-            candidate = item.get("id")
-        try:
-            numeric = int(candidate)
-        except (TypeError, ValueError):
-            continue
-        if numeric <= 0 or numeric in seen:
-            continue
-        seen.add(numeric)
-        result.append(numeric)
-    return result
-
-
-def _extract_media_id(image):
-    """Извлекает numeric id первого изображения."""
-    image_ids = _extract_media_ids(image)
-    return image_ids[0] if image_ids else None
-
-
-def _normalize_price_value(value):
-    """Приводит цену к строке формата `0.00` для API Strapi."""
-    if value is None:
-        return None
-    try:
-        decimal_value = Decimal(str(value)).quantize(Decimal("0.01"))
-    except (InvalidOperation, ValueError):
-        logger.warning("Invalid price value from Strapi: %r", value)
-        return None
-    return format(decimal_value, "f")
-
-
 def _trim_strapi_message(text):
     """Извлекает короткое человеко-читаемое сообщение ошибки Strapi."""
     message = None
@@ -173,77 +148,6 @@ def _slug_conflict_response():
     )
 
 
-def _category_products_params(category_id, page, page_size):
-    """Собирает параметры запроса товаров категории в Strapi."""
-    return {
-        "pagination[page]": page,
-        "pagination[pageSize]": page_size,
-        "populate": "category",
-        "filters[category][documentId][$eq]": category_id,
-    }
-
-
-def _build_product_payload(attrs):
-    """Формирует payload товара в формате, ожидаемом Strapi."""
-    payload = {
-        "title": attrs.get("title"),
-        "slug": attrs.get("slug"),
-        "description": attrs.get("description"),
-        "price": _normalize_price_value(attrs.get("price")),
-        "currency": attrs.get("currency") or "RUB",
-        "category": _extract_category_document_id(attrs.get("category")),
-        "discount_percent": attrs.get("discount_percent") or 0,
-        "publishedAt": attrs.get("publishedAt"),
-    }
-    image_ids = _extract_media_ids(attrs.get("image"))
-    payload["image"] = image_ids
-    return payload
-
-
-def _get_category_discount_stats(category_id):
-    """Считает агрегированную статистику скидок по категории."""
-    page = 1
-    total_in_category = 0
-    discounts = set()
-    while True:
-        params = _category_products_params(category_id, page, CATEGORY_PRODUCTS_PAGE_SIZE)
-        products, pagination = list_products_admin(
-            page=page,
-            page_size=CATEGORY_PRODUCTS_PAGE_SIZE,
-            params=params,
-        )
-        for product in products:
-            total_in_category += 1
-            discount_value = product.get("discount_percent") or 0
-            try:
-                discount_value = int(discount_value)
-            except (TypeError, ValueError):
-                discount_value = 0
-            discounts.add(max(0, min(100, discount_value)))
-        total = pagination.get("total") if isinstance(pagination, dict) else None
-        if not total or page * CATEGORY_PRODUCTS_PAGE_SIZE >= int(total):
-            break
-        page += 1
-
-    if total_in_category == 0:
-        return {
-            "product_count": 0,
-            "derived_discount_percent": None,
-            "derived_discount_is_mixed": False,
-        }
-    if len(discounts) == 1:
-        return {
-            "product_count": total_in_category,
-            "derived_discount_percent": next(iter(discounts)),
-            "derived_discount_is_mixed": False,
-        }
-    return {
-        "product_count": total_in_category,
-        "derived_discount_percent": None,
-        "derived_discount_is_mixed": True,
-    }
-
-
 class CategoryAdminViewSet(ViewSet):
     """Управление категориями каталога в админском API."""
 
@@ -251,17 +155,13 @@ class CategoryAdminViewSet(ViewSet):
     serializer_class = CategoryAdminSerializer
 
     def list(self, request):
-        """Возвращает список категорий со статистикой скидок."""
+        """Возвращает список категорий со статистикой скидок из предрассчитанных агрегатов."""
         page, page_size = _build_pagination(
             request.query_params.get("page"),
             request.query_params.get("page_size"),
         )
         try:
             results, pagination = list_categories_admin(page=page, page_size=page_size)
-            enriched = []
-            for category in results:
-                stats = _get_category_discount_stats(category["id"])
-                enriched.append({**category, **stats})
         except StrapiUnavailableError:
             logger.exception("Strapi unavailable while listing categories.")
             return Response(
@@ -273,6 +173,8 @@ class CategoryAdminViewSet(ViewSet):
                 {"detail": _trim_strapi_message(exc.response_text)},
                 status=exc.status_code,
             )
+        stats = category_discount_stats([category["id"] for category in results])
+        enriched = [{**category, **stats[category["id"]]} for category in results]
         serializer = self.serializer_class(enriched, many=True)
         return Response({"results": serializer.data, "pagination": pagination})
 
@@ -312,6 +214,7 @@ class CategoryAdminViewSet(ViewSet):
                 status=status.HTTP_502_BAD_GATEWAY,
             )
         bump_products_cache_version()
+        invalidate_categories()
         response_serializer = self.serializer_class(category)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
@@ -338,6 +241,7 @@ class CategoryAdminViewSet(ViewSet):
                 status=status.HTTP_502_BAD_GATEWAY,
             )
         bump_products_cache_version()
+        invalidate_categories()
         response_serializer = self.serializer_class(category)
         return Response(response_serializer.data)
 
@@ -354,157 +258,70 @@ class CategoryAdminViewSet(ViewSet):
                 status=status.HTTP_502_BAD_GATEWAY,
             )
         bump_products_cache_version()
+        invalidate_categories()
+        detach_category(pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    def _start_discount_job(self, request, pk, action, discount_percent):
+        """Запускает фоновое задание скидки категории; 409, если задание категории уже идет."""
+        running = active_discount_job(pk)
+        if running is None:
+            try:
+                job = start_discount_job(pk, action, discount_percent, user=request.user)
+            except IntegrityError:
+                running = active_discount_job(pk)
+            else:
+                return Response(discount_job_status(job), status=status.HTTP_202_ACCEPTED)
+        return Response(
+            {
+                "detail": "Discount job for this category is already running.",
+                "job": discount_job_status(running) if running is not None else None,
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
+
     @action(detail=True, methods=["post"], url_path="apply-discount")
     def apply_discount(self, request, pk=None):
-        """Применяет скидку ко всем товарам категории."""
+        """Запускает применение скидки ко всем товарам категории.
+
+        Скидка выставляется товарам с меньшей скидкой; прогресс отдает
+        `discount-jobs/<id>/`.
+        """
         serializer = CategoryDiscountApplySerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        requested_discount = serializer.validated_data["discount_percent"]
-        page = 1
-        updated_count = 0
-        skipped_count = 0
-        total_in_category = 0
-
-        while True:
-            params = _category_products_params(pk, page, CATEGORY_PRODUCTS_PAGE_SIZE)
-            try:
-                products, pagination = list_products_admin(
-                    page=page,
-                    page_size=CATEGORY_PRODUCTS_PAGE_SIZE,
-                    params=params,
-                )
-            except StrapiUnavailableError:
-                logger.exception(
-                    "Strapi unavailable while applying category discount for %s.", pk
-                )
-                return Response(
-                    {"detail": "Catalog service unavailable"},
-                    status=status.HTTP_502_BAD_GATEWAY,
-                )
-            for product in products:
-                total_in_category += 1
-                product_discount = product.get("discount_percent") or 0
-                try:
-                    product_discount = int(product_discount)
-                except (TypeError, ValueError):
-                    product_discount = 0
-                product_discount = max(0, min(100, product_discount))
-                if product_discount >= requested_discount:
-                    skipped_count += 1
-                    continue
-                product_id = product.get("id")
-                try:
-                    attrs = get_product_admin_raw(product_id)
-                    payload = _build_product_payload(attrs)
-                    payload["discount_percent"] = requested_discount
-                    update_product_admin_raw(product_id, payload)
-                    updated_count += 1
-                except StrapiNotFoundError:
-                    skipped_count += 1
-                except StrapiRequestError as exc:
-                    return Response(
-                        {"detail": _trim_strapi_message(exc.response_text)},
-                        status=exc.status_code,
-                    )
-                except StrapiUnavailableError:
-                    logger.exception(
-                        "Strapi unavailable while applying discount to product %s.", product_id
-                    )
-                    return Response(
-                        {"detail": "Catalog service unavailable"},
-                        status=status.HTTP_502_BAD_GATEWAY,
-                    )
-            total = pagination.get("total") if isinstance(pagination, dict) else None
-            if not total or page * CATEGORY_PRODUCTS_PAGE_SIZE >= int(total):
-                break
-            page += 1
-
-        if updated_count > 0:
-            bump_products_cache_version()
-        return Response(
-            {
-                "category_id": pk,
-                "requested_discount": requested_discount,
-                "updated_count": updated_count,
-                "skipped_count": skipped_count,
-                "total_in_category": total_in_category,
-            }
+        return self._start_discount_job(
+            request,
+            pk,
+            DiscountJobAction.APPLY,
+            serializer.validated_data["discount_percent"],
         )
 
     @action(detail=True, methods=["post"], url_path="remove-discount")
     def remove_discount(self, request, pk=None):
-        """Сбрасывает скидку до 0 для всех товаров категории."""
-        page = 1
-        updated_count = 0
-        skipped_count = 0
-        total_in_category = 0
-
-        while True:
-            params = _category_products_params(pk, page, CATEGORY_PRODUCTS_PAGE_SIZE)
-            try:
-                products, pagination = list_products_admin(
-                    page=page,
-                    page_size=CATEGORY_PRODUCTS_PAGE_SIZE,
-                    params=params,
-                )
-            except StrapiUnavailableError:
-                logger.exception(
-                    "Strapi unavailable while removing category discount for %s.", pk
-                )
-                return Response(
-                    {"detail": "Catalog service unavailable"},
-                    status=status.HTTP_502_BAD_GATEWAY,
-                )
-            for product in products:
-                total_in_category += 1
-                product_id = product.get("id")
-                product_discount = product.get("discount_percent") or 0
-                try:
-                    product_discount = int(product_discount)
-                except (TypeError, ValueError):
-                    product_discount = 0
-                product_discount = max(0, min(100, product_discount))
-                if product_discount == 0:
-                    skipped_count += 1
-                    continue
-                try:
-                    attrs = get_product_admin_raw(product_id)
-                    payload = _build_product_payload(attrs)
-                    payload["discount_percent"] = 0
-                    update_product_admin_raw(product_id, payload)
-                    updated_count += 1
-                except StrapiNotFoundError:
-                    skipped_count += 1
-                except StrapiRequestError as exc:
-                    return Response(
-                        {"detail": _trim_strapi_message(exc.response_text)},
-                        status=exc.status_code,
-                    )
-                except StrapiUnavailableError:
-                    logger.exception(
-                        "Strapi unavailable while removing discount from product %s.", product_id
-                    )
-                    return Response(
-                        {"detail": "Catalog service unavailable"},
-                        status=status.HTTP_502_BAD_GATEWAY,
-                    )
-            total = pagination.get("total") if isinstance(pagination, dict) else None
-            if not total or page * CATEGORY_PRODUCTS_PAGE_SIZE >= int(total):
-                break
-            page += 1
-
-        if updated_count > 0:
-            bump_products_cache_version()
-        return Response(
-            {
-                "category_id": pk,
-                "updated_count": updated_count,
-                "skipped_count": skipped_count,
-                "total_in_category": total_in_category,
-            }
-        )
+        """Запускает сброс скидки до 0 для всех товаров категории."""
+        return self._start_discount_job(request, pk, DiscountJobAction.REMOVE, 0)
+
+    @action(detail=False, methods=["get"], url_path=r"discount-jobs/(?P<job_id>\d+)")
+    def discount_job(self, request, job_id=None):
+        """Возвращает прогресс задания скидки: счетчики товаров и скорость обработки."""
+        job = CategoryDiscountJob.objects.filter(pk=job_id).first()
+        if job is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(discount_job_status(job))
+
+    @action(detail=False, methods=["post"], url_path=r"discount-jobs/(?P<job_id>\d+)/resume")
+    def discount_job_resume(self, request, job_id=None):
+        """Продолжает прерванное задание скидки и повторяет товары с ошибками."""
+        job = CategoryDiscountJob.objects.filter(pk=job_id).first()
+        if job is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not resume_discount_job(job, user=request.user):
+            return Response(
+                {"detail": "Discount job is still running.", "job": discount_job_status(job)},
+                status=status.HTTP_409_CONFLICT,
+            )
+        job.refresh_from_db()
+        return Response(discount_job_status(job), status=status.HTTP_202_ACCEPTED)
 
 
 class ProductAdminViewSet(ViewSet):
@@ -576,7 +393,9 @@ class ProductAdminViewSet(ViewSet):
                 {"detail": "Catalog service unavailable"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
-        bump_products_cache_version()
+        invalidate_product(product["id"], category_slugs={(product.get("category") or {}).get("slug")})
+        index_product_slug(product["id"], product.get("slug"))
+        record_product_discounts({product["id"]: payload_discount_state(payload)})
         response_serializer = self.serializer_class(product)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
@@ -644,7 +463,13 @@ class ProductAdminViewSet(ViewSet):
                 {"detail": "Catalog service unavailable"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
-        bump_products_cache_version()
+        previous_category = _normalize_category(current.get("category")) or {}
+        invalidate_product(
+            pk,
+            category_slugs={previous_category.get("slug"), (product.get("category") or {}).get("slug")},
+        )
+        index_product_slug(pk, product.get("slug"), previous_slugs={current.get("slug")})
+        record_product_discounts({pk: payload_discount_state(payload)})
         response_serializer = self.serializer_class(product)
         return Response(response_serializer.data)
 
@@ -661,6 +486,8 @@ class ProductAdminViewSet(ViewSet):
                 status=status.HTTP_502_BAD_GATEWAY,
             )
         bump_products_cache_version()
+        unindex_product(pk)
+        forget_products([pk])
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(detail=False, methods=["post"], url_path="upload-image")
@@ -695,12 +522,10 @@ class ProductAdminViewSet(ViewSet):
 
     @action(detail=False, methods=["post"], url_path="bulk-update")
     def bulk_update(self, request):
-        """Выполняет массовые операции над списком товаров."""
+        """Ставит массовую операцию над списком товаров в очередь фоновых заданий."""
         serializer = BulkUpdateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        product_ids = serializer.validated_data["product_ids"]
-        operation = serializer.validated_data["operation"]
-        operation_type = operation.get("type")
+        operation_type = serializer.validated_data["operation"].get("type")
         if operation_type not in {
             "set_category",
             "discount_percent",
@@ -711,93 +536,47 @@ class ProductAdminViewSet(ViewSet):
                 {"detail": "Unsupported operation type."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        category_id = operation.get("category_id")
-        if category_id == "":
-            category_id = None
-        value = operation.get("value")
-        updated = 0
-        failed = []
-        for product_id in product_ids:
-            try:
-                attrs = get_product_admin_raw(product_id)
-            except StrapiNotFoundError:
-                failed.append({"id": product_id, "status": 404, "detail": "Not found."})
-                continue
-            except StrapiRequestError as exc:
-                failed.append(
-                    {
-                        "id": product_id,
-                        "status": exc.status_code,
-                        "detail": exc.response_text,
-                    }
-                )
-                continue
-            except StrapiUnavailableError:
-                logger.exception("Strapi unavailable while fetching product %s.", product_id)
-                return Response(
-                    {"detail": "Catalog service unavailable"},
-                    status=status.HTTP_502_BAD_GATEWAY,
-                )
-            price_value = attrs.get("price")
-            if price_value is None:
-                failed.append(
-                    {"id": product_id, "status": 422, "detail": "Missing price on product."}
-                )
-                continue
-            try:
-                current_price = Decimal(str(price_value))
-            except (InvalidOperation, ValueError):
-                failed.append(
-                    {"id": product_id, "status": 422, "detail": "Invalid price on product."}
-                )
-                continue
-            if operation_type == "discount_percent":
-                current_price = (current_price * (Decimal("1") - (value / Decimal("100")))).quantize(
-                    Decimal("0.01"),
-                    rounding=ROUND_HALF_UP,
-                )
-            elif operation_type == "increase_price_fixed":
-                current_price = (current_price + value).quantize(
-                    Decimal("0.01"),
-                    rounding=ROUND_HALF_UP,
-                )
-            elif operation_type == "decrease_price_fixed":
-                current_price = max(
-                    (current_price - value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
-                    Decimal("0.00"),
-                )
-            payload = {
-                "title": attrs.get("title"),
-                "slug": attrs.get("slug"),
-                "description": attrs.get("description"),
-                "price": str(current_price),
-                "currency": attrs.get("currency"),
-                "category": category_id
-                if operation_type == "set_category"
-                else _extract_category_document_id(attrs.get("category")),
-                "image": _extract_media_ids(attrs.get("image")),
-                "publishedAt": attrs.get("publishedAt"),
-            }
-            try:
-                update_product_admin_raw(product_id, payload)
-            except StrapiNotFoundError:
-                failed.append({"id": product_id, "status": 404, "detail": "Not found."})
-            except StrapiRequestError as exc:
-                failed.append(
-                    {
-                        "id": product_id,
-                        "status": exc.status_code,
-                        "detail": exc.response_text,
-                    }
-                )
-            except StrapiUnavailableError:
-                logger.exception("Strapi unavailable while updating product %s.", product_id)
-                return Response(
-                    {"detail": "Catalog service unavailable"},
-                    status=status.HTTP_502_BAD_GATEWAY,
-                )
-            else:
-                updated += 1
-        if updated > 0:
-            bump_products_cache_version()
-        return Response({"updated": updated, "failed": failed})
+        job = enqueue_job("products.bulk_update", serializer.validated_data, user=request.user)
+        return Response(serialize_job(job), status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_products(self, request):
+        """Ставит импорт товаров из CSV/XLSX в очередь фоновых заданий.
+
+        Файл сохраняется в хранилище и читается заданием построчно; товары
+        создаются или обновляются по slug. `dry_run` только проверяет строки.
+        """
+        serializer = ProductImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uploaded_file = serializer.validated_data["file"]
+        path = default_storage.save(f"{IMPORT_STORAGE_PREFIX}{uploaded_file.name}", uploaded_file)
+        job = enqueue_job(
+            "products.import",
+            {"path": path, "filename": uploaded_file.name, "dry_run": serializer.validated_data["dry_run"]},
+            user=request.user,
+        )
+        return Response(serialize_job(job), status=status.HTTP_202_ACCEPTED)
+
+
+class CatalogMetricsView(APIView):
+    """Метрики интеграции с Strapi для текущего воркера."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        """Возвращает статистику пула соединений, circuit breaker'а Strapi, кэша каталога и его прогрева.
+
+        Также возвращается состояние индекса подсказок поиска этого воркера.
+        С `?memory=1` добавляется выборочная оценка памяти Redis по пространствам ключей.
+        """
+        payload = {
+            "pool": get_pool_stats(),
+            "breaker": strapi_breaker.snapshot(),
+            "cache": catalog_cache_stats.snapshot(),
+            "tiers": tiered_cache_stats(),
+            "warmer": last_warm_report(),
+            "suggest": suggest_service.snapshot(),
+        }
+        if request.query_params.get("memory") in ("1", "true"):
+            payload["cache"]["memory"] = sample_namespace_memory()
+        return Response(payload, status=status.HTTP_200_OK)
@@ -0,0 +1,45 @@
+"""Лимиты публичного API каталога."""
+
+from django.conf import settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class ProductNotFoundThrottle(SimpleRateThrottle):
+    """Бюджет запросов карточек товаров, закончившихся 404, на клиента.
+
+    В отличие от обычных throttle'ов, учитываются только ответы 404
+    (`record_not_found`), а проверка лишь сверяет счетчик с лимитом
+    `CATALOG_NOT_FOUND_RATE`. Клиент определяется по пользователю или IP.
+    """
+
+    scope = "product_not_found"
+
+    def get_rate(self):
+        return settings.CATALOG_NOT_FOUND_RATE
+
+    def get_cache_key(self, request, view):
+        user = getattr(request, "user", None)
+        ident = f"user:{user.pk}" if user is not None and user.is_authenticated else self.get_ident(request)
+        return self.cache_format % {"scope": self.scope, "ident": ident}
+
+    def _load_history(self, request, view):
+        self.key = self.get_cache_key(request, view)
+        self.history = self.cache.get(self.key, [])
+        self.now = self.timer()
+        while self.history and self.history[-1] <= self.now - self.duration:
+            self.history.pop()
+
+    def allow_request(self, request, view):
+        """Проверяет, что клиент не исчерпал бюджет 404; сам запрос не учитывается."""
+        if self.rate is None:
+            return True
+        self._load_history(request, view)
+        return len(self.history) < self.num_requests
+
+    def record_not_found(self, request, view):
+        """Учитывает ответ 404 в бюджете клиента."""
+        if self.rate is None:
+            return
+        self._load_history(request, view)
+        self.history.insert(0, self.now)
+        self.cache.set(self.key, self.history, self.duration)
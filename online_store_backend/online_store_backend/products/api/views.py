@@ -1,9 +1,11 @@
 """Публичные API viewset'ы каталога товаров и категорий."""
 
 import logging
+import time
 from urllib.parse import urlencode
 
-from django.core.cache import cache
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import status
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny
@@ -11,10 +13,40 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ViewSet
 
 from online_store_backend.orders.models import ProductViewEvent
+from online_store_backend.utils.conditional import apply_cache_headers
+from online_store_backend.utils.conditional import not_modified_response
 
 from .serializers import CategorySerializer
 from .serializers import ProductSerializer
+from .throttling import ProductNotFoundThrottle
+from ..cache import categories_list_cache_key
+from ..cache import category_detail_cache_key
 from ..cache import get_products_cache_version
+from ..cache import get_tag_version
+from ..cache import product_detail_cache_key
+from ..cache import products_list_tag
+from ..cursors import InvalidCursorError
+from ..cursors import build_cursor_page
+from ..cursors import collect_keyset_items
+from ..cursors import decode_cursor
+from ..cursors import strapi_keyset_queries
+from ..mirror import get_mirror_category
+from ..mirror import get_mirror_product
+from ..mirror import get_mirror_product_by_slug
+from ..mirror import is_mirror_read_mode
+from ..mirror import list_mirror_categories
+from ..mirror import list_mirror_products
+from ..mirror import list_mirror_products_keyset
+from ..response_cache import get_rendered
+from ..response_cache import rendered_response
+from ..response_cache import store_rendered
+from ..search import search_index_enabled
+from ..search import search_products
+from ..singleflight import get_or_fill_entry
+from ..singleflight import peek_fresh_entry
+from ..slug_index import index_product_slug
+from ..slug_index import lookup_product_slug
+from ..slug_index import mark_slug_missing
 from ..strapi_client import StrapiNotFoundError
 from ..strapi_client import StrapiUnavailableError
 from ..strapi_client import get_category
@@ -22,6 +54,9 @@ from ..strapi_client import get_product
 from ..strapi_client import get_product_by_slug
 from ..strapi_client import list_categories
 from ..strapi_client import list_products
+from ..suggest import DEFAULT_SUGGEST_LIMIT
+from ..suggest import MAX_SUGGEST_LIMIT
+from ..suggest import suggest_service
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +64,14 @@ DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
 MAX_PUBLIC_PAGE_SIZE = 50
 ALLOWED_ORDERING = {"price", "-price", "title", "-title"}
+STALE_HEADER = "X-Catalog-Stale-Seconds"
+PRODUCTS_LIST_CACHE_CONTROL = {"public": True, "max_age": 30, "stale_while_revalidate": 30}
+PRODUCT_DETAIL_CACHE_CONTROL = {"public": True, "max_age": 60, "stale_while_revalidate": 60}
+CATEGORIES_CACHE_CONTROL = {"public": True, "max_age": 60, "stale_while_revalidate": 60}
+SUGGEST_CACHE_CONTROL = {"public": True, "max_age": 60}
+# Логический TTL записей кэша товаров (секунды).
+PRODUCTS_LIST_CACHE_TTL = 60
+PRODUCT_DETAIL_CACHE_TTL = 300
 
 
 def _positive_int(value, default):
@@ -50,6 +93,7 @@ def _parse_products_query_params(request):
     raw_ordering = request.query_params.get("ordering")
     raw_category = request.query_params.get("category")
     raw_search = request.query_params.get("search")
+    raw_cursor = request.query_params.get("cursor")
 
     page = 1
     if raw_page not in (None, ""):
@@ -82,6 +126,14 @@ def _parse_products_query_params(request):
     if search == "":
         search = None
 
+    cursor = raw_cursor.strip() if isinstance(raw_cursor, str) else None
+    cursor_position = None
+    if cursor and not errors:
+        try:
+            cursor_position = decode_cursor(cursor, ordering)
+        except InvalidCursorError:
+            errors.append("Invalid cursor.")
+
     if errors:
         return None, errors[0]
 
@@ -91,6 +143,8 @@ def _parse_products_query_params(request):
         "ordering": ordering,
         "category": category,
         "search": search,
+        "cursor": cursor,
+        "cursor_position": cursor_position,
     }, None
 
 
@@ -119,29 +173,219 @@ def _build_products_strapi_params(validated):
     return params
 
 
-def _products_cache_key(validated):
-    """Формирует ключ кэша для выдачи списка товаров."""
-    version = get_products_cache_version()
+def _products_query_parts(validated):
+    """Возвращает неверсионированные части ключа кэша списка товаров."""
     parts = [
-        f"v={version}",
         f"page={validated['page']}",
         f"page_size={validated['page_size']}",
         f"ordering={validated.get('ordering') or ''}",
         f"category={validated.get('category') or ''}",
         f"search={validated.get('search') or ''}",
     ]
+    if validated.get("cursor") is not None:
+        parts[0] = f"cursor={validated['cursor']}"
+    return parts
+
+
+def _products_cache_key(validated):
+    """Формирует ключ кэша для выдачи списка товаров."""
+    version = get_products_cache_version()
+    tag = products_list_tag(validated.get("category"))
+    parts = [
+        f"v={version}",
+        f"tag={tag}:{get_tag_version(tag)}",
+        *_products_query_parts(validated),
+    ]
     return "products:list:" + "|".join(parts)
 
 
-def _build_cache_key(prefix, query_params):
-    """Строит детерминированный cache key по query-параметрам."""
+def _last_known_good_key(prefix, suffix):
+    """Ключ долгоживущей копии ответа, не зависящий от версий кэша."""
+    return f"{prefix}:lkg:{suffix}"
+
+
+def _products_list_fallback_key(validated):
+    """Ключ last-known-good копии страницы списка товаров."""
+    return _last_known_good_key("products", "list:" + "|".join(_products_query_parts(validated)))
+
+
+def _accepts_json(request):
+    """Проверяет, что по content negotiation клиенту отдается JSON, а не browsable API."""
+    renderer = getattr(request, "accepted_renderer", None)
+    return renderer is not None and renderer.format == "json"
+
+
+def _catalog_cached_response(request, cache_key, cache_control):
+    """Отвечает из кэша до обращения к источнику каталога.
+
+    Готовый отрендеренный ответ отдается целиком (или 304 по его валидаторам);
+    без него по актуальной записи single-flight проверяются только условные
+    заголовки. Возвращает `None`, если нужен полный путь.
+    """
+    if _accepts_json(request):
+        rendered = get_rendered(cache_key)
+        if rendered is not None:
+            response = not_modified_response(
+                request,
+                etag=rendered["etag"],
+                last_modified=rendered["modified_at"],
+                cache_control=cache_control,
+            )
+            if response is not None:
+                return response
+            return apply_cache_headers(
+                rendered_response(request, rendered),
+                etag=rendered["etag"],
+                last_modified=rendered["modified_at"],
+                cache_control=cache_control,
+            )
+    served = peek_fresh_entry(cache_key)
+    if served is None:
+        return None
+    return not_modified_response(
+        request,
+        etag=served["etag"],
+        last_modified=served["modified_at"],
+        cache_control=cache_control,
+    )
+
+
+def _catalog_response(request, cache_key, served, cache_control):
+    """Формирует ответ каталога с валидаторами, помечая устаревшие данные заголовком.
+
+    Актуальное значение рендерится один раз и сохраняется как готовый ответ
+    для следующих запросов.
+    """
+    response = not_modified_response(
+        request,
+        etag=served["etag"],
+        last_modified=served["modified_at"],
+        cache_control=cache_control,
+    )
+    if response is None and _accepts_json(request):
+        rendered = store_rendered(cache_key, served)
+        if rendered is not None:
+            response = rendered_response(request, rendered)
+    if response is None:
+        response = Response(served["value"], status=status.HTTP_200_OK)
+    if served["stale_since"] is not None:
+        response[STALE_HEADER] = str(max(0, int(time.time() - served["stale_since"])))
+    return apply_cache_headers(
+        response,
+        etag=served["etag"],
+        last_modified=served["modified_at"],
+        cache_control=cache_control,
+    )
+
+
+def _query_suffix(query_params):
+    """Строит детерминированную часть cache key по query-параметрам."""
     items = []
     for key, values in query_params.lists():
         for value in values:
             items.append((key, value))
     items.sort()
-    suffix = urlencode(items)
-    return f"{prefix}:{suffix}" if suffix else prefix
+    return urlencode(items)
+
+
+def _load_products_cursor_page(validated):
+    """Загружает keyset-страницу товаров после курсора и сериализует ее."""
+    position = validated["cursor_position"]
+    null_ids = frozenset()
+    if is_mirror_read_mode():
+        items = list_mirror_products_keyset(validated, position=position)
+    else:
+        queries = strapi_keyset_queries(
+            _build_products_strapi_params(validated),
+            ordering=validated.get("ordering"),
+            position=position,
+        )
+        items, null_ids = collect_keyset_items(
+            queries,
+            lambda params, limit: list_products(page=1, page_size=limit, params=params)[0],
+            page_size=validated["page_size"],
+        )
+    results, pagination = build_cursor_page(
+        items,
+        ordering=validated.get("ordering"),
+        position=position,
+        page_size=validated["page_size"],
+        null_ids=null_ids,
+    )
+    serializer = ProductSerializer(results, many=True)
+    return {"results": serializer.data, "pagination": pagination}
+
+
+def _load_products_page(validated):
+    """Загружает страницу товаров из источника каталога и сериализует ее.
+
+    Поиск при включенном локальном индексе ранжируется по релевантности;
+    keyset-страницы ищут прежним способом.
+    """
+    if validated.get("cursor") is not None:
+        return _load_products_cursor_page(validated)
+    if validated.get("search") and search_index_enabled():
+        results, pagination = search_products(validated)
+    elif is_mirror_read_mode():
+        results, pagination = list_mirror_products(validated)
+    else:
+        params = _build_products_strapi_params(validated)
+        results, pagination = list_products(
+            page=validated["page"],
+            page_size=validated["page_size"],
+            params=params,
+        )
+    serializer = ProductSerializer(results, many=True)
+    return {"results": serializer.data, "pagination": pagination}
+
+
+def _load_product(pk):
+    """Загружает карточку товара по ID и сериализует ее."""
+    product = get_mirror_product(pk) if is_mirror_read_mode() else get_product(pk)
+    return ProductSerializer(product).data
+
+
+def _load_product_by_slug(slug):
+    """Загружает карточку товара по slug и сериализует ее."""
+    product = get_mirror_product_by_slug(slug) if is_mirror_read_mode() else get_product_by_slug(slug)
+    return ProductSerializer(product).data
+
+
+def _resolve_product_slug(slug, entry):
+    """Разрешает slug в documentId по записи индекса `entry`, при промахе — через источник каталога.
+
+    Возвращает `(document_id, redirect, data)`: `redirect` — slug устарел после
+    переименования, `data` — сериализованная карточка, если ради разрешения
+    товар пришлось загрузить, иначе `None`. Ненайденный slug запоминается
+    отрицательной записью индекса.
+    """
+    if entry is not None:
+        if entry.get("missing"):
+            raise StrapiNotFoundError
+        return entry["document_id"], bool(entry.get("redirect")), None
+    try:
+        data = _load_product_by_slug(slug)
+    except StrapiNotFoundError:
+        mark_slug_missing(slug)
+        raise
+    index_product_slug(data["id"], data.get("slug") or slug)
+    return data["id"], False, data
+
+
+def _load_categories_page(page, page_size):
+    """Загружает страницу категорий и сериализует ее."""
+    if is_mirror_read_mode():
+        results, pagination = list_mirror_categories(page=page, page_size=page_size)
+    else:
+        results, pagination = list_categories(page=page, page_size=page_size)
+    serializer = CategorySerializer(results, many=True)
+    return {"results": serializer.data, "pagination": pagination}
+
+
+def _load_category(pk):
+    """Загружает категорию по ID и сериализует ее."""
+    category = get_mirror_category(pk) if is_mirror_read_mode() else get_category(pk)
+    return CategorySerializer(category).data
 
 
 class ProductViewSet(ViewSet):
@@ -150,21 +394,36 @@ class ProductViewSet(ViewSet):
     permission_classes = [AllowAny]
     serializer_class = ProductSerializer
 
+    def _check_not_found_budget(self, request):
+        """Отвечает 429, если клиент исчерпал бюджет запросов несуществующих товаров."""
+        throttle = ProductNotFoundThrottle()
+        if not throttle.allow_request(request, self):
+            self.throttled(request, throttle.wait())
+
+    def _product_not_found(self, request):
+        """Ответ 404 по товару с учетом в бюджете клиента."""
+        ProductNotFoundThrottle().record_not_found(request, self)
+        return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
     def list(self, request):
-        """Возвращает список товаров с пагинацией/поиском/сортировкой."""
+        """Возвращает список товаров с пагинацией/поиском/сортировкой.
+
+        С `?cursor=` (пустым для первой страницы) включается keyset-пагинация:
+        вместо `page`/`total` в ответе возвращаются курсоры `next`/`prev`.
+        """
         validated, error = _parse_products_query_params(request)
         if error:
             return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
         cache_key = _products_cache_key(validated)
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached, status=status.HTTP_200_OK)
+        cached = _catalog_cached_response(request, cache_key, PRODUCTS_LIST_CACHE_CONTROL)
+        if cached is not None:
+            return cached
         try:
-            params = _build_products_strapi_params(validated)
-            results, pagination = list_products(
-                page=validated["page"],
-                page_size=validated["page_size"],
-                params=params,
+            served = get_or_fill_entry(
+                cache_key,
+                lambda: _load_products_page(validated),
+                timeout=PRODUCTS_LIST_CACHE_TTL,
+                fallback_key=_products_list_fallback_key(validated),
             )
         except StrapiUnavailableError:
             logger.exception("Strapi unavailable while listing products.")
@@ -172,32 +431,54 @@ class ProductViewSet(ViewSet):
                 {"detail": "Catalog service unavailable"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
-        serializer = self.serializer_class(results, many=True)
-        payload = {"results": serializer.data, "pagination": pagination}
-        cache.set(cache_key, payload, timeout=60)
-        return Response(payload, status=status.HTTP_200_OK)
+        return _catalog_response(request, cache_key, served, PRODUCTS_LIST_CACHE_CONTROL)
 
     def retrieve(self, request, pk=None):
-        """Возвращает детальную карточку товара по ID."""
-        version = get_products_cache_version()
-        cache_key = f"products:detail:v{version}:{pk}"
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached, status=status.HTTP_200_OK)
+        """Возвращает детальную карточку товара по ID.
+
+        Бюджет 404 проверяется только при промахе кэша ответов.
+        """
+        cache_key = product_detail_cache_key(pk)
+        cached = _catalog_cached_response(request, cache_key, PRODUCT_DETAIL_CACHE_CONTROL)
+        if cached is not None:
+            return cached
+        self._check_not_found_budget(request)
         try:
-            product = get_product(pk)
+            served = get_or_fill_entry(
+                cache_key,
+                lambda: _load_product(pk),
+                timeout=PRODUCT_DETAIL_CACHE_TTL,
+                fallback_key=_last_known_good_key("products", f"detail:{pk}"),
+            )
         except StrapiNotFoundError:
-            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            return self._product_not_found(request)
         except StrapiUnavailableError:
             logger.exception("Strapi unavailable while retrieving product %s.", pk)
             return Response(
                 {"detail": "Catalog service unavailable"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
-        serializer = self.serializer_class(product)
-        payload = serializer.data
-        cache.set(cache_key, payload, timeout=300)
-        return Response(payload, status=status.HTTP_200_OK)
+        return _catalog_response(request, cache_key, served, PRODUCT_DETAIL_CACHE_CONTROL)
+
+    @action(detail=False, methods=["get"], url_path="suggest")
+    def suggest(self, request):
+        """Возвращает подсказки поиска по началу слов заголовков (`?q=`, `?limit=`).
+
+        Подсказки отдает индекс в памяти воркера, упорядоченный по популярности
+        товаров; Strapi запрашивается только при построении индекса.
+        """
+        query = str(request.query_params.get("q") or "").strip()
+        limit = min(_positive_int(request.query_params.get("limit"), DEFAULT_SUGGEST_LIMIT), MAX_SUGGEST_LIMIT)
+        try:
+            suggestions = suggest_service.suggest(query, limit)
+        except StrapiUnavailableError:
+            logger.exception("Strapi unavailable while building the suggest index.")
+            return Response(
+                {"detail": "Catalog service unavailable"},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        payload = {"query": query, "results": [suggestion.as_dict() for suggestion in suggestions]}
+        return apply_cache_headers(Response(payload, status=status.HTTP_200_OK), cache_control=SUGGEST_CACHE_CONTROL)
 
     @action(detail=True, methods=["post"], url_path="track-view")
     def track_view(self, request, pk=None):
@@ -210,28 +491,57 @@ class ProductViewSet(ViewSet):
 
     @action(detail=False, methods=["get"], url_path=r"by-slug/(?P<slug>[^/.]+)")
     def by_slug(self, request, slug=None):
-        """Возвращает товар по slug."""
+        """Возвращает товар по slug.
+
+        Slug разрешается в documentId через индекс, и ответ строится из той же
+        записи кэша, что и карточка по ID. Прежний slug переименованного товара
+        отвечает постоянным редиректом на актуальный адрес. Бюджет 404
+        проверяется только при промахе кэша ответов.
+        """
         if not slug:
             return Response({"detail": "Slug is required."}, status=status.HTTP_400_BAD_REQUEST)
-        version = get_products_cache_version()
-        cache_key = f"products:by-slug:v{version}:{slug}"
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached, status=status.HTTP_200_OK)
+        entry = lookup_product_slug(slug)
+        if entry is not None and entry.get("document_id") and not entry.get("redirect"):
+            cache_key = product_detail_cache_key(entry["document_id"])
+            cached = _catalog_cached_response(request, cache_key, PRODUCT_DETAIL_CACHE_CONTROL)
+            if cached is not None:
+                return cached
+        self._check_not_found_budget(request)
         try:
-            product = get_product_by_slug(slug)
+            document_id, redirect, data = _resolve_product_slug(slug, entry)
         except StrapiNotFoundError:
-            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            return self._product_not_found(request)
+        except StrapiUnavailableError:
+            logger.exception("Strapi unavailable while resolving product slug %s.", slug)
+            return Response(
+                {"detail": "Catalog service unavailable"},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
+        cache_key = product_detail_cache_key(document_id)
+        if entry is None:
+            cached = _catalog_cached_response(request, cache_key, PRODUCT_DETAIL_CACHE_CONTROL)
+            if cached is not None:
+                return cached
+        try:
+            served = get_or_fill_entry(
+                cache_key,
+                (lambda: data) if data is not None else (lambda: _load_product(document_id)),
+                timeout=PRODUCT_DETAIL_CACHE_TTL,
+                fallback_key=_last_known_good_key("products", f"detail:{document_id}"),
+            )
+        except StrapiNotFoundError:
+            return self._product_not_found(request)
         except StrapiUnavailableError:
             logger.exception("Strapi unavailable while retrieving product by slug %s.", slug)
             return Response(
                 {"detail": "Catalog service unavailable"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
-        serializer = self.serializer_class(product)
-        payload = serializer.data
-        cache.set(cache_key, payload, timeout=300)
-        return Response(payload, status=status.HTTP_200_OK)
+        canonical_slug = served["value"].get("slug")
+        if redirect and canonical_slug and canonical_slug != slug:
+            location = reverse("api:products-by-slug", kwargs={"slug": canonical_slug})
+            return Response(status=status.HTTP_301_MOVED_PERMANENTLY, headers={"Location": location})
+        return _catalog_response(request, cache_key, served, PRODUCT_DETAIL_CACHE_CONTROL)
 
 
 class CategoryViewSet(ViewSet):
@@ -242,35 +552,42 @@ class CategoryViewSet(ViewSet):
 
     def list(self, request):
         """Возвращает список категорий с пагинацией и кэшированием."""
-        cache_key = _build_cache_key("categories:list", request.query_params)
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached, status=status.HTTP_200_OK)
+        cache_key = categories_list_cache_key(_query_suffix(request.query_params))
         page = _positive_int(request.query_params.get("page"), 1)
         page_size = _positive_int(request.query_params.get("page_size"), DEFAULT_PAGE_SIZE)
         if page_size > MAX_PAGE_SIZE:
             page_size = MAX_PAGE_SIZE
+        cached = _catalog_cached_response(request, cache_key, CATEGORIES_CACHE_CONTROL)
+        if cached is not None:
+            return cached
         try:
-            results, pagination = list_categories(page=page, page_size=page_size)
+            served = get_or_fill_entry(
+                cache_key,
+                lambda: _load_categories_page(page, page_size),
+                timeout=settings.CATALOG_CATEGORIES_CACHE_TTL_SECONDS,
+                fallback_key=_last_known_good_key("categories", f"list:page={page}|page_size={page_size}"),
+            )
         except StrapiUnavailableError:
             logger.exception("Strapi unavailable while listing categories.")
             return Response(
                 {"detail": "Catalog service unavailable"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
-        serializer = self.serializer_class(results, many=True)
-        payload = {"results": serializer.data, "pagination": pagination}
-        cache.set(cache_key, payload, timeout=60)
-        return Response(payload, status=status.HTTP_200_OK)
+        return _catalog_response(request, cache_key, served, CATEGORIES_CACHE_CONTROL)
 
     def retrieve(self, request, pk=None):
         """Возвращает категорию по ID."""
-        cache_key = f"categories:detail:{pk}"
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached, status=status.HTTP_200_OK)
+        cache_key = category_detail_cache_key(pk)
+        cached = _catalog_cached_response(request, cache_key, CATEGORIES_CACHE_CONTROL)
+        if cached is not None:
+            return cached
         try:
-            category = get_category(pk)
+            served = get_or_fill_entry(
+                cache_key,
+                lambda: _load_category(pk),
+                timeout=settings.CATALOG_CATEGORIES_CACHE_TTL_SECONDS,
+                fallback_key=_last_known_good_key("categories", f"detail:{pk}"),
+            )
         except StrapiNotFoundError:
             return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
         except StrapiUnavailableError:
@@ -279,7 +596,4 @@ class CategoryViewSet(ViewSet):
                 {"detail": "Catalog service unavailable"},
                 status=status.HTTP_502_BAD_GATEWAY,
             )
-        serializer = self.serializer_class(category)
-        payload = serializer.data
-        cache.set(cache_key, payload, timeout=300)
-        return Response(payload, status=status.HTTP_200_OK)
+        return _catalog_response(request, cache_key, served, CATEGORIES_CACHE_CONTROL)
@@ -0,0 +1,38 @@
+"""Приемник lifecycle-webhook'ов Strapi."""
+
+import secrets
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ..webhooks import handle_strapi_webhook
+
+
+def _incoming_webhook_secret(request) -> str:
+    """Извлекает secret из заголовков webhook-запроса Strapi."""
+    secret = str(request.headers.get("X-Webhook-Secret") or "").strip()
+    if secret:
+        return secret
+    auth_header = str(request.headers.get("Authorization") or "")
+    if auth_header.lower().startswith("bearer "):
+        return auth_header[7:].strip()
+    return ""
+
+
+class StrapiWebhookView(APIView):
+    """Webhook Strapi о создании/изменении/удалении/публикации товаров и категорий."""
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def post(self, request):
+        """Проверяет secret и точечно инвалидирует кэш каталога."""
+        expected_secret = str(settings.STRAPI_WEBHOOK_SECRET or "").strip()
+        provided_secret = _incoming_webhook_secret(request)
+        if not expected_secret or not provided_secret or not secrets.compare_digest(provided_secret, expected_secret):
+            return Response({"detail": "Invalid webhook secret."}, status=status.HTTP_403_FORBIDDEN)
+        result = handle_strapi_webhook(request.data)
+        return Response({"ok": True, "invalidated": result}, status=status.HTTP_200_OK)
@@ -10,3 +10,12 @@ class ProductsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "online_store_backend.products"
     verbose_name = _("Products")
+
+    def ready(self):
+        """Подключает прогрев кэша каталога и журнал индекса подсказок к инвалидации кэша.
+
+        Также регистрирует обработчики фоновых заданий каталога.
+        """
+        from . import jobs  # noqa: F401
+        from . import suggest  # noqa: F401
+        from . import warmer  # noqa: F401
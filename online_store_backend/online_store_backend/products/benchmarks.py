@@ -0,0 +1,547 @@
+"""Микробенчмарки каталога на синтетических payload'ах Strapi.
+
+Сравнивают пакетный однопроходный нормализатор с прежней поэлементной
+реализацией и путь отдачи закэшированной страницы товаров: рендеринг DRF,
+рендеринг orjson и готовый ответ из кэша. Попутно проверяют, что результаты
+совпадают. Поиск по локальному индексу сравнивается с подстрочным поиском
+по заголовку на синтетическом зеркале каталога, для индекса подсказок
+замеряются построение, обновление и ответы на префиксы. Массовое изменение
+товаров сравнивается с прежним поштучным путем на имитации Strapi с
+задержкой запросов.
+"""
+
+import gc
+import random
+import threading
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from online_store_backend.utils import renderers
+
+from .api.serializers import ProductSerializer
+from .jobs import _bulk_update_payload
+from .jobs import apply_bulk_operation
+from .mirror import build_product_row
+from .models import CatalogProduct
+from .response_cache import IDENTITY
+from .response_cache import _encoded_bodies
+from .search import search_product_ids
+from .search import trigram_available
+from .strapi_async import map_concurrently
+from .strapi_client import _apply_discount
+from .strapi_client import _extract_attributes
+from .strapi_client import _extract_gallery_urls
+from .strapi_client import _extract_image_url
+from .strapi_client import _extract_media_ids
+from .strapi_client import _extract_thumbnail_url
+from .strapi_client import _format_price
+from .strapi_client import _normalize_category
+from .strapi_client import _normalize_discount_percent
+from .strapi_client import normalize_products
+from .strapi_client import normalize_products_admin
+from .suggest import SuggestIndex
+from .suggest import Suggestion
+
+DEFAULT_SIZES = (1_000, 10_000, 50_000)
+PRICE_SAMPLES = ("1299.90", 450, 99.5, "15", None)
+DISCOUNT_SAMPLES = (0, 0, 5, 15, 33, "20", None, 150)
+
+
+def _synthetic_media(rng, index):
+    """Строит медиа товара: галерея из 0..4 файлов с форматами и повторами URL."""
+    media = []
+    for position in range(rng.randint(0, 4)):
+        media_id = index * 10 + position + 1
+        url = f"/uploads/product_{index}_{position}.jpg"
+        if position == 2:
+            url = media[0]["url"] if media else f"https://cdn.example.com/{media_id}.jpg"
+        entry = {"id": media_id, "url": url, "name": f"product_{index}_{position}.jpg"}
+        if rng.random() < 0.8:
+            entry["formats"] = {
+                "thumbnail": {"url": f"/uploads/thumbnail_product_{index}_{position}.jpg"},
+                "small": {"url": f"/uploads/small_product_{index}_{position}.jpg"},
+            }
+        media.append(entry)
+    return media
+
+
+def build_synthetic_products(count, *, seed=0):
+    """Возвращает массив `data` ответа Strapi со `count` товарами."""
+    rng = random.Random(seed)
+    categories = [
+        {"documentId": f"cat-{index}", "slug": f"category-{index}", "title": f"Category {index}"} for index in range(20)
+    ]
+    items = []
+    for index in range(count):
+        attrs = {
+            "documentId": f"doc-{index}",
+            "slug": f"product-{index}",
+            "title": f"Product {index}",
+            "description": "Synthetic product description.",
+            "price": rng.choice(PRICE_SAMPLES),
+            "currency": "RUB",
+            "discount_percent": rng.choice(DISCOUNT_SAMPLES),
+            "publishedAt": "2026-01-01T00:00:00.000Z" if index % 7 else None,
+            "image": _synthetic_media(rng, index),
+            "category": rng.choice(categories) if index % 11 else None,
+        }
+        if index % 5 == 0:
+            items.append({"id": index + 1, "documentId": attrs["documentId"], "attributes": attrs})
+        else:
+            items.append({"id": index + 1, **attrs})
+    return items
+
+
+def legacy_normalize_product(item):
+    """Прежняя поэлементная нормализация публичного товара (эталон для сравнения)."""
+    attrs = _extract_attributes(item)
+    document_id = attrs.get("documentId")
+    if not document_id and isinstance(item, dict):
+        document_id = item.get("documentId")
+    if not document_id:
+        return None
+    discount_percent = _normalize_discount_percent(attrs.get("discount_percent"))
+    price = _format_price(attrs.get("price"))
+    discounted_price = _apply_discount(price, discount_percent) if discount_percent > 0 else None
+    gallery_urls = _extract_gallery_urls(attrs.get("image"))
+    return {
+        "id": str(document_id),
+        "slug": attrs.get("slug"),
+        "title": attrs.get("title"),
+        "description": attrs.get("description"),
+        "price": price,
+        "currency": "RUB",
+        "image_url": _extract_image_url(attrs.get("image")),
+        "thumbnail_url": _extract_thumbnail_url(attrs.get("image")),
+        "gallery_urls": gallery_urls,
+        "category": _normalize_category(attrs.get("category")),
+        "discount_percent": discount_percent,
+        "discounted_price": discounted_price,
+    }
+
+
+def legacy_normalize_product_admin(item):
+    """Прежняя поэлементная нормализация админского товара (эталон для сравнения)."""
+    attrs = _extract_attributes(item)
+    document_id = attrs.get("documentId")
+    if not document_id and isinstance(item, dict):
+        document_id = item.get("documentId")
+    if not document_id:
+        return None
+    discount_percent = _normalize_discount_percent(attrs.get("discount_percent"))
+    gallery_urls = _extract_gallery_urls(attrs.get("image"))
+    image_ids = _extract_media_ids(attrs.get("image"))
+    return {
+        "id": str(document_id),
+        "slug": attrs.get("slug"),
+        "title": attrs.get("title"),
+        "description": attrs.get("description"),
+        "price": _format_price(attrs.get("price")),
+        "currency": attrs.get("currency") or "RUB",
+        "category": _normalize_category(attrs.get("category")),
+        "discount_percent": discount_percent,
+        "publish": bool(attrs.get("publishedAt")),
+        "image_id": image_ids[0] if image_ids else None,
+        "image_ids": image_ids,
+        "image_url": gallery_urls[0] if gallery_urls else None,
+        "gallery_urls": gallery_urls,
+    }
+
+
+def _legacy_batch(normalizer):
+    def run(items):
+        return [normalized for normalized in map(normalizer, items) if normalized]
+
+    return run
+
+
+BENCHMARK_CASES = (
+    ("public", _legacy_batch(legacy_normalize_product), normalize_products),
+    ("admin", _legacy_batch(legacy_normalize_product_admin), normalize_products_admin),
+)
+
+
+def _best_time(function, items, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = function(items)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run_normalizer_benchmark(sizes=DEFAULT_SIZES, *, repeat=3, seed=0):
+    """Замеряет прежнюю и пакетную нормализацию; возвращает строки отчета.
+
+    Каждая строка содержит лучшее время из `repeat` прогонов и признак
+    совпадения результатов (`identical`).
+    """
+    rows = []
+    for size in sizes:
+        items = build_synthetic_products(size, seed=seed)
+        for shape, legacy, batch in BENCHMARK_CASES:
+            legacy_seconds, legacy_result = _best_time(legacy, items, repeat)
+            batch_seconds, batch_result = _best_time(batch, items, repeat)
+            rows.append(
+                {
+                    "size": size,
+                    "shape": shape,
+                    "legacy_ms": round(legacy_seconds * 1000, 2),
+                    "batch_ms": round(batch_seconds * 1000, 2),
+                    "speedup": round(legacy_seconds / batch_seconds, 2) if batch_seconds else None,
+                    "identical": legacy_result == batch_result,
+                }
+            )
+    return rows
+
+
+DEFAULT_PAGE_SIZES = (20, 50)
+DEFAULT_REQUESTS = 200
+
+
+def build_products_page(page_size, *, seed=0):
+    """Строит данные страницы списка товаров в том виде, в каком они лежат в кэше."""
+    results = normalize_products(build_synthetic_products(page_size, seed=seed))
+    return {
+        "results": ProductSerializer(results, many=True).data,
+        "pagination": {"page": 1, "page_size": page_size, "total": page_size * 10},
+    }
+
+
+def _cached_dict_path(benchmark_cache, renderer):
+    def run(requests):
+        body = b""
+        for _ in range(requests):
+            envelope = benchmark_cache.get("envelope")
+            body = renderer.render(envelope["value"], "application/json")
+        return body
+
+    return run
+
+
+def _cached_bytes_path(benchmark_cache):
+    def run(requests):
+        body = b""
+        for _ in range(requests):
+            body = benchmark_cache.get("rendered")["bodies"][IDENTITY]
+        return body
+
+    return run
+
+
+def run_response_benchmark(page_sizes=DEFAULT_PAGE_SIZES, *, requests=DEFAULT_REQUESTS, repeat=3, seed=0):
+    """Замеряет отдачу закэшированной страницы товаров; возвращает строки отчета.
+
+    Для каждого пути указывается лучшее среднее время одного запроса в
+    микросекундах: `drf` — чтение конверта и `JSONRenderer`, `orjson` —
+    чтение конверта и `FastJSONRenderer`, `rendered` — чтение готовых байтов.
+    Кэш — отдельный `LocMemCache`, который, как и Redis, сериализует значения
+    pickle'ом. `identical` — совпадение тел ответов всех путей.
+    """
+    rows = []
+    for page_size in page_sizes:
+        page = build_products_page(page_size, seed=seed)
+        body = JSONRenderer().render(page, "application/json")
+        bodies = _encoded_bodies(body)
+        benchmark_cache = LocMemCache(f"benchmark-response-{page_size}", {"TIMEOUT": None})
+        benchmark_cache.set("envelope", {"value": page, "expires_at": 0, "delta": 0})
+        benchmark_cache.set("rendered", {"bodies": bodies, "expires_at": 0, "delta": 0})
+        paths = (
+            ("drf", _cached_dict_path(benchmark_cache, JSONRenderer())),
+            ("orjson", _cached_dict_path(benchmark_cache, renderers.FastJSONRenderer())),
+            ("rendered", _cached_bytes_path(benchmark_cache)),
+        )
+        timings = {}
+        outputs = []
+        for name, path in paths:
+            seconds, output = _best_time(path, requests, repeat)
+            timings[name] = seconds / requests * 1_000_000
+            outputs.append(output)
+        benchmark_cache.clear()
+        rows.append(
+            {
+                "page_size": page_size,
+                "bytes": len(body),
+                "gzip_bytes": len(bodies.get("gzip", body)),
+                "drf_us": round(timings["drf"], 1),
+                "orjson_us": round(timings["orjson"], 1),
+                "rendered_us": round(timings["rendered"], 1),
+                "speedup": round(timings["drf"] / timings["rendered"], 2) if timings["rendered"] else None,
+                "identical": all(output == body for output in outputs),
+            }
+        )
+    return rows
+
+
+DEFAULT_SEARCH_PRODUCTS = 100_000
+DEFAULT_SEARCH_QUERIES = ("кружка", "керамические кружки", "lamp", "wooden chair", "чайник стеклянный")
+SEARCH_PAGE_SIZE = 20
+SEARCH_ADJECTIVES = (
+    "Керамическая", "Стеклянная", "Деревянная", "Металлическая", "Большая",
+    "Compact", "Wooden", "Glass", "Steel", "Vintage",
+)
+SEARCH_NOUNS = (
+    "кружка", "тарелка", "ваза", "лампа", "полка", "mug", "lamp", "chair", "kettle", "shelf", "чайник", "стул",
+)
+SEARCH_DETAILS = (
+    "для кухни", "для дома", "ручной работы", "for the office", "for the kitchen", "with a matte finish", "в подарок",
+)
+SEARCH_INSERT_BATCH = 5_000
+
+
+def build_synthetic_search_products(count, *, seed=0):
+    """Возвращает `count` товаров Strapi с разнообразными русскими и английскими заголовками."""
+    rng = random.Random(seed)
+    items = []
+    for index in range(count):
+        title = f"{rng.choice(SEARCH_ADJECTIVES)} {rng.choice(SEARCH_NOUNS)} {index}"
+        description = f"{title} {rng.choice(SEARCH_DETAILS)}, {rng.choice(SEARCH_NOUNS)} {rng.choice(SEARCH_DETAILS)}."
+        items.append(
+            {
+                "id": index + 1,
+                "documentId": f"search-{index}",
+                "slug": f"search-{index}",
+                "title": title,
+                "description": description,
+                "price": rng.choice(PRICE_SAMPLES),
+                "updatedAt": "2026-01-01T00:00:00.000Z",
+            }
+        )
+    return items
+
+
+class _RollbackBenchmark(Exception):
+    """Откатывает транзакцию с синтетическими строками зеркала."""
+
+
+def _substring_search(search):
+    queryset = CatalogProduct.objects.filter(title__icontains=search)
+    document_ids = list(queryset.order_by("document_id").values_list("document_id", flat=True)[:SEARCH_PAGE_SIZE])
+    return document_ids, queryset.count()
+
+
+def _index_search(search):
+    return search_product_ids(search, page=1, page_size=SEARCH_PAGE_SIZE)
+
+
+def run_search_benchmark(products=DEFAULT_SEARCH_PRODUCTS, *, queries=DEFAULT_SEARCH_QUERIES, repeat=3, seed=0):
+    """Замеряет поиск по индексу против `title__icontains`; возвращает строки отчета.
+
+    Синтетические товары вставляются в зеркало внутри транзакции, которая
+    затем откатывается, поэтому команду можно запускать на рабочей базе.
+    Для каждого запроса указываются лучшее время первой страницы с подсчетом
+    total и число найденных товаров: подстрочный поиск не находит другие
+    словоформы и слова не по порядку.
+    """
+    rows = []
+    try:
+        with transaction.atomic():
+            items = build_synthetic_search_products(products, seed=seed)
+            for start in range(0, len(items), SEARCH_INSERT_BATCH):
+                rows_batch = [build_product_row(item) for item in items[start : start + SEARCH_INSERT_BATCH]]
+                CatalogProduct.objects.bulk_create(rows_batch, batch_size=1_000)
+            with connection.cursor() as cursor:
+                cursor.execute(f"ANALYZE {CatalogProduct._meta.db_table}")
+            for search in queries:
+                substring_seconds, (_ids, substring_total) = _best_time(_substring_search, search, repeat)
+                index_seconds, (_ids, index_total) = _best_time(_index_search, search, repeat)
+                rows.append(
+                    {
+                        "products": products,
+                        "query": search,
+                        "substring_ms": round(substring_seconds * 1000, 2),
+                        "substring_total": substring_total,
+                        "index_ms": round(index_seconds * 1000, 2),
+                        "index_total": index_total,
+                        "trigram": trigram_available(),
+                    }
+                )
+            raise _RollbackBenchmark
+    except _RollbackBenchmark:
+        pass
+    return rows
+
+
+DEFAULT_SUGGEST_PRODUCTS = 100_000
+DEFAULT_SUGGEST_QUERIES = ("к", "кр", "кер", "керамическая кру", "la", "wooden ch", "ча")
+DEFAULT_SUGGEST_REQUESTS = 1_000
+
+
+def build_suggest_benchmark_entries(products, *, seed=0):
+    """Строит записи индекса подсказок по синтетическим товарам со случайной популярностью."""
+    rng = random.Random(seed)
+    return [
+        Suggestion.from_product(product, rng.randint(0, 500))
+        for product in normalize_products(build_synthetic_search_products(products, seed=seed))
+    ]
+
+
+def run_suggest_benchmark(
+    products=DEFAULT_SUGGEST_PRODUCTS, *, queries=DEFAULT_SUGGEST_QUERIES, requests=DEFAULT_SUGGEST_REQUESTS, seed=0
+):
+    """Замеряет индекс подсказок; возвращает сводку и строки по запросам.
+
+    `cold_us` — первый ответ на запрос (поиск по массиву и выбор лучших),
+    `warm_us` — среднее время повторного ответа из LRU индекса. В сводке
+    время построения индекса и применения изменения одного товара.
+    """
+    entries = build_suggest_benchmark_entries(products, seed=seed)
+    gc.collect()
+    started = time.perf_counter()
+    index = SuggestIndex.build(entries)
+    build_seconds = time.perf_counter() - started
+    changed = Suggestion.from_product({"id": "search-0", "slug": "search-0", "title": "Новая кружка"}, 1_000)
+    started = time.perf_counter()
+    index.with_changes([changed])
+    update_seconds = time.perf_counter() - started
+    rows = []
+    for query in queries:
+        started = time.perf_counter()
+        results = index.suggest(query)
+        cold_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        for _ in range(requests):
+            index.suggest(query)
+        warm_seconds = (time.perf_counter() - started) / requests
+        rows.append(
+            {
+                "query": query,
+                "results": len(results),
+                "cold_us": round(cold_seconds * 1_000_000, 1),
+                "warm_us": round(warm_seconds * 1_000_000, 1),
+            }
+        )
+    summary = {
+        "products": len(index),
+        "build_ms": round(build_seconds * 1000, 2),
+        "update_ms": round(update_seconds * 1000, 2),
+    }
+    return summary, rows
+
+
+DEFAULT_BULK_UPDATE_SIZES = (10, 50, 100)
+DEFAULT_BULK_UPDATE_LATENCY_MS = 20.0
+DEFAULT_BULK_UPDATE_CHANGED_RATIO = 0.5
+BULK_UPDATE_TARGET_CATEGORY = "cat-0"
+
+
+class SimulatedStrapi:
+    """Имитация admin API Strapi: каждый запрос ждет `latency_ms`, запросы считаются."""
+
+    def __init__(self, products, latency_ms):
+        self.products = products
+        self.latency = latency_ms / 1000
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _request(self):
+        with self._lock:
+            self.requests += 1
+        time.sleep(self.latency)
+
+    def get_raw(self, product_id):
+        self._request()
+        return dict(self.products[product_id])
+
+    def get_batch(self, product_ids):
+        self._request()
+        return {product_id: dict(self.products[product_id]) for product_id in product_ids}
+
+    def update(self, product_id, payload):
+        self._request()
+        self.products[product_id] = {
+            **self.products[product_id],
+            "price": payload["price"],
+            "category": {"documentId": payload["category"]} if payload["category"] else None,
+        }
+
+
+def build_bulk_update_products(count, *, changed_ratio=DEFAULT_BULK_UPDATE_CHANGED_RATIO, seed=0):
+    """Строит сырые товары Strapi; доля `changed_ratio` лежит не в целевой категории."""
+    rng = random.Random(seed)
+    products = {}
+    for index in range(count):
+        category = f"cat-{rng.randint(1, 19)}" if rng.random() < changed_ratio else BULK_UPDATE_TARGET_CATEGORY
+        products[f"doc-{index}"] = {
+            "title": f"Product {index}",
+            "slug": f"product-{index}",
+            "price": rng.choice(("1299.90", "450.00", "99.50")),
+            "currency": "RUB",
+            "category": {"documentId": category},
+            "publishedAt": "2026-01-01T00:00:00.000Z",
+        }
+    return products
+
+
+def legacy_bulk_update(product_ids, operation, strapi):
+    """Прежний путь: GET и полный PUT каждого товара независимо от изменений (эталон)."""
+
+    def update(product_id):
+        attrs = strapi.get_raw(product_id)
+        _error, payload = _bulk_update_payload(
+            product_id,
+            attrs,
+            operation["type"],
+            operation.get("category_id"),
+            None,
+        )
+        strapi.update(
+            product_id,
+            payload or {"price": attrs["price"], "category": operation.get("category_id")},
+        )
+
+    return map_concurrently(update, product_ids)
+
+
+def run_bulk_update_benchmark(
+    sizes=DEFAULT_BULK_UPDATE_SIZES,
+    *,
+    latency_ms=DEFAULT_BULK_UPDATE_LATENCY_MS,
+    changed_ratio=DEFAULT_BULK_UPDATE_CHANGED_RATIO,
+    seed=0,
+):
+    """Замеряет перенос товаров в категорию прежним и пакетным путем; возвращает строки отчета.
+
+    Для каждого числа id указываются время и число запросов к имитации Strapi:
+    `legacy` — GET и PUT каждого товара, `batched` — чтение пачками через `$in`
+    и PUT только измененных товаров. `identical` — совпадение итоговых данных
+    товаров после обоих путей.
+    """
+    operation = {"type": "set_category", "category_id": BULK_UPDATE_TARGET_CATEGORY}
+    rows = []
+    for size in sizes:
+        products = build_bulk_update_products(size, changed_ratio=changed_ratio, seed=seed)
+        product_ids = list(products)
+        legacy = SimulatedStrapi(dict(products), latency_ms)
+        started = time.perf_counter()
+        legacy_bulk_update(product_ids, operation, legacy)
+        legacy_seconds = time.perf_counter() - started
+        batched = SimulatedStrapi(dict(products), latency_ms)
+        started = time.perf_counter()
+        result, _states = apply_bulk_operation(
+            product_ids,
+            operation,
+            fetch_batch=batched.get_batch,
+            update=batched.update,
+        )
+        batched_seconds = time.perf_counter() - started
+        rows.append(
+            {
+                "ids": size,
+                "changed": result["updated"],
+                "legacy_ms": round(legacy_seconds * 1000, 1),
+                "legacy_requests": legacy.requests,
+                "batched_ms": round(batched_seconds * 1000, 1),
+                "batched_requests": batched.requests,
+                "speedup": round(legacy_seconds / batched_seconds, 2) if batched_seconds else None,
+                "identical": legacy.products == batched.products,
+            }
+        )
+    return rows
@@ -1,6 +1,11 @@
 """Utilities for versioned product-response cache keys."""
 
-from django.core.cache import cache
+import time
+
+from .catalog_cache import LOCAL_KEY_PREFIXES
+from .catalog_cache import catalog_cache
+from .signals import product_invalidated
+from .signals import products_cache_bumped
 
 PRODUCTS_CACHE_VERSION_KEY = "products:cache:version"
 DEFAULT_PRODUCTS_CACHE_VERSION = 1
@@ -8,7 +13,7 @@ DEFAULT_PRODUCTS_CACHE_VERSION = 1
 
 def get_products_cache_version() -> int:
     """Returns current cache version for product list/detail endpoints."""
-    raw_value = cache.get(PRODUCTS_CACHE_VERSION_KEY, DEFAULT_PRODUCTS_CACHE_VERSION)
+    raw_value = catalog_cache.get(PRODUCTS_CACHE_VERSION_KEY, DEFAULT_PRODUCTS_CACHE_VERSION)
     try:
         value = int(raw_value)
     except (TypeError, ValueError):
@@ -19,10 +24,137 @@ def get_products_cache_version() -> int:
 
 
 def bump_products_cache_version() -> int:
-    """Bumps cache version to invalidate all previously cached product payloads."""
+    """Bumps cache version to invalidate all previously cached product payloads.
+
+    Worker-local copies of catalog entries are dropped on every node as well,
+    since they are all keyed by the old version. Sends `products_cache_bumped`
+    so the cache warmer can refill hot entries.
+    """
     try:
-        return int(cache.incr(PRODUCTS_CACHE_VERSION_KEY))
+        value = int(catalog_cache.incr(PRODUCTS_CACHE_VERSION_KEY))
     except (ValueError, TypeError, AttributeError):
-        next_value = get_products_cache_version() + 1
-        cache.set(PRODUCTS_CACHE_VERSION_KEY, next_value, timeout=None)
-        return next_value
+        value = get_products_cache_version() + 1
+        catalog_cache.set(PRODUCTS_CACHE_VERSION_KEY, value, timeout=None)
+    catalog_cache.invalidate_local(prefixes=LOCAL_KEY_PREFIXES)
+    products_cache_bumped.send(sender=None, version=value)
+    return value
+
+
+PRODUCTS_TAG_VERSION_KEY = "products:tag:{tag}:version"
+ALL_PRODUCTS_TAG = "all"
+
+
+def category_tag(category_slug: str) -> str:
+    """Returns invalidation tag for list pages filtered by category slug."""
+    return f"category:{category_slug}"
+
+
+def products_list_tag(category_slug: str | None) -> str:
+    """Returns the tag a product list page is stored under."""
+    return category_tag(category_slug) if category_slug else ALL_PRODUCTS_TAG
+
+
+def get_tag_version(tag: str) -> int:
+    """Returns current version of a list tag.
+
+    Missing tag versions are seeded from the clock, so an evicted counter can
+    never resurrect list pages cached under an older version.
+    """
+    key = PRODUCTS_TAG_VERSION_KEY.format(tag=tag)
+    value = catalog_cache.get(key)
+    if value is None:
+        catalog_cache.add(key, time.time_ns() // 1_000_000, timeout=None)
+        value = catalog_cache.get(key)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PRODUCTS_CACHE_VERSION
+
+
+def bump_tag_versions(*tags: str) -> None:
+    """Invalidates list pages stored under the given tags."""
+    for tag in set(tags):
+        key = PRODUCTS_TAG_VERSION_KEY.format(tag=tag)
+        try:
+            catalog_cache.incr(key)
+        except ValueError:
+            catalog_cache.set(key, get_tag_version(tag) + 1, timeout=None)
+
+
+def product_detail_cache_key(document_id: str, version: int | None = None) -> str:
+    """Returns cache key of the public product detail payload."""
+    version = get_products_cache_version() if version is None else version
+    return f"products:detail:v{version}:{document_id}"
+
+
+def product_cache_key(document_id: str, version: int | None = None) -> str:
+    """Returns cache key of the normalized product used by internal catalog lookups."""
+    version = get_products_cache_version() if version is None else version
+    return f"products:item:v{version}:{document_id}"
+
+
+CATEGORIES_TAG = "categories"
+
+
+def categories_list_cache_key(query_suffix: str = "") -> str:
+    """Returns cache key of a public category list page.
+
+    Category keys embed the `categories` tag version, so any category mutation
+    retires every cached list page and detail entry at once and they can live
+    for hours.
+    """
+    key = f"categories:list:t{get_tag_version(CATEGORIES_TAG)}"
+    return f"{key}:{query_suffix}" if query_suffix else key
+
+
+def category_detail_cache_key(document_id: str) -> str:
+    """Returns cache key of the public category detail payload."""
+    return f"categories:detail:t{get_tag_version(CATEGORIES_TAG)}:{document_id}"
+
+
+def invalidate_categories() -> None:
+    """Retires all cached category list pages and detail entries.
+
+    Categories are a small set that changes rarely, so a single tag is enough;
+    old entries are not deleted and simply expire by TTL.
+    """
+    bump_tag_versions(CATEGORIES_TAG)
+
+
+RENDERED_KEY_SUFFIX = ":rendered"
+
+
+def rendered_cache_key(cache_key: str) -> str:
+    """Returns key of the pre-rendered response stored next to a catalog cache entry."""
+    return f"{cache_key}{RENDERED_KEY_SUFFIX}"
+
+
+MISSING_KEY_SUFFIX = ":missing"
+
+
+def missing_cache_key(cache_key: str) -> str:
+    """Returns key of the negative entry remembering that a catalog object does not exist."""
+    return f"{cache_key}{MISSING_KEY_SUFFIX}"
+
+
+def invalidate_product(document_id: str | None, *, category_slugs=()) -> None:
+    """Evicts one product's detail entries and list pages of its categories.
+
+    By-slug requests resolve through the slug index and share the detail entry.
+    Unfiltered and search list pages live under the `all` tag and are always
+    invalidated, because any product change can move them. Sends
+    `product_invalidated` so the suggest index can pick up the change.
+    """
+    if document_id:
+        version = get_products_cache_version()
+        detail_key = product_detail_cache_key(document_id, version)
+        catalog_cache.delete_many(
+            [
+                detail_key,
+                rendered_cache_key(detail_key),
+                missing_cache_key(detail_key),
+                product_cache_key(document_id, version),
+            ]
+        )
+        product_invalidated.send(sender=None, document_id=document_id)
+    bump_tag_versions(ALL_PRODUCTS_TAG, *(category_tag(slug) for slug in category_slugs if slug))
@@ -0,0 +1,86 @@
+"""Компактный кодек значений кэша каталога для django-redis.
+
+`CatalogSerializer` кодирует значения в msgpack, а все, что msgpack не может
+сохранить без потерь (кортежи, Decimal, даты), — pickle'ом.
+`CatalogCompressor` сжимает значения длиннее
+`CATALOG_CACHE_COMPRESS_MIN_BYTES` через zstd. Формат и алгоритм помечаются
+первым байтом, поэтому значения, записанные прежним pickle-кодеком или
+сжатые zlib, по-прежнему читаются.
+"""
+
+import pickle
+import zlib
+
+import msgpack
+import zstandard
+from django.conf import settings
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.base import BaseSerializer
+
+from .catalog_cache import catalog_cache_stats
+
+MSGPACK_MARKER = b"M"
+PICKLE_MARKER = b"P"
+ZSTD_MARKER = b"Z"
+ZLIB_MARKER = b"z"
+ZSTD_LEVEL = 3
+
+
+def _msgpack_default(value):
+    """Сводит подклассы dict/list (например, `ReturnDict` DRF) к базовым типам."""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    msg = f"Unsupported type for msgpack: {type(value).__name__}"
+    raise TypeError(msg)
+
+
+class CatalogSerializer(BaseSerializer):
+    """Сериализатор msgpack с откатом на pickle для значений, которые msgpack не сохранит."""
+
+    def dumps(self, value):
+        try:
+            payload = msgpack.packb(value, use_bin_type=True, strict_types=True, default=_msgpack_default)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        else:
+            catalog_cache_stats.record_format("msgpack")
+            return MSGPACK_MARKER + payload
+        catalog_cache_stats.record_format("pickle")
+        return PICKLE_MARKER + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, value):
+        marker = value[:1]
+        if marker == MSGPACK_MARKER:
+            return msgpack.unpackb(value[1:], raw=False, strict_map_key=False)
+        if marker == PICKLE_MARKER:
+            return pickle.loads(value[1:])  # noqa: S301
+        # Значения, записанные PickleSerializer'ом django-redis до смены кодека.
+        return pickle.loads(value)  # noqa: S301
+
+
+class CatalogCompressor(BaseCompressor):
+    """Сжатие zstd для значений длиннее порога; несжимаемые значения хранятся как есть."""
+
+    def compress(self, value):
+        stored = value
+        if len(value) >= settings.CATALOG_CACHE_COMPRESS_MIN_BYTES:
+            compressed = ZSTD_MARKER + zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(value)
+            if len(compressed) < len(value):
+                stored = compressed
+        catalog_cache_stats.record_encoded(len(value), len(stored))
+        return stored
+
+    def decompress(self, value):
+        marker = value[:1]
+        try:
+            if marker == ZSTD_MARKER:
+                return zstandard.ZstdDecompressor().decompress(value[1:])
+            # Значения, сжатые zlib до того, как zstandard стал зависимостью.
+            if marker == ZLIB_MARKER:
+                return zlib.decompress(value[1:])
+        except (zlib.error, zstandard.ZstdError) as exc:
+            raise CompressorError from exc
+        raise CompressorError
@@ -0,0 +1,179 @@
+"""Кэш каталога: отдельный алиас `catalog` со статистикой по пространствам ключей.
+
+Ключи `products:*` и `categories:*` читаются и пишутся через `catalog_cache`.
+В production алиас `catalog` указывает на тот же Redis, что и `default`, но
+с компактным кодеком (`cache_codec`); без алиаса используется кэш по
+умолчанию. Горячие ключи дополнительно держатся в локальном LRU-уровне
+воркера (`utils.local_cache`). Прокси считает попадания и промахи по
+пространствам ключей текущего воркера, а `sample_namespace_memory`
+оценивает занятую память Redis.
+"""
+
+import threading
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.cache import caches
+
+from online_store_backend.utils.local_cache import TieredCache
+
+CATALOG_CACHE_ALIAS = "catalog"
+CATALOG_KEY_PREFIXES = ("products", "categories")
+# Служебные ключи рядом с основными записями учитываются отдельно.
+AUXILIARY_KEY_SUFFIXES = ("lock", "rendered", "missing")
+DEFAULT_MEMORY_SAMPLE_KEYS = 1000
+# Горячие ключи, которые воркер держит в локальном LRU-уровне: версии кэша и
+# тегов, индекс slug'ов, конверты страниц/карточек и готовые ответы. Блокировки single-flight
+# и last-known-good копии всегда читаются из Redis.
+LOCAL_KEY_PREFIXES = (
+    "products:cache:",
+    "products:tag:",
+    "products:list:",
+    "products:detail:",
+    "products:slug:",
+    "categories:list",
+    "categories:detail:",
+)
+
+
+def catalog_cache_alias():
+    """Возвращает алиас кэша каталога, если он настроен, иначе алиас по умолчанию."""
+    return CATALOG_CACHE_ALIAS if CATALOG_CACHE_ALIAS in settings.CACHES else DEFAULT_CACHE_ALIAS
+
+
+def key_namespace(key):
+    """Пространство ключа для статистики: `products:list`, `categories:detail`, `products:lock`..."""
+    head, _, rest = str(key).partition(":")
+    if not rest:
+        return head
+    suffix = rest.rsplit(":", 1)[-1]
+    if suffix in AUXILIARY_KEY_SUFFIXES:
+        return f"{head}:{suffix}"
+    return f"{head}:{rest.split(':', 1)[0]}"
+
+
+class CatalogCacheStats:
+    """Потокобезопасные счетчики кэша каталога: обращения по пространствам и кодек."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Обнуляет все счетчики."""
+        with self._lock:
+            self.namespaces = {}
+            self.formats = {}
+            self.encoded_values = 0
+            self.compressed_values = 0
+            self.raw_bytes = 0
+            self.stored_bytes = 0
+
+    def _namespace(self, key):
+        return self.namespaces.setdefault(key_namespace(key), {"hits": 0, "misses": 0, "sets": 0})
+
+    def record_get(self, key, *, hit):
+        """Учитывает чтение ключа."""
+        with self._lock:
+            self._namespace(key)["hits" if hit else "misses"] += 1
+
+    def record_set(self, key):
+        """Учитывает запись ключа."""
+        with self._lock:
+            self._namespace(key)["sets"] += 1
+
+    def record_format(self, name):
+        """Учитывает формат сериализации значения (`msgpack`/`pickle`)."""
+        with self._lock:
+            self.formats[name] = self.formats.get(name, 0) + 1
+
+    def record_encoded(self, raw_size, stored_size):
+        """Учитывает размер значения до и после сжатия."""
+        with self._lock:
+            self.encoded_values += 1
+            self.compressed_values += int(stored_size < raw_size)
+            self.raw_bytes += raw_size
+            self.stored_bytes += stored_size
+
+    def snapshot(self):
+        """Возвращает срез статистики для метрик."""
+        with self._lock:
+            namespaces = {}
+            for name, counters in sorted(self.namespaces.items()):
+                reads = counters["hits"] + counters["misses"]
+                namespaces[name] = {
+                    **counters,
+                    "hit_ratio": round(counters["hits"] / reads, 4) if reads else 0.0,
+                }
+            return {
+                "alias": catalog_cache_alias(),
+                "namespaces": namespaces,
+                "codec": {
+                    "formats": dict(self.formats),
+                    "encoded_values": self.encoded_values,
+                    "compressed_values": self.compressed_values,
+                    "raw_bytes": self.raw_bytes,
+                    "stored_bytes": self.stored_bytes,
+                    "compression_ratio": round(self.stored_bytes / self.raw_bytes, 4) if self.raw_bytes else 1.0,
+                },
+            }
+
+
+catalog_cache_stats = CatalogCacheStats()
+
+
+class CatalogCache(TieredCache):
+    """Кэш каталога: локальный LRU-уровень для горячих ключей и статистика по пространствам.
+
+    Алиас выбирается при каждом обращении, поэтому переопределение `CACHES`
+    в настройках подхватывается без перезапуска.
+    """
+
+    def _backend(self):
+        return caches[catalog_cache_alias()]
+
+    def _record_get(self, key, *, hit):
+        catalog_cache_stats.record_get(key, hit=hit)
+
+    def _record_set(self, key):
+        catalog_cache_stats.record_set(key)
+
+
+catalog_cache = CatalogCache(
+    "catalog",
+    CATALOG_CACHE_ALIAS,
+    local_prefixes=LOCAL_KEY_PREFIXES,
+    excluded_suffixes=(":lock",),
+)
+
+
+def sample_namespace_memory(limit=DEFAULT_MEMORY_SAMPLE_KEYS):
+    """Оценивает память Redis под ключами каталога по пространствам.
+
+    Просматривает через SCAN не больше `limit` ключей на префикс и суммирует
+    `MEMORY USAGE`. Для бэкендов без django-redis возвращает `None`.
+    """
+    client = getattr(caches[catalog_cache_alias()], "client", None)
+    if client is None or not hasattr(client, "get_client"):
+        return None
+    redis = client.get_client(write=False)
+    namespaces = {}
+    truncated = False
+    sampled = 0
+    for prefix in CATALOG_KEY_PREFIXES:
+        keys = []
+        for raw_key in redis.scan_iter(match=str(client.make_pattern(f"{prefix}:*")), count=500):
+            if len(keys) >= limit:
+                truncated = True
+                break
+            keys.append(raw_key)
+        pipeline = redis.pipeline(transaction=False)
+        for raw_key in keys:
+            pipeline.memory_usage(raw_key)
+        for raw_key, size in zip(keys, pipeline.execute(), strict=True):
+            key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+            usage = namespaces.setdefault(key_namespace(client.reverse_key(key)), {"keys": 0, "bytes": 0})
+            usage["keys"] += 1
+            usage["bytes"] += size or 0
+        sampled += len(keys)
+    return {"sampled_keys": sampled, "truncated": truncated, "namespaces": dict(sorted(namespaces.items()))}
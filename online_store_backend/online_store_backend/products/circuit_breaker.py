@@ -0,0 +1,105 @@
+"""Circuit breaker для запросов к Strapi в пределах воркера."""
+
+import logging
+import threading
+import time
+from collections import Counter
+from collections import deque
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Breaker по скользящему окну последних вызовов.
+
+    Вызов считается неудачным при сетевой ошибке, ответе 5xx или превышении
+    `STRAPI_BREAKER_SLOW_CALL_SECONDS`. Когда доля неудач в окне достигает
+    `STRAPI_BREAKER_FAILURE_RATE`, breaker открывается на
+    `STRAPI_BREAKER_OPEN_SECONDS` и сразу отклоняет запросы; затем пропускает
+    один пробный запрос (half-open) и по его результату закрывается или
+    открывается снова.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Возвращает breaker в закрытое состояние и обнуляет метрики."""
+        with self._lock:
+            self.state = STATE_CLOSED
+            self.opened_at = None
+            self.window = deque(maxlen=settings.STRAPI_BREAKER_WINDOW_SIZE)
+            self.transitions = Counter()
+            self.short_circuited = 0
+            self.trial_in_flight = False
+
+    def _transition(self, state):
+        if state == self.state:
+            return
+        logger.warning("Strapi circuit breaker %s: %s -> %s", self.name, self.state, state)
+        self.transitions[f"{self.state}->{state}"] += 1
+        self.state = state
+        self.opened_at = time.monotonic() if state == STATE_OPEN else None
+        self.trial_in_flight = False
+        if state != STATE_HALF_OPEN:
+            self.window.clear()
+
+    def allow_request(self) -> bool:
+        """Решает, можно ли выполнить запрос сейчас."""
+        if not settings.STRAPI_BREAKER_ENABLED:
+            return True
+        with self._lock:
+            if self.state == STATE_OPEN:
+                if time.monotonic() - self.opened_at < settings.STRAPI_BREAKER_OPEN_SECONDS:
+                    self.short_circuited += 1
+                    return False
+                self._transition(STATE_HALF_OPEN)
+            if self.state == STATE_HALF_OPEN:
+                if self.trial_in_flight:
+                    self.short_circuited += 1
+                    return False
+                self.trial_in_flight = True
+            return True
+
+    def record(self, *, success: bool, latency: float):
+        """Учитывает результат запроса и при необходимости меняет состояние."""
+        if not settings.STRAPI_BREAKER_ENABLED:
+            return
+        failed = not success or latency >= settings.STRAPI_BREAKER_SLOW_CALL_SECONDS
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._transition(STATE_OPEN if failed else STATE_CLOSED)
+                return
+            self.window.append((failed, latency))
+            if len(self.window) < settings.STRAPI_BREAKER_MIN_CALLS:
+                return
+            failures = sum(1 for is_failed, _ in self.window if is_failed)
+            if failures / len(self.window) >= settings.STRAPI_BREAKER_FAILURE_RATE:
+                self._transition(STATE_OPEN)
+
+    def snapshot(self):
+        """Возвращает состояние и метрики breaker'а."""
+        with self._lock:
+            calls = len(self.window)
+            failures = sum(1 for is_failed, _ in self.window if is_failed)
+            latencies = sorted(latency for _, latency in self.window)
+            return {
+                "state": self.state,
+                "window_calls": calls,
+                "window_failure_rate": round(failures / calls, 4) if calls else 0.0,
+                "window_latency_p95_seconds": round(latencies[int(0.95 * (calls - 1))], 6) if calls else 0.0,
+                "short_circuited": self.short_circuited,
+                "transitions": dict(self.transitions),
+                "open_for_seconds": round(time.monotonic() - self.opened_at, 3) if self.opened_at else 0.0,
+            }
+
+
+strapi_breaker = CircuitBreaker("strapi")
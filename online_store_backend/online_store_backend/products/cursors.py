@@ -0,0 +1,179 @@
+"""Keyset (cursor) пагинация публичного списка товаров.
+
+Курсор — непрозрачная base64url-строка с сортировкой, значением ключа
+последнего/первого товара страницы, его `documentId` (tiebreaker) и
+направлением. Следующая страница выбирается условием
+`(field, documentId) > (value, id)` вместо смещения, поэтому стоимость
+запроса не зависит от глубины, а вставки не сдвигают уже показанные товары.
+
+Товары Strapi без значения ключа (NULL) идут после остальных в любом
+направлении сортировки (NULLS LAST) и упорядочены по `documentId`; в их
+курсоре значение равно `null`. Сравнение с NULL в фильтре Strapi ложно,
+поэтому такие товары запрашиваются отдельным сегментом (`strapi_keyset_queries`).
+Зеркало хранит вместо NULL значения по умолчанию (`mirror.CURSOR_NULL_VALUES`).
+"""
+
+import base64
+import binascii
+import json
+
+CURSOR_NEXT = "next"
+CURSOR_PREV = "prev"
+
+# ordering -> (поле сортировки в нормализованном товаре, по убыванию).
+# Без ordering курсор идет по одному documentId.
+CURSOR_SORT_FIELDS = {
+    None: (None, False),
+    "price": ("price", False),
+    "-price": ("price", True),
+    "title": ("title", False),
+    "-title": ("title", True),
+}
+
+
+class InvalidCursorError(ValueError):
+    """Курсор поврежден или выдан для другой сортировки."""
+
+
+def encode_cursor(ordering, value, document_id, direction):
+    """Кодирует позицию в списке в непрозрачный курсор."""
+    raw = json.dumps(
+        {"o": ordering or "", "v": value, "id": document_id, "d": direction},
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, ordering):
+    """Декодирует курсор; возвращает `{"value", "document_id", "direction"}`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorError from exc
+    if not isinstance(data, dict) or data.get("d") not in (CURSOR_NEXT, CURSOR_PREV):
+        raise InvalidCursorError
+    if (data.get("o") or None) != ordering or not isinstance(data.get("id"), str) or not data["id"]:
+        raise InvalidCursorError
+    field, _descending = CURSOR_SORT_FIELDS[ordering]
+    if field is not None and data.get("v") is not None and not isinstance(data["v"], str):
+        raise InvalidCursorError
+    return {"value": data.get("v"), "document_id": data["id"], "direction": data["d"]}
+
+
+def keyset_direction(ordering, position):
+    """Возвращает `(field, descending)` фактического запроса с учетом направления курсора.
+
+    Для `prev` сортировка разворачивается, а найденная страница затем
+    переворачивается обратно в `build_cursor_page`.
+    """
+    field, descending = CURSOR_SORT_FIELDS[ordering]
+    if position is not None and position["direction"] == CURSOR_PREV:
+        descending = not descending
+    return field, descending
+
+
+def _strapi_segment_params(params, *, field, descending, null_segment, position):
+    """Параметры запроса одного сегмента: товаров со значением ключа или без него."""
+    direction = "desc" if descending else "asc"
+    operator = "$lt" if descending else "$gt"
+    params = dict(params)
+    if field is None or null_segment:
+        params["sort[0]"] = f"documentId:{direction}"
+    else:
+        params["sort[0]"] = f"{field}:{direction}"
+        params["sort[1]"] = f"documentId:{direction}"
+    if field is not None:
+        params[f"filters[{field}][{'$null' if null_segment else '$notNull'}]"] = "true"
+    if position is None:
+        return params
+    if field is None or null_segment:
+        params[f"filters[documentId][{operator}]"] = position["document_id"]
+    else:
+        params[f"filters[$or][0][{field}][{operator}]"] = position["value"]
+        params[f"filters[$or][1][{field}][$eq]"] = position["value"]
+        params[f"filters[$or][1][documentId][{operator}]"] = position["document_id"]
+    return params
+
+
+def strapi_keyset_queries(params, *, ordering, position):
+    """Строит запросы Strapi keyset-страницы: список `(null_segment, params)` в порядке запроса.
+
+    При сортировке по полю товары со значением и без него (NULL) запрашиваются
+    разными сегментами; курсор относится к одному из них, сегменты до него
+    пропускаются, после него — читаются с начала. Лимит каждому запросу
+    назначает `collect_keyset_items`; total не подсчитывается.
+    """
+    field, descending = keyset_direction(ordering, position)
+    params = {key: value for key, value in params.items() if not key.startswith(("pagination[", "sort"))}
+    params["pagination[start]"] = 0
+    params["pagination[withCount]"] = "false"
+    if field is None:
+        segments = (False,)
+    else:
+        backwards = position is not None and position["direction"] == CURSOR_PREV
+        segments = (True, False) if backwards else (False, True)
+        if position is not None:
+            segments = segments[segments.index(position["value"] is None) :]
+    return [
+        (
+            null_segment,
+            _strapi_segment_params(
+                params,
+                field=field,
+                descending=descending,
+                null_segment=null_segment,
+                position=position if index == 0 else None,
+            ),
+        )
+        for index, null_segment in enumerate(segments)
+    ]
+
+
+def collect_keyset_items(queries, fetch, *, page_size):
+    """Выполняет запросы сегментов по порядку, пока не наберется `page_size + 1` товар.
+
+    `fetch(params, limit)` возвращает товары одного запроса. Возвращает
+    `(items, null_ids)`: товары в порядке запроса и `documentId` товаров из
+    сегмента без значения ключа.
+    """
+    items = []
+    null_ids = set()
+    for null_segment, params in queries:
+        limit = page_size + 1 - len(items)
+        products = fetch({**params, "pagination[limit]": limit}, limit)
+        if null_segment:
+            null_ids.update(product["id"] for product in products)
+        items.extend(products)
+        if len(items) > page_size:
+            break
+    return items, null_ids
+
+
+def _cursor_for(product, ordering, direction, null_ids):
+    field, _descending = CURSOR_SORT_FIELDS[ordering]
+    value = product.get(field) if field and product["id"] not in null_ids else None
+    return encode_cursor(ordering, None if value is None else str(value), product["id"], direction)
+
+
+def build_cursor_page(items, *, ordering, position, page_size, null_ids=frozenset()):
+    """Формирует страницу из `page_size + 1` товаров в порядке запроса.
+
+    `null_ids` — товары без значения ключа сортировки (их курсор хранит `null`).
+    Возвращает `(results, pagination)`, где `pagination` содержит
+    `page_size`, `next` и `prev` курсоры вместо номера страницы и total.
+    """
+    backwards = position is not None and position["direction"] == CURSOR_PREV
+    has_more = len(items) > page_size
+    results = list(items[:page_size])
+    if backwards:
+        results.reverse()
+    next_cursor = None
+    prev_cursor = None
+    if results:
+        if backwards or has_more:
+            next_cursor = _cursor_for(results[-1], ordering, CURSOR_NEXT, null_ids)
+        if (backwards and has_more) or (not backwards and position is not None):
+            prev_cursor = _cursor_for(results[0], ordering, CURSOR_PREV, null_ids)
+    return results, {"page_size": page_size, "next": next_cursor, "prev": prev_cursor}
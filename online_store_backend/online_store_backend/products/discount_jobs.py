@@ -0,0 +1,390 @@
+"""Фоновые задания применения и сброса скидки категории.
+
+Задание сначала фиксирует план: список товаров категории, скидку которых
+нужно изменить (`CategoryDiscountJobItem`). Затем товары обрабатываются
+пачками по `CATALOG_DISCOUNT_JOB_BATCH_SIZE`: пачка читается одним
+`$in`-запросом, скидка перепроверяется, и PUT уходит только для товаров,
+которым она все еще нужна, в пуле из `CATALOG_DISCOUNT_JOB_CONCURRENCY`
+одновременных обновлений. Сбои Strapi повторяются до
+`CATALOG_DISCOUNT_JOB_MAX_ATTEMPTS` раз на запрос. После каждой
+пачки статусы товаров, счетчики задания и агрегаты скидок сохраняются одной
+транзакцией, поэтому прерванное задание продолжается с первого
+необработанного товара. Обновления пачки, не успевшей сохраниться, при
+продолжении повторяются: запись скидки идемпотентна.
+
+Задание выполняет воркер фоновых заданий (`products.category_discount`):
+задание, потерянное вместе с воркером, он же возвращает в очередь, и оно
+продолжается с сохраненной точки. Отмена фонового задания останавливает
+обработку перед следующей пачкой.
+"""
+
+import logging
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from online_store_backend.jobs.models import ACTIVE_JOB_STATUSES
+from online_store_backend.jobs.runner import JobCancelled
+from online_store_backend.jobs.runner import enqueue_job
+
+from .admin_payloads import _build_product_payload
+from .cache import bump_products_cache_version
+from .discount_stats import alist_admin_products
+from .discount_stats import record_product_discounts
+from .models import CategoryDiscountJob
+from .models import CategoryDiscountJobItem
+from .models import DiscountJobAction
+from .models import DiscountJobItemStatus
+from .models import DiscountJobStatus
+from .strapi_async import AsyncStrapiClient
+from .strapi_async import map_concurrently
+from .strapi_async import run_sync
+from .strapi_client import StrapiNotFoundError
+from .strapi_client import StrapiRequestError
+from .strapi_client import StrapiUnavailableError
+from .strapi_client import _normalize_discount_percent
+from .strapi_client import get_products_admin_raw
+from .strapi_client import update_product_admin_raw
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = (DiscountJobStatus.PENDING, DiscountJobStatus.RUNNING)
+# Ответы Strapi, после которых обновление товара имеет смысл повторить.
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+# Сколько последних ошибок товаров отдается в статусе задания.
+STATUS_FAILURES_LIMIT = 20
+
+
+def _set_product_discount(product_id, attrs, discount_percent):
+    """Перезаписывает скидку товара в Strapi, сохраняя остальные поля `attrs`."""
+    payload = _build_product_payload(attrs)
+    payload["discount_percent"] = discount_percent
+    update_product_admin_raw(product_id, payload)
+
+
+def _is_retryable(exc):
+    if isinstance(exc, StrapiUnavailableError):
+        return True
+    return isinstance(exc, StrapiRequestError) and exc.status_code in RETRYABLE_STATUS_CODES
+
+
+def _with_retry(func, *args):
+    """Вызывает запрос к Strapi, повторяя временные сбои с удваивающейся паузой."""
+    attempts = max(1, settings.CATALOG_DISCOUNT_JOB_MAX_ATTEMPTS)
+    for attempt in range(1, attempts + 1):
+        try:
+            return func(*args)
+        except (StrapiUnavailableError, StrapiRequestError) as exc:
+            if attempt == attempts or not _is_retryable(exc):
+                raise
+            time.sleep(settings.CATALOG_DISCOUNT_JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+
+def _set_product_discount_with_retry(product_id, attrs, discount_percent):
+    """Меняет скидку товара, повторяя временные сбои Strapi."""
+    return _with_retry(_set_product_discount, product_id, attrs, discount_percent)
+
+
+def _should_update(job, discount):
+    """Нужно ли менять текущую скидку товара: применение не уменьшает большие скидки."""
+    if job.action == DiscountJobAction.APPLY:
+        return discount < job.discount_percent
+    return discount != 0
+
+
+def _active_jobs():
+    """Незавершенные задания, фоновое задание которых еще в очереди или выполняется."""
+    return CategoryDiscountJob.objects.filter(
+        status__in=ACTIVE_STATUSES,
+        background_job__status__in=ACTIVE_JOB_STATUSES,
+    )
+
+
+def active_discount_job(category_id):
+    """Выполняющееся задание категории или `None`."""
+    return _active_jobs().filter(category_document_id=category_id).first()
+
+
+def _expire_stale_jobs(category_id, exclude_pk=None):
+    """Завершает задания категории, застрявшие в `pending`/`running` без живого фонового задания.
+
+    Такие задания остаются после воркера, потерявшего задание окончательно, и
+    иначе навсегда занимали бы место единственного активного задания категории.
+    """
+    stale = CategoryDiscountJob.objects.filter(category_document_id=category_id, status__in=ACTIVE_STATUSES).exclude(
+        pk__in=_active_jobs().values("pk")
+    )
+    if exclude_pk is not None:
+        stale = stale.exclude(pk=exclude_pk)
+    now = timezone.now()
+    stale.update(status=DiscountJobStatus.FAILED, error="Worker lost", finished_at=now, heartbeat_at=now)
+
+
+def _enqueue(job, user=None):
+    job.background_job = enqueue_job("products.category_discount", {"discount_job_id": job.pk}, user=user)
+    job.save(update_fields=["background_job"])
+
+
+def start_discount_job(category_id, action, discount_percent, user=None):
+    """Создает задание и ставит его в очередь фоновых заданий.
+
+    Единственность активного задания категории обеспечивает ограничение
+    `uniq_active_discount_job_per_category`: при гонке запусков
+    пробрасывается `IntegrityError`, транзакция вызывающего остается рабочей.
+    """
+    with transaction.atomic():
+        _expire_stale_jobs(category_id)
+        job = CategoryDiscountJob.objects.create(
+            category_document_id=category_id,
+            action=action,
+            discount_percent=discount_percent,
+            created_by=user if user is not None and user.is_authenticated else None,
+        )
+        _enqueue(job, user)
+    return job
+
+
+def resume_discount_job(job, user=None):
+    """Возвращает в очередь прерванное, отмененное или завершенное с ошибками задание.
+
+    Товары с ошибками снова становятся необработанными. Возвращает `False`,
+    если задание или другое задание его категории еще выполняется.
+    """
+    try:
+        with transaction.atomic():
+            return _resume(job, user)
+    except IntegrityError:
+        return False
+
+
+def _resume(job, user):
+    job = CategoryDiscountJob.objects.select_for_update().get(pk=job.pk)
+    if _active_jobs().filter(pk=job.pk).exists():
+        return False
+    _expire_stale_jobs(job.category_document_id, exclude_pk=job.pk)
+    retried = job.items.filter(status=DiscountJobItemStatus.FAILED).update(
+        status=DiscountJobItemStatus.PENDING,
+        error="",
+    )
+    job.failed_count = max(0, job.failed_count - retried)
+    job.status = DiscountJobStatus.PENDING
+    job.heartbeat_at = timezone.now()
+    job.error = ""
+    job.finished_at = None
+    job.save(update_fields=["failed_count", "status", "heartbeat_at", "error", "finished_at"])
+    _enqueue(job, user)
+    return True
+
+
+def _claim(job_id):
+    """Переводит задание в `running`; `None`, если оно завершено.
+
+    Задание в статусе `running` продолжается: единственность выполнения
+    обеспечивает очередь фоновых заданий.
+    """
+    with transaction.atomic():
+        job = CategoryDiscountJob.objects.select_for_update().filter(pk=job_id).first()
+        if job is None or job.status not in ACTIVE_STATUSES:
+            return None
+        now = timezone.now()
+        job.status = DiscountJobStatus.RUNNING
+        job.started_at = job.started_at or now
+        job.heartbeat_at = now
+        job.run_count += 1
+        job.save(update_fields=["status", "started_at", "heartbeat_at", "run_count"])
+    return job
+
+
+def _plan(job):
+    """Фиксирует товары категории, скидку которых нужно изменить."""
+    started = time.monotonic()
+    products = run_sync(alist_admin_products, AsyncStrapiClient(), job.category_document_id)
+    product_ids = list(
+        dict.fromkeys(
+            product["id"]
+            for product in products
+            if product.get("id") and _should_update(job, _normalize_discount_percent(product.get("discount_percent")))
+        )
+    )
+    with transaction.atomic():
+        CategoryDiscountJobItem.objects.bulk_create(
+            [CategoryDiscountJobItem(job=job, product_document_id=product_id) for product_id in product_ids],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        job.total_in_category = len(products)
+        job.skipped_count = len(products) - len(product_ids)
+        job.elapsed_seconds += time.monotonic() - started
+        job.heartbeat_at = timezone.now()
+        job.save(update_fields=["total_in_category", "skipped_count", "elapsed_seconds", "heartbeat_at"])
+
+
+def _outcome_state(outcome):
+    """Статус товара и текст ошибки по результату обновления."""
+    if outcome == DiscountJobItemStatus.SKIPPED:
+        return DiscountJobItemStatus.SKIPPED, ""
+    if not isinstance(outcome, Exception):
+        return DiscountJobItemStatus.UPDATED, ""
+    if isinstance(outcome, StrapiNotFoundError):
+        return DiscountJobItemStatus.NOT_FOUND, ""
+    if isinstance(outcome, StrapiRequestError):
+        return DiscountJobItemStatus.FAILED, f"Strapi responded with status {outcome.status_code}"
+    if isinstance(outcome, StrapiUnavailableError):
+        return DiscountJobItemStatus.FAILED, "Catalog service unavailable"
+    logger.error("Unexpected error while updating product discount.", exc_info=outcome)
+    return DiscountJobItemStatus.FAILED, "Internal error"
+
+
+def _checkpoint(job, items, outcomes, elapsed):
+    """Сохраняет результаты пачки: статусы товаров, счетчики задания и агрегаты скидок."""
+    states = {}
+    counts = Counter()
+    for item, outcome in zip(items, outcomes):
+        item.status, item.error = _outcome_state(outcome)
+        counts[item.status] += 1
+        if item.status == DiscountJobItemStatus.UPDATED:
+            states[item.product_document_id] = (job.category_document_id, job.discount_percent)
+        elif item.status == DiscountJobItemStatus.NOT_FOUND:
+            states[item.product_document_id] = None
+    with transaction.atomic():
+        CategoryDiscountJobItem.objects.bulk_update(items, ["status", "error"])
+        record_product_discounts(states)
+        job.updated_count += counts[DiscountJobItemStatus.UPDATED]
+        job.skipped_count += counts[DiscountJobItemStatus.SKIPPED] + counts[DiscountJobItemStatus.NOT_FOUND]
+        job.failed_count += counts[DiscountJobItemStatus.FAILED]
+        job.elapsed_seconds += elapsed
+        job.heartbeat_at = timezone.now()
+        job.save(update_fields=["updated_count", "skipped_count", "failed_count", "elapsed_seconds", "heartbeat_at"])
+
+
+def _report_progress(job, context):
+    if context is not None:
+        context.set_progress(
+            discount_job_id=job.pk,
+            total_in_category=job.total_in_category,
+            updated_count=job.updated_count,
+            skipped_count=job.skipped_count,
+            failed_count=job.failed_count,
+        )
+
+
+def _update_batch(job, product_ids):
+    """Меняет скидку пачки товаров; возвращает результаты в порядке `product_ids`.
+
+    Пачка читается одним `$in`-запросом; товары, скидку которых после плана
+    уже изменили так, что она не требует правки, пропускаются, а PUT уходит
+    только для остальных.
+    """
+    try:
+        current = _with_retry(get_products_admin_raw, product_ids)
+    except (StrapiUnavailableError, StrapiRequestError) as exc:
+        return [exc] * len(product_ids)
+    outcomes = {}
+    writes = []
+    for product_id in product_ids:
+        attrs = current.get(product_id)
+        if attrs is None:
+            outcomes[product_id] = StrapiNotFoundError()
+        elif not _should_update(job, _normalize_discount_percent(attrs.get("discount_percent"))):
+            outcomes[product_id] = DiscountJobItemStatus.SKIPPED
+        else:
+            writes.append(product_id)
+
+    def update(product_id):
+        return _set_product_discount_with_retry(product_id, current[product_id], job.discount_percent)
+
+    results = map_concurrently(update, writes, concurrency=settings.CATALOG_DISCOUNT_JOB_CONCURRENCY)
+    outcomes.update(zip(writes, results))
+    return [outcomes[product_id] for product_id in product_ids]
+
+
+def _process(job, context=None):
+    """Обрабатывает необработанные товары задания пачками, проверяя отмену перед каждой."""
+    batch_size = max(1, settings.CATALOG_DISCOUNT_JOB_BATCH_SIZE)
+    while True:
+        if context is not None:
+            context.check_cancelled()
+        items = list(job.items.filter(status=DiscountJobItemStatus.PENDING).order_by("pk")[:batch_size])
+        if not items:
+            return
+        started = time.monotonic()
+        outcomes = _update_batch(job, [item.product_document_id for item in items])
+        _checkpoint(job, items, outcomes, time.monotonic() - started)
+        _report_progress(job, context)
+
+
+def _finish(job, status, error=""):
+    job.status = status
+    job.error = error
+    job.finished_at = timezone.now()
+    job.heartbeat_at = job.finished_at
+    job.save(update_fields=["status", "error", "finished_at", "heartbeat_at"])
+
+
+def run_discount_job(job_id, context=None):
+    """Выполняет (или продолжает) задание; возвращает его или `None`, если оно уже завершено.
+
+    `context` — контекст фонового задания: прогресс и отмена.
+    """
+    job = _claim(job_id)
+    if job is None:
+        return None
+    updated_before = job.updated_count
+    try:
+        if job.total_in_category is None:
+            _plan(job)
+            _report_progress(job, context)
+        _process(job, context)
+    except JobCancelled:
+        _finish(job, DiscountJobStatus.CANCELLED)
+        raise
+    except StrapiUnavailableError:
+        logger.exception("Strapi unavailable while running category discount job %s.", job.pk)
+        _finish(job, DiscountJobStatus.FAILED, "Catalog service unavailable")
+    except Exception:
+        logger.exception("Category discount job %s failed.", job.pk)
+        _finish(job, DiscountJobStatus.FAILED, "Internal error")
+    else:
+        _finish(job, DiscountJobStatus.COMPLETED)
+    finally:
+        if job.updated_count > updated_before:
+            bump_products_cache_version()
+    return job
+
+
+def discount_job_status(job):
+    """Прогресс задания для админского API."""
+    counts = dict(job.items.values("status").annotate(count=Count("pk")).values_list("status", "count"))
+    processed = (
+        job.updated_count
+        + job.failed_count
+        + counts.get(DiscountJobItemStatus.SKIPPED, 0)
+        + counts.get(DiscountJobItemStatus.NOT_FOUND, 0)
+    )
+    failures = job.items.filter(status=DiscountJobItemStatus.FAILED).order_by("-pk")[:STATUS_FAILURES_LIMIT]
+    return {
+        "id": job.pk,
+        "job_id": job.background_job_id,
+        "category_id": job.category_document_id,
+        "action": job.action,
+        "discount_percent": job.discount_percent,
+        "status": job.status,
+        "total_in_category": job.total_in_category,
+        "planned_count": sum(counts.values()),
+        "pending_count": counts.get(DiscountJobItemStatus.PENDING, 0),
+        "updated_count": job.updated_count,
+        "skipped_count": job.skipped_count,
+        "failed_count": job.failed_count,
+        "failures": [{"id": item.product_document_id, "detail": item.error} for item in failures],
+        "elapsed_seconds": round(job.elapsed_seconds, 3),
+        "throughput_per_second": round(processed / job.elapsed_seconds, 2) if job.elapsed_seconds else None,
+        "error": job.error or None,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,240 @@
+"""Агрегаты скидок по категориям для админского списка категорий.
+
+Для каждого товара хранится учтенная пара «категория, скидка»
+(`CategoryDiscountProduct`), для каждой категории — число товаров с каждой
+скидкой (`CategoryDiscountBucket`). Отсюда статистика категории: число
+товаров, набор различных скидок и признак смешанных скидок; список категорий
+читает ее одним запросом вместо обхода товаров каждой категории в Strapi.
+
+Агрегаты обновляются при создании, изменении и удалении товаров в админке,
+массовых операциях, скидках категорий и по webhook'ам Strapi. Изменения,
+прошедшие мимо этих путей, исправляет полный пересчет
+(`recompute_category_discount_stats`). Таблицы создаются пустыми: после
+деплоя их заполняет `recompute_category_discount_stats --if-empty`, который
+запускается при старте воркера фоновых заданий.
+"""
+
+import asyncio
+import logging
+import math
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import CategoryDiscountBucket
+from .models import CategoryDiscountProduct
+from .strapi_async import AsyncStrapiClient
+from .strapi_async import run_sync
+from .strapi_client import StrapiNotFoundError
+from .strapi_client import StrapiUnavailableError
+from .strapi_client import _normalize_discount_percent
+from .strapi_client import get_product_admin
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS_PAGE_SIZE = 100
+
+
+def product_discount_state(product):
+    """Пара `(documentId категории, скидка)` нормализованного админского товара."""
+    category = product.get("category") or {}
+    return category.get("id"), _normalize_discount_percent(product.get("discount_percent"))
+
+
+def payload_discount_state(payload, discount_percent=None):
+    """Состояние товара по payload, записанному в Strapi; `None` для черновика.
+
+    Черновики не учитываются, как и в публичной выдаче товаров Strapi.
+    """
+    if not payload.get("publishedAt"):
+        return None
+    discount = payload.get("discount_percent") if discount_percent is None else discount_percent
+    return payload.get("category") or None, _normalize_discount_percent(discount)
+
+
+def _products_params(page, page_size, category_id=None):
+    """Параметры запроса товаров (при `category_id` — одной категории) в Strapi."""
+    params = {
+        "pagination[page]": page,
+        "pagination[pageSize]": page_size,
+        "populate": "category",
+    }
+    if category_id is not None:
+        params["filters[category][documentId][$eq]"] = category_id
+    return params
+
+
+async def alist_admin_products(client, category_id=None):
+    """Загружает все товары (или товары категории): первую страницу, затем остальные параллельно."""
+    products, pagination = await client.list_products_admin(
+        page=1,
+        page_size=PRODUCTS_PAGE_SIZE,
+        params=_products_params(1, PRODUCTS_PAGE_SIZE, category_id),
+    )
+    total = pagination.get("total") if isinstance(pagination, dict) else None
+    page_count = math.ceil(int(total) / PRODUCTS_PAGE_SIZE) if total else 1
+    pages = await asyncio.gather(
+        *(
+            client.list_products_admin(
+                page=page,
+                page_size=PRODUCTS_PAGE_SIZE,
+                params=_products_params(page, PRODUCTS_PAGE_SIZE, category_id),
+            )
+            for page in range(2, page_count + 1)
+        )
+    )
+    products = list(products)
+    for page_products, _pagination in pages:
+        products.extend(page_products)
+    return products
+
+
+def _apply_bucket_deltas(deltas):
+    """Применяет изменения счетчиков `{(категория, скидка): delta}` и убирает пустые корзины."""
+    deltas = {bucket: delta for bucket, delta in deltas.items() if delta and bucket[0]}
+    if not deltas:
+        return
+    CategoryDiscountBucket.objects.bulk_create(
+        [
+            CategoryDiscountBucket(category_document_id=category_id, discount_percent=discount, product_count=0)
+            for category_id, discount in deltas
+        ],
+        ignore_conflicts=True,
+    )
+    for (category_id, discount), delta in sorted(deltas.items()):
+        CategoryDiscountBucket.objects.filter(category_document_id=category_id, discount_percent=discount).update(
+            product_count=F("product_count") + delta
+        )
+    CategoryDiscountBucket.objects.filter(
+        category_document_id__in={category_id for category_id, _discount in deltas},
+        product_count__lte=0,
+    ).delete()
+
+
+def record_product_discounts(states):
+    """Учитывает новые состояния товаров `{documentId: (категория, скидка) | None}`.
+
+    `None` означает, что товар удален из каталога.
+    """
+    states = {str(document_id): state for document_id, state in states.items() if document_id}
+    if not states:
+        return
+    with transaction.atomic():
+        previous = {
+            row.document_id: (row.category_document_id, row.discount_percent)
+            for row in CategoryDiscountProduct.objects.select_for_update().filter(document_id__in=list(states))
+        }
+        deltas = Counter()
+        removed = []
+        upserts = []
+        for document_id, state in states.items():
+            before = previous.get(document_id)
+            if state == before:
+                continue
+            if before is not None:
+                deltas[before] -= 1
+            if state is None:
+                removed.append(document_id)
+                continue
+            deltas[state] += 1
+            category_id, discount = state
+            upserts.append(
+                CategoryDiscountProduct(
+                    document_id=document_id,
+                    category_document_id=category_id,
+                    discount_percent=discount,
+                )
+            )
+        if removed:
+            CategoryDiscountProduct.objects.filter(document_id__in=removed).delete()
+        if upserts:
+            CategoryDiscountProduct.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=["document_id"],
+                update_fields=["category_document_id", "discount_percent", "updated_at"],
+            )
+        _apply_bucket_deltas(deltas)
+
+
+def refresh_product_discount(document_id):
+    """Перечитывает товар из Strapi и учитывает его состояние в агрегатах."""
+    try:
+        product = get_product_admin(document_id)
+    except StrapiNotFoundError:
+        forget_products([document_id])
+        return
+    except StrapiUnavailableError:
+        logger.warning("Strapi unavailable while refreshing discount stats of product %s.", document_id)
+        return
+    record_product_discounts({document_id: product_discount_state(product)})
+
+
+def forget_products(document_ids):
+    """Убирает удаленные товары из агрегатов."""
+    record_product_discounts(dict.fromkeys(document_ids))
+
+
+def detach_category(category_id):
+    """Отвязывает товары удаленной категории и удаляет ее агрегаты."""
+    if not category_id:
+        return
+    with transaction.atomic():
+        CategoryDiscountProduct.objects.filter(category_document_id=category_id).update(category_document_id=None)
+        CategoryDiscountBucket.objects.filter(category_document_id=category_id).delete()
+
+
+def _summarize(counts):
+    """Статистика категории по счетчикам `{скидка: число товаров}`."""
+    product_count = sum(counts.values())
+    stats = {
+        "product_count": product_count,
+        "discount_percents": sorted(counts),
+        "derived_discount_percent": None,
+        "derived_discount_is_mixed": len(counts) > 1,
+    }
+    if len(counts) == 1:
+        stats["derived_discount_percent"] = next(iter(counts))
+    return stats
+
+
+def category_discount_stats(category_ids):
+    """Возвращает `{documentId категории: статистика скидок}` одним запросом."""
+    counts = {category_id: {} for category_id in category_ids}
+    buckets = CategoryDiscountBucket.objects.filter(category_document_id__in=list(counts)).values_list(
+        "category_document_id", "discount_percent", "product_count"
+    )
+    for category_id, discount, product_count in buckets:
+        counts[category_id][discount] = product_count
+    return {category_id: _summarize(category_counts) for category_id, category_counts in counts.items()}
+
+
+def recompute_category_discount_stats():
+    """Пересчитывает агрегаты по всем товарам Strapi; возвращает сводку.
+
+    Ошибка Strapi пробрасывается до изменения таблиц.
+    """
+    products = run_sync(alist_admin_products, AsyncStrapiClient())
+    states = {product["id"]: product_discount_state(product) for product in products if product.get("id")}
+    buckets = Counter(state for state in states.values() if state[0])
+    with transaction.atomic():
+        CategoryDiscountProduct.objects.all().delete()
+        CategoryDiscountBucket.objects.all().delete()
+        CategoryDiscountProduct.objects.bulk_create(
+            [
+                CategoryDiscountProduct(document_id=document_id, category_document_id=category_id, discount_percent=discount)
+                for document_id, (category_id, discount) in states.items()
+            ],
+            batch_size=1000,
+        )
+        CategoryDiscountBucket.objects.bulk_create(
+            [
+                CategoryDiscountBucket(category_document_id=category_id, discount_percent=discount, product_count=count)
+                for (category_id, discount), count in buckets.items()
+            ],
+            batch_size=1000,
+        )
+    summary = {"products": len(states), "categories": len({category_id for category_id, _discount in buckets})}
+    logger.info("Category discount stats recomputed: %s", summary)
+    return summary
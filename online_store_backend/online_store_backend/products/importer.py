@@ -0,0 +1,257 @@
+"""Потоковый импорт товаров из CSV/XLSX с upsert по slug.
+
+Файл читается построчно: CSV — `csv.DictReader` поверх потока, XLSX —
+`openpyxl` в режиме read-only. Строки проверяются `ProductUpsertSerializer`
+и обрабатываются окнами по `STRAPI_BATCH_SIZE`: существующие товары окна
+ищутся одним `$in`-запросом по slug, затем товары создаются или обновляются
+параллельно, не больше `CATALOG_IMPORT_CONCURRENCY` одновременно. В памяти
+держится только текущее окно. Кэш каталога сбрасывается один раз в конце.
+"""
+
+import csv
+import io
+import itertools
+import time
+import zipfile
+
+from django.conf import settings
+from django.utils import timezone
+
+from .admin_payloads import _build_product_payload
+from .api.admin_serializers import ProductUpsertSerializer
+from .api.admin_views import _is_slug_conflict
+from .api.admin_views import _trim_strapi_message
+from .cache import bump_products_cache_version
+from .discount_stats import payload_discount_state
+from .discount_stats import record_product_discounts
+from .slug_index import index_product_slug
+from .strapi_async import map_concurrently
+from .strapi_client import StrapiRequestError
+from .strapi_client import StrapiUnavailableError
+from .strapi_client import create_product_admin
+from .strapi_client import get_products_admin_raw
+from .strapi_client import update_product_admin_flat
+
+IMPORT_COLUMNS = (
+    "title",
+    "slug",
+    "description",
+    "price",
+    "currency",
+    "category",
+    "publish",
+    "discount_percent",
+    "images",
+)
+IMPORT_ERRORS_LIMIT = 500
+
+
+class ImportFileError(Exception):
+    """Файл импорта не удалось прочитать."""
+
+
+def _row_data(row):
+    """Оставляет известные колонки строки; пустые ячейки пропускаются."""
+    data = {}
+    for key, value in row.items():
+        column = str(key or "").strip().lower()
+        if column not in IMPORT_COLUMNS or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+            if not value:
+                continue
+        if column == "images":
+            value = [part.strip() for part in str(value).replace(";", ",").split(",") if part.strip()]
+        data[column] = value
+    return data
+
+
+def _iter_csv(stream):
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    header = text.readline()
+    delimiter = ";" if header.count(";") > header.count(",") else ","
+    yield from csv.DictReader(itertools.chain([header], text), delimiter=delimiter)
+
+
+def _iter_xlsx(stream):
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except InvalidFileException as exc:
+        raise ImportFileError("Unable to read the import file.") from exc
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        columns = [str(value).strip() if value is not None else "" for value in header]
+        for values in rows:
+            yield dict(zip(columns, values))
+    finally:
+        workbook.close()
+
+
+def iter_import_rows(stream, filename):
+    """Построчно читает CSV/XLSX; отдает `(номер строки файла, данные)` для непустых строк.
+
+    Без openpyxl чтение XLSX пробрасывает `ImportError`.
+    """
+    name = str(filename or "").lower()
+    if name.endswith(".csv"):
+        rows = _iter_csv(stream)
+    elif name.endswith(".xlsx"):
+        rows = _iter_xlsx(stream)
+    else:
+        raise ImportFileError("Unsupported file type. Use .csv or .xlsx.")
+    try:
+        for row_number, row in enumerate(rows, start=2):
+            data = _row_data(row)
+            if data:
+                yield row_number, data
+    except (csv.Error, UnicodeDecodeError, zipfile.BadZipFile) as exc:
+        raise ImportFileError("Unable to read the import file.") from exc
+
+
+def _create_payload(validated):
+    """Payload создания товара, как в `ProductAdminViewSet.create`."""
+    payload = {
+        "title": validated["title"],
+        "slug": validated["slug"],
+        "description": validated.get("description"),
+        "price": str(validated["price"]),
+        "currency": validated["currency"],
+        "category": validated.get("category") or None,
+        "image": list(validated.get("images") or []),
+        "publishedAt": timezone.now().isoformat() if validated.get("publish", True) else None,
+    }
+    if "discount_percent" in validated:
+        payload["discount_percent"] = validated["discount_percent"]
+    return payload
+
+
+def _update_payload(current, validated, columns):
+    """Payload обновления: текущий товар, перекрытый заполненными колонками строки."""
+    payload = _build_product_payload(current)
+    created = _create_payload(validated)
+    for key in ("title", "slug", "price", "currency"):
+        payload[key] = created[key]
+    if "description" in columns:
+        payload["description"] = created["description"]
+    if "category" in columns:
+        payload["category"] = created["category"]
+    if "images" in columns:
+        payload["image"] = created["image"]
+    if "publish" in columns:
+        payload["publishedAt"] = created["publishedAt"]
+    if "discount_percent" in columns:
+        payload["discount_percent"] = created["discount_percent"]
+    return payload
+
+
+def _upsert(row, current):
+    """Создает товар или обновляет найденный по slug; возвращает `(действие, documentId, payload)`."""
+    if current is None:
+        payload = _create_payload(row["validated"])
+        product = create_product_admin(payload)
+        return "created", product["id"], payload
+    payload = _update_payload(current, row["validated"], row["columns"])
+    update_product_admin_flat(current.get("documentId"), payload)
+    return "updated", current.get("documentId"), payload
+
+
+def _row_error(result, row_number, errors, slug=None):
+    result["failed"] += 1
+    if len(result["errors"]) < IMPORT_ERRORS_LIMIT:
+        error = {"row": row_number, "errors": errors}
+        if slug:
+            error["slug"] = slug
+        result["errors"].append(error)
+
+
+def _strapi_error(exc):
+    if isinstance(exc, StrapiRequestError):
+        if _is_slug_conflict(exc.response_text):
+            return {"slug": ["This slug is already in use."]}
+        return {"detail": [_trim_strapi_message(exc.response_text)]}
+    return {"detail": ["Catalog service unavailable"]}
+
+
+def _import_window(window, result, dry_run):
+    """Обрабатывает окно проверенных строк: поиск по slug и параллельный upsert."""
+    slugs = [row["validated"]["slug"] for row in window]
+    try:
+        existing = get_products_admin_raw(slugs, field="slug")
+    except (StrapiRequestError, StrapiUnavailableError) as exc:
+        for row in window:
+            _row_error(result, row["row"], _strapi_error(exc), row["validated"]["slug"])
+        return
+    if dry_run:
+        for slug in slugs:
+            result["updated" if existing.get(slug) else "created"] += 1
+        return
+
+    def upsert(row):
+        return _upsert(row, existing.get(row["validated"]["slug"]))
+
+    outcomes = map_concurrently(upsert, window, concurrency=settings.CATALOG_IMPORT_CONCURRENCY)
+    states = {}
+    for row, outcome in zip(window, outcomes):
+        slug = row["validated"]["slug"]
+        if isinstance(outcome, (StrapiRequestError, StrapiUnavailableError)):
+            _row_error(result, row["row"], _strapi_error(outcome), slug)
+            continue
+        if isinstance(outcome, Exception):
+            raise outcome
+        action, document_id, payload = outcome
+        result[action] += 1
+        current = existing.get(slug) or {}
+        index_product_slug(document_id, slug, previous_slugs={current.get("slug")})
+        states[document_id] = payload_discount_state(payload)
+    record_product_discounts(states)
+
+
+def import_products(rows, *, dry_run=False, context=None):
+    """Импортирует строки `(номер, данные)`; возвращает счетчики, ошибки строк и скорость.
+
+    В режиме `dry_run` строки проверяются и сопоставляются с каталогом по
+    slug, но в Strapi ничего не пишется: `created`/`updated` показывают, что
+    произошло бы. Перед каждым окном проверяется отмена задания `context`.
+    """
+    started = time.monotonic()
+    result = {"dry_run": dry_run, "rows": 0, "created": 0, "updated": 0, "failed": 0, "errors": []}
+    seen_slugs = set()
+    window = []
+
+    def flush():
+        if context is not None:
+            context.check_cancelled()
+        _import_window(window, result, dry_run)
+        window.clear()
+        if context is not None:
+            context.set_progress(**{key: result[key] for key in ("rows", "created", "updated", "failed")})
+
+    try:
+        for row_number, data in rows:
+            result["rows"] += 1
+            serializer = ProductUpsertSerializer(data=data)
+            if not serializer.is_valid():
+                _row_error(result, row_number, serializer.errors, data.get("slug"))
+                continue
+            slug = serializer.validated_data["slug"]
+            if slug in seen_slugs:
+                _row_error(result, row_number, {"slug": ["Duplicate slug in file."]}, slug)
+                continue
+            seen_slugs.add(slug)
+            window.append({"row": row_number, "columns": set(data), "validated": serializer.validated_data})
+            if len(window) >= settings.STRAPI_BATCH_SIZE:
+                flush()
+        if window:
+            flush()
+    finally:
+        if not dry_run and (result["created"] or result["updated"]):
+            bump_products_cache_version()
+    elapsed = time.monotonic() - started
+    result["elapsed_seconds"] = round(elapsed, 3)
+    result["rows_per_second"] = round(result["rows"] / elapsed, 1) if elapsed > 0 else None
+    return result
@@ -0,0 +1,211 @@
+"""Обработчики фоновых заданий каталога: массовое изменение, импорт товаров и скидки категорий."""
+
+import logging
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+from online_store_backend.jobs.registry import job_handler
+from online_store_backend.jobs.runner import JobError
+
+from .admin_payloads import _extract_category_document_id
+from .admin_payloads import _extract_media_ids
+from .api.admin_serializers import BulkUpdateSerializer
+from .api.admin_serializers import ProductImportParamsSerializer
+from .cache import bump_products_cache_version
+from .discount_jobs import run_discount_job
+from .discount_stats import payload_discount_state
+from .discount_stats import record_product_discounts
+from .importer import ImportFileError
+from .importer import import_products
+from .importer import iter_import_rows
+from .models import DiscountJobStatus
+from .strapi_async import map_concurrently
+from .strapi_client import StrapiNotFoundError
+from .strapi_client import StrapiRequestError
+from .strapi_client import StrapiUnavailableError
+from .strapi_client import _chunked
+from .strapi_client import get_products_admin_raw
+from .strapi_client import update_product_admin_raw
+
+logger = logging.getLogger(__name__)
+
+
+def _bulk_update_payload(product_id, attrs, operation_type, category_id, value):
+    """Вычисляет новое состояние товара для массовой операции.
+
+    Возвращает `(ошибка, payload)`: описание ошибки валидации цены или `None`
+    и полный payload обновления либо `None`, если цена и категория товара не
+    меняются и запись в Strapi не нужна.
+    """
+    price_value = attrs.get("price")
+    if price_value is None:
+        return {"id": product_id, "status": 422, "detail": "Missing price on product."}, None
+    try:
+        current_price = Decimal(str(price_value))
+    except (InvalidOperation, ValueError):
+        return {"id": product_id, "status": 422, "detail": "Invalid price on product."}, None
+    new_price = current_price
+    if operation_type == "discount_percent":
+        new_price = (current_price * (Decimal("1") - (value / Decimal("100")))).quantize(
+            Decimal("0.01"),
+            rounding=ROUND_HALF_UP,
+        )
+    elif operation_type == "increase_price_fixed":
+        new_price = (current_price + value).quantize(
+            Decimal("0.01"),
+            rounding=ROUND_HALF_UP,
+        )
+    elif operation_type == "decrease_price_fixed":
+        new_price = max(
+            (current_price - value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP),
+            Decimal("0.00"),
+        )
+    current_category_id = _extract_category_document_id(attrs.get("category"))
+    new_category_id = category_id if operation_type == "set_category" else current_category_id
+    if new_price == current_price and new_category_id == current_category_id:
+        return None, None
+    return None, {
+        "title": attrs.get("title"),
+        "slug": attrs.get("slug"),
+        "description": attrs.get("description"),
+        "price": str(new_price),
+        "currency": attrs.get("currency"),
+        "category": new_category_id,
+        "image": _extract_media_ids(attrs.get("image")),
+        "publishedAt": attrs.get("publishedAt"),
+    }
+
+
+def _strapi_failure(product_id, exc):
+    """Описание ошибки Strapi для списка `failed` результата массовой операции."""
+    if isinstance(exc, StrapiNotFoundError):
+        return {"id": product_id, "status": 404, "detail": "Not found."}
+    if isinstance(exc, StrapiRequestError):
+        return {"id": product_id, "status": exc.status_code, "detail": exc.response_text}
+    logger.error("Strapi unavailable while updating product %s.", product_id, exc_info=exc)
+    return {"id": product_id, "status": 502, "detail": "Catalog service unavailable"}
+
+
+def apply_bulk_operation(product_ids, operation, *, fetch_batch=None, update=None):
+    """Применяет массовую операцию к товарам: пакетное чтение, расчет в памяти, запись изменений.
+
+    Товары читаются пачками по `STRAPI_BATCH_SIZE` через `$in`-фильтр
+    (`fetch_batch`, по умолчанию `get_products_admin_raw`), новое состояние
+    считается в памяти, а PUT (`update`, по умолчанию `update_product_admin_raw`)
+    отправляется только для товаров, у которых меняется цена или категория, не
+    больше `CATALOG_BULK_UPDATE_CONCURRENCY` одновременно.
+
+    Возвращает результат `{"updated", "unchanged", "failed"}` и состояния
+    измененных и удаленных товаров для `record_product_discounts`.
+    """
+    fetch_batch = fetch_batch or get_products_admin_raw
+    update = update or update_product_admin_raw
+    product_ids = list(dict.fromkeys(product_ids))
+    operation_type = operation.get("type")
+    category_id = operation.get("category_id") or None
+    value = Decimal(str(operation["value"])) if operation.get("value") is not None else None
+
+    chunks = list(_chunked(product_ids, settings.STRAPI_BATCH_SIZE))
+    current = {}
+    failures = {}
+    for chunk, outcome in zip(chunks, map_concurrently(fetch_batch, chunks)):
+        if isinstance(outcome, (StrapiRequestError, StrapiUnavailableError)):
+            failures.update((product_id, _strapi_failure(product_id, outcome)) for product_id in chunk)
+        elif isinstance(outcome, Exception):
+            raise outcome
+        else:
+            current.update(outcome)
+
+    unchanged = []
+    states = {}
+    writes = {}
+    for product_id in product_ids:
+        if product_id in failures:
+            continue
+        attrs = current.get(product_id)
+        if attrs is None:
+            failures[product_id] = _strapi_failure(product_id, StrapiNotFoundError())
+            states[product_id] = None
+            continue
+        error, payload = _bulk_update_payload(product_id, attrs, operation_type, category_id, value)
+        if error is not None:
+            failures[product_id] = error
+        elif payload is None:
+            unchanged.append(product_id)
+        else:
+            writes[product_id] = (payload, attrs.get("discount_percent"))
+
+    def write(product_id):
+        update(product_id, writes[product_id][0])
+
+    outcomes = map_concurrently(write, list(writes), concurrency=settings.CATALOG_BULK_UPDATE_CONCURRENCY)
+    updated = 0
+    for product_id, outcome in zip(list(writes), outcomes):
+        if isinstance(outcome, StrapiNotFoundError):
+            failures[product_id] = _strapi_failure(product_id, outcome)
+            states[product_id] = None
+        elif isinstance(outcome, (StrapiRequestError, StrapiUnavailableError)):
+            failures[product_id] = _strapi_failure(product_id, outcome)
+        elif isinstance(outcome, Exception):
+            raise outcome
+        else:
+            updated += 1
+            states[product_id] = payload_discount_state(*writes[product_id])
+    result = {
+        "updated": updated,
+        "unchanged": unchanged,
+        "failed": [failures[product_id] for product_id in product_ids if product_id in failures],
+    }
+    return result, states
+
+
+@job_handler("products.bulk_update", params_serializer=BulkUpdateSerializer)
+def bulk_update_products(context):
+    """Применяет массовую операцию к товарам; результат — `{"updated", "unchanged", "failed"}`.
+
+    Товары, которые не удалось прочитать или обновить из-за недоступности
+    Strapi, попадают в `failed` со статусом 502.
+    """
+    result, states = apply_bulk_operation(context.params["product_ids"], context.params["operation"])
+    record_product_discounts(states)
+    if result["updated"] > 0:
+        bump_products_cache_version()
+    return result
+
+
+@job_handler("products.import", params_serializer=ProductImportParamsSerializer)
+def import_products_file(context):
+    """Импортирует товары из загруженного CSV/XLSX; файл удаляется из хранилища после задания."""
+    path = context.params["path"]
+    try:
+        with default_storage.open(path, "rb") as stream:
+            rows = iter_import_rows(stream, context.params["filename"])
+            return import_products(rows, dry_run=context.params.get("dry_run", False), context=context)
+    except ImportError as exc:
+        raise JobError("Excel import dependency is not installed.") from exc
+    except FileNotFoundError as exc:
+        raise JobError("Import file not found.") from exc
+    except ImportFileError as exc:
+        raise JobError(str(exc)) from exc
+    finally:
+        default_storage.delete(path)
+
+
+@job_handler("products.category_discount")
+def apply_category_discount(context):
+    """Выполняет или продолжает задание скидки категории `discount_job_id`."""
+    job = run_discount_job(context.params["discount_job_id"], context)
+    if job is None:
+        raise JobError("Discount job is already finished.")
+    if job.status == DiscountJobStatus.FAILED:
+        raise JobError(job.error or "Discount job failed.")
+    return {
+        "discount_job_id": job.pk,
+        "status": job.status,
+        "total_in_category": job.total_in_category,
+        "updated_count": job.updated_count,
+        "skipped_count": job.skipped_count,
+        "failed_count": job.failed_count,
+    }
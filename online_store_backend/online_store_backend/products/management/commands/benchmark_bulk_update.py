@@ -0,0 +1,54 @@
+"""Команда бенчмарка массового изменения товаров."""
+
+from django.core.management.base import BaseCommand
+
+from online_store_backend.products.benchmarks import DEFAULT_BULK_UPDATE_CHANGED_RATIO
+from online_store_backend.products.benchmarks import DEFAULT_BULK_UPDATE_LATENCY_MS
+from online_store_backend.products.benchmarks import DEFAULT_BULK_UPDATE_SIZES
+from online_store_backend.products.benchmarks import run_bulk_update_benchmark
+
+
+class Command(BaseCommand):
+    """Сравнивает поштучное массовое изменение товаров с пакетным чтением и записью только изменений."""
+
+    help = (
+        "Benchmark bulk product updates against a simulated Strapi: per-product GET+PUT vs "
+        "batched $in reads with writes only for changed products."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=list(DEFAULT_BULK_UPDATE_SIZES),
+            help="Numbers of product ids to update.",
+        )
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=DEFAULT_BULK_UPDATE_LATENCY_MS,
+            help="Simulated Strapi latency per request.",
+        )
+        parser.add_argument(
+            "--changed-ratio",
+            type=float,
+            default=DEFAULT_BULK_UPDATE_CHANGED_RATIO,
+            help="Share of products whose category actually changes.",
+        )
+
+    def handle(self, *args, **options):
+        rows = run_bulk_update_benchmark(
+            [max(1, size) for size in options["sizes"]],
+            latency_ms=max(0.0, options["latency_ms"]),
+            changed_ratio=min(max(options["changed_ratio"], 0.0), 1.0),
+        )
+        self.stdout.write(
+            f"{'ids':>5} {'changed':>8} {'legacy_ms':>10} {'requests':>9} {'batched_ms':>11} {'requests':>9} "
+            f"{'speedup':>8}  identical"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['ids']:>5} {row['changed']:>8} {row['legacy_ms']:>10} {row['legacy_requests']:>9} "
+                f"{row['batched_ms']:>11} {row['batched_requests']:>9} {row['speedup']:>8}  {row['identical']}"
+            )
@@ -0,0 +1,43 @@
+"""Команда микробенчмарка отдачи закэшированной страницы товаров."""
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from online_store_backend.products.benchmarks import DEFAULT_PAGE_SIZES
+from online_store_backend.products.benchmarks import DEFAULT_REQUESTS
+from online_store_backend.products.benchmarks import run_response_benchmark
+
+
+class Command(BaseCommand):
+    """Сравнивает рендеринг DRF, рендеринг orjson и готовые ответы из кэша."""
+
+    help = "Benchmark serving a cached product list page: DRF rendering vs orjson vs pre-rendered bytes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page-sizes",
+            nargs="+",
+            type=int,
+            default=list(DEFAULT_PAGE_SIZES),
+            help="Products per list page.",
+        )
+        parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Cache hits per measurement.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; best time is reported.")
+
+    def handle(self, *args, **options):
+        rows = run_response_benchmark(
+            options["page_sizes"],
+            requests=max(1, options["requests"]),
+            repeat=max(1, options["repeat"]),
+        )
+        self.stdout.write(
+            f"{'page_size':>9} {'bytes':>8} {'gzip':>7} {'drf_us':>9} {'orjson_us':>10} {'rendered_us':>12} {'speedup':>8}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['page_size']:>9} {row['bytes']:>8} {row['gzip_bytes']:>7} {row['drf_us']:>9} "
+                f"{row['orjson_us']:>10} {row['rendered_us']:>12} {row['speedup']:>8}"
+            )
+        mismatched = [row for row in rows if not row["identical"]]
+        if mismatched:
+            raise CommandError(f"Response bodies differ for: {mismatched}")
@@ -0,0 +1,48 @@
+"""Команда бенчмарка поиска товаров по локальному индексу."""
+
+from django.core.management.base import BaseCommand
+
+from online_store_backend.products.benchmarks import DEFAULT_SEARCH_PRODUCTS
+from online_store_backend.products.benchmarks import DEFAULT_SEARCH_QUERIES
+from online_store_backend.products.benchmarks import run_search_benchmark
+
+
+class Command(BaseCommand):
+    """Сравнивает поиск по индексу зеркала с подстрочным поиском по заголовку."""
+
+    help = (
+        "Benchmark catalog search: full-text/trigram index vs title substring scan "
+        "on a synthetic mirror (rolled back)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=DEFAULT_SEARCH_PRODUCTS,
+            help="Synthetic products inserted into the mirror.",
+        )
+        parser.add_argument(
+            "--queries",
+            nargs="+",
+            default=list(DEFAULT_SEARCH_QUERIES),
+            help="Search queries to measure.",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; best time is reported.")
+
+    def handle(self, *args, **options):
+        rows = run_search_benchmark(
+            max(1, options["products"]),
+            queries=options["queries"],
+            repeat=max(1, options["repeat"]),
+        )
+        if rows and not rows[0]["trigram"]:
+            self.stdout.write("pg_trgm is not installed: the index path uses full-text search only.")
+        self.stdout.write(
+            f"{'products':>9} {'substring_ms':>13} {'found':>7} {'index_ms':>9} {'found':>7}  query"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['products']:>9} {row['substring_ms']:>13} {row['substring_total']:>7} "
+                f"{row['index_ms']:>9} {row['index_total']:>7}  {row['query']}"
+            )
@@ -0,0 +1,47 @@
+"""Команда бенчмарка индекса подсказок поиска товаров."""
+
+from django.core.management.base import BaseCommand
+
+from online_store_backend.products.benchmarks import DEFAULT_SUGGEST_PRODUCTS
+from online_store_backend.products.benchmarks import DEFAULT_SUGGEST_QUERIES
+from online_store_backend.products.benchmarks import DEFAULT_SUGGEST_REQUESTS
+from online_store_backend.products.benchmarks import run_suggest_benchmark
+
+
+class Command(BaseCommand):
+    """Замеряет построение индекса подсказок и ответы на префиксы запросов."""
+
+    help = "Benchmark the in-memory typeahead index: build, single-product update and prefix lookups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--products",
+            type=int,
+            default=DEFAULT_SUGGEST_PRODUCTS,
+            help="Synthetic products in the index.",
+        )
+        parser.add_argument(
+            "--queries",
+            nargs="+",
+            default=list(DEFAULT_SUGGEST_QUERIES),
+            help="Typeahead queries to measure.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=DEFAULT_SUGGEST_REQUESTS,
+            help="Repeated lookups per query.",
+        )
+
+    def handle(self, *args, **options):
+        summary, rows = run_suggest_benchmark(
+            max(1, options["products"]),
+            queries=options["queries"],
+            requests=max(1, options["requests"]),
+        )
+        self.stdout.write(
+            f"products={summary['products']} build_ms={summary['build_ms']} update_ms={summary['update_ms']}"
+        )
+        self.stdout.write(f"{'results':>7} {'cold_us':>9} {'warm_us':>8}  query")
+        for row in rows:
+            self.stdout.write(f"{row['results']:>7} {row['cold_us']:>9} {row['warm_us']:>8}  {row['query']}")
@@ -0,0 +1,34 @@
+"""Команда микробенчмарка нормализации списков товаров Strapi."""
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from online_store_backend.products.benchmarks import DEFAULT_SIZES
+from online_store_backend.products.benchmarks import run_normalizer_benchmark
+
+
+class Command(BaseCommand):
+    """Сравнивает пакетный нормализатор с прежней реализацией на синтетических данных."""
+
+    help = "Benchmark batch normalization of Strapi product lists against the per-item normalizer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            nargs="+",
+            type=int,
+            default=list(DEFAULT_SIZES),
+            help="Synthetic payload sizes (products per list).",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; best time is reported.")
+
+    def handle(self, *args, **options):
+        rows = run_normalizer_benchmark(options["sizes"], repeat=max(1, options["repeat"]))
+        self.stdout.write(f"{'size':>8} {'shape':<7} {'legacy_ms':>10} {'batch_ms':>10} {'speedup':>8}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['size']:>8} {row['shape']:<7} {row['legacy_ms']:>10} {row['batch_ms']:>10} {row['speedup']:>8}"
+            )
+        mismatched = [row for row in rows if not row["identical"]]
+        if mismatched:
+            raise CommandError(f"Batch normalizer output differs for: {mismatched}")
@@ -0,0 +1,37 @@
+"""Команда полного пересчета агрегатов скидок по категориям.
+
+Таблицы агрегатов создаются пустыми, поэтому воркер фоновых заданий при
+старте запускает команду с `--if-empty` (см. `docker-compose.production.yml`):
+после первого деплоя агрегаты заполняются по всем товарам Strapi, при
+последующих рестартах пересчет пропускается.
+"""
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from online_store_backend.products.discount_stats import recompute_category_discount_stats
+from online_store_backend.products.models import CategoryDiscountProduct
+from online_store_backend.products.strapi_client import StrapiUnavailableError
+
+
+class Command(BaseCommand):
+    """Пересчитывает агрегаты скидок категорий по всем товарам Strapi."""
+
+    help = "Recompute per-category discount statistics from all Strapi products."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-empty",
+            action="store_true",
+            help="Skip the recompute when the statistics have already been filled.",
+        )
+
+    def handle(self, *args, **options):
+        if options["if_empty"] and CategoryDiscountProduct.objects.exists():
+            self.stdout.write("Category discount stats are already filled; skipping.")
+            return
+        try:
+            summary = recompute_category_discount_stats()
+        except StrapiUnavailableError as exc:
+            raise CommandError(f"Strapi unavailable: {exc}") from exc
+        self.stdout.write(f"products={summary['products']} categories={summary['categories']}")
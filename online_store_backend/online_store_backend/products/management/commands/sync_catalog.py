@@ -0,0 +1,31 @@
+"""Команда синхронизации локального зеркала каталога со Strapi."""
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from online_store_backend.products.mirror import sync_catalog
+from online_store_backend.products.strapi_client import StrapiUnavailableError
+
+
+class Command(BaseCommand):
+    """Заполняет зеркало полностью или подтягивает изменения после watermark."""
+
+    help = "Sync local catalog mirror from Strapi (incremental by default)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Reload the whole catalog and drop rows missing in Strapi.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            result = sync_catalog(full=options["full"])
+        except StrapiUnavailableError as exc:
+            raise CommandError(f"Strapi unavailable: {exc}") from exc
+        for name, stats in result.items():
+            self.stdout.write(
+                f"{name}: fetched={stats['fetched']} upserted={stats['upserted']} "
+                f"deleted={stats['deleted']} watermark={stats['watermark'] or '-'}"
+            )
@@ -0,0 +1,38 @@
+"""Команда прогрева кэша публичного каталога."""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from online_store_backend.products.strapi_client import StrapiUnavailableError
+from online_store_backend.products.warmer import warm_catalog_cache
+
+
+class Command(BaseCommand):
+    """Заполняет горячие страницы списка товаров и карточки популярных товаров."""
+
+    help = "Warm the public catalog cache: first list pages per category/ordering and top-viewed product details."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--list-pages", type=int, default=None, help="List pages per category and ordering.")
+        parser.add_argument("--top-products", type=int, default=None, help="Top-viewed product details to warm.")
+        parser.add_argument("--concurrency", type=int, default=None, help="Entries warmed at the same time.")
+
+    def handle(self, *args, **options):
+        try:
+            report = warm_catalog_cache(
+                list_pages=options["list_pages"],
+                top_products=options["top_products"],
+                concurrency=max(1, options["concurrency"] or settings.CATALOG_WARM_CONCURRENCY),
+            )
+        except StrapiUnavailableError as exc:
+            raise CommandError(f"Strapi unavailable: {exc}") from exc
+        self.stdout.write(
+            f"warmed={report['warmed']} failed={report['failed']} categories={report['categories']} "
+            f"duration_ms={report['duration_ms']} concurrency={report['concurrency']}"
+        )
+        for kind, stats in report["kinds"].items():
+            self.stdout.write(
+                f"{kind}: count={stats['count']} failed={stats['failed']} "
+                f"avg_ms={stats['avg_ms']} max_ms={stats['max_ms']}"
+            )
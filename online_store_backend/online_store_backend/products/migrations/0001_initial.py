@@ -0,0 +1,51 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:12
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogCategory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_id', models.CharField(max_length=64, unique=True)),
+                ('strapi_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('slug', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('title', models.CharField(blank=True, default='', max_length=255)),
+                ('strapi_updated_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['strapi_id', 'document_id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CatalogProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_id', models.CharField(max_length=64, unique=True)),
+                ('strapi_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('slug', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('title', models.CharField(blank=True, default='', max_length=255)),
+                ('price', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=12)),
+                ('discount_percent', models.PositiveSmallIntegerField(default=0)),
+                ('category_document_id', models.CharField(blank=True, db_index=True, max_length=64, null=True)),
+                ('category_slug', models.CharField(blank=True, max_length=255, null=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('strapi_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['strapi_id', 'document_id'],
+                'indexes': [models.Index(fields=['category_slug', 'price'], name='products_cp_cat_price_idx'), models.Index(fields=['category_slug', 'title'], name='products_cp_cat_title_idx'), models.Index(fields=['price'], name='products_cp_price_idx'), models.Index(fields=['title'], name='products_cp_title_idx'), models.Index(fields=['strapi_updated_at'], name='products_cp_updated_idx')],
+            },
+        ),
+    ]
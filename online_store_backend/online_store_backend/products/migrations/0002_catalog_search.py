@@ -0,0 +1,49 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:55
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+TRIGRAM_SQL = """
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS products_cp_title_trgm_idx
+            ON products_catalogproduct USING gin (title gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS products_cp_description_trgm_idx
+            ON products_catalogproduct USING gin (description gin_trgm_ops);
+    END IF;
+END
+$$;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='catalogproduct',
+            name='description',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='catalogproduct',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='russian', weight='A'), '||', django.contrib.postgres.search.SearchVector('title', config='english', weight='A'), django.contrib.postgres.search.SearchConfig('russian')), '||', django.contrib.postgres.search.SearchVector('description', config='russian', weight='B'), django.contrib.postgres.search.SearchConfig('russian')), '||', django.contrib.postgres.search.SearchVector('description', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('russian')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='catalogproduct',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='products_cp_search_idx'),
+        ),
+        # pg_trgm нужен только для поиска с опечатками: без расширения (например, на
+        # managed Postgres без прав) поиск работает по полнотекстовому индексу.
+        migrations.RunSQL(
+            sql=TRIGRAM_SQL,
+            reverse_sql="DROP INDEX IF EXISTS products_cp_title_trgm_idx, products_cp_description_trgm_idx;",
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_catalog_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryDiscountProduct',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('document_id', models.CharField(max_length=64, unique=True)),
+                ('category_document_id', models.CharField(blank=True, db_index=True, max_length=64, null=True)),
+                ('discount_percent', models.PositiveSmallIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CategoryDiscountBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_document_id', models.CharField(max_length=64)),
+                ('discount_percent', models.PositiveSmallIntegerField()),
+                ('product_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['category_document_id', 'discount_percent'],
+                'constraints': [models.UniqueConstraint(fields=('category_document_id', 'discount_percent'), name='products_cdb_category_discount_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_category_discount_stats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryDiscountJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_document_id', models.CharField(db_index=True, max_length=64)),
+                ('action', models.CharField(choices=[('apply', 'Apply'), ('remove', 'Remove')], max_length=16)),
+                ('discount_percent', models.PositiveSmallIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('total_in_category', models.IntegerField(blank=True, null=True)),
+                ('updated_count', models.IntegerField(default=0)),
+                ('skipped_count', models.IntegerField(default=0)),
+                ('failed_count', models.IntegerField(default=0)),
+                ('elapsed_seconds', models.FloatField(default=0.0)),
+                ('run_count', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CategoryDiscountJobItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_document_id', models.CharField(max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('updated', 'Updated'), ('not_found', 'Not found'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('error', models.CharField(blank=True, default='', max_length=255)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='products.categorydiscountjob')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['job', 'status'], name='products_cdji_job_status_idx')],
+                'constraints': [models.UniqueConstraint(fields=('job', 'product_document_id'), name='products_cdji_job_product_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+        ('products', '0004_category_discount_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categorydiscountjob',
+            name='background_job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='jobs.job'),
+        ),
+        migrations.AlterField(
+            model_name='categorydiscountjob',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=16),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_category_discount_background_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='categorydiscountjobitem',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('updated', 'Updated'), ('skipped', 'Skipped'), ('not_found', 'Not found'), ('failed', 'Failed')], default='pending', max_length=16),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:39
+
+from django.db import migrations, models
+from django.utils import timezone
+
+ACTIVE_STATUSES = ("pending", "running")
+
+
+def fail_duplicate_active_jobs(apps, schema_editor):
+    """Оставляет активным только последнее задание категории перед ограничением уникальности."""
+    CategoryDiscountJob = apps.get_model("products", "CategoryDiscountJob")
+    seen = set()
+    duplicates = []
+    active = CategoryDiscountJob.objects.filter(status__in=ACTIVE_STATUSES).order_by("-created_at", "-pk")
+    for job_id, category_id in active.values_list("pk", "category_document_id"):
+        if category_id in seen:
+            duplicates.append(job_id)
+        seen.add(category_id)
+    now = timezone.now()
+    CategoryDiscountJob.objects.filter(pk__in=duplicates).update(
+        status="failed",
+        error="Superseded",
+        finished_at=now,
+        heartbeat_at=now,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_discount_job_item_skipped'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='categorydiscountjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('category_document_id',), name='uniq_active_discount_job_per_category'),
+        ),
+    ]
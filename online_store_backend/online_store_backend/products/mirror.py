@@ -0,0 +1,324 @@
+"""Синхронизация и чтение локального зеркала каталога Strapi."""
+
+import logging
+from decimal import Decimal
+from decimal import InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from .cache import invalidate_categories
+from .cursors import keyset_direction
+from .models import CatalogCategory
+from .models import CatalogProduct
+from .strapi_client import StrapiNotFoundError
+from .strapi_client import _extract_attributes
+from .strapi_client import _normalize_category_admin
+from .strapi_client import _normalize_product
+from .strapi_client import list_categories_raw
+from .strapi_client import list_products_raw
+
+logger = logging.getLogger(__name__)
+
+CATALOG_READ_MODE_STRAPI = "strapi"
+CATALOG_READ_MODE_MIRROR = "mirror"
+CATALOG_SEARCH_BACKEND_STRAPI = "strapi"
+CATALOG_SEARCH_BACKEND_INDEX = "index"
+SYNC_PAGE_SIZE = 100
+
+PRODUCT_ORDERING = {
+    None: ("strapi_id", "document_id"),
+    "price": ("price", "document_id"),
+    "-price": ("-price", "-document_id"),
+    "title": ("title", "document_id"),
+    "-title": ("-title", "-document_id"),
+}
+CURSOR_MODEL_FIELDS = {"price": "price", "title": "title"}
+# Значения, которыми зеркало заменяет пустые цену и название (см. `build_product_row`);
+# курсор товара без значения ключа (`null`) сравнивается с ними.
+CURSOR_NULL_VALUES = {"price": Decimal("0.00"), "title": ""}
+PRODUCT_UPDATE_FIELDS = [
+    "strapi_id",
+    "slug",
+    "title",
+    "price",
+    "discount_percent",
+    "category_document_id",
+    "category_slug",
+    "description",
+    "payload",
+    "strapi_updated_at",
+    "synced_at",
+]
+CATEGORY_UPDATE_FIELDS = ["strapi_id", "slug", "title", "strapi_updated_at", "synced_at"]
+
+
+def is_mirror_read_mode() -> bool:
+    """Проверяет, обслуживает ли витрина чтения из локального зеркала."""
+    return settings.CATALOG_READ_MODE == CATALOG_READ_MODE_MIRROR
+
+
+def is_mirror_maintained() -> bool:
+    """Проверяет, нужно ли держать зеркало актуальным: для чтения витрины или поискового индекса."""
+    return is_mirror_read_mode() or settings.CATALOG_SEARCH_BACKEND == CATALOG_SEARCH_BACKEND_INDEX
+
+
+def _strapi_id(attrs):
+    """Возвращает числовой id записи Strapi или `None`."""
+    try:
+        return int(attrs.get("id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _raw_price(value):
+    """Приводит сырую цену Strapi к Decimal для сортировки."""
+    try:
+        return Decimal(str(value)).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return Decimal("0.00")
+
+
+def build_product_row(item):
+    """Строит несохраненную строку зеркала товара из сырого элемента Strapi."""
+    normalized = _normalize_product(item)
+    if not normalized:
+        return None
+    attrs = _extract_attributes(item)
+    category = normalized.get("category") or {}
+    return CatalogProduct(
+        document_id=normalized["id"],
+        strapi_id=_strapi_id(attrs),
+        slug=normalized.get("slug"),
+        title=normalized.get("title") or "",
+        price=_raw_price(attrs.get("price")),
+        discount_percent=normalized["discount_percent"],
+        category_document_id=category.get("id"),
+        category_slug=category.get("slug"),
+        description=normalized.get("description") or "",
+        payload=normalized,
+        strapi_updated_at=parse_datetime(str(attrs.get("updatedAt") or "")),
+    )
+
+
+def build_category_row(item):
+    """Строит несохраненную строку зеркала категории из сырого элемента Strapi."""
+    normalized = _normalize_category_admin(item)
+    if not normalized:
+        return None
+    attrs = _extract_attributes(item)
+    return CatalogCategory(
+        document_id=normalized["id"],
+        strapi_id=_strapi_id(attrs),
+        slug=normalized.get("slug"),
+        title=normalized.get("title") or "",
+        strapi_updated_at=parse_datetime(str(attrs.get("updatedAt") or "")),
+    )
+
+
+def upsert_products(items):
+    """Вставляет или обновляет товары зеркала одной пачкой; возвращает их documentId."""
+    rows = [row for row in (build_product_row(item) for item in items) if row is not None]
+    if rows:
+        CatalogProduct.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["document_id"],
+            update_fields=PRODUCT_UPDATE_FIELDS,
+        )
+    return [row.document_id for row in rows]
+
+
+def upsert_categories(items):
+    """Вставляет или обновляет категории зеркала и переносит изменения в товары."""
+    rows = [row for row in (build_category_row(item) for item in items) if row is not None]
+    if not rows:
+        return []
+    CatalogCategory.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["document_id"],
+        update_fields=CATEGORY_UPDATE_FIELDS,
+    )
+    by_id = {row.document_id: row for row in rows}
+    products = list(CatalogProduct.objects.filter(category_document_id__in=by_id))
+    for product in products:
+        category = by_id[product.category_document_id]
+        product.category_slug = category.slug
+        product.payload = {**product.payload, "category": category.to_public()}
+    if products:
+        CatalogProduct.objects.bulk_update(products, ["category_slug", "payload"])
+    return list(by_id)
+
+
+def delete_products(document_ids):
+    """Удаляет товары из зеркала."""
+    return CatalogProduct.objects.filter(document_id__in=list(document_ids)).delete()[0]
+
+
+def delete_categories(document_ids):
+    """Удаляет категории из зеркала и отвязывает от них товары."""
+    document_ids = list(document_ids)
+    products = list(CatalogProduct.objects.filter(category_document_id__in=document_ids))
+    for product in products:
+        product.category_document_id = None
+        product.category_slug = None
+        product.payload = {**product.payload, "category": None}
+    if products:
+        CatalogProduct.objects.bulk_update(products, ["category_document_id", "category_slug", "payload"])
+    deleted = CatalogCategory.objects.filter(document_id__in=document_ids).delete()[0]
+    if deleted:
+        invalidate_categories()
+    return deleted
+
+
+def _watermark(model):
+    """Возвращает максимальный `updatedAt` в зеркале."""
+    return model.objects.aggregate(value=Max("strapi_updated_at"))["value"]
+
+
+def _is_mirrored(item, watermark, mirrored):
+    """Элемент уже записан в зеркало с `updatedAt`, равным watermark."""
+    attrs = _extract_attributes(item)
+    document_id = attrs.get("documentId") or (item.get("documentId") if isinstance(item, dict) else None)
+    return document_id in mirrored and parse_datetime(str(attrs.get("updatedAt") or "")) == watermark
+
+
+def _sync(model, fetch_page, upsert, *, full):
+    """Постранично выгружает коллекцию из Strapi в зеркало.
+
+    Инкрементальная выгрузка запрашивает `updatedAt >= watermark`: элементы,
+    сохраненные в Strapi в ту же миллисекунду, что и последний синхронизированный,
+    но после прошлой выгрузки, не теряются. Уже записанные элементы с этим
+    `updatedAt` повторно не сохраняются и не считаются изменениями.
+    """
+    watermark = None if full else _watermark(model)
+    updated_after = watermark.isoformat() if watermark else None
+    mirrored = set()
+    if watermark is not None:
+        mirrored = set(model.objects.filter(strapi_updated_at=watermark).values_list("document_id", flat=True))
+    page = 1
+    seen = set()
+    fetched = 0
+    while True:
+        items, pagination = fetch_page(page=page, page_size=SYNC_PAGE_SIZE, updated_after=updated_after)
+        fetched += len(items)
+        changed = [item for item in items if not _is_mirrored(item, watermark, mirrored)]
+        with transaction.atomic():
+            seen.update(upsert(changed))
+        total = pagination.get("total") or 0
+        if not items or page * SYNC_PAGE_SIZE >= int(total):
+            break
+        page += 1
+    deleted = 0
+    if full:
+        deleted = model.objects.exclude(document_id__in=seen).delete()[0]
+    return {"fetched": fetched, "upserted": len(seen), "deleted": deleted, "watermark": updated_after}
+
+
+def sync_categories(*, full=False):
+    """Синхронизирует категории: полностью или по `updatedAt >= watermark`.
+
+    Если что-то изменилось, кэш публичных категорий сбрасывается после записи
+    в зеркало, чтобы его не заполнили прежние строки.
+    """
+    result = _sync(CatalogCategory, list_categories_raw, upsert_categories, full=full)
+    if result["upserted"] or result["deleted"]:
+        invalidate_categories()
+    return result
+
+
+def sync_products(*, full=False):
+    """Синхронизирует товары: полностью или по `updatedAt >= watermark`.
+
+    Инкрементальная синхронизация не видит удалений и снятий с публикации —
+    их убирает полная синхронизация.
+    """
+    return _sync(CatalogProduct, list_products_raw, upsert_products, full=full)
+
+
+def sync_catalog(*, full=False):
+    """Синхронизирует категории и товары зеркала."""
+    categories = sync_categories(full=full)
+    products = sync_products(full=full)
+    logger.info("Catalog mirror synced (full=%s): categories=%s products=%s", full, categories, products)
+    return {"categories": categories, "products": products}
+
+
+def _filtered_mirror_products(validated):
+    """Применяет к зеркалу фильтры категории и поиска из query-параметров."""
+    queryset = CatalogProduct.objects.all()
+    if validated.get("category"):
+        queryset = queryset.filter(category_slug=validated["category"])
+    if validated.get("search"):
+        queryset = queryset.filter(title__icontains=validated["search"])
+    return queryset
+
+
+def list_mirror_products(validated):
+    """Возвращает страницу товаров из зеркала в формате `list_products`."""
+    queryset = _filtered_mirror_products(validated)
+    queryset = queryset.order_by(*PRODUCT_ORDERING[validated.get("ordering")])
+    page = validated["page"]
+    page_size = validated["page_size"]
+    offset = (page - 1) * page_size
+    results = list(queryset.values_list("payload", flat=True)[offset : offset + page_size])
+    return results, {"page": page, "page_size": page_size, "total": queryset.count()}
+
+
+def list_mirror_products_keyset(validated, *, position):
+    """Возвращает до `page_size + 1` товаров после позиции курсора в порядке запроса."""
+    field, descending = keyset_direction(validated.get("ordering"), position)
+    lookup = "lt" if descending else "gt"
+    prefix = "-" if descending else ""
+    column = CURSOR_MODEL_FIELDS.get(field)
+    queryset = _filtered_mirror_products(validated)
+    if position is not None:
+        after_document = Q(**{f"document_id__{lookup}": position["document_id"]})
+        if column is None:
+            queryset = queryset.filter(after_document)
+        else:
+            value = CURSOR_NULL_VALUES[column] if position["value"] is None else position["value"]
+            queryset = queryset.filter(Q(**{f"{column}__{lookup}": value}) | (Q(**{column: value}) & after_document))
+    ordering = (f"{prefix}{column}", f"{prefix}document_id") if column else (f"{prefix}document_id",)
+    return list(queryset.order_by(*ordering).values_list("payload", flat=True)[: validated["page_size"] + 1])
+
+
+def get_mirror_product(document_id: str):
+    """Возвращает товар из зеркала по documentId."""
+    payload = CatalogProduct.objects.filter(document_id=document_id).values_list("payload", flat=True).first()
+    if payload is None:
+        raise StrapiNotFoundError
+    return payload
+
+
+def get_mirror_product_by_slug(slug: str):
+    """Возвращает товар из зеркала по slug."""
+    payload = (
+        CatalogProduct.objects.filter(slug=slug)
+        .order_by("strapi_id")
+        .values_list("payload", flat=True)
+        .first()
+    )
+    if payload is None:
+        raise StrapiNotFoundError
+    return payload
+
+
+def list_mirror_categories(*, page: int, page_size: int):
+    """Возвращает страницу категорий из зеркала."""
+    queryset = CatalogCategory.objects.all()
+    offset = (page - 1) * page_size
+    results = [category.to_public() for category in queryset[offset : offset + page_size]]
+    return results, {"page": page, "page_size": page_size, "total": queryset.count()}
+
+
+def get_mirror_category(document_id: str):
+    """Возвращает категорию из зеркала по documentId."""
+    category = CatalogCategory.objects.filter(document_id=document_id).first()
+    if category is None:
+        raise StrapiNotFoundError
+    return category.to_public()
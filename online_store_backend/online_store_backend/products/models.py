@@ -0,0 +1,215 @@
+"""Локальное зеркало каталога Strapi для чтения витрины из Postgres.
+
+Здесь же — агрегаты скидок по категориям для админского списка категорий и
+фоновые задания изменения скидок категорий с прогрессом по товарам.
+"""
+
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+
+# Конфигурации полнотекстового поиска: русская и английская морфология.
+SEARCH_CONFIGS = ("russian", "english")
+
+
+def _search_vector_expression():
+    """Вектор поиска: заголовок с весом A и описание с весом B во всех конфигурациях."""
+    vectors = [
+        SearchVector(field, config=config, weight=weight)
+        for field, weight in (("title", "A"), ("description", "B"))
+        for config in SEARCH_CONFIGS
+    ]
+    expression = vectors[0]
+    for vector in vectors[1:]:
+        expression = expression + vector
+    return expression
+
+
+class CatalogCategory(models.Model):
+    """Категория каталога, синхронизированная из Strapi."""
+
+    document_id = models.CharField(max_length=64, unique=True)
+    strapi_id = models.PositiveIntegerField(null=True, blank=True)
+    slug = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    title = models.CharField(max_length=255, blank=True, default="")
+    strapi_updated_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["strapi_id", "document_id"]
+
+    def __str__(self) -> str:
+        return f"CatalogCategory({self.document_id}:{self.slug})"
+
+    def to_public(self):
+        """Возвращает категорию в формате публичного API."""
+        return {"id": self.document_id, "slug": self.slug, "title": self.title}
+
+
+class CatalogProduct(models.Model):
+    """Товар каталога в нормализованном виде `_normalize_product` плюс сырые поля Strapi."""
+
+    document_id = models.CharField(max_length=64, unique=True)
+    strapi_id = models.PositiveIntegerField(null=True, blank=True)
+    slug = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    title = models.CharField(max_length=255, blank=True, default="")
+    price = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    discount_percent = models.PositiveSmallIntegerField(default=0)
+    category_document_id = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+    category_slug = models.CharField(max_length=255, null=True, blank=True)
+    description = models.TextField(blank=True, default="")
+    search_vector = models.GeneratedField(
+        expression=_search_vector_expression(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+    payload = models.JSONField(default=dict)
+    strapi_updated_at = models.DateTimeField(null=True, blank=True)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["strapi_id", "document_id"]
+        indexes = [
+            models.Index(fields=["category_slug", "price"], name="products_cp_cat_price_idx"),
+            models.Index(fields=["category_slug", "title"], name="products_cp_cat_title_idx"),
+            models.Index(fields=["price"], name="products_cp_price_idx"),
+            models.Index(fields=["title"], name="products_cp_title_idx"),
+            models.Index(fields=["strapi_updated_at"], name="products_cp_updated_idx"),
+            GinIndex(fields=["search_vector"], name="products_cp_search_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"CatalogProduct({self.document_id}:{self.slug})"
+
+
+class CategoryDiscountProduct(models.Model):
+    """Категория и скидка товара, учтенные в агрегатах `CategoryDiscountBucket`."""
+
+    document_id = models.CharField(max_length=64, unique=True)
+    category_document_id = models.CharField(max_length=64, null=True, blank=True, db_index=True)
+    discount_percent = models.PositiveSmallIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"CategoryDiscountProduct({self.document_id}:{self.category_document_id}:{self.discount_percent})"
+
+
+class CategoryDiscountBucket(models.Model):
+    """Число товаров категории с одной и той же скидкой."""
+
+    category_document_id = models.CharField(max_length=64)
+    discount_percent = models.PositiveSmallIntegerField()
+    product_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["category_document_id", "discount_percent"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category_document_id", "discount_percent"],
+                name="products_cdb_category_discount_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"CategoryDiscountBucket({self.category_document_id}:{self.discount_percent}={self.product_count})"
+
+
+class DiscountJobAction(models.TextChoices):
+    """Операции заданий скидок категорий."""
+
+    APPLY = "apply", "Apply"
+    REMOVE = "remove", "Remove"
+
+
+class DiscountJobStatus(models.TextChoices):
+    """Статусы задания скидки категории."""
+
+    PENDING = "pending", "Pending"
+    RUNNING = "running", "Running"
+    COMPLETED = "completed", "Completed"
+    FAILED = "failed", "Failed"
+    CANCELLED = "cancelled", "Cancelled"
+
+
+class DiscountJobItemStatus(models.TextChoices):
+    """Статусы обработки товара в задании скидки категории."""
+
+    PENDING = "pending", "Pending"
+    UPDATED = "updated", "Updated"
+    SKIPPED = "skipped", "Skipped"
+    NOT_FOUND = "not_found", "Not found"
+    FAILED = "failed", "Failed"
+
+
+class CategoryDiscountJob(models.Model):
+    """Фоновое изменение скидки всех товаров категории.
+
+    Счетчики и `elapsed_seconds` (чистое время обработки по всем запускам)
+    сохраняются вместе с каждой пачкой обработанных товаров; `background_job` —
+    последнее фоновое задание, выполняющее его.
+    """
+
+    category_document_id = models.CharField(max_length=64, db_index=True)
+    action = models.CharField(max_length=16, choices=DiscountJobAction.choices)
+    discount_percent = models.PositiveSmallIntegerField()
+    status = models.CharField(max_length=16, choices=DiscountJobStatus.choices, default=DiscountJobStatus.PENDING)
+    total_in_category = models.IntegerField(null=True, blank=True)
+    updated_count = models.IntegerField(default=0)
+    skipped_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    elapsed_seconds = models.FloatField(default=0.0)
+    run_count = models.PositiveSmallIntegerField(default=0)
+    error = models.CharField(max_length=255, blank=True, default="")
+    background_job = models.ForeignKey(
+        "jobs.Job",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category_document_id"],
+                condition=models.Q(status__in=[DiscountJobStatus.PENDING, DiscountJobStatus.RUNNING]),
+                name="uniq_active_discount_job_per_category",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"CategoryDiscountJob #{self.pk} ({self.action} {self.discount_percent}% {self.category_document_id})"
+
+
+class CategoryDiscountJobItem(models.Model):
+    """Товар задания скидки категории; необработанные товары — точка продолжения задания."""
+
+    job = models.ForeignKey(CategoryDiscountJob, on_delete=models.CASCADE, related_name="items")
+    product_document_id = models.CharField(max_length=64)
+    status = models.CharField(
+        max_length=16,
+        choices=DiscountJobItemStatus.choices,
+        default=DiscountJobItemStatus.PENDING,
+    )
+    error = models.CharField(max_length=255, blank=True, default="")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["job", "product_document_id"], name="products_cdji_job_product_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["job", "status"], name="products_cdji_job_status_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"CategoryDiscountJobItem({self.job_id}:{self.product_document_id}={self.status})"
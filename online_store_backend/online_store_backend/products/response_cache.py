@@ -0,0 +1,126 @@
+"""Кэш готовых ответов каталога: отрендеренный JSON в сжатых вариантах.
+
+Рядом с конвертом single-flight (`<key>:rendered`) хранятся итоговые байты
+ответа в вариантах identity/gzip/br и валидаторы того же значения. Попадание
+отдается как есть с нужным `Content-Encoding`, минуя распаковку данных,
+сериализаторы и рендерер DRF. Запись живет не дольше логического TTL
+конверта и пропускается, когда XFetch решает обновить значение заранее, —
+тогда запрос проходит обычный путь single-flight.
+"""
+
+import gzip
+import math
+import time
+
+import brotli
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from online_store_backend.utils.renderers import render_json
+
+from .cache import rendered_cache_key
+from .catalog_cache import catalog_cache
+from .singleflight import is_fresh
+
+IDENTITY = "identity"
+GZIP = "gzip"
+BROTLI = "br"
+# Порядок предпочтения кодировок при равных q.
+ENCODING_PREFERENCE = (BROTLI, GZIP, IDENTITY)
+JSON_CONTENT_TYPE = "application/json"
+
+
+def _encoded_bodies(body):
+    """Возвращает варианты тела ответа по кодировкам; мелкие тела не сжимаются."""
+    bodies = {IDENTITY: body}
+    if len(body) < settings.CATALOG_RENDERED_MIN_COMPRESS_BYTES:
+        return bodies
+    bodies[GZIP] = gzip.compress(body, compresslevel=6, mtime=0)
+    bodies[BROTLI] = brotli.compress(body, quality=5)
+    return bodies
+
+
+def get_rendered(cache_key):
+    """Возвращает актуальный готовый ответ из кэша или `None`."""
+    if not settings.CATALOG_RENDERED_CACHE_ENABLED:
+        return None
+    entry = catalog_cache.get(rendered_cache_key(cache_key))
+    if not isinstance(entry, dict) or "bodies" not in entry or "expires_at" not in entry:
+        return None
+    if not is_fresh(entry):
+        return None
+    return entry
+
+
+def store_rendered(cache_key, served):
+    """Рендерит и сжимает актуальное значение, сохраняя его до истечения конверта.
+
+    Устаревшие копии и значения без срока жизни не сохраняются; для них
+    возвращается `None`.
+    """
+    if not settings.CATALOG_RENDERED_CACHE_ENABLED:
+        return None
+    expires_at = served.get("expires_at")
+    if served["stale_since"] is not None or expires_at is None:
+        return None
+    timeout = math.ceil(expires_at - time.time())
+    if timeout <= 0:
+        return None
+    entry = {
+        "bodies": _encoded_bodies(render_json(served["value"])),
+        "etag": served["etag"],
+        "modified_at": served["modified_at"],
+        "expires_at": expires_at,
+        "delta": served.get("delta"),
+    }
+    catalog_cache.set(rendered_cache_key(cache_key), entry, timeout=timeout)
+    return entry
+
+
+def _accepted_encodings(header):
+    """Разбирает `Accept-Encoding` в словарь `{кодировка: q}`."""
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate_encoding(request, available):
+    """Выбирает кодировку из `available` по `Accept-Encoding` запроса."""
+    accepted = _accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    wildcard = accepted.get("*", 0.0)
+    best = IDENTITY
+    best_quality = 0.0
+    for encoding in ENCODING_PREFERENCE:
+        if encoding == IDENTITY or encoding not in available:
+            continue
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def rendered_response(request, entry):
+    """Строит `HttpResponse` из готового ответа в кодировке, принятой клиентом."""
+    bodies = entry["bodies"]
+    encoding = negotiate_encoding(request, bodies)
+    response = HttpResponse(bodies[encoding], content_type=JSON_CONTENT_TYPE)
+    if encoding != IDENTITY:
+        response["Content-Encoding"] = encoding
+    response["Content-Length"] = str(len(bodies[encoding]))
+    if len(bodies) > 1:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    return response
@@ -0,0 +1,113 @@
+"""Поиск товаров по локальному индексу зеркала каталога.
+
+Полнотекстовый поиск идет по `CatalogProduct.search_vector` (русская и
+английская морфология, заголовок важнее описания), опечатки прощает
+триграммное сходство слов запроса с заголовком и описанием (`pg_trgm`). Результаты
+ранжируются по релевантности, если не задана явная сортировка. Индекс
+возвращает только documentId страницы: карточки берутся из зеркала в режиме
+чтения "mirror" или из read-through кэша товаров (`get_products`).
+
+Порог сходства для опечаток — `pg_trgm.word_similarity_threshold` базы
+(по умолчанию 0.6): при нем запрос использует триграммный GIN-индекс. Без
+расширения `pg_trgm` поиск работает только по полнотекстовому индексу.
+"""
+
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.postgres.search import SearchRank
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F
+from django.db.models import Q
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+from .mirror import PRODUCT_ORDERING
+from .mirror import is_mirror_maintained
+from .mirror import is_mirror_read_mode
+from .models import SEARCH_CONFIGS
+from .models import CatalogProduct
+from .strapi_client import get_products
+
+# Совпадение по описанию весит меньше совпадения по заголовку, как и в `search_vector`.
+DESCRIPTION_SIMILARITY_WEIGHT = 0.4
+
+_trigram_available = {}
+
+
+def search_index_enabled() -> bool:
+    """Проверяет, обслуживается ли `?search=` локальным индексом (он живет в поддерживаемом зеркале)."""
+    return is_mirror_maintained()
+
+
+def trigram_available() -> bool:
+    """Проверяет (один раз на базу), установлено ли расширение `pg_trgm`."""
+    alias = connection.alias
+    if alias not in _trigram_available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[alias] = cursor.fetchone() is not None
+    return _trigram_available[alias]
+
+
+def _text_query(search):
+    """Запрос в синтаксисе websearch сразу во всех конфигурациях поиска."""
+    query = SearchQuery(search, config=SEARCH_CONFIGS[0], search_type="websearch")
+    for config in SEARCH_CONFIGS[1:]:
+        query |= SearchQuery(search, config=config, search_type="websearch")
+    return query
+
+
+def _search_queryset(search, category=None):
+    """Товары, подходящие под запрос, с аннотацией `relevance`."""
+    text_query = _text_query(search)
+    queryset = CatalogProduct.objects.all()
+    if category:
+        queryset = queryset.filter(category_slug=category)
+    queryset = queryset.annotate(rank=SearchRank(F("search_vector"), text_query))
+    matches = Q(search_vector=text_query)
+    relevance = F("rank")
+    if trigram_available():
+        queryset = queryset.annotate(
+            title_similarity=Coalesce(TrigramWordSimilarity(search, "title"), Value(0.0)),
+            description_similarity=Coalesce(TrigramWordSimilarity(search, "description"), Value(0.0)),
+        )
+        matches |= Q(title__trigram_word_similar=search) | Q(description__trigram_word_similar=search)
+        relevance = relevance + F("title_similarity") + F("description_similarity") * DESCRIPTION_SIMILARITY_WEIGHT
+    return queryset.filter(matches).annotate(relevance=relevance)
+
+
+def search_product_ids(search, *, page, page_size, category=None, ordering=None):
+    """Возвращает `(document_ids, total)` страницы результатов поиска.
+
+    Без явной сортировки результаты упорядочены по релевантности.
+    """
+    queryset = _search_queryset(search, category)
+    order = PRODUCT_ORDERING[ordering] if ordering else ("-relevance", "document_id")
+    offset = (page - 1) * page_size
+    document_ids = list(queryset.order_by(*order).values_list("document_id", flat=True)[offset : offset + page_size])
+    return document_ids, queryset.count()
+
+
+def _hydrate(document_ids):
+    """Возвращает карточки товаров в порядке `document_ids`, пропуская исчезнувшие."""
+    if is_mirror_read_mode():
+        payloads = dict(
+            CatalogProduct.objects.filter(document_id__in=document_ids).values_list("document_id", "payload")
+        )
+    else:
+        payloads = get_products(document_ids)
+    return [payloads[document_id] for document_id in document_ids if payloads.get(document_id)]
+
+
+def search_products(validated):
+    """Возвращает страницу результатов поиска в формате `list_products`."""
+    page = validated["page"]
+    page_size = validated["page_size"]
+    document_ids, total = search_product_ids(
+        validated["search"],
+        page=page,
+        page_size=page_size,
+        category=validated.get("category"),
+        ordering=validated.get("ordering"),
+    )
+    return _hydrate(document_ids), {"page": page, "page_size": page_size, "total": total}
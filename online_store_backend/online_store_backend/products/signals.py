@@ -0,0 +1,8 @@
+"""Сигналы приложения каталога."""
+
+from django.dispatch import Signal
+
+# Отправляется после сброса версии кэша товаров; аргументы: `version`.
+products_cache_bumped = Signal()
+# Отправляется после инвалидации кэша одного товара; аргументы: `document_id`.
+product_invalidated = Signal()
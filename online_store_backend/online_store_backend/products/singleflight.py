@@ -0,0 +1,194 @@
+"""Single-flight заполнение кэша каталога с вероятностным ранним обновлением.
+
+Значение хранится в конверте `{"value", "expires_at", "delta", "etag",
+"modified_at"}` дольше своего логического TTL, чтобы во время перестроения
+отдавать устаревшую копию. При промахе перестраивает кэш только владелец
+короткой блокировки в Redis, остальные воркеры ждут его результат или получают
+устаревшее значение. Горячие ключи перестраиваются заранее по алгоритму XFetch:
+вероятность раннего обновления растет по мере приближения к `expires_at` и
+пропорциональна времени расчета. `etag` — хэш содержимого, `modified_at` —
+время последнего изменения содержимого; по ним отвечают на условные
+GET-запросы без перестроения.
+
+Если источник отвечает, что объекта нет (`StrapiNotFoundError`), рядом с
+ключом (`<key>:missing`) на `STRAPI_PRODUCT_NOT_FOUND_TTL_SECONDS` остается
+отрицательная запись: повторные запросы несуществующих ID не доходят до
+источника.
+"""
+
+import json
+import logging
+import math
+import random
+import time
+import uuid
+
+from django.conf import settings
+
+from online_store_backend.utils.conditional import make_etag
+
+from .cache import missing_cache_key
+from .catalog_cache import catalog_cache
+from .strapi_client import StrapiNotFoundError
+from .strapi_client import StrapiUnavailableError
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY_SUFFIX = ":lock"
+WAIT_POLL_SECONDS = 0.05
+
+
+def _lock_key(key):
+    return f"{key}{LOCK_KEY_SUFFIX}"
+
+
+def _acquire_lock(key):
+    """Пытается захватить блокировку перестроения ключа; возвращает токен или `None`."""
+    token = uuid.uuid4().hex
+    if catalog_cache.add(_lock_key(key), token, timeout=settings.CATALOG_CACHE_LOCK_SECONDS):
+        return token
+    return None
+
+
+def _release_lock(key, token):
+    """Освобождает блокировку, если она все еще принадлежит текущему воркеру."""
+    if catalog_cache.get(_lock_key(key)) == token:
+        catalog_cache.delete(_lock_key(key))
+
+
+def _should_refresh_early(entry, now):
+    """XFetch: решает, пора ли перестроить еще не истекшее значение."""
+    delta = float(entry.get("delta") or 0.0)
+    beta = settings.CATALOG_CACHE_EARLY_REFRESH_BETA
+    if delta <= 0 or beta <= 0:
+        return False
+    return now - delta * beta * math.log(random.random() or 1e-12) >= entry["expires_at"]  # noqa: S311
+
+
+def _content_etag(value):
+    """Строит ETag из канонического JSON-представления значения."""
+    return make_etag(json.dumps(value, sort_keys=True, ensure_ascii=False, default=str))
+
+
+def is_fresh(entry, now=None):
+    """Проверяет, что значение не истекло и XFetch не требует его раннего обновления."""
+    now = time.time() if now is None else now
+    return now < entry["expires_at"] and not _should_refresh_early(entry, now)
+
+
+def _served(entry, stale_since=None):
+    """Описание отданного значения: само значение, устаревание, валидаторы и срок жизни."""
+    return {
+        "value": entry["value"],
+        "stale_since": stale_since,
+        "etag": entry.get("etag") or _content_etag(entry["value"]),
+        "modified_at": entry.get("modified_at"),
+        "expires_at": entry.get("expires_at"),
+        "delta": entry.get("delta"),
+    }
+
+
+def _fill(key, loader, timeout, fallback_key=None, previous=None):
+    """Вычисляет значение и сохраняет его вместе со временем расчета и валидаторами."""
+    started = time.monotonic()
+    value = loader()
+    delta = time.monotonic() - started
+    now = time.time()
+    etag = _content_etag(value)
+    modified_at = now
+    if previous is not None and previous.get("etag") == etag and previous.get("modified_at"):
+        modified_at = previous["modified_at"]
+    entry = {"value": value, "expires_at": now + timeout, "delta": delta, "etag": etag, "modified_at": modified_at}
+    catalog_cache.set(key, entry, timeout=timeout + settings.CATALOG_CACHE_STALE_SECONDS)
+    if fallback_key:
+        catalog_cache.set(
+            fallback_key,
+            {"value": value, "stored_at": now, "etag": etag, "modified_at": modified_at},
+            timeout=settings.CATALOG_LAST_KNOWN_GOOD_SECONDS,
+        )
+    return entry
+
+
+def _fill_or_fallback(key, loader, timeout, entry, fallback_key):
+    """Перестраивает значение; при недоступности Strapi отдает устаревшую копию.
+
+    Сначала используется истекший конверт этого же ключа, затем долгоживущая
+    last-known-good копия `fallback_key`, не зависящая от версий кэша.
+    """
+    try:
+        return _served(_fill(key, loader, timeout, fallback_key, entry))
+    except StrapiNotFoundError:
+        catalog_cache.set(missing_cache_key(key), True, timeout=settings.STRAPI_PRODUCT_NOT_FOUND_TTL_SECONDS)
+        raise
+    except StrapiUnavailableError:
+        if entry is not None:
+            logger.warning("Strapi unavailable while refreshing %s, serving stale value.", key)
+            stale_since = entry["expires_at"] if entry["expires_at"] <= time.time() else None
+            return _served(entry, stale_since)
+        last_known_good = catalog_cache.get(fallback_key) if fallback_key else None
+        if isinstance(last_known_good, dict) and "value" in last_known_good:
+            logger.warning("Strapi unavailable while refreshing %s, serving last known good value.", key)
+            return _served(last_known_good, last_known_good["stored_at"])
+        raise
+
+
+def _read_entry(key):
+    """Читает конверт из кэша, игнорируя значения в старом формате."""
+    entry = catalog_cache.get(key)
+    if isinstance(entry, dict) and "expires_at" in entry and "value" in entry:
+        return entry
+    return None
+
+
+def peek_fresh_entry(key):
+    """Возвращает описание актуального значения из кэша без перестроения или `None`."""
+    entry = _read_entry(key)
+    if entry is None or time.time() >= entry["expires_at"]:
+        return None
+    return _served(entry)
+
+
+def get_or_fill_entry(key, loader, *, timeout, fallback_key=None):
+    """Возвращает `{"value", "stale_since", "etag", "modified_at"}`, перестраивая значение одним воркером.
+
+    `stale_since` — unix-время, с которого отданное значение устарело, либо
+    `None` для актуального значения. Исключения `loader` пробрасываются, кроме
+    `StrapiUnavailableError` при наличии устаревшей или last-known-good копии;
+    пока жива отрицательная запись, сразу выбрасывается `StrapiNotFoundError`.
+    """
+    entry = _read_entry(key)
+    if entry is not None and is_fresh(entry):
+        return _served(entry)
+    if catalog_cache.get(missing_cache_key(key)):
+        raise StrapiNotFoundError
+
+    token = _acquire_lock(key)
+    if token is not None:
+        try:
+            return _fill_or_fallback(key, loader, timeout, entry, fallback_key)
+        finally:
+            _release_lock(key, token)
+
+    if entry is not None:
+        return _served(entry)
+
+    deadline = time.monotonic() + settings.CATALOG_CACHE_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_POLL_SECONDS)
+        entry = _read_entry(key)
+        if entry is not None:
+            return _served(entry)
+        if catalog_cache.get(_lock_key(key)) is None:
+            break
+    return _fill_or_fallback(key, loader, timeout, None, fallback_key)
+
+
+def get_or_fill_with_staleness(key, loader, *, timeout, fallback_key=None):
+    """Возвращает `(value, stale_since)`, перестраивая значение не более чем одним воркером."""
+    served = get_or_fill_entry(key, loader, timeout=timeout, fallback_key=fallback_key)
+    return served["value"], served["stale_since"]
+
+
+def get_or_fill(key, loader, *, timeout, fallback_key=None):
+    """Возвращает значение из кэша, перестраивая его не более чем одним воркером."""
+    return get_or_fill_entry(key, loader, timeout=timeout, fallback_key=fallback_key)["value"]
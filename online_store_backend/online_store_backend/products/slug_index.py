@@ -0,0 +1,81 @@
+"""Индекс slug → documentId товаров в кэше каталога.
+
+Запрос товара по slug разрешается в documentId без фильтр-запроса к Strapi
+(или к зеркалу) и дальше обслуживается той же записью кэша, что и карточка
+по ID. Индекс обновляется при создании, изменении и удалении товара через
+админку и по webhook'ам Strapi; при промахе slug разрешается через источник
+каталога и добавляется в индекс.
+
+Прежние slug'и переименованного товара остаются в индексе с пометкой
+`redirect`, чтобы старые ссылки вели на актуальный адрес. Для каждого товара
+хранится список его slug'ов, чтобы удаление товара убирало их все. Slug,
+которого нет в каталоге, запоминается отрицательной записью на
+`STRAPI_PRODUCT_NOT_FOUND_TTL_SECONDS`.
+"""
+
+from django.conf import settings
+
+from .catalog_cache import catalog_cache
+
+SLUG_INDEX_KEY = "products:slug:{slug}"
+PRODUCT_SLUGS_KEY = "products:slugs:{document_id}"
+
+
+def _slug_key(slug):
+    return SLUG_INDEX_KEY.format(slug=slug)
+
+
+def _product_slugs_key(document_id):
+    return PRODUCT_SLUGS_KEY.format(document_id=document_id)
+
+
+def lookup_product_slug(slug):
+    """Возвращает запись индекса для slug или `None`.
+
+    Запись — `{"document_id", "redirect"}` либо `{"missing": True}` для slug'а,
+    недавно не найденного в каталоге.
+    """
+    entry = catalog_cache.get(_slug_key(slug))
+    if isinstance(entry, dict) and (entry.get("document_id") or entry.get("missing")):
+        return entry
+    return None
+
+
+def mark_slug_missing(slug):
+    """Запоминает, что slug не найден в каталоге; запись товара с этим slug'ом ее заменит."""
+    catalog_cache.set(_slug_key(slug), {"missing": True}, timeout=settings.STRAPI_PRODUCT_NOT_FOUND_TTL_SECONDS)
+
+
+def _is_free_for(entry, document_id):
+    """Можно ли записать редирект slug'а на товар: запись пуста или уже его."""
+    return not isinstance(entry, dict) or not entry.get("document_id") or entry["document_id"] == document_id
+
+
+def index_product_slug(document_id, slug, *, previous_slugs=()):
+    """Записывает текущий slug товара; прежние slug'и становятся редиректами.
+
+    Прежний slug, который уже занял другой товар, не перезаписывается и
+    убирается из списка slug'ов товара.
+    """
+    if not document_id or not slug:
+        return
+    known = catalog_cache.get(_product_slugs_key(document_id)) or []
+    candidates = {item for item in (*known, *previous_slugs) if item and item != slug}
+    current = catalog_cache.get_many([_slug_key(item) for item in candidates])
+    previous = sorted(item for item in candidates if _is_free_for(current.get(_slug_key(item)), document_id))
+    entries = {_slug_key(slug): {"document_id": document_id, "redirect": False}}
+    for item in previous:
+        entries[_slug_key(item)] = {"document_id": document_id, "redirect": True}
+    entries[_product_slugs_key(document_id)] = [slug, *previous]
+    catalog_cache.set_many(entries, timeout=None)
+
+
+def unindex_product(document_id, *, slugs=()):
+    """Удаляет из индекса все slug'и товара, которые все еще указывают на него."""
+    if not document_id:
+        return
+    known = catalog_cache.get(_product_slugs_key(document_id)) or []
+    candidates = {_slug_key(slug): slug for slug in (*known, *slugs) if slug}
+    current = catalog_cache.get_many(list(candidates))
+    stale = [key for key, entry in current.items() if isinstance(entry, dict) and entry.get("document_id") == document_id]
+    catalog_cache.delete_many([*stale, _product_slugs_key(document_id)])
@@ -0,0 +1,81 @@
+"""Асинхронный клиент Strapi для параллельных запросов с ограничением конкуренции.
+
+Методы клиента выполняют функции `strapi_client` в пуле потоков поверх общей
+pooled-сессии, поэтому нормализаторы, типы ошибок, повторы и circuit breaker
+остаются теми же. Одновременно выполняется не более `STRAPI_ASYNC_CONCURRENCY`
+запросов на клиент. Для вызова из синхронных DRF view есть `run_sync` и
+`map_concurrently`.
+"""
+
+import asyncio
+
+from asgiref.sync import async_to_sync
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import strapi_client
+
+
+class AsyncStrapiClient:
+    """Асинхронный двойник `strapi_client` с общим лимитом одновременных запросов."""
+
+    def __init__(self, concurrency: int | None = None):
+        self.concurrency = max(1, concurrency or settings.STRAPI_ASYNC_CONCURRENCY)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def call(self, func, *args, **kwargs):
+        """Выполняет синхронную функцию клиента Strapi, соблюдая лимит конкуренции."""
+        async with self._semaphore:
+            return await sync_to_async(func, thread_sensitive=False)(*args, **kwargs)
+
+    async def map(self, func, items):
+        """Вызывает `func(item)` для всех элементов параллельно.
+
+        Возвращает список в порядке `items`; исключения отдельных вызовов
+        возвращаются на месте результата, а не прерывают остальные вызовы.
+        """
+        return await asyncio.gather(*(self.call(func, item) for item in items), return_exceptions=True)
+
+    async def list_products(self, *, page: int, page_size: int, params=None):
+        return await self.call(strapi_client.list_products, page=page, page_size=page_size, params=params)
+
+    async def get_product(self, document_id: str, *, fresh: bool = False):
+        return await self.call(strapi_client.get_product, document_id, fresh=fresh)
+
+    async def get_products(self, document_ids, *, fresh: bool = False):
+        return await self.call(strapi_client.get_products, document_ids, fresh=fresh)
+
+    async def list_categories(self, *, page: int, page_size: int):
+        return await self.call(strapi_client.list_categories, page=page, page_size=page_size)
+
+    async def list_categories_admin(self, *, page: int, page_size: int):
+        return await self.call(strapi_client.list_categories_admin, page=page, page_size=page_size)
+
+    async def list_products_admin(self, *, page: int, page_size: int, params=None):
+        return await self.call(strapi_client.list_products_admin, page=page, page_size=page_size, params=params)
+
+    async def get_product_admin(self, document_id: str):
+        return await self.call(strapi_client.get_product_admin, document_id)
+
+    async def get_product_admin_raw(self, document_id: str):
+        return await self.call(strapi_client.get_product_admin_raw, document_id)
+
+    async def get_products_admin_raw(self, values, *, field="documentId"):
+        return await self.call(strapi_client.get_products_admin_raw, values, field=field)
+
+    async def update_product_admin_raw(self, document_id: str, data):
+        return await self.call(strapi_client.update_product_admin_raw, document_id, data)
+
+
+def run_sync(coroutine_function, *args, **kwargs):
+    """Выполняет корутину из синхронного кода (например, из DRF view)."""
+    return async_to_sync(coroutine_function)(*args, **kwargs)
+
+
+def map_concurrently(func, items, *, concurrency: int | None = None):
+    """Синхронная обертка над `AsyncStrapiClient.map` для одного набора вызовов."""
+
+    async def _run():
+        return await AsyncStrapiClient(concurrency).map(func, list(items))
+
+    return run_sync(_run)
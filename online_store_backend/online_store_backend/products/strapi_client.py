@@ -1,14 +1,30 @@
 """Клиент для взаимодействия с Strapi Catalog API."""
 
 import logging
+import re
+import time
 from decimal import Decimal, InvalidOperation
 from urllib.parse import urljoin
 
 import requests
 from django.conf import settings
 
+from .cache import get_products_cache_version
+from .cache import product_cache_key
+from .catalog_cache import catalog_cache
+from .circuit_breaker import strapi_breaker
+from .strapi_session import get_session
+
 logger = logging.getLogger(__name__)
 
+PRODUCT_NOT_FOUND_MARKER = "__not_found__"
+
+TWO_PLACES = Decimal("0.01")
+ZERO_PRICE = Decimal("0.00")
+# Относительный путь без query/fragment/params и dot-сегментов: urljoin сводится к конкатенации.
+SIMPLE_MEDIA_PATH_RE = re.compile(r"[A-Za-z0-9_\-.~%+@!$&'()*,=/]+")
+DISCOUNT_MULTIPLIERS = tuple(Decimal("1") - Decimal(percent) / Decimal("100") for percent in range(101))
+
 
 class StrapiUnavailableError(Exception):
     """Ошибка недоступности Strapi или некорректного ответа."""
@@ -17,6 +33,13 @@ class StrapiUnavailableError(Exception):
         super().__init__(message)
 
 
+class StrapiCircuitOpenError(StrapiUnavailableError):
+    """Запрос отклонен без обращения к Strapi: circuit breaker открыт."""
+
+    def __init__(self, message="Strapi circuit breaker is open"):
+        super().__init__(message)
+
+
 class StrapiNotFoundError(Exception):
     """Ошибка отсутствия сущности в Strapi."""
 
@@ -176,6 +199,85 @@ def _extract_media_ids(image):
     return result
 
 
+def _media_base_url():
+    """Возвращает базовый URL медиа Strapi с завершающим слешем."""
+    return settings.STRAPI_PUBLIC_URL.rstrip("/") + "/"
+
+
+def _media_url_resolver(base_url: str):
+    """Возвращает `_absolute_media_url` с мемоизацией в пределах одного пакета.
+
+    Простые относительные пути присоединяются к базовому URL конкатенацией,
+    остальные разбираются через `urljoin`, как и раньше.
+    """
+    resolved = {}
+    can_concatenate = "?" not in base_url and "#" not in base_url
+
+    def resolve(url: str) -> str:
+        absolute = resolved.get(url)
+        if absolute is None:
+            path = url.lstrip("/")
+            if url.startswith("http://") or url.startswith("https://"):
+                absolute = url
+            elif can_concatenate and SIMPLE_MEDIA_PATH_RE.fullmatch(path) and "/." not in f"/{path}":
+                absolute = base_url + path
+            else:
+                absolute = urljoin(base_url, path)
+            resolved[url] = absolute
+        return absolute
+
+    return resolve
+
+
+def _extract_media(image, resolve_url, *, with_thumbnail=True):
+    """За один проход возвращает `(gallery_urls, thumbnail_url, media_ids)`.
+
+    Результат совпадает с `_extract_gallery_urls`, `_extract_thumbnail_url` и
+    `_extract_media_ids` для того же медиа-payload; при `with_thumbnail=False`
+    thumbnail не ищется и возвращается `None`.
+    """
+    gallery_urls = []
+    seen_urls = set()
+    thumbnail_url = None
+    media_ids = []
+    seen_ids = set()
+    for attrs in _iter_media_attributes(image):
+        url = attrs.get("url")
+        if url:
+            absolute = resolve_url(url)
+            if absolute not in seen_urls:
+                seen_urls.add(absolute)
+                gallery_urls.append(absolute)
+        if with_thumbnail and thumbnail_url is None:
+            formats = attrs.get("formats") or {}
+            thumbnail = formats.get("thumbnail") if isinstance(formats, dict) else None
+            if isinstance(thumbnail, dict) and thumbnail.get("url"):
+                thumbnail_url = resolve_url(thumbnail["url"])
+        candidate = attrs.get("id")
+        if candidate in (None, ""):
+            continue
+        try:
+            numeric = int(candidate)
+        except (TypeError, ValueError):
+            continue
+        if numeric <= 0 or numeric in seen_ids:
+            continue
+        seen_ids.add(numeric)
+        media_ids.append(numeric)
+    return gallery_urls, thumbnail_url, media_ids
+
+
+def _parse_price(value):
+    """Возвращает цену как Decimal с двумя знаками; некорректные значения дают `0.00`."""
+    if value is None:
+        return ZERO_PRICE
+    try:
+        return Decimal(str(value)).quantize(TWO_PLACES)
+    except (InvalidOperation, ValueError):
+        logger.warning("Invalid price value from Strapi: %r", value)
+        return ZERO_PRICE
+
+
 def _normalize_category(category):
     """Нормализует категорию к единому публичному формату."""
     if not category:
@@ -197,28 +299,38 @@ def _normalize_category(category):
     }
 
 
-def _normalize_product(item):
-    """Нормализует товар Strapi к публичному контракту API."""
-    attrs = _extract_attributes(item)
+def _item_document_id(item, attrs, kind):
+    """Возвращает documentId элемента списка Strapi или `None` с записью в лог."""
     document_id = attrs.get("documentId")
     if not document_id and isinstance(item, dict):
         document_id = item.get("documentId")
     if not document_id:
-        logger.error("Product missing documentId: %r", item)
+        logger.error("%s missing documentId: %r", kind, item)
+        return None
+    return document_id
+
+
+def _build_product(item, resolve_url):
+    """Нормализует товар к публичному контракту за один проход по медиа."""
+    attrs = _extract_attributes(item)
+    document_id = _item_document_id(item, attrs, "Product")
+    if not document_id:
         return None
     discount_percent = _normalize_discount_percent(attrs.get("discount_percent"))
-    price = _format_price(attrs.get("price"))
-    discounted_price = _apply_discount(price, discount_percent) if discount_percent > 0 else None
-    gallery_urls = _extract_gallery_urls(attrs.get("image"))
+    price = _parse_price(attrs.get("price"))
+    discounted_price = None
+    if discount_percent > 0:
+        discounted_price = format((price * DISCOUNT_MULTIPLIERS[discount_percent]).quantize(TWO_PLACES), "f")
+    gallery_urls, thumbnail_url, _media_ids = _extract_media(attrs.get("image"), resolve_url)
     return {
         "id": str(document_id),
         "slug": attrs.get("slug"),
         "title": attrs.get("title"),
         "description": attrs.get("description"),
-        "price": price,
+        "price": format(price, "f"),
         "currency": "RUB",
-        "image_url": _extract_image_url(attrs.get("image")),
-        "thumbnail_url": _extract_thumbnail_url(attrs.get("image")),
+        "image_url": gallery_urls[0] if gallery_urls else None,
+        "thumbnail_url": thumbnail_url,
         "gallery_urls": gallery_urls,
         "category": _normalize_category(attrs.get("category")),
         "discount_percent": discount_percent,
@@ -226,6 +338,22 @@ def _normalize_product(item):
     }
 
 
+def _normalize_product(item):
+    """Нормализует товар Strapi к публичному контракту API."""
+    return _build_product(item, _media_url_resolver(_media_base_url()))
+
+
+def normalize_products(items):
+    """Нормализует массив `data` списка товаров; элементы без documentId пропускаются."""
+    resolve_url = _media_url_resolver(_media_base_url())
+    results = []
+    for item in items:
+        normalized = _build_product(item, resolve_url)
+        if normalized:
+            results.append(normalized)
+    return results
+
+
 def _normalize_category_admin(item):
     """Нормализует категорию к формату админского API."""
     attrs = _extract_attributes(item)
@@ -242,27 +370,22 @@ def _normalize_category_admin(item):
     }
 
 
-def _normalize_product_admin(item):
-    """Нормализует товар к формату админского API."""
+def _build_product_admin(item, resolve_url):
+    """Нормализует товар к формату админского API за один проход по медиа."""
     attrs = _extract_attributes(item)
-    document_id = attrs.get("documentId")
-    if not document_id and isinstance(item, dict):
-        document_id = item.get("documentId")
+    document_id = _item_document_id(item, attrs, "Product")
     if not document_id:
-        logger.error("Product missing documentId: %r", item)
         return None
-    discount_percent = _normalize_discount_percent(attrs.get("discount_percent"))
-    gallery_urls = _extract_gallery_urls(attrs.get("image"))
-    image_ids = _extract_media_ids(attrs.get("image"))
+    gallery_urls, _thumbnail_url, image_ids = _extract_media(attrs.get("image"), resolve_url, with_thumbnail=False)
     return {
         "id": str(document_id),
         "slug": attrs.get("slug"),
         "title": attrs.get("title"),
         "description": attrs.get("description"),
-        "price": _format_price(attrs.get("price")),
+        "price": format(_parse_price(attrs.get("price")), "f"),
         "currency": attrs.get("currency") or "RUB",
         "category": _normalize_category(attrs.get("category")),
-        "discount_percent": discount_percent,
+        "discount_percent": _normalize_discount_percent(attrs.get("discount_percent")),
         "publish": bool(attrs.get("publishedAt")),
         "image_id": image_ids[0] if image_ids else None,
         "image_ids": image_ids,
@@ -271,6 +394,22 @@ def _normalize_product_admin(item):
     }
 
 
+def _normalize_product_admin(item):
+    """Нормализует товар к формату админского API."""
+    return _build_product_admin(item, _media_url_resolver(_media_base_url()))
+
+
+def normalize_products_admin(items):
+    """Нормализует массив `data` админского списка товаров."""
+    resolve_url = _media_url_resolver(_media_base_url())
+    results = []
+    for item in items:
+        normalized = _build_product_admin(item, resolve_url)
+        if normalized:
+            results.append(normalized)
+    return results
+
+
 def _get_read_token():
     """Возвращает read-only API токен Strapi."""
     token = settings.STRAPI_READ_API_TOKEN
@@ -309,11 +448,20 @@ def _strapi_request(method, path, *, params=None, json=None, data=None, files=No
             request_kwargs["data"] = data
     else:
         request_kwargs["json"] = json
+    if not strapi_breaker.allow_request():
+        raise StrapiCircuitOpenError
+    started = time.perf_counter()
+    success = False
     try:
-        response = requests.request(**request_kwargs)
+        response = get_session().request(**request_kwargs)
+        success = response.status_code < 500
     except requests.RequestException as exc:
         logger.exception("Strapi request failed: %s", exc)
         raise StrapiUnavailableError from exc
+    finally:
+        # Любой исход разрешенного запроса, включая непредвиденные исключения,
+        # учитывается: иначе пробный запрос half-open навсегда занял бы слот.
+        strapi_breaker.record(success=success, latency=time.perf_counter() - started)
     if response.status_code == 404:
         raise StrapiNotFoundError
     if response.status_code >= 400:
@@ -403,11 +551,7 @@ def list_products(*, page: int, page_size: int, params=None):
     except StrapiRequestError as exc:
         raise StrapiUnavailableError from exc
     items = payload.get("data", []) if isinstance(payload, dict) else []
-    results = []
-    for item in items:
-        normalized = _normalize_product(item)
-        if normalized:
-            results.append(normalized)
+    results = normalize_products(items)
     pagination = {
         "page": page,
         "page_size": page_size,
@@ -422,8 +566,8 @@ def list_products(*, page: int, page_size: int, params=None):
     return results, pagination
 
 
-def get_product(document_id: str):
-    """Возвращает публичные данные товара по documentId."""
+def _fetch_product(document_id: str):
+    """Загружает публичные данные товара из Strapi без кэша."""
     params = {
         "populate[0]": "image",
         "populate[1]": "category",
@@ -441,6 +585,96 @@ def get_product(document_id: str):
     return normalized
 
 
+def _cache_product_lookups(products, version):
+    """Сохраняет результаты поиска товаров в кэш, включая отрицательные."""
+    found = {}
+    missing = {}
+    for document_id, product in products.items():
+        key = product_cache_key(document_id, version)
+        if product is None:
+            missing[key] = PRODUCT_NOT_FOUND_MARKER
+        else:
+            found[key] = product
+    if found:
+        catalog_cache.set_many(found, timeout=settings.STRAPI_PRODUCT_CACHE_TTL_SECONDS)
+    if missing:
+        catalog_cache.set_many(missing, timeout=settings.STRAPI_PRODUCT_NOT_FOUND_TTL_SECONDS)
+
+
+def get_product(document_id: str, *, fresh: bool = False):
+    """Возвращает публичные данные товара по documentId через read-through кэш.
+
+    `fresh=True` игнорирует кэш и обновляет его авторитетным ответом Strapi.
+    """
+    version = get_products_cache_version()
+    if not fresh:
+        cached = catalog_cache.get(product_cache_key(document_id, version))
+        if cached == PRODUCT_NOT_FOUND_MARKER:
+            raise StrapiNotFoundError
+        if cached is not None:
+            return cached
+    try:
+        product = _fetch_product(document_id)
+    except StrapiNotFoundError:
+        _cache_product_lookups({document_id: None}, version)
+        raise
+    _cache_product_lookups({document_id: product}, version)
+    return product
+
+
+def _chunked(values, size):
+    """Разбивает последовательность на чанки фиксированного размера."""
+    for index in range(0, len(values), size):
+        yield values[index : index + size]
+
+
+def _products_batch_params(document_ids):
+    """Собирает параметры запроса пачки товаров по `documentId`."""
+    params = {
+        "pagination[page]": 1,
+        "pagination[pageSize]": len(document_ids),
+        "populate[0]": "image",
+        "populate[1]": "category",
+    }
+    for index, document_id in enumerate(document_ids):
+        params[f"filters[documentId][$in][{index}]"] = document_id
+    return params
+
+
+def get_products(document_ids, *, fresh: bool = False):
+    """Возвращает публичные данные товаров пачкой: `{documentId: product | None}`.
+
+    Товары берутся из read-through кэша `get_product`, промахи запрашиваются
+    в Strapi чанками по `STRAPI_BATCH_SIZE` через `filters[documentId][$in]`.
+    Отсутствующие в каталоге товары возвращаются со значением `None`, порядок
+    ключей совпадает с порядком входных id.
+    """
+    unique_ids = list(dict.fromkeys(str(document_id) for document_id in document_ids if document_id))
+    products = dict.fromkeys(unique_ids)
+    version = get_products_cache_version()
+    pending = unique_ids
+    if not fresh:
+        keys = {product_cache_key(document_id, version): document_id for document_id in unique_ids}
+        cached = catalog_cache.get_many(list(keys))
+        for key, value in cached.items():
+            if value != PRODUCT_NOT_FOUND_MARKER:
+                products[keys[key]] = value
+        pending = [document_id for document_id in unique_ids if product_cache_key(document_id, version) not in cached]
+    fetched = dict.fromkeys(pending)
+    for chunk in _chunked(pending, settings.STRAPI_BATCH_SIZE):
+        try:
+            payload = _strapi_get_public("/api/products", params=_products_batch_params(chunk))
+        except StrapiRequestError as exc:
+            raise StrapiUnavailableError from exc
+        items = payload.get("data", []) if isinstance(payload, dict) else []
+        for normalized in normalize_products(items):
+            if normalized["id"] in fetched:
+                fetched[normalized["id"]] = normalized
+    _cache_product_lookups(fetched, version)
+    products.update(fetched)
+    return products
+
+
 def get_product_by_slug(slug: str):
     """Возвращает товар по slug."""
     params = {
@@ -461,6 +695,50 @@ def get_product_by_slug(slug: str):
     return normalized
 
 
+def _list_raw(path, *, page: int, page_size: int, updated_after=None, populate=()):
+    """Возвращает сырые элементы коллекции Strapi, отсортированные по `updatedAt`.
+
+    С `updated_after` — только элементы с `updatedAt` не раньше этого момента.
+    """
+    params = {
+        "pagination[page]": page,
+        "pagination[pageSize]": page_size,
+        "sort[0]": "updatedAt:asc",
+        "sort[1]": "id:asc",
+    }
+    for index, relation in enumerate(populate):
+        params[f"populate[{index}]"] = relation
+    if updated_after:
+        params["filters[updatedAt][$gte]"] = updated_after
+    try:
+        payload = _strapi_get_public(path, params=params)
+    except StrapiRequestError as exc:
+        raise StrapiUnavailableError from exc
+    items = payload.get("data", []) if isinstance(payload, dict) else []
+    meta = payload.get("meta", {}) if isinstance(payload, dict) else {}
+    meta_pagination = meta.get("pagination") if isinstance(meta, dict) else None
+    total = len(items)
+    if isinstance(meta_pagination, dict):
+        total = meta_pagination.get("total", total)
+    return items, {"page": page, "page_size": page_size, "total": total}
+
+
+def list_products_raw(*, page: int, page_size: int, updated_after=None):
+    """Возвращает сырые товары Strapi (с `updatedAt`) для синхронизации зеркала."""
+    return _list_raw(
+        "/api/products",
+        page=page,
+        page_size=page_size,
+        updated_after=updated_after,
+        populate=("image", "category"),
+    )
+
+
+def list_categories_raw(*, page: int, page_size: int, updated_after=None):
+    """Возвращает сырые категории Strapi (с `updatedAt`) для синхронизации зеркала."""
+    return _list_raw("/api/categories", page=page, page_size=page_size, updated_after=updated_after)
+
+
 def list_categories(*, page: int, page_size: int):
     """Возвращает публичный список категорий и пагинацию."""
     params = {
@@ -606,11 +884,7 @@ def list_products_admin(*, page: int, page_size: int, params=None):
     except StrapiRequestError as exc:
         raise StrapiUnavailableError from exc
     items = payload.get("data", []) if isinstance(payload, dict) else []
-    results = []
-    for item in items:
-        normalized = _normalize_product_admin(item)
-        if normalized:
-            results.append(normalized)
+    results = normalize_products_admin(items)
     pagination = {
         "page": page,
         "page_size": page_size,
@@ -732,6 +1006,35 @@ def get_product_admin_raw(document_id: str):
     return attrs
 
 
+def get_products_admin_raw(values, *, field="documentId"):
+    """Возвращает сырые атрибуты товаров пачкой: `{значение поля: attrs | None}`.
+
+    Товары ищутся по `field` (`documentId` или, например, `slug`) чанками по
+    `STRAPI_BATCH_SIZE` через `filters[<field>][$in]`; отсутствующие в Strapi
+    товары возвращаются со значением `None`, порядок ключей совпадает с
+    порядком входных значений. Ошибки Strapi пробрасываются, как и в
+    `get_product_admin_raw`.
+    """
+    products = dict.fromkeys(str(value) for value in values if value)
+    for chunk in _chunked(list(products), settings.STRAPI_BATCH_SIZE):
+        params = {
+            "pagination[page]": 1,
+            "pagination[pageSize]": len(chunk),
+            "populate[0]": "category",
+            "populate[1]": "image",
+        }
+        for index, value in enumerate(chunk):
+            params[f"filters[{field}][$in][{index}]"] = value
+        payload = _strapi_get_admin("/api/products", params=params)
+        items = payload.get("data", []) if isinstance(payload, dict) else []
+        for item in items:
+            attrs = _extract_attributes(item)
+            key = _item_document_id(item, attrs, "Product") if field == "documentId" else attrs.get(field)
+            if key in products:
+                products[key] = attrs
+    return products
+
+
 def update_product_admin_raw(document_id: str, data):
     """Отправляет сырой payload обновления товара в Strapi."""
     try:
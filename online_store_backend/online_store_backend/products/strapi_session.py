@@ -0,0 +1,184 @@
+"""Пул HTTP-соединений к Strapi с keep-alive, ретраями и статистикой."""
+
+import os
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.connectionpool import HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+RETRY_METHODS = frozenset({"GET", "HEAD"})
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class PoolStats:
+    """Потокобезопасные счетчики использования пула соединений."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Обнуляет все счетчики."""
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.in_flight = 0
+            self.max_in_flight = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def request_started(self):
+        """Отмечает начало запроса."""
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def request_finished(self):
+        """Отмечает завершение запроса."""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def connection_created(self):
+        """Отмечает открытие нового TCP/TLS-соединения."""
+        with self._lock:
+            self.new_connections += 1
+
+    def connection_acquired(self, wait_seconds):
+        """Учитывает время ожидания свободного соединения в пуле."""
+        with self._lock:
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def snapshot(self):
+        """Возвращает срез статистики для метрик."""
+        with self._lock:
+            requests_count = self.requests
+            reused = max(0, requests_count - self.new_connections)
+            return {
+                "pool_connections": settings.STRAPI_POOL_CONNECTIONS,
+                "pool_maxsize": settings.STRAPI_POOL_MAXSIZE,
+                "requests": requests_count,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": round(reused / requests_count, 4) if requests_count else 0.0,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / requests_count, 6) if requests_count else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class _InstrumentedPoolMixin:
+    """Измеряет ожидание соединения и количество новых подключений."""
+
+    def _new_conn(self):
+        pool_stats.connection_created()
+        return super()._new_conn()
+
+    def _get_conn(self, timeout=None):
+        started = time.perf_counter()
+        try:
+            return super()._get_conn(timeout=timeout)
+        finally:
+            pool_stats.connection_acquired(time.perf_counter() - started)
+
+
+class InstrumentedHTTPConnectionPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+    """HTTP-пул urllib3 со сбором статистики."""
+
+
+class InstrumentedHTTPSConnectionPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+    """HTTPS-пул urllib3 со сбором статистики."""
+
+
+class StrapiHTTPAdapter(HTTPAdapter):
+    """HTTP-адаптер requests с инструментированными пулами соединений."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": InstrumentedHTTPConnectionPool,
+            "https": InstrumentedHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        pool_stats.request_started()
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            pool_stats.request_finished()
+
+
+def _build_retry():
+    """Ретраи только для идемпотентных запросов с jitter-backoff."""
+    return Retry(
+        total=settings.STRAPI_RETRY_TOTAL,
+        connect=settings.STRAPI_RETRY_TOTAL,
+        read=settings.STRAPI_RETRY_TOTAL,
+        status=settings.STRAPI_RETRY_TOTAL,
+        allowed_methods=RETRY_METHODS,
+        status_forcelist=RETRY_STATUSES,
+        backoff_factor=settings.STRAPI_RETRY_BACKOFF_FACTOR,
+        backoff_jitter=settings.STRAPI_RETRY_BACKOFF_JITTER,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+
+
+def build_session():
+    """Создает `requests.Session` с пулом keep-alive соединений к Strapi."""
+    session = requests.Session()
+    adapter = StrapiHTTPAdapter(
+        pool_connections=settings.STRAPI_POOL_CONNECTIONS,
+        pool_maxsize=settings.STRAPI_POOL_MAXSIZE,
+        pool_block=settings.STRAPI_POOL_BLOCK,
+        max_retries=_build_retry(),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Возвращает общий для воркера session; после fork создается заново."""
+    global _session, _session_pid  # noqa: PLW0603
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            _session = build_session()
+            _session_pid = pid
+            pool_stats.reset()
+        return _session
+
+
+def reset_session():
+    """Закрывает текущий session (например, после изменения настроек)."""
+    global _session, _session_pid  # noqa: PLW0603
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_pid = None
+        pool_stats.reset()
+
+
+def get_pool_stats():
+    """Возвращает статистику пула соединений текущего воркера."""
+    return pool_stats.snapshot()
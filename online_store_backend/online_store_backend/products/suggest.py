@@ -0,0 +1,412 @@
+"""Подсказки поиска товаров (typeahead) из префиксного индекса в памяти воркера.
+
+Индекс — отсортированный массив нормализованных слов заголовков и для
+каждого слова список товаров, упорядоченный по рангу: префикс запроса
+находится двумя `bisect`, без обращений к Strapi и к базе. Ранг упорядочивает
+товары по популярности — числу просмотров за
+`CATALOG_SUGGEST_POPULARITY_DAYS` дней, — поэтому лучшие `k` подсказок —
+первые `k` товаров слияния списков (`heapq.merge`). Ответы на запросы
+запоминаются в LRU самого индекса.
+
+Индекс неизменяемый: изменения товаров собирают новый индекс, который
+подменяет прежний одной операцией присваивания, и читатели работают без
+блокировок. Каждый воркер держит свой индекс. Изменения товаров
+(`invalidate_product`) записываются в общий журнал в кэше каталога; воркер
+не чаще раза в `CATALOG_SUGGEST_REFRESH_SECONDS` сверяется с журналом и
+применяет изменения, перечитывая эти товары из источника каталога. Сброс
+версии кэша товаров, пропуски в журнале и возраст индекса больше
+`CATALOG_SUGGEST_REBUILD_SECONDS` ведут к полной пересборке в фоне; до ее
+окончания отвечает прежний индекс.
+"""
+
+import functools
+import heapq
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from bisect import insort
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db import transaction
+from django.db.models import Count
+from django.dispatch import receiver
+from django.utils import timezone
+
+from online_store_backend.orders.models import ProductViewEvent
+
+from .cache import get_products_cache_version
+from .catalog_cache import catalog_cache
+from .mirror import SYNC_PAGE_SIZE
+from .mirror import is_mirror_maintained
+from .models import CatalogProduct
+from .signals import product_invalidated
+from .strapi_client import get_products
+from .strapi_client import list_products_raw
+from .strapi_client import normalize_products
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_SEQUENCE_KEY = "products:suggest:seq"
+SUGGEST_CHANGE_KEY = "products:suggest:change:{sequence}"
+SUGGEST_CHANGE_TTL = 24 * 60 * 60
+DEFAULT_SUGGEST_LIMIT = 8
+MAX_SUGGEST_LIMIT = 20
+MIN_QUERY_LENGTH = 2
+SUGGEST_MEMO_SIZE = 4096
+# Больше изменений за одну сверку дешевле применить полной пересборкой.
+MAX_INCREMENTAL_CHANGES = 500
+# Верхняя граница для префиксного поиска через bisect.
+_PREFIX_END = "\U0010ffff"
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_tokens(text):
+    """Разбивает текст на нормализованные слова: нижний регистр, `ё` → `е`."""
+    return _TOKEN_RE.findall(str(text or "").casefold().replace("ё", "е"))
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """Товар в индексе подсказок.
+
+    `rank` — ключ сортировки: больше просмотров, затем заголовок и documentId.
+    """
+
+    document_id: str
+    slug: str | None
+    title: str
+    thumbnail_url: str | None
+    views: int
+    tokens: tuple
+    rank: tuple
+
+    @classmethod
+    def from_product(cls, product, views=0):
+        """Строит запись из нормализованного товара; `None`, если в заголовке нет слов."""
+        title = str(product.get("title") or "")
+        tokens = tuple(dict.fromkeys(normalize_tokens(title)))
+        if not product.get("id") or not tokens:
+            return None
+        document_id = str(product["id"])
+        return cls(
+            document_id=document_id,
+            slug=product.get("slug"),
+            title=title,
+            thumbnail_url=product.get("thumbnail_url") or product.get("image_url"),
+            views=views,
+            tokens=tokens,
+            rank=(-views, title.casefold(), document_id),
+        )
+
+    def as_dict(self):
+        return {"id": self.document_id, "slug": self.slug, "title": self.title, "thumbnail_url": self.thumbnail_url}
+
+
+class SuggestIndex:
+    """Неизменяемый префиксный индекс заголовков товаров.
+
+    Хранит отсортированный массив различных слов и для каждого слова список
+    рангов товаров по возрастанию. Подсказки для префикса — начало слияния
+    списков всех слов с этим префиксом.
+    """
+
+    def __init__(self, entries, words, postings, by_rank=None):
+        self._entries = entries
+        self._words = words
+        self._postings = postings
+        self._by_rank = {entry.rank: entry for entry in entries.values()} if by_rank is None else by_rank
+        self._search = functools.lru_cache(maxsize=SUGGEST_MEMO_SIZE)(self._compute)
+
+    @classmethod
+    def build(cls, suggestions):
+        """Строит индекс из записей `Suggestion`."""
+        entries = {entry.document_id: entry for entry in suggestions if entry is not None}
+        postings = {}
+        for entry in entries.values():
+            for token in entry.tokens:
+                postings.setdefault(token, []).append(entry.rank)
+        for ranks in postings.values():
+            ranks.sort()
+        return cls(entries, sorted(postings), postings)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, document_id):
+        return document_id in self._entries
+
+    def with_changes(self, upserts=(), removals=()):
+        """Возвращает новый индекс с добавленными или обновленными и удаленными товарами.
+
+        Копируются только списки затронутых слов.
+        """
+        upserts = [entry for entry in upserts if entry is not None]
+        entries = dict(self._entries)
+        by_rank = dict(self._by_rank)
+        words = list(self._words)
+        postings = dict(self._postings)
+        copied = set()
+
+        def ranks_for(token):
+            if token not in copied:
+                postings[token] = list(postings.get(token, ()))
+                copied.add(token)
+            return postings[token]
+
+        for document_id in {*removals, *(entry.document_id for entry in upserts)}:
+            previous = entries.pop(document_id, None)
+            if previous is None:
+                continue
+            del by_rank[previous.rank]
+            for token in previous.tokens:
+                ranks = ranks_for(token)
+                del ranks[bisect_left(ranks, previous.rank)]
+        for entry in upserts:
+            entries[entry.document_id] = entry
+            by_rank[entry.rank] = entry
+            for token in entry.tokens:
+                insort(ranks_for(token), entry.rank)
+        for token in copied:
+            position = bisect_left(words, token)
+            present = position < len(words) and words[position] == token
+            if postings[token] and not present:
+                words.insert(position, token)
+            elif not postings[token]:
+                del postings[token]
+                if present:
+                    del words[position]
+        return SuggestIndex(entries, words, postings, by_rank)
+
+    def _prefix_words(self, prefix):
+        """Слова индекса, начинающиеся с `prefix`."""
+        return self._words[bisect_left(self._words, prefix) : bisect_left(self._words, prefix + _PREFIX_END)]
+
+    def _compute(self, tokens, limit):
+        """Лучшие `limit` товаров, у которых каждое слово запроса — префикс слова заголовка.
+
+        Товары перебираются по возрастанию ранга из слова запроса с самыми
+        короткими списками; остальные слова проверяются по словам товара.
+        """
+        candidates = []
+        for token in tokens:
+            words = self._prefix_words(token)
+            if not words:
+                return ()
+            candidates.append(words)
+        words = min(candidates, key=lambda prefix_words: sum(len(self._postings[word]) for word in prefix_words))
+        stream = heapq.merge(*(self._postings[word] for word in words)) if len(words) > 1 else self._postings[words[0]]
+        results = []
+        previous = None
+        for rank in stream:
+            if rank == previous:
+                continue
+            previous = rank
+            entry = self._by_rank[rank]
+            if len(tokens) > 1 and not all(any(word.startswith(token) for word in entry.tokens) for token in tokens):
+                continue
+            results.append(entry)
+            if len(results) >= limit:
+                break
+        return tuple(results)
+
+    def suggest(self, query, limit=DEFAULT_SUGGEST_LIMIT):
+        """Возвращает до `limit` подсказок (`Suggestion`) для строки запроса."""
+        tokens = tuple(dict.fromkeys(normalize_tokens(query)))
+        if not tokens or len("".join(tokens)) < MIN_QUERY_LENGTH:
+            return []
+        return list(self._search(tokens, limit))
+
+
+def product_popularity(document_ids=None, *, days=None):
+    """Возвращает `{documentId: просмотры}` за последние `days` дней."""
+    days = settings.CATALOG_SUGGEST_POPULARITY_DAYS if days is None else days
+    events = ProductViewEvent.objects.filter(viewed_at__gte=timezone.now() - timedelta(days=days))
+    if document_ids is not None:
+        events = events.filter(product_id__in=list(document_ids))
+    rows = events.values("product_id").annotate(views=Count("id")).values_list("product_id", "views")
+    return dict(rows)
+
+
+def _catalog_products():
+    """Возвращает все товары каталога в нормализованном виде: из зеркала или постранично из Strapi."""
+    if is_mirror_maintained():
+        return list(CatalogProduct.objects.values_list("payload", flat=True).iterator(chunk_size=2000))
+    products = []
+    page = 1
+    while True:
+        items, pagination = list_products_raw(page=page, page_size=SYNC_PAGE_SIZE)
+        products.extend(normalize_products(items))
+        if not items or page * SYNC_PAGE_SIZE >= int(pagination.get("total") or 0):
+            break
+        page += 1
+    return products
+
+
+def _changed_products(document_ids):
+    """Возвращает `{documentId: товар | None}` для измененных товаров."""
+    if is_mirror_maintained():
+        payloads = dict(
+            CatalogProduct.objects.filter(document_id__in=document_ids).values_list("document_id", "payload")
+        )
+        return {document_id: payloads.get(document_id) for document_id in document_ids}
+    return get_products(document_ids)
+
+
+def build_suggest_index():
+    """Строит индекс подсказок по всему каталогу."""
+    popularity = product_popularity()
+    return SuggestIndex.build(
+        Suggestion.from_product(product, popularity.get(str(product.get("id")), 0)) for product in _catalog_products()
+    )
+
+
+def _change_key(sequence):
+    return SUGGEST_CHANGE_KEY.format(sequence=sequence)
+
+
+def current_change_sequence():
+    """Номер последней записи журнала изменений (0, если журнал пуст)."""
+    return int(catalog_cache.get(SUGGEST_SEQUENCE_KEY) or 0)
+
+
+def record_product_change(document_id):
+    """Добавляет изменение товара в общий журнал индекса подсказок."""
+    try:
+        sequence = int(catalog_cache.incr(SUGGEST_SEQUENCE_KEY))
+    except ValueError:
+        catalog_cache.add(SUGGEST_SEQUENCE_KEY, 0, timeout=None)
+        sequence = int(catalog_cache.incr(SUGGEST_SEQUENCE_KEY))
+    catalog_cache.set(_change_key(sequence), str(document_id), timeout=SUGGEST_CHANGE_TTL)
+    return sequence
+
+
+class SuggestService:
+    """Индекс подсказок воркера: ленивое построение, сверка с журналом и фоновая пересборка."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Забывает индекс; следующий запрос построит его заново."""
+        self._index = None
+        self._sequence = 0
+        self._version = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._rebuilding = False
+
+    def suggest(self, query, limit=DEFAULT_SUGGEST_LIMIT):
+        """Возвращает подсказки для запроса; первый вызов в воркере строит индекс."""
+        return self.index().suggest(query, limit)
+
+    def index(self):
+        """Возвращает актуальный индекс воркера."""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self.rebuild()
+            return self._index
+        if time.monotonic() - self._checked_at >= settings.CATALOG_SUGGEST_REFRESH_SECONDS:
+            self.refresh()
+        return self._index
+
+    def rebuild(self):
+        """Синхронно строит индекс по всему каталогу."""
+        version = get_products_cache_version()
+        sequence = current_change_sequence()
+        started = time.monotonic()
+        index = build_suggest_index()
+        self._index = index
+        self._version = version
+        self._sequence = sequence
+        self._built_at = self._checked_at = time.monotonic()
+        logger.info("Catalog suggest index built: %s products in %.3fs", len(index), self._built_at - started)
+        return index
+
+    def refresh(self):
+        """Сверяется с журналом изменений; применяет их или ставит полную пересборку.
+
+        Сверку выполняет один поток, остальные отвечают текущим индексом.
+        """
+        if not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = now = time.monotonic()
+            if self._rebuilding:
+                return
+            if (
+                get_products_cache_version() != self._version
+                or now - self._built_at >= settings.CATALOG_SUGGEST_REBUILD_SECONDS
+            ):
+                self._schedule_rebuild()
+                return
+            sequence = current_change_sequence()
+            if sequence == self._sequence:
+                return
+            if sequence < self._sequence or sequence - self._sequence > MAX_INCREMENTAL_CHANGES:
+                self._schedule_rebuild()
+                return
+            keys = [_change_key(number) for number in range(self._sequence + 1, sequence + 1)]
+            changes = catalog_cache.get_many(keys)
+            if len(changes) < len(keys):
+                self._schedule_rebuild()
+                return
+            self._apply(list(dict.fromkeys(changes.values())))
+            self._sequence = sequence
+        except Exception:
+            logger.exception("Catalog suggest index refresh failed.")
+        finally:
+            self._lock.release()
+
+    def _apply(self, document_ids):
+        """Перечитывает измененные товары и подменяет индекс."""
+        products = _changed_products(document_ids)
+        popularity = product_popularity(document_ids)
+        upserts = []
+        removals = []
+        for document_id in document_ids:
+            product = products.get(document_id)
+            entry = Suggestion.from_product(product, popularity.get(document_id, 0)) if product else None
+            if entry is None:
+                removals.append(document_id)
+            else:
+                upserts.append(entry)
+        self._index = self._index.with_changes(upserts, removals)
+
+    def _schedule_rebuild(self):
+        self._rebuilding = True
+        threading.Thread(target=self._run_rebuild, name="catalog-suggest", daemon=True).start()
+
+    def _run_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Catalog suggest index rebuild failed.")
+        finally:
+            self._rebuilding = False
+            connections.close_all()
+
+    def snapshot(self):
+        """Состояние индекса для метрик."""
+        index = self._index
+        return {
+            "products": len(index) if index is not None else None,
+            "age_seconds": round(time.monotonic() - self._built_at, 1) if index is not None else None,
+            "sequence": self._sequence,
+            "rebuilding": self._rebuilding,
+        }
+
+
+suggest_service = SuggestService()
+
+
+@receiver(product_invalidated)
+def record_invalidated_product(sender, document_id, **kwargs):
+    """Записывает изменение товара в журнал после фиксации транзакции."""
+    transaction.on_commit(functools.partial(record_product_change, document_id))
@@ -0,0 +1,276 @@
+"""Прогрев кэша публичного каталога после инвалидации.
+
+После `bump_products_cache_version` все страницы и карточки оказываются под
+старой версией, и первые покупатели ждут Strapi. Прогрев заново заполняет
+горячие записи через тот же single-flight, что и view, и сразу сохраняет
+готовые ответы: первые `CATALOG_WARM_LIST_PAGES` страниц списка товаров для
+каждой категории (и без фильтра) и каждой сортировки из
+`CATALOG_WARM_ORDERINGS`, а также карточки самых просматриваемых товаров по
+`ProductViewEvent`. Записи заполняются параллельно, не более
+`CATALOG_WARM_CONCURRENCY` одновременно; отчет о последнем прогоне доступен
+в метриках каталога.
+
+Запускается командой `warm_catalog_cache` или в фоне после сброса версии
+(`CATALOG_WARM_ON_INVALIDATE`).
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+from django.db import transaction
+from django.db.models import Count
+from django.dispatch import receiver
+from django.utils import timezone
+
+from online_store_backend.orders.models import ProductViewEvent
+
+from .api.views import DEFAULT_PAGE_SIZE
+from .api.views import MAX_PAGE_SIZE
+from .api.views import PRODUCT_DETAIL_CACHE_TTL
+from .api.views import PRODUCTS_LIST_CACHE_TTL
+from .api.views import _last_known_good_key
+from .api.views import _load_categories_page
+from .api.views import _load_product
+from .api.views import _load_products_page
+from .api.views import _products_cache_key
+from .api.views import _products_list_fallback_key
+from .cache import categories_list_cache_key
+from .cache import product_detail_cache_key
+from .catalog_cache import catalog_cache
+from .response_cache import store_rendered
+from .signals import products_cache_bumped
+from .singleflight import get_or_fill_entry
+from .strapi_async import map_concurrently
+
+logger = logging.getLogger(__name__)
+
+LAST_REPORT_KEY = "products:warmer:last"
+LIST_KIND = "list"
+DETAIL_KIND = "detail"
+
+
+@dataclass(frozen=True)
+class WarmTarget:
+    """Запись кэша для прогрева: ключ, загрузчик и параметры как во view."""
+
+    kind: str
+    key: str
+    loader: Callable
+    timeout: int
+    fallback_key: str
+
+
+def _warm_entry(key, loader, timeout, fallback_key):
+    """Заполняет запись single-flight и сохраняет готовый ответ; возвращает значение."""
+    served = get_or_fill_entry(key, loader, timeout=timeout, fallback_key=fallback_key)
+    store_rendered(key, served)
+    return served["value"]
+
+
+def _warm_target(target):
+    """Прогревает одну запись; возвращает время заполнения в секундах."""
+    started = time.monotonic()
+    try:
+        _warm_entry(target.key, target.loader, target.timeout, target.fallback_key)
+    finally:
+        connections.close_all()
+    return time.monotonic() - started
+
+
+def _warm_categories():
+    """Прогревает первую страницу категорий и возвращает slug'и категорий каталога.
+
+    Для перечисления категорий используется страница максимального размера —
+    та же запись, что отдает `/api/categories/?page_size=100`.
+    """
+    _warm_entry(
+        categories_list_cache_key(),
+        partial(_load_categories_page, 1, DEFAULT_PAGE_SIZE),
+        settings.CATALOG_CATEGORIES_CACHE_TTL_SECONDS,
+        _last_known_good_key("categories", f"list:page=1|page_size={DEFAULT_PAGE_SIZE}"),
+    )
+    page = _warm_entry(
+        categories_list_cache_key(f"page_size={MAX_PAGE_SIZE}"),
+        partial(_load_categories_page, 1, MAX_PAGE_SIZE),
+        settings.CATALOG_CATEGORIES_CACHE_TTL_SECONDS,
+        _last_known_good_key("categories", f"list:page=1|page_size={MAX_PAGE_SIZE}"),
+    )
+    return [category["slug"] for category in page["results"] if category.get("slug")]
+
+
+def _list_targets(category_slugs, *, pages, orderings):
+    """Страницы списка товаров для каждой категории (и без фильтра) и сортировки."""
+    targets = []
+    for category in (None, *category_slugs):
+        for ordering in orderings:
+            for page in range(1, pages + 1):
+                validated = {
+                    "page": page,
+                    "page_size": DEFAULT_PAGE_SIZE,
+                    "ordering": ordering or None,
+                    "category": category,
+                    "search": None,
+                    "cursor": None,
+                    "cursor_position": None,
+                }
+                targets.append(
+                    WarmTarget(
+                        kind=LIST_KIND,
+                        key=_products_cache_key(validated),
+                        loader=partial(_load_products_page, validated),
+                        timeout=PRODUCTS_LIST_CACHE_TTL,
+                        fallback_key=_products_list_fallback_key(validated),
+                    )
+                )
+    return targets
+
+
+def top_viewed_product_ids(limit, *, days=None):
+    """Возвращает ID самых просматриваемых товаров за последние `days` дней."""
+    if limit <= 0:
+        return []
+    days = settings.CATALOG_WARM_VIEW_WINDOW_DAYS if days is None else days
+    rows = (
+        ProductViewEvent.objects.filter(viewed_at__gte=timezone.now() - timedelta(days=days))
+        .values("product_id")
+        .annotate(views=Count("id"))
+        .order_by("-views", "product_id")[:limit]
+    )
+    return [row["product_id"] for row in rows]
+
+
+def _detail_targets(product_ids):
+    """Карточки товаров по ID."""
+    return [
+        WarmTarget(
+            kind=DETAIL_KIND,
+            key=product_detail_cache_key(product_id),
+            loader=partial(_load_product, product_id),
+            timeout=PRODUCT_DETAIL_CACHE_TTL,
+            fallback_key=_last_known_good_key("products", f"detail:{product_id}"),
+        )
+        for product_id in product_ids
+    ]
+
+
+def _kind_stats(targets, results):
+    """Сводит время и ошибки прогрева по видам записей."""
+    kinds = {}
+    for target, result in zip(targets, results, strict=True):
+        stats = kinds.setdefault(target.kind, {"count": 0, "failed": 0, "total_ms": 0.0, "max_ms": 0.0})
+        stats["count"] += 1
+        if isinstance(result, BaseException):
+            stats["failed"] += 1
+            continue
+        elapsed_ms = result * 1000
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    for stats in kinds.values():
+        warmed = stats["count"] - stats["failed"]
+        stats["avg_ms"] = round(stats["total_ms"] / warmed, 2) if warmed else 0.0
+        stats["total_ms"] = round(stats["total_ms"], 2)
+        stats["max_ms"] = round(stats["max_ms"], 2)
+    return kinds
+
+
+def warm_catalog_cache(*, list_pages=None, orderings=None, top_products=None, concurrency=None):
+    """Прогревает горячие записи кэша каталога и возвращает отчет с таймингами.
+
+    Ошибки отдельных записей (например, удаленный товар) не прерывают прогрев
+    и учитываются в `failed`; недоступность Strapi при загрузке категорий
+    пробрасывается.
+    """
+    list_pages = settings.CATALOG_WARM_LIST_PAGES if list_pages is None else list_pages
+    orderings = settings.CATALOG_WARM_ORDERINGS if orderings is None else orderings
+    top_products = settings.CATALOG_WARM_TOP_PRODUCTS if top_products is None else top_products
+    concurrency = settings.CATALOG_WARM_CONCURRENCY if concurrency is None else concurrency
+
+    started = time.monotonic()
+    category_slugs = _warm_categories()
+    targets = _list_targets(category_slugs, pages=list_pages, orderings=orderings)
+    targets += _detail_targets(top_viewed_product_ids(top_products))
+    results = map_concurrently(_warm_target, targets, concurrency=concurrency)
+    failures = [result for result in results if isinstance(result, BaseException)]
+    if failures:
+        logger.warning("Catalog cache warm-up: %s of %s entries failed, first error: %r", len(failures), len(targets), failures[0])
+    report = {
+        "finished_at": timezone.now().isoformat(),
+        "duration_ms": round((time.monotonic() - started) * 1000, 2),
+        "concurrency": concurrency,
+        "categories": len(category_slugs),
+        "targets": len(targets),
+        "warmed": len(targets) - len(failures),
+        "failed": len(failures),
+        "kinds": _kind_stats(targets, results),
+    }
+    catalog_cache.set(LAST_REPORT_KEY, report, timeout=None)
+    logger.info("Catalog cache warmed: %s", report)
+    return report
+
+
+def last_warm_report():
+    """Возвращает отчет о последнем прогреве или `None`."""
+    return catalog_cache.get(LAST_REPORT_KEY)
+
+
+class BackgroundWarmer:
+    """Запускает прогрев в фоновом потоке воркера, не больше одного одновременно.
+
+    Если версия кэша сбрасывается во время прогрева, после его окончания
+    выполняется еще один прогон: часть записей могла быть заполнена под
+    прежней версией.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pending = False
+
+    def schedule(self):
+        """Запускает прогрев; возвращает `False`, если он уже идет и лишь запрошен повтор."""
+        with self._lock:
+            if self._thread is not None:
+                self._pending = True
+                return False
+            self._thread = threading.Thread(target=self._run, name="catalog-warmer", daemon=True)
+            self._thread.start()
+            return True
+
+    def join(self, timeout=None):
+        """Ждет окончания текущего прогрева."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        try:
+            while True:
+                with self._lock:
+                    self._pending = False
+                try:
+                    warm_catalog_cache()
+                except Exception:
+                    logger.exception("Catalog cache warm-up failed.")
+                with self._lock:
+                    if not self._pending:
+                        self._thread = None
+                        return
+        finally:
+            connections.close_all()
+
+
+background_warmer = BackgroundWarmer()
+
+
+@receiver(products_cache_bumped)
+def warm_after_products_cache_bump(sender, **kwargs):
+    """Ставит фоновый прогрев после фиксации транзакции, сбросившей версию кэша."""
+    if settings.CATALOG_WARM_ON_INVALIDATE:
+        transaction.on_commit(background_warmer.schedule)
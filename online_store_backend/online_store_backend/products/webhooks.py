@@ -0,0 +1,182 @@
+"""Обработка lifecycle-webhook'ов Strapi для точечной инвалидации кэша каталога.
+
+Попутно обновляются индекс slug'ов, зеркало каталога и агрегаты скидок категорий.
+"""
+
+import logging
+from functools import partial
+
+from django.db import transaction
+
+from .cache import bump_products_cache_version
+from .cache import invalidate_categories
+from .cache import invalidate_product
+from .discount_stats import detach_category
+from .discount_stats import forget_products
+from .discount_stats import record_product_discounts
+from .discount_stats import refresh_product_discount
+from .mirror import delete_categories
+from .mirror import delete_products
+from .mirror import is_mirror_maintained
+from .mirror import sync_categories
+from .mirror import upsert_products
+from .models import CatalogProduct
+from .slug_index import index_product_slug
+from .slug_index import unindex_product
+from .strapi_client import StrapiNotFoundError
+from .strapi_client import StrapiRequestError
+from .strapi_client import StrapiUnavailableError
+from .strapi_client import _normalize_category
+from .strapi_client import _normalize_discount_percent
+from .strapi_client import get_product
+from .strapi_client import get_products_admin_raw
+
+logger = logging.getLogger(__name__)
+
+PRODUCT_MODEL = "product"
+CATEGORY_MODEL = "category"
+SUPPORTED_EVENTS = {
+    "entry.create",
+    "entry.update",
+    "entry.delete",
+    "entry.publish",
+    "entry.unpublish",
+}
+REMOVAL_EVENTS = {"entry.delete", "entry.unpublish"}
+
+
+def _known_product_state(document_id, entry):
+    """Собирает известные slug'и и категории товара: из webhook и из зеркала.
+
+    Возвращает `None` вместо набора категорий, если категория товара неизвестна.
+    """
+    slugs = {entry.get("slug")}
+    category_slugs = set()
+    category_known = False
+    if "category" in entry:
+        category = _normalize_category(entry.get("category"))
+        category_slugs.add(category.get("slug") if category else None)
+        category_known = True
+    mirrored = CatalogProduct.objects.filter(document_id=document_id).first()
+    if mirrored is not None:
+        slugs.add(mirrored.slug)
+        category_slugs.add(mirrored.category_slug)
+        category_known = True
+    return slugs, (category_slugs if category_known else None)
+
+
+def _reindex_product_slugs(event, document_id, current_slug, known_slugs):
+    """Обновляет индекс slug'ов товара; без известного текущего slug'а записи убираются."""
+    if event not in REMOVAL_EVENTS and current_slug:
+        index_product_slug(document_id, current_slug, previous_slugs=known_slugs)
+    else:
+        unindex_product(document_id, slugs=known_slugs)
+
+
+def _update_discount_stats(event, document_id, entry):
+    """Обновляет агрегаты скидок категорий по событию товара.
+
+    Состояние берется из опубликованной записи webhook'а. Если в нем нет
+    категории или скидки либо пришел черновик (у опубликованной версии могут
+    быть другие значения), товар перечитывается из Strapi после фиксации
+    транзакции.
+    """
+    if event in REMOVAL_EVENTS:
+        forget_products([document_id])
+    elif entry.get("publishedAt") and "category" in entry and "discount_percent" in entry:
+        category = _normalize_category(entry.get("category")) or {}
+        state = (category.get("id"), _normalize_discount_percent(entry.get("discount_percent")))
+        record_product_discounts({document_id: state})
+    else:
+        transaction.on_commit(partial(refresh_product_discount, document_id))
+
+
+def _mirror_product(event, document_id):
+    """Обновляет в зеркале только товар события.
+
+    Опубликованная версия товара перечитывается из Strapi: webhook может
+    прислать черновик или запись без связей. Если Strapi недоступен, товар
+    догонит плановая синхронизация зеркала.
+    """
+    if event in REMOVAL_EVENTS:
+        delete_products([document_id])
+        return
+    try:
+        attrs = get_products_admin_raw([document_id]).get(document_id)
+    except (StrapiRequestError, StrapiUnavailableError):
+        logger.warning("Strapi unavailable while mirroring webhook product %s.", document_id)
+        return
+    if attrs is None:
+        delete_products([document_id])
+    else:
+        upsert_products([attrs])
+
+
+def _handle_product_event(event, entry):
+    """Инвалидирует кэш одного товара и списки его категорий, обновляет индекс slug'ов.
+
+    Кэш сбрасывается после фиксации транзакции, чтобы чтения после
+    инвалидации уже видели обновленное зеркало.
+    """
+    document_id = entry.get("documentId")
+    if not document_id:
+        transaction.on_commit(bump_products_cache_version)
+        return {"scope": "global"}
+    slugs, category_slugs = _known_product_state(document_id, entry)
+    current_slug = entry.get("slug")
+    if category_slugs is None and event not in REMOVAL_EVENTS:
+        try:
+            product = get_product(document_id, fresh=True)
+        except StrapiNotFoundError:
+            product = None
+        except StrapiUnavailableError:
+            logger.warning("Strapi unavailable while resolving webhook product %s.", document_id)
+            product = None
+        if product is not None:
+            current_slug = current_slug or product.get("slug")
+            category_slugs = {(product.get("category") or {}).get("slug")}
+    _reindex_product_slugs(event, document_id, current_slug, slugs)
+    _update_discount_stats(event, document_id, entry)
+    if is_mirror_maintained():
+        _mirror_product(event, document_id)
+    if category_slugs is None:
+        transaction.on_commit(bump_products_cache_version)
+        scope = "global"
+    else:
+        transaction.on_commit(partial(invalidate_product, document_id, category_slugs=category_slugs))
+        scope = "product"
+    return {"scope": scope, "document_id": document_id}
+
+
+def _handle_category_event(event, entry):
+    """Инвалидирует кэш категорий и товаров при изменении категории.
+
+    Категория вложена в payload каждого товара, поэтому изменение категории
+    сбрасывает версию кэша товаров целиком.
+    """
+    bump_products_cache_version()
+    invalidate_categories()
+    if event == "entry.delete":
+        detach_category(entry.get("documentId"))
+    if is_mirror_maintained():
+        if event in REMOVAL_EVENTS and entry.get("documentId"):
+            delete_categories([entry["documentId"]])
+        else:
+            sync_categories()
+    return {"scope": "global", "document_id": entry.get("documentId")}
+
+
+def handle_strapi_webhook(payload):
+    """Обрабатывает webhook Strapi; возвращает описание выполненной инвалидации или `None`."""
+    if not isinstance(payload, dict):
+        return None
+    event = payload.get("event")
+    model = payload.get("model")
+    entry = payload.get("entry") if isinstance(payload.get("entry"), dict) else {}
+    if event not in SUPPORTED_EVENTS:
+        return None
+    if model == PRODUCT_MODEL:
+        return _handle_product_event(event, entry)
+    if model == CATEGORY_MODEL:
+        return _handle_category_event(event, entry)
+    return None
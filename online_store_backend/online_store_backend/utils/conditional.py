@@ -0,0 +1,89 @@
+"""Условные GET-запросы: ETag/Last-Modified, ответы 304 и заголовки кэширования.
+
+Валидаторы считаются из версий в кэше до обращения к Strapi или БД, поэтому
+повторный запрос с актуальным `If-None-Match`/`If-Modified-Since` завершается
+без построения ответа.
+"""
+
+import hashlib
+import time
+
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+from .local_cache import shared_cache
+
+DEFAULT_VARY = ("Accept",)
+
+
+def get_clock_version(key: str) -> int:
+    """Возвращает версию данных — время последнего изменения в миллисекундах.
+
+    Отсутствующая версия засевается текущим временем, поэтому после вытеснения
+    ключа клиенты не получат 304 на устаревшую копию.
+    """
+    value = shared_cache.get(key)
+    if value is None:
+        shared_cache.add(key, time.time_ns() // 1_000_000, timeout=None)
+        value = shared_cache.get(key)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def bump_clock_version(key: str) -> int:
+    """Отмечает изменение данных: версия становится не меньше текущего времени."""
+    current = get_clock_version(key)
+    value = max(current + 1, time.time_ns() // 1_000_000)
+    shared_cache.set(key, value, timeout=None)
+    return value
+
+
+def make_etag(*parts) -> str:
+    """Строит сильный ETag из частей версии ответа."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def apply_cache_headers(response, *, etag=None, last_modified=None, cache_control=None, vary=DEFAULT_VARY):
+    """Проставляет ETag, Last-Modified, Cache-Control и Vary.
+
+    У сжатого ответа (`Content-Encoding`) ETag становится слабым: байты gzip/br
+    отличаются от identity, а сильный валидатор обязан различать их. Для
+    `If-None-Match` Django сравнивает ETag слабо, так что 304 по-прежнему
+    отдается для любого варианта.
+    """
+    if etag:
+        if response.get("Content-Encoding") and not etag.startswith("W/"):
+            etag = f"W/{etag}"
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(int(last_modified))
+    if cache_control:
+        patch_cache_control(response, **cache_control)
+    if vary:
+        patch_vary_headers(response, vary)
+    return response
+
+
+def not_modified_response(request, *, etag=None, last_modified=None, cache_control=None, vary=DEFAULT_VARY):
+    """Возвращает 304 (или 412) по условным заголовкам запроса либо `None`."""
+    if etag is None and last_modified is None:
+        return None
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified) if last_modified is not None else None,
+    )
+    if response is None:
+        return None
+    return apply_cache_headers(
+        response,
+        etag=etag,
+        last_modified=last_modified,
+        cache_control=cache_control,
+        vary=vary,
+    )
@@ -0,0 +1,401 @@
+"""Внутрипроцессный LRU-уровень перед кэшем Django с инвалидацией через Redis pub/sub.
+
+`TieredCache` проксирует Django cache API: ключи выбранных префиксов читаются
+сначала из ограниченного LRU текущего процесса (с коротким TTL), затем из
+общего кэша. Любая запись, удаление или инкремент такого ключа сбрасывает
+его локальные копии во всех воркерах и на всех узлах через канал
+`INVALIDATION_CHANNEL`; TTL локального уровня ограничивает рассинхронизацию,
+если сообщение потерялось. Без django-redis (LocMem в разработке и тестах)
+инвалидация действует только внутри процесса.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+LISTEN_POLL_SECONDS = 1.0
+MAX_RECONNECT_DELAY_SECONDS = 30
+
+_MISSING = object()
+
+
+def _redis_connection():
+    """Возвращает клиент Redis кэша по умолчанию или `None` для других бэкендов."""
+    client = getattr(caches[DEFAULT_CACHE_ALIAS], "client", None)
+    if client is None or not hasattr(client, "get_client"):
+        return None
+    return client.get_client(write=True)
+
+
+class LocalLRU:
+    """Потокобезопасный LRU с TTL записей, сбрасываемый после fork воркера."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self._pid = os.getpid()
+
+    def _check_pid(self):
+        # Копия, унаследованная от master-процесса gunicorn, не инвалидировалась.
+        if self._pid != os.getpid():
+            self._data.clear()
+            self._pid = os.getpid()
+
+    def get(self, key):
+        """Возвращает значение или `_MISSING`, продлевая недавность использования."""
+        with self._lock:
+            self._check_pid()
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Сохраняет значение на `LOCAL_CACHE_TTL_SECONDS`, вытесняя самые старые записи."""
+        with self._lock:
+            self._check_pid()
+            self._data[key] = (time.monotonic() + settings.LOCAL_CACHE_TTL_SECONDS, value)
+            self._data.move_to_end(key)
+            while len(self._data) > settings.LOCAL_CACHE_MAX_ENTRIES:
+                self._data.popitem(last=False)
+
+    def discard(self, keys=(), prefixes=()):
+        """Удаляет ключи и все ключи с указанными префиксами."""
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+            if prefixes:
+                prefixes = tuple(prefixes)
+                for key in [key for key in self._data if key.startswith(prefixes)]:
+                    del self._data[key]
+
+    def clear(self):
+        """Очищает уровень целиком."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class InvalidationBus:
+    """Рассылка инвалидаций локальных уровней между процессами через Redis pub/sub."""
+
+    def __init__(self, channel=INVALIDATION_CHANNEL):
+        self.channel = channel
+        self._token = uuid.uuid4().hex
+        self._handlers = []
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    @property
+    def origin(self):
+        """Идентификатор процесса-отправителя, чтобы не обрабатывать свои сообщения."""
+        return f"{self._token}:{os.getpid()}"
+
+    def subscribe(self, handler):
+        """Регистрирует обработчик `handler(keys, prefixes)`."""
+        self._handlers.append(handler)
+
+    def _dispatch(self, keys, prefixes):
+        for handler in list(self._handlers):
+            handler(keys, prefixes)
+
+    def publish(self, keys=(), prefixes=()):
+        """Сбрасывает ключи в текущем процессе и рассылает инвалидацию остальным."""
+        keys = tuple(keys)
+        prefixes = tuple(prefixes)
+        if not keys and not prefixes:
+            return
+        self._dispatch(keys, prefixes)
+        redis = _redis_connection()
+        if redis is None:
+            return
+        message = json.dumps({"origin": self.origin, "keys": keys, "prefixes": prefixes})
+        try:
+            redis.publish(self.channel, message)
+        except Exception:  # noqa: BLE001 - как IGNORE_EXCEPTIONS у django-redis
+            logger.warning("Failed to publish cache invalidation.", exc_info=True)
+
+    def ensure_listening(self):
+        """Запускает поток подписки один раз на процесс (в том числе после fork)."""
+        pid = os.getpid()
+        if self._listener_pid == pid:
+            return
+        with self._lock:
+            if self._listener_pid == pid:
+                return
+            self._listener_pid = pid
+            if _redis_connection() is None:
+                return
+            threading.Thread(target=self._listen, name="cache-invalidation", daemon=True).start()
+
+    def _handle(self, message):
+        try:
+            data = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("origin") == self.origin:
+            return
+        self._dispatch(tuple(data.get("keys") or ()), tuple(data.get("prefixes") or ()))
+
+    def _listen(self):
+        delay = 1
+        while True:
+            try:
+                pubsub = _redis_connection().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Сообщения, пришедшие без подписки, потеряны: сбрасываем локальные уровни.
+                self._dispatch((), ("",))
+                delay = 1
+                while True:
+                    message = pubsub.get_message(timeout=LISTEN_POLL_SECONDS)
+                    if message is not None:
+                        self._handle(message)
+            except Exception:  # noqa: BLE001 - поток не должен завершаться
+                logger.warning("Cache invalidation listener disconnected, reconnecting.", exc_info=True)
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+
+
+invalidation_bus = InvalidationBus()
+
+_tiered_caches = {}
+
+
+class TierStats:
+    """Счетчики попаданий уровня кэша."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def record(self, *, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            reads = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / reads, 4) if reads else 0.0,
+            }
+
+
+class TieredCache:
+    """Прокси Django cache API с локальным LRU-уровнем для ключей `local_prefixes`.
+
+    `alias=None` — только локальный уровень без общего кэша (для данных,
+    которые не должны попадать в Redis). Ключи с суффиксами
+    `excluded_suffixes` (например, блокировки) всегда читаются из общего кэша.
+    """
+
+    def __init__(self, name, alias=DEFAULT_CACHE_ALIAS, *, local_prefixes=(), excluded_suffixes=()):
+        self.name = name
+        self.alias = alias
+        self.local_prefixes = tuple(local_prefixes)
+        self.excluded_suffixes = tuple(excluded_suffixes)
+        self.local = LocalLRU()
+        self.local_stats = TierStats()
+        self.remote_stats = TierStats()
+        invalidation_bus.subscribe(self._on_invalidation)
+        _tiered_caches[name] = self
+
+    def _backend(self):
+        return caches[self.alias]
+
+    def __getattr__(self, name):
+        return getattr(self._backend(), name)
+
+    def _is_local(self, key, version=None):
+        if version is not None or not settings.LOCAL_CACHE_ENABLED:
+            return False
+        key = str(key)
+        return key.startswith(self.local_prefixes) and not key.endswith(self.excluded_suffixes)
+
+    def _on_invalidation(self, keys, prefixes):
+        self.local.discard(keys, prefixes)
+
+    def _record_get(self, key, *, hit):
+        """Хук для статистики обращений в наследниках."""
+
+    def _record_set(self, key):
+        """Хук для статистики записей в наследниках."""
+
+    def _remote_get(self, key, version):
+        if self.alias is None:
+            return _MISSING
+        value = self._backend().get(key, _MISSING, version=version)
+        self.remote_stats.record(hit=value is not _MISSING)
+        return value
+
+    def get(self, key, default=None, version=None):
+        local = self._is_local(key, version)
+        if local:
+            invalidation_bus.ensure_listening()
+            value = self.local.get(key)
+            self.local_stats.record(hit=value is not _MISSING)
+            if value is not _MISSING:
+                self._record_get(key, hit=True)
+                return value
+        value = self._remote_get(key, version)
+        self._record_get(key, hit=value is not _MISSING)
+        if value is _MISSING:
+            return default
+        if local:
+            self.local.set(key, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote_keys = []
+        for key in keys:
+            if self._is_local(key, version):
+                invalidation_bus.ensure_listening()
+                value = self.local.get(key)
+                self.local_stats.record(hit=value is not _MISSING)
+                if value is not _MISSING:
+                    found[key] = value
+                    continue
+            remote_keys.append(key)
+        if remote_keys and self.alias is not None:
+            fetched = self._backend().get_many(remote_keys, version=version)
+            for key in remote_keys:
+                self.remote_stats.record(hit=key in fetched)
+                if key in fetched and self._is_local(key, version):
+                    self.local.set(key, fetched[key])
+            found.update(fetched)
+        for key in keys:
+            self._record_get(key, hit=key in found)
+        return found
+
+    def _written(self, keys, values=None, version=None):
+        """Инвалидирует копии записанных ключей в других процессах и обновляет свою."""
+        local_keys = [key for key in keys if self._is_local(key, version)]
+        if not local_keys:
+            return
+        invalidation_bus.publish(keys=local_keys)
+        if values is not None:
+            for key in local_keys:
+                self.local.set(key, values[key])
+
+    def set(self, key, value, timeout=None, version=None, **kwargs):
+        self._record_set(key)
+        if self.alias is not None:
+            self._backend().set(key, value, timeout=timeout, version=version, **kwargs)
+        self._written([key], {key: value}, version)
+
+    def add(self, key, value, timeout=None, version=None, **kwargs):
+        self._record_set(key)
+        if self.alias is None:
+            if self.local.get(key) is not _MISSING:
+                return False
+            self._written([key], {key: value}, version)
+            return True
+        added = self._backend().add(key, value, timeout=timeout, version=version, **kwargs)
+        if added:
+            self._written([key], {key: value}, version)
+        return added
+
+    def set_many(self, data, timeout=None, version=None, **kwargs):
+        for key in data:
+            self._record_set(key)
+        failed = []
+        if self.alias is not None:
+            failed = self._backend().set_many(data, timeout=timeout, version=version, **kwargs)
+        self._written(list(data), data, version)
+        return failed
+
+    def get_or_set(self, key, default, timeout=None, version=None):
+        """Как `cache.get_or_set`, но значение `None` тоже кэшируется."""
+        value = self.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            value = default() if callable(default) else default
+            self.set(key, value, timeout=timeout, version=version)
+        return value
+
+    def delete(self, key, version=None):
+        deleted = self._backend().delete(key, version=version) if self.alias is not None else True
+        self._written([key], version=version)
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        if self.alias is not None:
+            self._backend().delete_many(keys, version=version)
+        self._written(keys, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self._backend().incr(key, delta, version=version)
+        self._written([key], version=version)
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        if self.alias is not None:
+            self._backend().clear()
+        self.invalidate_local(prefixes=("",))
+
+    def invalidate_local(self, keys=(), prefixes=()):
+        """Сбрасывает локальные копии ключей/префиксов во всех процессах."""
+        invalidation_bus.publish(keys=keys, prefixes=prefixes)
+
+    def stats(self):
+        """Возвращает статистику попаданий по уровням."""
+        return {
+            "local": {
+                **self.local_stats.snapshot(),
+                "entries": len(self.local),
+                "max_entries": settings.LOCAL_CACHE_MAX_ENTRIES,
+                "enabled": settings.LOCAL_CACHE_ENABLED,
+            },
+            "remote": self.remote_stats.snapshot(),
+        }
+
+    def reset(self):
+        """Очищает локальный уровень текущего процесса и обнуляет статистику."""
+        self.local.clear()
+        self.local_stats.reset()
+        self.remote_stats.reset()
+
+
+def tiered_cache_stats():
+    """Возвращает статистику уровней всех многоуровневых кэшей процесса."""
+    return {name: tiered.stats() for name, tiered in sorted(_tiered_caches.items())}
+
+
+def reset_local_caches():
+    """Очищает локальные уровни текущего процесса и их статистику (например, после смены настроек)."""
+    for tiered in _tiered_caches.values():
+        tiered.reset()
+
+
+shared_cache = TieredCache("shared", local_prefixes=("appearance:",))
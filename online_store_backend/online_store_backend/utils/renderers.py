@@ -0,0 +1,39 @@
+"""Быстрый JSON-рендерер DRF на orjson.
+
+Вывод совпадает с компактным JSON DRF
+(UTF-8 без экранирования, разделители без пробелов), поэтому переключение
+рендерера не меняет тела ответов и их ETag.
+"""
+
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_LINE_SEPARATOR = "\u2028".encode()
+_PARAGRAPH_SEPARATOR = "\u2029".encode()
+
+
+def _default(value):
+    """Сериализует типы, неизвестные orjson (Decimal, lazy-строки и т.п.), как DRF."""
+    return JSONEncoder().default(value)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """`JSONRenderer`, использующий orjson для компактного вывода."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type or "", renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default)
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как и DRF, экранируем разделители строк, недопустимые в JavaScript.
+        return ret.replace(_LINE_SEPARATOR, b"\\u2028").replace(_PARAGRAPH_SEPARATOR, b"\\u2029")
+
+
+def render_json(data):
+    """Рендерит данные в байты JSON так же, как `FastJSONRenderer` для `application/json`."""
+    return FastJSONRenderer().render(data, "application/json")
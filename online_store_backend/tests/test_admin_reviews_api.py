@@ -51,11 +51,14 @@ def test_public_product_reviews_returns_only_published(api_client):
 @pytest.mark.django_db
 def test_admin_reviews_list_and_patch_and_bulk(api_client, admin_user, monkeypatch):
     monkeypatch.setattr(
-        "online_store_backend.orders.api.admin_views.get_product",
-        lambda product_id: {
-            "id": product_id,
-            "title": f"Product {product_id}",
-            "image_url": f"https://img/{product_id}.jpg",
+        "online_store_backend.orders.api.admin_views.get_products",
+        lambda product_ids: {
+            product_id: {
+                "id": product_id,
+                "title": f"Product {product_id}",
+                "image_url": f"https://img/{product_id}.jpg",
+            }
+            for product_id in product_ids
         },
     )
 
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from online_store_backend.products.cache import bump_products_cache_version
+from online_store_backend.products.singleflight import get_or_fill
+from online_store_backend.products.strapi_client import StrapiCircuitOpenError
+from online_store_backend.products.strapi_client import StrapiUnavailableError
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def test_get_or_fill_coalesces_concurrent_misses():
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"results": [1, 2, 3]}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(get_or_fill("products:list:test", slow_loader, timeout=60)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"results": [1, 2, 3]}] * 5
+
+
+def test_get_or_fill_refreshes_hot_key_before_expiry(settings):
+    settings.CATALOG_CACHE_EARLY_REFRESH_BETA = 1.0
+    cache.set(
+        "products:detail:test",
+        {"value": "old", "expires_at": time.time() + 0.01, "delta": 100.0},
+        timeout=60,
+    )
+
+    assert get_or_fill("products:detail:test", lambda: "new", timeout=60) == "new"
+
+
+def test_get_or_fill_serves_stale_value_when_strapi_is_down():
+    cache.set(
+        "products:detail:test",
+        {"value": "stale", "expires_at": time.time() - 1, "delta": 0.1},
+        timeout=60,
+    )
+
+    def failing_loader():
+        raise StrapiUnavailableError
+
+    assert get_or_fill("products:detail:test", failing_loader, timeout=60) == "stale"
+    with pytest.raises(StrapiUnavailableError):
+        get_or_fill("products:detail:missing", failing_loader, timeout=60)
+
+
+@pytest.mark.django_db
+def test_product_detail_serves_last_known_good_copy_while_strapi_is_down(monkeypatch):
+    api_client = APIClient()
+    monkeypatch.setattr(
+        "online_store_backend.products.api.views.get_product",
+        lambda document_id: {"id": document_id, "title": "Mug", "price": "1.00", "currency": "RUB"},
+    )
+    assert api_client.get("/api/products/doc-1/").status_code == 200
+    bump_products_cache_version()
+
+    def circuit_open(document_id):
+        raise StrapiCircuitOpenError
+
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product", circuit_open)
+    response = api_client.get("/api/products/doc-1/")
+
+    assert response.status_code == 200
+    assert response.json()["title"] == "Mug"
+    assert "X-Catalog-Stale-Seconds" in response.headers
+    assert api_client.get("/api/products/doc-2/").status_code == 502
@@ -0,0 +1,110 @@
+import pickle
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django_redis.client.default import DefaultClient
+from rest_framework.test import APIClient
+
+from online_store_backend.products.benchmarks import build_products_page
+from online_store_backend.products.cache_codec import PICKLE_MARKER
+from online_store_backend.products.catalog_cache import catalog_cache_stats
+from online_store_backend.products.catalog_cache import key_namespace
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    catalog_cache_stats.reset()
+
+
+@pytest.fixture
+def admin_user(db):
+    user_model = get_user_model()
+    return user_model.objects.create_user(
+        username="admin",
+        password="pass12345",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+@pytest.fixture
+def redis_client():
+    # encode/decode не обращаются к Redis, соединение не открывается.
+    return DefaultClient(
+        "redis://localhost:6379/0",
+        {
+            "OPTIONS": {
+                "SERIALIZER": "online_store_backend.products.cache_codec.CatalogSerializer",
+                "COMPRESSOR": "online_store_backend.products.cache_codec.CatalogCompressor",
+            },
+        },
+        None,
+    )
+
+
+def test_catalog_codec_round_trips_and_shrinks_list_pages(redis_client):
+    envelope = {"value": build_products_page(50), "expires_at": 1.5, "delta": 0.1, "etag": '"e"', "modified_at": 1.0}
+    extras = {"bodies": {"identity": b"{}"}, "pair": ("a", 1), "price": Decimal("1.10"), "flag": True}
+
+    encoded = redis_client.encode(envelope)
+
+    assert redis_client.decode(encoded) == envelope
+    assert len(encoded) < len(pickle.dumps(envelope, pickle.HIGHEST_PROTOCOL)) * 0.4
+    assert redis_client.decode(redis_client.encode(extras)) == extras
+    assert redis_client.decode(redis_client.encode(extras))["pair"] == ("a", 1)
+    assert redis_client.encode(7) == 7
+
+
+def test_catalog_codec_keeps_small_values_uncompressed_and_reads_legacy_pickles(redis_client, settings):
+    settings.CATALOG_CACHE_COMPRESS_MIN_BYTES = 256
+    legacy = pickle.dumps({"id": "doc-1"}, pickle.HIGHEST_PROTOCOL)
+
+    small = redis_client.encode("__not_found__")
+
+    assert small[:1] in (b"M", PICKLE_MARKER)
+    assert redis_client.decode(small) == "__not_found__"
+    assert redis_client.decode(legacy) == {"id": "doc-1"}
+    assert catalog_cache_stats.snapshot()["codec"]["compressed_values"] == 0
+
+
+@pytest.mark.parametrize(
+    ("key", "namespace"),
+    [
+        ("products:list:v=1|page=1", "products:list"),
+        ("products:detail:v3:doc-1", "products:detail"),
+        ("products:detail:v3:doc-1:lock", "products:lock"),
+        ("categories:list:page=1:rendered", "categories:rendered"),
+        ("products:lkg:detail:doc-1", "products:lkg"),
+    ],
+)
+def test_key_namespace_groups_catalog_keys(key, namespace):
+    assert key_namespace(key) == namespace
+
+
+@pytest.mark.django_db
+def test_catalog_metrics_report_hits_per_namespace(api_client, admin_user, monkeypatch):
+    monkeypatch.setattr(
+        "online_store_backend.products.api.views.get_product",
+        lambda document_id: {"id": document_id, "title": "Mug", "price": "1.00", "currency": "RUB"},
+    )
+    api_client.get("/api/products/doc-1/")
+    api_client.get("/api/products/doc-1/")
+    api_client.force_authenticate(admin_user)
+
+    response = api_client.get("/api/admin/catalog/metrics/?memory=1")
+
+    payload = response.json()["cache"]
+    assert response.status_code == 200
+    assert payload["alias"] == "default"
+    assert payload["namespaces"]["products:detail"]["misses"] >= 1
+    assert payload["namespaces"]["products:detail"]["sets"] == 1
+    assert payload["namespaces"]["products:rendered"]["hits"] == 1
+    assert payload["memory"] is None
@@ -0,0 +1,125 @@
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APIClient
+
+from online_store_backend.products.mirror import sync_products
+from online_store_backend.products.models import CatalogCategory
+from online_store_backend.products.models import CatalogProduct
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def _product(document_id, title, price, updated_at, category=None):
+    return {
+        "id": int(document_id.split("-")[1]),
+        "documentId": document_id,
+        "slug": title.lower().replace(" ", "-"),
+        "title": title,
+        "price": price,
+        "discount_percent": 0,
+        "updatedAt": updated_at,
+        "category": category,
+    }
+
+
+KITCHEN = {"documentId": "cat-1", "slug": "kitchen", "title": "Kitchen"}
+
+
+@pytest.fixture
+def strapi_catalog(monkeypatch):
+    state = {
+        "products": [
+            _product("p-1", "Ceramic Mug", 590, "2026-01-01T10:00:00.000Z", KITCHEN),
+            _product("p-2", "Tea Pot", 1500, "2026-01-02T10:00:00.000Z", KITCHEN),
+            _product("p-3", "Desk Lamp", 2500, "2026-01-03T10:00:00.000Z"),
+        ],
+        "categories": [{"id": 1, **KITCHEN, "updatedAt": "2026-01-01T09:00:00.000Z"}],
+        "calls": [],
+    }
+
+    def fake_page(kind):
+        def _fetch(*, page, page_size, updated_after=None):
+            state["calls"].append((kind, updated_after))
+            items = [
+                item
+                for item in state[kind]
+                if updated_after is None or parse_datetime(item["updatedAt"]) >= parse_datetime(updated_after)
+            ]
+            return items[(page - 1) * page_size : page * page_size], {"total": len(items)}
+
+        return _fetch
+
+    monkeypatch.setattr("online_store_backend.products.mirror.list_products_raw", fake_page("products"))
+    monkeypatch.setattr("online_store_backend.products.mirror.list_categories_raw", fake_page("categories"))
+    return state
+
+
+@pytest.mark.django_db
+def test_full_sync_fills_mirror_and_removes_stale_rows(strapi_catalog):
+    CatalogProduct.objects.create(document_id="p-old", title="Gone", payload={})
+
+    call_command("sync_catalog", "--full")
+
+    assert set(CatalogProduct.objects.values_list("document_id", flat=True)) == {"p-1", "p-2", "p-3"}
+    assert CatalogCategory.objects.get().slug == "kitchen"
+    mug = CatalogProduct.objects.get(document_id="p-1")
+    assert mug.category_slug == "kitchen"
+    assert mug.payload["price"] == "590.00"
+
+
+@pytest.mark.django_db
+def test_incremental_sync_pulls_only_changes_after_watermark(strapi_catalog):
+    call_command("sync_catalog", "--full")
+    strapi_catalog["products"][0] = _product("p-1", "Ceramic Mug", 650, "2026-01-05T10:00:00.000Z", KITCHEN)
+
+    call_command("sync_catalog")
+
+    assert strapi_catalog["calls"][-1] == ("products", "2026-01-03T10:00:00+00:00")
+    assert CatalogProduct.objects.get(document_id="p-1").payload["price"] == "650.00"
+
+
+@pytest.mark.django_db
+def test_incremental_sync_picks_up_products_saved_at_the_watermark(strapi_catalog):
+    call_command("sync_catalog", "--full")
+    strapi_catalog["products"].append(_product("p-4", "Tea Cup", 300, "2026-01-03T10:00:00.000Z", KITCHEN))
+
+    result = sync_products()
+
+    assert CatalogProduct.objects.filter(document_id="p-4").exists()
+    assert result["fetched"] == 2
+    assert result["upserted"] == 1
+
+
+@pytest.mark.django_db
+def test_public_endpoints_serve_from_mirror_in_mirror_mode(api_client, strapi_catalog, settings, monkeypatch):
+    call_command("sync_catalog", "--full")
+    settings.CATALOG_READ_MODE = "mirror"
+
+    def _strapi_must_not_be_called(*args, **kwargs):
+        raise AssertionError
+
+    monkeypatch.setattr("online_store_backend.products.api.views.list_products", _strapi_must_not_be_called)
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product_by_slug", _strapi_must_not_be_called)
+
+    response = api_client.get("/api/products/?category=kitchen&ordering=-price")
+    assert response.status_code == 200
+    payload = response.json()
+    assert [item["id"] for item in payload["results"]] == ["p-2", "p-1"]
+    assert payload["pagination"]["total"] == 2
+
+    response = api_client.get("/api/products/by-slug/desk-lamp/")
+    assert response.status_code == 200
+    assert response.json()["id"] == "p-3"
+
+    assert api_client.get("/api/products/p-404/").status_code == 404
+    assert api_client.get("/api/categories/cat-1/").json()["slug"] == "kitchen"
@@ -0,0 +1,81 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from online_store_backend.products.benchmarks import build_synthetic_products
+from online_store_backend.products.benchmarks import legacy_normalize_product
+from online_store_backend.products.benchmarks import legacy_normalize_product_admin
+from online_store_backend.products.strapi_client import _absolute_media_url
+from online_store_backend.products.strapi_client import _media_base_url
+from online_store_backend.products.strapi_client import _media_url_resolver
+from online_store_backend.products.strapi_client import normalize_products
+from online_store_backend.products.strapi_client import normalize_products_admin
+
+EDGE_CASE_ITEMS = [
+    {"documentId": "bad-price", "price": "not-a-price", "discount_percent": "x", "image": "/uploads/a.png"},
+    {"documentId": "rounding", "price": "0.05", "discount_percent": 50, "image": {"data": None}},
+    {"title": "missing document id"},
+    {
+        "id": 7,
+        "documentId": "v4",
+        "attributes": {
+            "price": 10,
+            "discount_percent": 33,
+            "image": {
+                "data": [
+                    {"id": "3", "attributes": {"url": "../uploads/b.png", "formats": []}},
+                    {"id": 3, "attributes": {"url": "/uploads/b.png?x=1", "formats": {"thumbnail": {"url": "t.png"}}}},
+                    {"id": 0, "attributes": {"url": "https://cdn.example.com/c.png"}},
+                ]
+            },
+            "category": {"data": {"documentId": "cat-1", "slug": "kitchen", "title": "Kitchen"}},
+        },
+    },
+]
+
+
+@pytest.mark.parametrize("public_url", ["http://localhost:1337", "https://cms.example.com/strapi/"])
+def test_batch_normalizer_matches_per_item_normalizers(settings, public_url):
+    settings.STRAPI_PUBLIC_URL = public_url
+    items = build_synthetic_products(500, seed=3) + EDGE_CASE_ITEMS
+
+    expected_public = [product for product in map(legacy_normalize_product, items) if product]
+    expected_admin = [product for product in map(legacy_normalize_product_admin, items) if product]
+
+    assert normalize_products(items) == expected_public
+    assert normalize_products_admin(items) == expected_admin
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/uploads/photo.jpg",
+        "uploads/photo one.jpg",
+        "/uploads/./photo.jpg",
+        "/uploads/../photo.jpg",
+        "/uploads/.hidden.jpg",
+        "/uploads/photo.jpg?format=webp",
+        "/uploads/photo.jpg#top",
+        "/uploads/a;b.jpg",
+        "mailto:owner@example.com",
+        "//cdn.example.com/photo.jpg",
+        "https://cdn.example.com/photo.jpg",
+    ],
+)
+def test_media_url_resolver_matches_urljoin(settings, url):
+    settings.STRAPI_PUBLIC_URL = "https://cms.example.com/strapi"
+    resolve = _media_url_resolver(_media_base_url())
+
+    assert resolve(url) == _absolute_media_url(url)
+    assert resolve(url) == _absolute_media_url(url)
+
+
+def test_benchmark_normalizer_command_reports_both_shapes():
+    stdout = StringIO()
+
+    call_command("benchmark_normalizer", "--sizes", "200", "--repeat", "1", stdout=stdout)
+
+    lines = stdout.getvalue().splitlines()
+    assert lines[0].split() == ["size", "shape", "legacy_ms", "batch_ms", "speedup"]
+    assert [line.split()[:2] for line in lines[1:]] == [["200", "public"], ["200", "admin"]]
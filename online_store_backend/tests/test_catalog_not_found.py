@@ -0,0 +1,106 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from online_store_backend.products.cache import invalidate_product
+from online_store_backend.products.slug_index import index_product_slug
+from online_store_backend.products.strapi_client import StrapiNotFoundError
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def strapi_products(monkeypatch):
+    state = {"products": {}, "calls": []}
+
+    def fake_get_product(document_id):
+        state["calls"].append(("detail", document_id))
+        if document_id not in state["products"]:
+            raise StrapiNotFoundError
+        return state["products"][document_id]
+
+    def fake_get_product_by_slug(slug):
+        state["calls"].append(("by-slug", slug))
+        for product in state["products"].values():
+            if product["slug"] == slug:
+                return product
+        raise StrapiNotFoundError
+
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product", fake_get_product)
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product_by_slug", fake_get_product_by_slug)
+    return state
+
+
+MUG = {"id": "p-1", "slug": "mug", "title": "Mug", "price": "1.00", "currency": "RUB"}
+
+
+@pytest.mark.django_db
+def test_missing_product_detail_is_negatively_cached_until_the_product_is_created(api_client, strapi_products):
+    assert api_client.get("/api/products/p-1/").status_code == 404
+    assert api_client.get("/api/products/p-1/").status_code == 404
+    assert strapi_products["calls"] == [("detail", "p-1")]
+
+    strapi_products["products"]["p-1"] = MUG
+    invalidate_product("p-1")
+
+    assert api_client.get("/api/products/p-1/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_missing_slug_is_negatively_cached_until_a_product_takes_it(api_client, strapi_products):
+    assert api_client.get("/api/products/by-slug/mug/").status_code == 404
+    assert api_client.get("/api/products/by-slug/mug/").status_code == 404
+    assert strapi_products["calls"] == [("by-slug", "mug")]
+
+    strapi_products["products"]["p-1"] = MUG
+    index_product_slug("p-1", "mug")
+
+    response = api_client.get("/api/products/by-slug/mug/")
+    assert response.status_code == 200
+    assert response.json()["id"] == "p-1"
+
+
+@pytest.mark.django_db
+def test_clients_exceeding_the_not_found_budget_are_throttled(api_client, settings, strapi_products):
+    settings.CATALOG_NOT_FOUND_RATE = "3/min"
+    strapi_products["products"]["p-1"] = MUG
+
+    statuses = [
+        api_client.get(f"/api/products/missing-{index}/", REMOTE_ADDR="10.0.0.1").status_code for index in range(3)
+    ]
+    throttled = api_client.get("/api/products/p-1/", REMOTE_ADDR="10.0.0.1")
+    throttled_slug = api_client.get("/api/products/by-slug/mug/", REMOTE_ADDR="10.0.0.1")
+    other_client = api_client.get("/api/products/p-1/", REMOTE_ADDR="10.0.0.2")
+
+    assert statuses == [404, 404, 404]
+    assert throttled.status_code == 429
+    assert int(throttled["Retry-After"]) > 0
+    assert throttled_slug.status_code == 429
+    assert other_client.status_code == 200
+    assert ("detail", "missing-0") in strapi_products["calls"]
+    assert len(strapi_products["calls"]) == 4
+
+
+@pytest.mark.django_db
+def test_cached_products_are_served_without_checking_the_not_found_budget(api_client, settings, strapi_products):
+    settings.CATALOG_NOT_FOUND_RATE = "1/min"
+    strapi_products["products"]["p-1"] = MUG
+    assert api_client.get("/api/products/p-1/", REMOTE_ADDR="10.0.0.2").status_code == 200
+    assert api_client.get("/api/products/by-slug/mug/", REMOTE_ADDR="10.0.0.2").status_code == 200
+    assert api_client.get("/api/products/missing/", REMOTE_ADDR="10.0.0.1").status_code == 404
+
+    cached = api_client.get("/api/products/p-1/", REMOTE_ADDR="10.0.0.1")
+    cached_slug = api_client.get("/api/products/by-slug/mug/", REMOTE_ADDR="10.0.0.1")
+    missing = api_client.get("/api/products/missing-2/", REMOTE_ADDR="10.0.0.1")
+
+    assert cached.status_code == 200
+    assert cached_slug.status_code == 200
+    assert missing.status_code == 429
@@ -0,0 +1,118 @@
+import gzip
+import json
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from online_store_backend.products.response_cache import negotiate_encoding
+from online_store_backend.utils.renderers import FastJSONRenderer
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    calls = []
+    original = FastJSONRenderer.render
+
+    def counting_render(self, data, accepted_media_type=None, renderer_context=None):
+        calls.append(accepted_media_type)
+        return original(self, data, accepted_media_type, renderer_context)
+
+    monkeypatch.setattr(FastJSONRenderer, "render", counting_render)
+    return calls
+
+
+@pytest.fixture
+def list_calls(monkeypatch):
+    calls = []
+
+    def fake_list_products(*, page, page_size, params=None):
+        calls.append(page)
+        products = [
+            {"id": f"doc-{index}", "title": f"Кружка {index}", "price": "590.00", "currency": "RUB"}
+            for index in range(page_size)
+        ]
+        return products, {"page": page, "page_size": page_size, "total": 100}
+
+    monkeypatch.setattr("online_store_backend.products.api.views.list_products", fake_list_products)
+    return calls
+
+
+@pytest.mark.django_db
+def test_cached_list_page_is_served_as_prerendered_bytes(api_client, list_calls, render_calls):
+    first = api_client.get("/api/products/?page_size=50")
+    identity = api_client.get("/api/products/?page_size=50")
+    compressed = api_client.get("/api/products/?page_size=50", HTTP_ACCEPT_ENCODING="br;q=0, gzip")
+
+    assert list_calls == [1]
+    assert len(render_calls) == 1
+    assert identity.content == first.content
+    assert "Content-Encoding" not in identity
+    assert compressed["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.content) == first.content
+    assert compressed["ETag"] == f"W/{first['ETag']}"
+    assert identity["ETag"] == first["ETag"]
+    for etag in (first["ETag"], compressed["ETag"]):
+        response = api_client.get("/api/products/?page_size=50", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+    assert "Accept-Encoding" in compressed["Vary"]
+    assert json.loads(first.content)["results"][0]["title"] == "Кружка 0"
+
+
+@pytest.mark.django_db
+def test_browsable_api_bypasses_prerendered_cache(api_client, list_calls):
+    api_client.get("/api/products/")
+
+    response = api_client.get("/api/products/", HTTP_ACCEPT="text/html")
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/html")
+    assert list_calls == [1]
+
+
+def test_fast_renderer_output_matches_drf_renderer():
+    data = {"title": "Чайник\u2028", "price": Decimal("10.50"), "items": [1, None, True], "nested": {"a": 0.5}}
+
+    assert FastJSONRenderer().render(data, "application/json") == JSONRenderer().render(data, "application/json")
+    assert FastJSONRenderer().render(None) == b""
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("", "identity"),
+        ("gzip, deflate", "gzip"),
+        ("br, gzip", "br"),
+        ("gzip;q=0.5, br;q=0.2", "gzip"),
+        ("*;q=0", "identity"),
+        ("*", "br"),
+    ],
+)
+def test_negotiate_encoding_respects_quality_values(header, expected):
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=header)
+
+    assert negotiate_encoding(request, {"identity": b"", "gzip": b"", "br": b""}) == expected
+
+
+def test_benchmark_catalog_response_command_reports_all_paths():
+    stdout = StringIO()
+
+    call_command("benchmark_catalog_response", "--page-sizes", "5", "--requests", "3", "--repeat", "1", stdout=stdout)
+
+    rows = [line.split() for line in stdout.getvalue().splitlines() if line.split()[0].isdigit()]
+    assert [row[0] for row in rows] == ["5"]
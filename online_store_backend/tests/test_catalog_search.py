@@ -0,0 +1,104 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from online_store_backend.products.mirror import upsert_products
+from online_store_backend.products.models import CatalogProduct
+from online_store_backend.products.search import search_product_ids
+from online_store_backend.products.search import trigram_available
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def _product(document_id, title, description="", category=None):
+    return {
+        "id": int(document_id.split("-")[1]),
+        "documentId": document_id,
+        "slug": document_id,
+        "title": title,
+        "description": description,
+        "price": 100,
+        "updatedAt": "2026-01-01T10:00:00.000Z",
+        "category": category,
+    }
+
+
+KITCHEN = {"documentId": "cat-1", "slug": "kitchen", "title": "Kitchen"}
+
+
+@pytest.fixture
+def indexed_catalog():
+    upsert_products(
+        [
+            _product("p-1", "Керамическая кружка", "Кружка для чая и кофе", KITCHEN),
+            _product("p-2", "Заварочный чайник", "Подходит к кружкам из той же серии", KITCHEN),
+            _product("p-3", "Desk lamp", "Warm light for the office"),
+            _product("p-4", "Reading chair", "Pairs well with floor lamps"),
+        ]
+    )
+
+
+@pytest.mark.django_db
+def test_search_index_matches_word_forms_and_ranks_titles_first(indexed_catalog):
+    ids, total = search_product_ids("кружки", page=1, page_size=10)
+    assert ids == ["p-1", "p-2"]
+    assert total == 2
+
+    ids, total = search_product_ids("lamps", page=1, page_size=10)
+    assert ids == ["p-3", "p-4"]
+
+    ids, total = search_product_ids("кружки", page=1, page_size=10, category="kitchen", ordering="-title")
+    assert ids == ["p-1", "p-2"]
+    assert search_product_ids("кружки", page=2, page_size=1) == (["p-2"], 2)
+
+
+@pytest.mark.django_db
+def test_search_index_tolerates_typos_in_titles(indexed_catalog):
+    if not trigram_available():
+        pytest.skip("pg_trgm is not installed")
+    ids, _total = search_product_ids("Керамичиская", page=1, page_size=10)
+    assert ids == ["p-1"]
+
+
+@pytest.mark.django_db
+def test_product_search_is_served_from_the_index_and_hydrated_from_cache(api_client, settings, monkeypatch, indexed_catalog):
+    settings.CATALOG_SEARCH_BACKEND = "index"
+    hydrated = []
+
+    def _strapi_must_not_be_called(*args, **kwargs):
+        raise AssertionError
+
+    def fake_get_products(document_ids):
+        hydrated.append(list(document_ids))
+        return {document_id: {"id": document_id, "title": document_id, "price": "1.00", "currency": "RUB"} for document_id in document_ids}
+
+    monkeypatch.setattr("online_store_backend.products.api.views.list_products", _strapi_must_not_be_called)
+    monkeypatch.setattr("online_store_backend.products.search.get_products", fake_get_products)
+
+    response = api_client.get("/api/products/?search=lamps")
+
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["results"]] == ["p-3", "p-4"]
+    assert response.json()["pagination"]["total"] == 2
+    assert hydrated == [["p-3", "p-4"]]
+
+
+@pytest.mark.django_db
+def test_search_benchmark_command_rolls_back_synthetic_products():
+    out = StringIO()
+
+    call_command("benchmark_catalog_search", "--products", "300", "--queries", "кружки", "--repeat", "1", stdout=out)
+
+    assert "кружки" in out.getvalue()
+    assert not CatalogProduct.objects.exists()
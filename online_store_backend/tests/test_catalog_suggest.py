@@ -0,0 +1,115 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from online_store_backend.orders.models import ProductViewEvent
+from online_store_backend.products.cache import invalidate_product
+from online_store_backend.products.mirror import upsert_products
+from online_store_backend.products.models import CatalogProduct
+from online_store_backend.products.suggest import SuggestIndex
+from online_store_backend.products.suggest import Suggestion
+from online_store_backend.products.suggest import suggest_service
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    suggest_service.reset()
+    yield
+    suggest_service.reset()
+
+
+def _suggestion(document_id, title, views=0):
+    return Suggestion.from_product({"id": document_id, "slug": document_id, "title": title}, views)
+
+
+def _titles(suggestions):
+    return [suggestion.title for suggestion in suggestions]
+
+
+def test_suggest_index_matches_word_prefixes_by_popularity():
+    index = SuggestIndex.build(
+        [
+            _suggestion("p-1", "Керамическая кружка", views=5),
+            _suggestion("p-2", "Кружка-термос", views=20),
+            _suggestion("p-3", "Ёлочная игрушка", views=1),
+            _suggestion("p-4", "Крышка для кружки", views=0),
+            _suggestion("p-5", "Desk lamp", views=3),
+        ]
+    )
+
+    assert _titles(index.suggest("КРУ")) == ["Кружка-термос", "Керамическая кружка", "Крышка для кружки"]
+    assert _titles(index.suggest("кер кр")) == ["Керамическая кружка"]
+    assert _titles(index.suggest("елоч")) == ["Ёлочная игрушка"]
+    assert _titles(index.suggest("кр", limit=2)) == ["Кружка-термос", "Керамическая кружка"]
+    assert index.suggest("к") == []
+    assert index.suggest("lamps") == []
+
+
+def test_suggest_index_changes_produce_a_new_index():
+    index = SuggestIndex.build([_suggestion("p-1", "Desk lamp", views=1), _suggestion("p-2", "Floor lamp", views=2)])
+    assert _titles(index.suggest("lam")) == ["Floor lamp", "Desk lamp"]
+
+    changed = index.with_changes([_suggestion("p-1", "Table lamp", views=1)], removals=["p-2"])
+
+    assert _titles(changed.suggest("lam")) == ["Table lamp"]
+    assert changed.suggest("desk") == []
+    assert changed.suggest("floor") == []
+    assert _titles(index.suggest("lam")) == ["Floor lamp", "Desk lamp"]
+    assert len(changed) == 1
+
+
+def _product(document_id, title):
+    return {
+        "id": int(document_id.split("-")[1]),
+        "documentId": document_id,
+        "slug": document_id,
+        "title": title,
+        "price": 100,
+        "updatedAt": "2026-01-01T10:00:00.000Z",
+    }
+
+
+@pytest.mark.django_db
+def test_suggest_endpoint_serves_mirror_titles_and_applies_logged_changes(
+    api_client, settings, monkeypatch, django_capture_on_commit_callbacks
+):
+    settings.CATALOG_READ_MODE = "mirror"
+    settings.CATALOG_SUGGEST_REFRESH_SECONDS = 0
+    upsert_products([_product("p-1", "Desk lamp"), _product("p-2", "Floor lamp"), _product("p-3", "Lampshade")])
+    ProductViewEvent.objects.bulk_create([ProductViewEvent(product_id="p-2") for _ in range(3)])
+
+    def _strapi_must_not_be_called(*args, **kwargs):
+        raise AssertionError
+
+    monkeypatch.setattr("online_store_backend.products.suggest.list_products_raw", _strapi_must_not_be_called)
+    monkeypatch.setattr("online_store_backend.products.suggest.get_products", _strapi_must_not_be_called)
+
+    response = api_client.get("/api/products/suggest/?q=lam&limit=2")
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "query": "lam",
+        "results": [
+            {"id": "p-2", "slug": "p-2", "title": "Floor lamp", "thumbnail_url": None},
+            {"id": "p-1", "slug": "p-1", "title": "Desk lamp", "thumbnail_url": None},
+        ],
+    }
+    assert "max-age=60" in response["Cache-Control"]
+
+    upsert_products([_product("p-1", "Reading light")])
+    CatalogProduct.objects.filter(document_id="p-3").delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        invalidate_product("p-1")
+        invalidate_product("p-3")
+
+    response = api_client.get("/api/products/suggest/?q=lam")
+    assert [item["id"] for item in response.json()["results"]] == ["p-2"]
+    response = api_client.get("/api/products/suggest/?q=read li")
+    assert [item["title"] for item in response.json()["results"]] == ["Reading light"]
+    assert suggest_service.snapshot()["sequence"] == 2
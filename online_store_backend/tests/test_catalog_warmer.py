@@ -0,0 +1,112 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from online_store_backend.orders.models import ProductViewEvent
+from online_store_backend.products import warmer
+from online_store_backend.products.cache import bump_products_cache_version
+from online_store_backend.products.strapi_client import StrapiNotFoundError
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def strapi_catalog(monkeypatch):
+    calls = []
+
+    def fake_list_categories(*, page, page_size):
+        calls.append(("categories", page_size))
+        categories = [{"id": "c-1", "slug": "kitchen", "title": "Kitchen"}, {"id": "c-2", "slug": "garden", "title": "Garden"}]
+        return categories, {"page": page, "page_size": page_size, "total": 2}
+
+    def fake_list_products(*, page, page_size, params=None):
+        calls.append(("list", params.get("filters[category][slug][$eq]"), params.get("sort"), page))
+        return [], {"page": page, "page_size": page_size, "total": 0}
+
+    def fake_get_product(document_id):
+        calls.append(("detail", document_id))
+        if document_id == "gone":
+            raise StrapiNotFoundError(document_id)
+        return {"id": document_id, "title": "Mug", "price": "1.00", "currency": "RUB"}
+
+    monkeypatch.setattr("online_store_backend.products.api.views.list_categories", fake_list_categories)
+    monkeypatch.setattr("online_store_backend.products.api.views.list_products", fake_list_products)
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product", fake_get_product)
+    return calls
+
+
+@pytest.mark.django_db
+def test_warm_catalog_cache_fills_hot_list_pages_and_top_viewed_details(api_client, strapi_catalog):
+    for product_id, views in (("p-1", 3), ("p-2", 1), ("p-3", 2)):
+        ProductViewEvent.objects.bulk_create([ProductViewEvent(product_id=product_id) for _ in range(views)])
+
+    report = warmer.warm_catalog_cache(list_pages=2, orderings=["", "price"], top_products=2, concurrency=2)
+
+    # (без фильтра + 2 категории) x 2 сортировки x 2 страницы + 2 карточки.
+    assert report["targets"] == 14
+    assert report["warmed"] == 14
+    assert report["failed"] == 0
+    assert report["kinds"]["list"]["count"] == 12
+    assert report["kinds"]["detail"]["count"] == 2
+    assert sorted(call[1] for call in strapi_catalog if call[0] == "detail") == ["p-1", "p-3"]
+    assert warmer.last_warm_report() == report
+
+    strapi_catalog.clear()
+    for url in (
+        "/api/categories/",
+        "/api/products/",
+        "/api/products/?category=garden&ordering=price&page=2",
+        "/api/products/p-1/",
+    ):
+        response = api_client.get(url, HTTP_ACCEPT="application/json")
+        assert response.status_code == 200
+    assert strapi_catalog == []
+
+
+@pytest.mark.django_db
+def test_warm_catalog_cache_counts_failed_entries(strapi_catalog):
+    ProductViewEvent.objects.create(product_id="gone")
+    ProductViewEvent.objects.create(product_id="p-1")
+
+    report = warmer.warm_catalog_cache(list_pages=1, orderings=[""], top_products=5, concurrency=4)
+
+    assert report["failed"] == 1
+    assert report["warmed"] == report["targets"] - 1
+    assert report["kinds"]["detail"]["count"] == 2
+    assert report["kinds"]["detail"]["failed"] == 1
+
+
+@pytest.mark.django_db
+def test_products_cache_bump_schedules_background_warm_after_commit(settings, monkeypatch, django_capture_on_commit_callbacks):
+    settings.CATALOG_WARM_ON_INVALIDATE = True
+    runs = []
+    monkeypatch.setattr(warmer, "warm_catalog_cache", lambda: runs.append("warm"))
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        bump_products_cache_version()
+        assert runs == []
+    warmer.background_warmer.join(timeout=5)
+
+    assert len(callbacks) == 1
+    assert runs == ["warm"]
+
+
+@pytest.mark.django_db
+def test_warm_catalog_cache_command_prints_timings(strapi_catalog):
+    out = StringIO()
+
+    call_command("warm_catalog_cache", "--list-pages=1", "--top-products=0", stdout=out)
+
+    assert "warmed=9 failed=0 categories=2" in out.getvalue()
+    assert "list: count=9" in out.getvalue()
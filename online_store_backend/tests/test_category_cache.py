@@ -0,0 +1,115 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from online_store_backend.products.cache import CATEGORIES_TAG
+from online_store_backend.products.cache import get_tag_version
+from online_store_backend.products.mirror import sync_categories
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def admin_user():
+    return get_user_model().objects.create_user(
+        username="admin",
+        password="pass12345",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+@pytest.fixture
+def strapi_categories(monkeypatch):
+    state = {"title": "Kitchen", "calls": []}
+
+    def fake_list_categories(*, page, page_size):
+        state["calls"].append("list")
+        return [{"id": "c-1", "slug": "kitchen", "title": state["title"]}], {"page": page, "page_size": page_size, "total": 1}
+
+    def fake_get_category(document_id):
+        state["calls"].append(document_id)
+        return {"id": document_id, "slug": "kitchen", "title": state["title"]}
+
+    monkeypatch.setattr("online_store_backend.products.api.views.list_categories", fake_list_categories)
+    monkeypatch.setattr("online_store_backend.products.api.views.get_category", fake_get_category)
+    return state
+
+
+def _warm(api_client):
+    assert api_client.get("/api/categories/").status_code == 200
+    assert api_client.get("/api/categories/c-1/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_category_admin_update_invalidates_public_category_caches(api_client, admin_user, strapi_categories, monkeypatch):
+    def fake_update(document_id, payload):
+        strapi_categories["title"] = payload["title"]
+        return {"id": document_id, "slug": payload["slug"], "title": payload["title"]}
+
+    monkeypatch.setattr("online_store_backend.products.api.admin_views.update_category_admin", fake_update)
+    _warm(api_client)
+    _warm(api_client)
+    assert strapi_categories["calls"] == ["list", "c-1"]
+
+    api_client.force_authenticate(admin_user)
+    response = api_client.put(
+        "/api/admin/catalog/categories/c-1/",
+        {"slug": "kitchen", "title": "Kitchenware"},
+        format="json",
+    )
+    assert response.status_code == 200
+    api_client.force_authenticate(None)
+
+    list_response = api_client.get("/api/categories/")
+    detail_response = api_client.get("/api/categories/c-1/")
+
+    assert list_response.json()["results"][0]["title"] == "Kitchenware"
+    assert detail_response.json()["title"] == "Kitchenware"
+    assert strapi_categories["calls"] == ["list", "c-1", "list", "c-1"]
+
+
+@pytest.mark.django_db
+def test_category_webhook_invalidates_public_category_caches(api_client, settings, strapi_categories):
+    settings.STRAPI_WEBHOOK_SECRET = "hook-secret"
+    _warm(api_client)
+    version = get_tag_version(CATEGORIES_TAG)
+
+    response = api_client.post(
+        "/api/catalog/webhook/strapi/",
+        {"event": "entry.update", "model": "category", "entry": {"documentId": "c-1", "slug": "kitchen"}},
+        format="json",
+        HTTP_AUTHORIZATION="Bearer hook-secret",
+    )
+    _warm(api_client)
+
+    assert response.status_code == 200
+    assert get_tag_version(CATEGORIES_TAG) == version + 1
+    assert strapi_categories["calls"] == ["list", "c-1", "list", "c-1"]
+
+
+@pytest.mark.django_db
+def test_mirror_category_sync_invalidates_only_on_changes(monkeypatch):
+    category = {"id": 1, "documentId": "c-1", "slug": "kitchen", "title": "Kitchen", "updatedAt": "2026-01-01T09:00:00.000Z"}
+
+    def fake_list_categories_raw(*, page, page_size, updated_after=None):
+        items = [] if updated_after else [category]
+        return items, {"total": len(items)}
+
+    monkeypatch.setattr("online_store_backend.products.mirror.list_categories_raw", fake_list_categories_raw)
+    version = get_tag_version(CATEGORIES_TAG)
+
+    sync_categories()
+    assert get_tag_version(CATEGORIES_TAG) == version + 1
+
+    sync_categories()
+    assert get_tag_version(CATEGORIES_TAG) == version + 1
@@ -0,0 +1,221 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from online_store_backend.jobs.models import Job
+from online_store_backend.jobs.models import JobStatus
+from online_store_backend.products import discount_jobs
+from online_store_backend.products.discount_stats import category_discount_stats
+from online_store_backend.products.models import CategoryDiscountJob
+from online_store_backend.products.models import DiscountJobStatus
+from online_store_backend.products.strapi_client import StrapiRequestError
+from online_store_backend.products.strapi_client import StrapiUnavailableError
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def admin_user():
+    return get_user_model().objects.create_user(
+        username="admin",
+        password="pass12345",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+@pytest.fixture
+def strapi_products(monkeypatch, settings):
+    settings.CATALOG_DISCOUNT_JOB_BATCH_SIZE = 2
+    settings.CATALOG_DISCOUNT_JOB_RETRY_BACKOFF_SECONDS = 0
+    products = [{"id": f"p-{index}", "discount_percent": 0} for index in range(1, 6)]
+    products.append({"id": "p-6", "discount_percent": 30})
+    failures = {
+        "fetch": [StrapiUnavailableError()],
+        "p-2": [StrapiUnavailableError()],
+        "p-4": [StrapiRequestError(400, "bad")] * 3,
+    }
+    writes = []
+
+    def fake_list_products_admin(*, page, page_size, params=None):
+        return products, {"page": page, "page_size": page_size, "total": len(products)}
+
+    def fake_get_raw_batch(product_ids):
+        if failures["fetch"]:
+            raise failures["fetch"].pop(0)
+        discounts = {product["id"]: product["discount_percent"] for product in products}
+        return {
+            product_id: {
+                "title": product_id,
+                "price": "10.00",
+                "discount_percent": discounts[product_id],
+                "publishedAt": "2026-01-01",
+            }
+            for product_id in product_ids
+        }
+
+    def fake_update(product_id, payload):
+        if failures.get(product_id):
+            raise failures[product_id].pop(0)
+        writes.append((product_id, payload["discount_percent"]))
+
+    monkeypatch.setattr("online_store_backend.products.strapi_client.list_products_admin", fake_list_products_admin)
+    monkeypatch.setattr("online_store_backend.products.discount_jobs.get_products_admin_raw", fake_get_raw_batch)
+    monkeypatch.setattr("online_store_backend.products.discount_jobs.update_product_admin_raw", fake_update)
+    return writes
+
+
+@pytest.mark.django_db
+def test_discount_job_retries_and_resumes_from_checkpoint(api_client, admin_user, strapi_products, monkeypatch):
+    api_client.force_authenticate(admin_user)
+    response = api_client.post(
+        "/api/admin/catalog/categories/c-1/apply-discount/",
+        {"discount_percent": 20},
+        format="json",
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    response = api_client.post("/api/admin/catalog/categories/c-1/remove-discount/")
+    assert response.status_code == 409
+    assert response.json()["job"]["id"] == job_id
+
+    checkpoint = discount_jobs._checkpoint
+    checkpoints = []
+
+    def interrupted_checkpoint(*args):
+        checkpoints.append(args)
+        if len(checkpoints) > 1:
+            raise RuntimeError("worker stopped")
+        checkpoint(*args)
+
+    monkeypatch.setattr(discount_jobs, "_checkpoint", interrupted_checkpoint)
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    job = api_client.get(f"/api/admin/catalog/categories/discount-jobs/{job_id}/").json()
+    assert (job["status"], job["updated_count"], job["pending_count"], job["skipped_count"]) == ("failed", 2, 3, 1)
+    assert api_client.get(f"/api/admin/jobs/{job['job_id']}/").json()["status"] == "failed"
+
+    monkeypatch.setattr(discount_jobs, "_checkpoint", checkpoint)
+    assert api_client.post(f"/api/admin/catalog/categories/discount-jobs/{job_id}/resume/").status_code == 202
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    job = api_client.get(f"/api/admin/catalog/categories/discount-jobs/{job_id}/").json()
+    assert job["status"] == "completed"
+    assert api_client.get(f"/api/admin/jobs/{job['job_id']}/").json()["result"]["updated_count"] == 4
+    assert (job["updated_count"], job["skipped_count"], job["failed_count"], job["pending_count"]) == (4, 1, 1, 0)
+    assert job["failures"] == [{"id": "p-4", "detail": "Strapi responded with status 400"}]
+    assert job["throughput_per_second"] > 0
+    assert sorted(product_id for product_id, _discount in strapi_products) == ["p-1", "p-2", "p-3", "p-3", "p-5"]
+    assert category_discount_stats(["c-1"])["c-1"]["discount_percents"] == [20]
+    assert category_discount_stats(["c-1"])["c-1"]["product_count"] == 4
+
+
+@pytest.mark.django_db
+def test_worker_requeues_discount_job_of_lost_worker(api_client, admin_user, strapi_products):
+    api_client.force_authenticate(admin_user)
+    response = api_client.post("/api/admin/catalog/categories/c-1/remove-discount/")
+    assert response.status_code == 202
+    stale = timezone.now() - timedelta(hours=1)
+    discount_job = CategoryDiscountJob.objects.get(pk=response.json()["id"])
+    discount_job.status = DiscountJobStatus.RUNNING
+    discount_job.heartbeat_at = stale
+    discount_job.save()
+    Job.objects.filter(pk=discount_job.background_job_id).update(
+        status=JobStatus.RUNNING,
+        attempts=1,
+        worker="lost-worker",
+        heartbeat_at=stale,
+    )
+
+    out = StringIO()
+    call_command("run_job_worker", "--once", stdout=out)
+
+    assert out.getvalue().strip() == "processed=1"
+    background_job = Job.objects.get(pk=discount_job.background_job_id)
+    assert (background_job.status, background_job.attempts) == (JobStatus.SUCCEEDED, 2)
+    discount_job.refresh_from_db()
+    assert (discount_job.status, discount_job.updated_count, discount_job.skipped_count) == ("completed", 1, 5)
+
+
+@pytest.mark.django_db
+def test_discount_job_skips_products_changed_after_planning(api_client, admin_user, strapi_products, monkeypatch):
+    fetched = {"p-1": 0, "p-2": 25, "p-3": 0, "p-4": 20, "p-5": None}
+    fetches = []
+
+    def fake_get_raw_batch(product_ids):
+        fetches.append(list(product_ids))
+        return {
+            product_id: (
+                None
+                if fetched[product_id] is None
+                else {"title": product_id, "price": "10.00", "discount_percent": fetched[product_id]}
+            )
+            for product_id in product_ids
+        }
+
+    monkeypatch.setattr("online_store_backend.products.discount_jobs.get_products_admin_raw", fake_get_raw_batch)
+    api_client.force_authenticate(admin_user)
+    job_id = api_client.post(
+        "/api/admin/catalog/categories/c-1/apply-discount/",
+        {"discount_percent": 20},
+        format="json",
+    ).json()["id"]
+
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    job = api_client.get(f"/api/admin/catalog/categories/discount-jobs/{job_id}/").json()
+    assert (job["status"], job["updated_count"], job["skipped_count"], job["failed_count"]) == ("completed", 2, 4, 0)
+    assert fetches == [["p-1", "p-2"], ["p-3", "p-4"], ["p-5"]]
+    assert sorted(product_id for product_id, _discount in strapi_products) == ["p-1", "p-3"]
+    statuses = dict(CategoryDiscountJob.objects.get(pk=job_id).items.values_list("product_document_id", "status"))
+    assert statuses == {"p-1": "updated", "p-2": "skipped", "p-3": "updated", "p-4": "skipped", "p-5": "not_found"}
+
+
+@pytest.mark.django_db
+def test_concurrent_discount_job_start_is_rejected_by_constraint(api_client, admin_user, strapi_products, monkeypatch):
+    api_client.force_authenticate(admin_user)
+    job_id = api_client.post("/api/admin/catalog/categories/c-1/remove-discount/").json()["id"]
+    active_discount_job = discount_jobs.active_discount_job
+    lookups = []
+
+    def racing_lookup(category_id):
+        lookups.append(category_id)
+        return None if len(lookups) == 1 else active_discount_job(category_id)
+
+    monkeypatch.setattr("online_store_backend.products.api.admin_views.active_discount_job", racing_lookup)
+
+    response = api_client.post("/api/admin/catalog/categories/c-1/remove-discount/")
+
+    assert response.status_code == 409
+    assert response.json()["job"]["id"] == job_id
+    assert CategoryDiscountJob.objects.filter(category_document_id="c-1").count() == 1
+
+
+@pytest.mark.django_db
+def test_discount_job_start_expires_job_of_lost_background_job(api_client, admin_user, strapi_products):
+    api_client.force_authenticate(admin_user)
+    lost_id = api_client.post("/api/admin/catalog/categories/c-1/remove-discount/").json()["id"]
+    lost = CategoryDiscountJob.objects.get(pk=lost_id)
+    CategoryDiscountJob.objects.filter(pk=lost_id).update(status=DiscountJobStatus.RUNNING)
+    Job.objects.filter(pk=lost.background_job_id).update(status=JobStatus.FAILED, error="Worker lost")
+
+    response = api_client.post("/api/admin/catalog/categories/c-1/remove-discount/")
+
+    assert response.status_code == 202
+    lost.refresh_from_db()
+    assert (lost.status, lost.error) == (DiscountJobStatus.FAILED, "Worker lost")
+    assert api_client.post(f"/api/admin/catalog/categories/discount-jobs/{lost_id}/resume/").status_code == 409
@@ -0,0 +1,185 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from online_store_backend.products.discount_stats import category_discount_stats
+from online_store_backend.products.models import CategoryDiscountBucket
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def admin_user():
+    return get_user_model().objects.create_user(
+        username="admin",
+        password="pass12345",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+def _admin_product(document_id, category_id, discount):
+    category = {"id": category_id, "slug": category_id, "title": category_id} if category_id else None
+    return {"id": document_id, "category": category, "discount_percent": discount}
+
+
+@pytest.fixture
+def strapi_admin_products(monkeypatch):
+    products = [
+        _admin_product("p-1", "c-1", 10),
+        _admin_product("p-2", "c-1", 10),
+        _admin_product("p-3", "c-2", 0),
+        _admin_product("p-4", "c-2", 15),
+        _admin_product("p-5", None, 30),
+    ]
+
+    def fake_list_products_admin(*, page, page_size, params=None):
+        return products[(page - 1) * page_size : page * page_size], {"page": page, "page_size": page_size, "total": 5}
+
+    monkeypatch.setattr("online_store_backend.products.strapi_client.list_products_admin", fake_list_products_admin)
+    return products
+
+
+def _stats(*category_ids):
+    return {
+        category_id: (stats["product_count"], stats["discount_percents"], stats["derived_discount_is_mixed"])
+        for category_id, stats in category_discount_stats(category_ids).items()
+    }
+
+
+@pytest.mark.django_db
+def test_admin_category_list_reads_recomputed_stats_without_strapi_product_calls(
+    api_client, admin_user, strapi_admin_products, monkeypatch
+):
+    out = StringIO()
+    call_command("recompute_category_discount_stats", stdout=out)
+    assert out.getvalue().strip() == "products=5 categories=2"
+
+    def _strapi_must_not_be_called(*args, **kwargs):
+        raise AssertionError
+
+    categories = [{"id": category_id, "slug": category_id, "title": category_id} for category_id in ("c-1", "c-2", "c-3")]
+    monkeypatch.setattr("online_store_backend.products.strapi_client.list_products_admin", _strapi_must_not_be_called)
+    monkeypatch.setattr(
+        "online_store_backend.products.api.admin_views.list_categories_admin",
+        lambda *, page, page_size: (categories, {"page": page, "page_size": page_size, "total": 3}),
+    )
+    api_client.force_authenticate(admin_user)
+
+    response = api_client.get("/api/admin/catalog/categories/")
+
+    assert response.status_code == 200
+    results = {category["id"]: category for category in response.json()["results"]}
+    assert results["c-1"]["product_count"] == 2
+    assert results["c-1"]["derived_discount_percent"] == 10
+    assert results["c-1"]["derived_discount_is_mixed"] is False
+    assert results["c-2"]["discount_percents"] == [0, 15]
+    assert results["c-2"]["derived_discount_percent"] is None
+    assert results["c-2"]["derived_discount_is_mixed"] is True
+    assert results["c-3"]["product_count"] == 0
+
+
+@pytest.mark.django_db
+def test_recompute_if_empty_fills_stats_once(strapi_admin_products, monkeypatch):
+    out = StringIO()
+    call_command("recompute_category_discount_stats", "--if-empty", stdout=out)
+    assert out.getvalue().strip() == "products=5 categories=2"
+
+    def _strapi_must_not_be_called(*args, **kwargs):
+        raise AssertionError
+
+    monkeypatch.setattr("online_store_backend.products.strapi_client.list_products_admin", _strapi_must_not_be_called)
+    out = StringIO()
+    call_command("recompute_category_discount_stats", "--if-empty", stdout=out)
+
+    assert "skipping" in out.getvalue()
+    assert _stats("c-1", "c-2") == {"c-1": (2, [10], False), "c-2": (2, [0, 15], True)}
+
+
+@pytest.mark.django_db
+def test_admin_product_changes_update_stats_incrementally(api_client, admin_user, strapi_admin_products, monkeypatch):
+    call_command("recompute_category_discount_stats", stdout=StringIO())
+    raw = {
+        "p-1": {"title": "Mug", "slug": "mug", "price": "10.00", "discount_percent": 10, "category": {"documentId": "c-1"}},
+        "p-3": {"title": "Pot", "slug": "pot", "price": "10.00", "discount_percent": 0, "category": {"documentId": "c-2"}},
+    }
+    for attrs in raw.values():
+        attrs["publishedAt"] = "2026-01-01T00:00:00.000Z"
+    monkeypatch.setattr("online_store_backend.products.api.admin_views.get_product_admin_raw", lambda pk: raw[pk])
+    monkeypatch.setattr(
+        "online_store_backend.products.api.admin_views.update_product_admin_flat",
+        lambda pk, payload: {
+            "id": pk,
+            "slug": payload["slug"],
+            "title": payload["title"],
+            "price": payload["price"],
+            "currency": "RUB",
+            "category": None,
+        },
+    )
+    monkeypatch.setattr(
+        "online_store_backend.products.jobs.get_products_admin_raw",
+        lambda pks: {pk: raw.get(pk) for pk in pks},
+    )
+    monkeypatch.setattr("online_store_backend.products.jobs.update_product_admin_raw", lambda pk, payload: None)
+    monkeypatch.setattr("online_store_backend.products.api.admin_views.delete_product_admin", lambda pk: None)
+    api_client.force_authenticate(admin_user)
+
+    response = api_client.put("/api/admin/catalog/products/p-1/", {"category": "c-2", "discount_percent": 15}, format="json")
+    assert response.status_code == 200
+    assert _stats("c-1", "c-2") == {"c-1": (1, [10], False), "c-2": (3, [0, 15], True)}
+
+    response = api_client.post(
+        "/api/admin/catalog/products/bulk-update/",
+        {"product_ids": ["p-3"], "operation": {"type": "set_category", "category_id": "c-1"}},
+        format="json",
+    )
+    assert response.status_code == 202
+    call_command("run_job_worker", "--once", stdout=StringIO())
+    assert _stats("c-1", "c-2") == {"c-1": (2, [0, 10], True), "c-2": (2, [15], False)}
+
+    assert api_client.delete("/api/admin/catalog/products/p-2/").status_code == 204
+    assert _stats("c-1") == {"c-1": (1, [0], False)}
+    assert not CategoryDiscountBucket.objects.filter(category_document_id="c-1", discount_percent=10).exists()
+
+
+@pytest.mark.django_db
+def test_product_webhooks_update_stats(api_client, settings, monkeypatch, django_capture_on_commit_callbacks):
+    settings.STRAPI_WEBHOOK_SECRET = "hook-secret"
+    monkeypatch.setattr(
+        "online_store_backend.products.discount_stats.get_product_admin",
+        lambda document_id: _admin_product(document_id, "c-2", 5),
+    )
+
+    def webhook(event, entry):
+        response = api_client.post(
+            "/api/catalog/webhook/strapi/",
+            {"event": event, "model": "product", "entry": entry},
+            format="json",
+            HTTP_AUTHORIZATION="Bearer hook-secret",
+        )
+        assert response.status_code == 200
+
+    published = {"category": {"documentId": "c-1", "slug": "kitchen"}, "publishedAt": "2026-01-01T00:00:00.000Z"}
+    webhook("entry.publish", {"documentId": "p-1", "discount_percent": 20, **published})
+    webhook("entry.publish", {"documentId": "p-2", "discount_percent": 20, **published})
+    assert _stats("c-1") == {"c-1": (2, [20], False)}
+
+    webhook("entry.unpublish", {"documentId": "p-2", **published})
+    assert _stats("c-1") == {"c-1": (1, [20], False)}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        webhook("entry.update", {"documentId": "p-1", "discount_percent": 0, "category": None, "publishedAt": None})
+    assert _stats("c-1", "c-2") == {"c-1": (0, [], False), "c-2": (1, [5], False)}
@@ -43,14 +43,17 @@ def test_checkout_preview_returns_totals_without_creating_order(api_client, monk
     )
 
     monkeypatch.setattr(
-        "online_store_backend.orders.api.checkout_views.get_product",
-        lambda _product_id: {
-            "id": "p-1",
-            "title": "Product 1",
-            "price": "1000.00",
-            "discount_percent": 0,
-            "currency": "RUB",
-            "image_url": "",
+        "online_store_backend.orders.api.checkout_views.get_products",
+        lambda product_ids, **_kwargs: {
+            product_id: {
+                "id": "p-1",
+                "title": "Product 1",
+                "price": "1000.00",
+                "discount_percent": 0,
+                "currency": "RUB",
+                "image_url": "",
+            }
+            for product_id in product_ids
         },
     )
 
@@ -87,14 +90,17 @@ def test_checkout_confirm_creates_pending_payment_order_and_clears_cart(api_clie
     )
 
     monkeypatch.setattr(
-        "online_store_backend.orders.api.checkout_views.get_product",
-        lambda _product_id: {
-            "id": "p-1",
-            "title": "Product 1",
-            "price": "1000.00",
-            "discount_percent": 10,
-            "currency": "RUB",
-            "image_url": "",
+        "online_store_backend.orders.api.checkout_views.get_products",
+        lambda product_ids, **_kwargs: {
+            product_id: {
+                "id": "p-1",
+                "title": "Product 1",
+                "price": "1000.00",
+                "discount_percent": 10,
+                "currency": "RUB",
+                "image_url": "",
+            }
+            for product_id in product_ids
         },
     )
 
@@ -143,14 +149,17 @@ def test_checkout_preview_returns_400_when_shipping_provider_disabled(api_client
     _prepare_guest_cart(api_client)
 
     monkeypatch.setattr(
-        "online_store_backend.orders.api.checkout_views.get_product",
-        lambda _product_id: {
-            "id": "p-1",
-            "title": "Product 1",
-            "price": "1000.00",
-            "discount_percent": 0,
-            "currency": "RUB",
-            "image_url": "",
+        "online_store_backend.orders.api.checkout_views.get_products",
+        lambda product_ids, **_kwargs: {
+            product_id: {
+                "id": "p-1",
+                "title": "Product 1",
+                "price": "1000.00",
+                "discount_percent": 0,
+                "currency": "RUB",
+                "image_url": "",
+            }
+            for product_id in product_ids
         },
     )
 
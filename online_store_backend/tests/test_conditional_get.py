@@ -0,0 +1,114 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from online_store_backend.appearance.models import ShopAppearanceSettings
+from online_store_backend.orders.models import Order
+from online_store_backend.orders.models import Review
+from online_store_backend.products.cache import bump_products_cache_version
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def _data_queries(context):
+    return [query["sql"] for query in context.captured_queries if "SAVEPOINT" not in query["sql"]]
+
+
+@pytest.fixture
+def product_calls(monkeypatch):
+    calls = []
+    product = {"title": "Mug", "price": "590.00", "currency": "RUB"}
+
+    def fake_get_product(document_id):
+        calls.append(document_id)
+        return {"id": document_id, **product}
+
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product", fake_get_product)
+    return calls, product
+
+
+@pytest.mark.django_db
+def test_product_detail_revalidates_with_etag_and_last_modified(api_client, product_calls):
+    calls, _product = product_calls
+    first = api_client.get("/api/products/doc-1/")
+
+    assert first.status_code == 200
+    assert first["Cache-Control"] == "public, max-age=60, stale-while-revalidate=60"
+    assert "Accept" in first["Vary"]
+
+    by_etag = api_client.get("/api/products/doc-1/", HTTP_IF_NONE_MATCH=first["ETag"])
+    by_date = api_client.get("/api/products/doc-1/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+
+    assert by_etag.status_code == 304
+    assert by_etag["ETag"] == first["ETag"]
+    assert by_date.status_code == 304
+    assert calls == ["doc-1"]
+
+
+@pytest.mark.django_db
+def test_product_detail_etag_follows_content_across_cache_versions(api_client, product_calls):
+    calls, product = product_calls
+    etag = api_client.get("/api/products/doc-1/")["ETag"]
+
+    bump_products_cache_version()
+    unchanged = api_client.get("/api/products/doc-1/", HTTP_IF_NONE_MATCH=etag)
+    bump_products_cache_version()
+    product["price"] = "650.00"
+    changed = api_client.get("/api/products/doc-1/", HTTP_IF_NONE_MATCH=etag)
+
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert changed["ETag"] != etag
+    assert len(calls) == 3
+
+
+@pytest.mark.django_db
+def test_public_appearance_returns_304_without_queries(
+    api_client,
+    django_capture_on_commit_callbacks,
+):
+    etag = api_client.get("/api/shop/appearance/")["ETag"]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/shop/appearance/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert _data_queries(queries) == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        live = ShopAppearanceSettings.objects.get(is_published=True)
+        live.primary_color = "#654321"
+        live.save()
+
+    refreshed = api_client.get("/api/shop/appearance/", HTTP_IF_NONE_MATCH=etag)
+    assert refreshed.status_code == 200
+    assert refreshed.json()["primary_color"] == "#654321"
+
+
+@pytest.mark.django_db
+def test_review_summary_returns_304_until_reviews_change(
+    api_client,
+    django_capture_on_commit_callbacks,
+):
+    url = "/api/reviews/summary/?product_ids=p-1,p-2"
+    etag = api_client.get(url)["ETag"]
+
+    with CaptureQueriesContext(connection) as queries:
+        assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert _data_queries(queries) == []
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Review.objects.create(product_id="p-1", order=Order.objects.create(), rating=5, author_display_name="Alice")
+
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.json()["results"]["p-1"]["reviews_count"] == 1
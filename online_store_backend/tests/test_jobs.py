@@ -0,0 +1,209 @@
+from datetime import timedelta
+from io import BytesIO
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from online_store_backend.jobs import registry
+from online_store_backend.jobs.models import Job
+from online_store_backend.jobs.models import JobStatus
+from online_store_backend.jobs.registry import job_handler
+from online_store_backend.jobs.runner import cancel_job
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def admin_user():
+    return get_user_model().objects.create_user(
+        username="admin",
+        password="pass12345",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+@pytest.fixture
+def countdown_kind(monkeypatch):
+    monkeypatch.setattr(registry, "_kinds", dict(registry._kinds))
+    steps = []
+
+    @job_handler("tests.countdown")
+    def countdown(context):
+        for step in range(context.params["steps"]):
+            context.check_cancelled()
+            steps.append(step)
+            context.set_progress(done=step + 1, total=context.params["steps"])
+            if step == context.params.get("cancel_at"):
+                cancel_job(context.job)
+        return {"steps": len(steps)}
+
+    return steps
+
+
+@pytest.mark.django_db
+def test_job_is_queued_run_by_worker_and_polled(api_client, admin_user, countdown_kind):
+    api_client.force_authenticate(admin_user)
+
+    response = api_client.post("/api/admin/jobs/", {"kind": "tests.countdown", "params": {"steps": 3}}, format="json")
+
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.json()["status"] == "queued"
+    out = StringIO()
+    call_command("run_job_worker", "--once", stdout=out)
+    assert out.getvalue().strip() == "processed=1"
+
+    job = api_client.get(f"/api/admin/jobs/{job_id}/").json()
+    assert (job["status"], job["progress"], job["result"], job["attempts"]) == (
+        "succeeded",
+        {"done": 3, "total": 3},
+        {"steps": 3},
+        1,
+    )
+    assert job["file_url"] is None
+    listing = api_client.get("/api/admin/jobs/", {"status": "succeeded", "kind": "tests.countdown"}).json()
+    assert [item["id"] for item in listing["results"]] == [job_id]
+    assert api_client.get("/api/admin/jobs/", {"status": "unknown"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_enqueue_rejects_unknown_kind_and_invalid_params(api_client, admin_user):
+    api_client.force_authenticate(admin_user)
+
+    response = api_client.post("/api/admin/jobs/", {"kind": "nope"}, format="json")
+    assert response.status_code == 400
+    assert "kind" in response.json()
+
+    response = api_client.post(
+        "/api/admin/jobs/",
+        {"kind": "orders.monthly_report_xlsx", "params": {"month": 13}},
+        format="json",
+    )
+    assert response.status_code == 400
+    assert "month" in response.json()["params"]
+    assert not Job.objects.exists()
+
+
+@pytest.mark.django_db
+def test_cancel_queued_and_running_jobs(api_client, admin_user, countdown_kind):
+    api_client.force_authenticate(admin_user)
+    queued_id = api_client.post(
+        "/api/admin/jobs/",
+        {"kind": "tests.countdown", "params": {"steps": 3}},
+        format="json",
+    ).json()["id"]
+
+    response = api_client.post(f"/api/admin/jobs/{queued_id}/cancel/")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert api_client.post(f"/api/admin/jobs/{queued_id}/cancel/").status_code == 409
+
+    running_id = api_client.post(
+        "/api/admin/jobs/",
+        {"kind": "tests.countdown", "params": {"steps": 5, "cancel_at": 1}},
+        format="json",
+    ).json()["id"]
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    job = api_client.get(f"/api/admin/jobs/{running_id}/").json()
+    assert (job["status"], job["cancel_requested"], job["progress"]["done"]) == ("cancelled", True, 2)
+    assert countdown_kind == [0, 1]
+
+
+@pytest.mark.django_db
+def test_worker_requeues_stale_jobs_until_attempts_run_out(settings, countdown_kind):
+    settings.JOBS_MAX_ATTEMPTS = 2
+    stale = timezone.now() - timedelta(seconds=settings.JOBS_STALE_SECONDS + 1)
+    lost = Job.objects.create(
+        kind="tests.countdown",
+        params={"steps": 1},
+        status=JobStatus.RUNNING,
+        attempts=1,
+        heartbeat_at=stale,
+    )
+    exhausted = Job.objects.create(
+        kind="tests.countdown",
+        params={"steps": 1},
+        status=JobStatus.RUNNING,
+        attempts=2,
+        heartbeat_at=stale,
+    )
+    alive = Job.objects.create(
+        kind="tests.countdown",
+        params={"steps": 1},
+        status=JobStatus.RUNNING,
+        attempts=1,
+        heartbeat_at=timezone.now(),
+    )
+
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    lost.refresh_from_db()
+    exhausted.refresh_from_db()
+    alive.refresh_from_db()
+    assert (lost.status, lost.attempts, lost.result) == (JobStatus.SUCCEEDED, 2, {"steps": 1})
+    assert (exhausted.status, exhausted.error) == (JobStatus.FAILED, "Worker lost")
+    assert alive.status == JobStatus.RUNNING
+
+
+@pytest.mark.django_db
+def test_report_export_job_attaches_xlsx_file(api_client, admin_user):
+    load_workbook = pytest.importorskip("openpyxl").load_workbook
+    api_client.force_authenticate(admin_user)
+
+    response = api_client.post(
+        "/api/admin/jobs/",
+        {"kind": "orders.yearly_report_xlsx", "params": {"year": 2024}},
+        format="json",
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert api_client.get(f"/api/admin/jobs/{job_id}/file/").status_code == 404
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    job = api_client.get(f"/api/admin/jobs/{job_id}/").json()
+    assert job["status"] == "succeeded"
+    assert job["result"]["rows"] == 0
+    response = api_client.get(job["file_url"])
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    assert response["Content-Disposition"] == 'attachment; filename="yearly_report_2024.xlsx"'
+    worksheet = load_workbook(filename=BytesIO(response.content)).active
+    assert [cell.value for cell in worksheet[1]] == ["ИТОГО", 0, 0, "0.00"]
+
+
+@pytest.mark.django_db
+def test_jobs_api_requires_admin(api_client):
+    assert api_client.get("/api/admin/jobs/").status_code in {401, 403}
+    assert api_client.post("/api/admin/jobs/", {"kind": "orders.yearly_report_xlsx"}, format="json").status_code in {
+        401,
+        403,
+    }
+
+
+@pytest.mark.django_db
+def test_worker_recycles_db_connections_around_jobs(monkeypatch, countdown_kind):
+    calls = []
+    monkeypatch.setattr(
+        "online_store_backend.jobs.worker._close_old_connections",
+        lambda: calls.append(len(countdown_kind)),
+    )
+    Job.objects.create(kind="tests.countdown", params={"steps": 2})
+
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    assert calls == [0, 2, 2]
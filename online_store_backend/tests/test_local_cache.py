@@ -0,0 +1,150 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from online_store_backend.appearance.models import ShopAppearanceSettings
+from online_store_backend.integrations.cache import get_enabled_integration_config
+from online_store_backend.integrations.models import IntegrationConfig
+from online_store_backend.integrations.models import IntegrationKind
+from online_store_backend.products.cache import bump_products_cache_version
+from online_store_backend.products.cache import product_detail_cache_key
+from online_store_backend.products.catalog_cache import catalog_cache
+from online_store_backend.utils.local_cache import invalidation_bus
+from online_store_backend.utils.local_cache import reset_local_caches
+from online_store_backend.utils.local_cache import shared_cache
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def local_tier(settings):
+    settings.LOCAL_CACHE_ENABLED = True
+    cache.clear()
+    reset_local_caches()
+    yield
+    reset_local_caches()
+
+
+@pytest.fixture
+def admin_user(db):
+    user_model = get_user_model()
+    return user_model.objects.create_user(
+        username="admin",
+        password="pass12345",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+def test_local_tier_is_bounded_and_expires(settings, monkeypatch):
+    settings.LOCAL_CACHE_MAX_ENTRIES = 2
+    now = [1000.0]
+    monkeypatch.setattr("online_store_backend.utils.local_cache.time.monotonic", lambda: now[0])
+    for index in range(3):
+        catalog_cache.set(f"products:detail:v1:doc-{index}", index, timeout=60)
+    cache.set("products:detail:v1:doc-2", "changed-behind-the-tier", timeout=60)
+
+    assert len(catalog_cache.local) == 2
+    assert catalog_cache.get("products:detail:v1:doc-2") == 2
+    now[0] += settings.LOCAL_CACHE_TTL_SECONDS + 1
+    assert catalog_cache.get("products:detail:v1:doc-2") == "changed-behind-the-tier"
+    assert catalog_cache.stats()["local"]["hits"] == 1
+
+
+@pytest.mark.django_db
+def test_hot_product_detail_is_served_from_local_tier_until_version_bump(api_client, monkeypatch):
+    calls = []
+
+    def fake_get_product(document_id):
+        calls.append(document_id)
+        return {"id": document_id, "title": f"Mug {len(calls)}", "price": "1.00", "currency": "RUB"}
+
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product", fake_get_product)
+    api_client.get("/api/products/doc-1/")
+    remote_hits = catalog_cache.stats()["remote"]["hits"]
+
+    assert api_client.get("/api/products/doc-1/").json()["title"] == "Mug 1"
+    assert catalog_cache.stats()["remote"]["hits"] == remote_hits
+
+    bump_products_cache_version()
+
+    assert len(catalog_cache.local) == 0
+    assert api_client.get("/api/products/doc-1/").json()["title"] == "Mug 2"
+    assert calls == ["doc-1", "doc-1"]
+
+
+def test_invalidation_messages_from_other_workers_drop_local_copies():
+    key = product_detail_cache_key("doc-1", 1)
+    catalog_cache.set(key, {"value": 1}, timeout=60)
+    catalog_cache.set("products:list:v=1|page=1", {"value": 2}, timeout=60)
+
+    invalidation_bus._handle({"data": json.dumps({"origin": invalidation_bus.origin, "keys": [key]})})
+    assert len(catalog_cache.local) == 2
+
+    invalidation_bus._handle({"data": json.dumps({"origin": "other-worker", "keys": [key]})})
+    assert len(catalog_cache.local) == 1
+    invalidation_bus._handle({"data": json.dumps({"origin": "other-worker", "prefixes": ["products:list:"]})})
+    assert len(catalog_cache.local) == 0
+
+
+def test_lock_keys_bypass_local_tier():
+    assert catalog_cache.add("products:detail:v1:doc-1:lock", "token", timeout=10)
+    cache.delete("products:detail:v1:doc-1:lock")
+
+    assert catalog_cache.get("products:detail:v1:doc-1:lock") is None
+    assert len(catalog_cache.local) == 0
+
+
+@pytest.mark.django_db
+def test_enabled_integration_config_is_cached_until_saved(django_assert_num_queries):
+    config = IntegrationConfig.objects.create(kind=IntegrationKind.PAYMENT, provider_id="demo", enabled=True)
+    first = get_enabled_integration_config(IntegrationKind.PAYMENT, "demo")
+
+    with django_assert_num_queries(0):
+        cached = get_enabled_integration_config(IntegrationKind.PAYMENT, "demo")
+    cached.settings["mutated"] = True
+
+    assert first.pk == config.pk
+    assert get_enabled_integration_config(IntegrationKind.PAYMENT, "demo").settings == {}
+
+    config.enabled = False
+    config.save()
+
+    assert get_enabled_integration_config(IntegrationKind.PAYMENT, "demo") is None
+
+
+@pytest.mark.django_db
+def test_public_appearance_payload_is_cached_per_version(api_client, django_capture_on_commit_callbacks):
+    api_client.get("/api/shop/appearance/")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/shop/appearance/")
+    assert response.status_code == 200
+    assert [query["sql"] for query in queries.captured_queries if "SAVEPOINT" not in query["sql"]] == []
+    assert shared_cache.stats()["local"]["hits"] >= 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        live = ShopAppearanceSettings.objects.get(is_published=True)
+        live.primary_color = "#123456"
+        live.save()
+
+    assert api_client.get("/api/shop/appearance/").json()["primary_color"] == "#123456"
+
+
+@pytest.mark.django_db
+def test_catalog_metrics_expose_hit_ratios_per_tier(api_client, admin_user):
+    api_client.force_authenticate(admin_user)
+
+    tiers = api_client.get("/api/admin/catalog/metrics/").json()["tiers"]
+
+    assert set(tiers) >= {"catalog", "integrations", "shared"}
+    assert set(tiers["catalog"]) == {"local", "remote"}
+    assert "hit_ratio" in tiers["catalog"]["local"]
@@ -0,0 +1,215 @@
+import threading
+from io import BytesIO
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from online_store_backend.products.discount_stats import category_discount_stats
+from online_store_backend.products.strapi_client import StrapiRequestError
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def admin_user():
+    return get_user_model().objects.create_user(
+        username="admin",
+        password="pass12345",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def strapi_catalog(monkeypatch):
+    catalog = {
+        "mug": {
+            "documentId": "p-mug",
+            "title": "Old mug",
+            "slug": "mug",
+            "description": "Keep me",
+            "price": "100.00",
+            "currency": "RUB",
+            "discount_percent": 5,
+            "category": {"documentId": "c-1"},
+            "image": [{"id": 7}],
+            "publishedAt": "2026-01-01T00:00:00.000Z",
+        }
+    }
+    calls = {"lookups": [], "created": [], "updated": [], "bumps": 0}
+    lock = threading.Lock()
+
+    def fake_lookup(values, *, field="documentId"):
+        assert field == "slug"
+        calls["lookups"].append(list(values))
+        return {value: catalog.get(value) for value in values}
+
+    def fake_create(payload):
+        if payload["slug"] == "taken":
+            raise StrapiRequestError(400, '{"error": {"message": "This attribute must be unique", "path": ["slug"]}}')
+        with lock:
+            calls["created"].append(payload)
+        return {"id": f"p-{payload['slug']}", "slug": payload["slug"]}
+
+    def fake_update(document_id, payload):
+        with lock:
+            calls["updated"].append((document_id, payload))
+        return {"id": document_id, "slug": payload["slug"]}
+
+    def fake_bump():
+        calls["bumps"] += 1
+
+    monkeypatch.setattr("online_store_backend.products.importer.get_products_admin_raw", fake_lookup)
+    monkeypatch.setattr("online_store_backend.products.importer.create_product_admin", fake_create)
+    monkeypatch.setattr("online_store_backend.products.importer.update_product_admin_flat", fake_update)
+    monkeypatch.setattr("online_store_backend.products.importer.bump_products_cache_version", fake_bump)
+    return calls
+
+
+CSV_CONTENT = (
+    "title;slug;price;currency;category;discount_percent\n"
+    "Big mug;mug;120;RUB;;\n"
+    "Teapot;;450.5;RUB;c-2;10\n"
+    "Broken;broken;not-a-price;RUB;;\n"
+    ";;;;;\n"
+    "Mug copy;mug;10;RUB;;\n"
+    "Taken;taken;10;RUB;;\n"
+    "Cup;cup;50;RUB;c-2;\n"
+)
+
+
+def _upload(api_client, name, content, **data):
+    return api_client.post(
+        "/api/admin/catalog/products/import/",
+        {"file": SimpleUploadedFile(name, content), **data},
+        format="multipart",
+    )
+
+
+@pytest.mark.django_db
+def test_csv_import_upserts_by_slug_and_reports_row_errors(
+    api_client, admin_user, media_root, strapi_catalog, settings
+):
+    settings.STRAPI_BATCH_SIZE = 2
+    api_client.force_authenticate(admin_user)
+
+    response = _upload(api_client, "products.csv", CSV_CONTENT.encode("utf-8-sig"))
+
+    assert response.status_code == 202
+    assert response.json()["kind"] == "products.import"
+    assert list((media_root / "imports").iterdir())
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    job = api_client.get(f"/api/admin/jobs/{response.json()['id']}/").json()
+    assert job["status"] == "succeeded"
+    result = job["result"]
+    assert (result["rows"], result["created"], result["updated"], result["failed"]) == (6, 2, 1, 3)
+    assert result["dry_run"] is False
+    assert result["rows_per_second"] > 0
+    assert result["errors"] == [
+        {"row": 4, "slug": "broken", "errors": {"price": ["A valid number is required."]}},
+        {"row": 6, "slug": "mug", "errors": {"slug": ["Duplicate slug in file."]}},
+        {"row": 7, "slug": "taken", "errors": {"slug": ["This slug is already in use."]}},
+    ]
+    assert job["progress"] == {"rows": 6, "created": 2, "updated": 1, "failed": 3}
+    assert strapi_catalog["lookups"] == [["mug", "teapot"], ["taken", "cup"]]
+    assert strapi_catalog["bumps"] == 1
+    assert list((media_root / "imports").iterdir()) == []
+
+    [(document_id, payload)] = strapi_catalog["updated"]
+    assert document_id == "p-mug"
+    assert (payload["title"], payload["price"], payload["category"]) == ("Big mug", "120.00", "c-1")
+    assert payload["image"] == [7]
+    assert payload["description"] == "Keep me"
+    assert payload["discount_percent"] == 5
+    assert payload["publishedAt"] == "2026-01-01T00:00:00.000Z"
+    created = {payload["slug"]: payload for payload in strapi_catalog["created"]}
+    assert sorted(created) == ["cup", "teapot"]
+    assert (created["teapot"]["price"], created["teapot"]["discount_percent"]) == ("450.50", 10)
+    assert category_discount_stats(["c-2"])["c-2"]["discount_percents"] == [0, 10]
+
+
+@pytest.mark.django_db
+def test_xlsx_dry_run_validates_without_writes(api_client, admin_user, media_root, strapi_catalog):
+    workbook_class = pytest.importorskip("openpyxl").Workbook
+    workbook = workbook_class()
+    worksheet = workbook.active
+    worksheet.append(["Title", "Slug", "Price", "Currency", "Publish", "Images"])
+    worksheet.append(["Big mug", "mug", 120, "RUB", True, "3; 4"])
+    worksheet.append(["Lamp", None, 99.9, "RUB", False, None])
+    worksheet.append([None, "no-title", 10, "RUB", None, None])
+    stream = BytesIO()
+    workbook.save(stream)
+    api_client.force_authenticate(admin_user)
+
+    response = _upload(api_client, "products.xlsx", stream.getvalue(), dry_run="true")
+    assert response.status_code == 202
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    result = api_client.get(f"/api/admin/jobs/{response.json()['id']}/").json()["result"]
+    assert result["dry_run"] is True
+    assert (result["rows"], result["created"], result["updated"], result["failed"]) == (3, 1, 1, 1)
+    assert result["errors"] == [{"row": 4, "slug": "no-title", "errors": {"title": ["This field is required."]}}]
+    assert strapi_catalog["lookups"] == [["mug", "lamp"]]
+    assert (strapi_catalog["created"], strapi_catalog["updated"], strapi_catalog["bumps"]) == ([], [], 0)
+
+
+@pytest.mark.django_db
+def test_import_rejects_unsupported_files(api_client, admin_user, media_root, strapi_catalog):
+    api_client.force_authenticate(admin_user)
+
+    response = _upload(api_client, "products.json", b"[]")
+    assert response.status_code == 400
+    assert "file" in response.json()
+
+    response = _upload(api_client, "products.xlsx", b"not a workbook")
+    assert response.status_code == 202
+    call_command("run_job_worker", "--once", stdout=StringIO())
+    job = api_client.get(f"/api/admin/jobs/{response.json()['id']}/").json()
+    assert (job["status"], job["error"]) == ("failed", "Unable to read the import file.")
+    assert list((media_root / "imports").iterdir()) == []
+
+    response = api_client.post(
+        "/api/admin/jobs/",
+        {"kind": "products.import", "params": {"path": "../settings.py", "filename": "x.csv"}},
+        format="json",
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_import_update_keeps_fields_left_empty_in_row(api_client, admin_user, media_root, strapi_catalog):
+    api_client.force_authenticate(admin_user)
+    content = "title,slug,description,price,currency,category,publish,discount_percent,images\nNew mug,mug,,150,RUB,,,,\n"
+
+    response = _upload(api_client, "products.csv", content.encode())
+    assert response.status_code == 202
+    call_command("run_job_worker", "--once", stdout=StringIO())
+
+    [(document_id, payload)] = strapi_catalog["updated"]
+    assert document_id == "p-mug"
+    assert (payload["title"], payload["price"]) == ("New mug", "150.00")
+    assert payload["description"] == "Keep me"
+    assert payload["category"] == "c-1"
+    assert payload["image"] == [7]
+    assert payload["discount_percent"] == 5
+    assert payload["publishedAt"] == "2026-01-01T00:00:00.000Z"
@@ -0,0 +1,157 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from online_store_backend.products.slug_index import lookup_product_slug
+from online_store_backend.products.strapi_client import StrapiNotFoundError
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def admin_user():
+    return get_user_model().objects.create_user(
+        username="admin",
+        password="pass12345",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+@pytest.fixture
+def strapi_products(monkeypatch):
+    state = {"products": {"p-1": {"id": "p-1", "slug": "mug", "title": "Mug", "price": "1.00", "currency": "RUB"}}, "calls": []}
+
+    def fake_get_product_by_slug(slug):
+        state["calls"].append(("by-slug", slug))
+        for product in state["products"].values():
+            if product["slug"] == slug:
+                return dict(product)
+        raise StrapiNotFoundError
+
+    def fake_get_product(document_id):
+        state["calls"].append(("detail", document_id))
+        if document_id not in state["products"]:
+            raise StrapiNotFoundError
+        return dict(state["products"][document_id])
+
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product_by_slug", fake_get_product_by_slug)
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product", fake_get_product)
+    return state
+
+
+@pytest.mark.django_db
+def test_by_slug_resolves_once_and_shares_the_detail_entry(api_client, strapi_products):
+    first = api_client.get("/api/products/by-slug/mug/")
+    second = api_client.get("/api/products/by-slug/mug/")
+    by_id = api_client.get("/api/products/p-1/")
+
+    assert first.status_code == second.status_code == by_id.status_code == 200
+    assert first.json()["id"] == by_id.json()["id"] == "p-1"
+    assert first["ETag"] == by_id["ETag"]
+    assert strapi_products["calls"] == [("by-slug", "mug")]
+    assert lookup_product_slug("mug") == {"document_id": "p-1", "redirect": False}
+
+
+@pytest.mark.django_db
+def test_admin_slug_rename_keeps_a_redirect_from_the_old_slug(api_client, admin_user, strapi_products, monkeypatch):
+    def fake_get_raw(document_id):
+        return {"title": "Mug", "slug": "mug", "price": "1.00", "category": None, "image": []}
+
+    def fake_update(document_id, payload):
+        strapi_products["products"][document_id]["slug"] = payload["slug"]
+        return {**strapi_products["products"][document_id], "category": None}
+
+    monkeypatch.setattr("online_store_backend.products.api.admin_views.get_product_admin_raw", fake_get_raw)
+    monkeypatch.setattr("online_store_backend.products.api.admin_views.update_product_admin_flat", fake_update)
+    assert api_client.get("/api/products/by-slug/mug/").status_code == 200
+
+    api_client.force_authenticate(admin_user)
+    response = api_client.put("/api/admin/catalog/products/p-1/", {"slug": "big-mug"}, format="json")
+    assert response.status_code == 200
+    api_client.force_authenticate(None)
+    strapi_products["calls"].clear()
+
+    redirect = api_client.get("/api/products/by-slug/mug/")
+    renamed = api_client.get("/api/products/by-slug/big-mug/")
+
+    assert redirect.status_code == 301
+    assert redirect["Location"] == "/api/products/by-slug/big-mug/"
+    assert renamed.status_code == 200
+    assert renamed.json()["slug"] == "big-mug"
+    assert strapi_products["calls"] == [("detail", "p-1")]
+
+
+@pytest.mark.django_db
+def test_admin_product_delete_removes_its_slugs_from_the_index(api_client, admin_user, strapi_products, monkeypatch):
+    monkeypatch.setattr(
+        "online_store_backend.products.api.admin_views.delete_product_admin",
+        lambda document_id: strapi_products["products"].pop(document_id),
+    )
+    assert api_client.get("/api/products/by-slug/mug/").status_code == 200
+
+    api_client.force_authenticate(admin_user)
+    assert api_client.delete("/api/admin/catalog/products/p-1/").status_code == 204
+    api_client.force_authenticate(None)
+
+    assert lookup_product_slug("mug") is None
+    assert api_client.get("/api/products/by-slug/mug/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_product_webhook_updates_the_slug_index(api_client, settings, strapi_products):
+    settings.STRAPI_WEBHOOK_SECRET = "hook-secret"
+    assert api_client.get("/api/products/by-slug/mug/").status_code == 200
+    strapi_products["products"]["p-1"]["slug"] = "tea-mug"
+
+    response = api_client.post(
+        "/api/catalog/webhook/strapi/",
+        {"event": "entry.update", "model": "product", "entry": {"documentId": "p-1", "slug": "tea-mug", "category": None}},
+        format="json",
+        HTTP_AUTHORIZATION="Bearer hook-secret",
+    )
+
+    assert response.status_code == 200
+    assert lookup_product_slug("tea-mug") == {"document_id": "p-1", "redirect": False}
+    assert lookup_product_slug("mug") == {"document_id": "p-1", "redirect": True}
+
+
+@pytest.mark.django_db
+def test_reused_slug_is_not_taken_back_by_the_renamed_product(api_client, settings, strapi_products):
+    settings.STRAPI_WEBHOOK_SECRET = "hook-secret"
+
+    def webhook(event, document_id, slug):
+        response = api_client.post(
+            "/api/catalog/webhook/strapi/",
+            {
+                "event": event,
+                "model": "product",
+                "entry": {"documentId": document_id, "slug": slug, "category": None},
+            },
+            format="json",
+            HTTP_AUTHORIZATION="Bearer hook-secret",
+        )
+        assert response.status_code == 200
+
+    assert api_client.get("/api/products/by-slug/mug/").status_code == 200
+    strapi_products["products"]["p-1"]["slug"] = "tea-mug"
+    webhook("entry.update", "p-1", "tea-mug")
+    cup = {"id": "p-2", "slug": "mug", "title": "Cup", "price": "2.00", "currency": "RUB"}
+    strapi_products["products"]["p-2"] = cup
+    webhook("entry.create", "p-2", "mug")
+    webhook("entry.update", "p-1", "tea-mug")
+
+    assert lookup_product_slug("mug") == {"document_id": "p-2", "redirect": False}
+    assert lookup_product_slug("tea-mug") == {"document_id": "p-1", "redirect": False}
+    response = api_client.get("/api/products/by-slug/mug/")
+    assert response.status_code == 200
+    assert response.json()["id"] == "p-2"
@@ -0,0 +1,195 @@
+import operator
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from online_store_backend.products.cursors import decode_cursor
+from online_store_backend.products.models import CatalogProduct
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def _mirror_product(document_id, title, price):
+    payload = {"id": document_id, "title": title, "price": price, "currency": "RUB"}
+    return CatalogProduct.objects.create(
+        document_id=document_id,
+        title=title,
+        price=Decimal(price),
+        payload=payload,
+    )
+
+
+def _walk(api_client, url, direction, ordering="-price"):
+    pages = []
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        payload = response.json()
+        pages.append([product["id"] for product in payload["results"]])
+        cursor = payload["pagination"][direction]
+        url = f"/api/products/?ordering={ordering}&page_size=2&cursor={cursor}" if cursor else None
+    return pages
+
+
+@pytest.mark.django_db
+def test_cursor_pages_walk_mirror_forward_and_back_with_stable_tiebreaker(api_client, settings):
+    settings.CATALOG_READ_MODE = "mirror"
+    prices = {"p-1": "100.00", "p-2": "300.00", "p-3": "100.00", "p-4": "200.00", "p-5": "100.00"}
+    for document_id, price in prices.items():
+        _mirror_product(document_id, document_id.upper(), price)
+
+    forward = _walk(api_client, "/api/products/?ordering=-price&page_size=2&cursor=", "next")
+
+    assert forward == [["p-2", "p-4"], ["p-5", "p-3"], ["p-1"]]
+
+    last_page = api_client.get("/api/products/?ordering=-price&page_size=2&cursor=").json()
+    while last_page["pagination"]["next"]:
+        cursor = last_page["pagination"]["next"]
+        last_page = api_client.get(f"/api/products/?ordering=-price&page_size=2&cursor={cursor}").json()
+    backward = _walk(
+        api_client,
+        f"/api/products/?ordering=-price&page_size=2&cursor={last_page['pagination']['prev']}",
+        "prev",
+    )
+
+    assert backward == [["p-5", "p-3"], ["p-2", "p-4"]]
+    assert "total" not in last_page["pagination"]
+
+
+@pytest.mark.django_db
+def test_cursor_mode_sends_keyset_filter_to_strapi(api_client, monkeypatch):
+    calls = []
+
+    def fake_list_products(*, page, page_size, params=None):
+        calls.append(params)
+        products = [
+            {"id": f"doc-{index}", "title": f"Mug {index}", "price": "590.00", "currency": "RUB"}
+            for index in range(page_size)
+        ]
+        return products, {"page": 1, "page_size": page_size, "total": 0}
+
+    monkeypatch.setattr("online_store_backend.products.api.views.list_products", fake_list_products)
+
+    first = api_client.get("/api/products/?ordering=title&page_size=2&cursor=&category=kitchen").json()
+    next_cursor = first["pagination"]["next"]
+    api_client.get(f"/api/products/?ordering=title&page_size=2&cursor={next_cursor}&category=kitchen")
+
+    assert [product["id"] for product in first["results"]] == ["doc-0", "doc-1"]
+    assert first["pagination"]["prev"] is None
+    assert decode_cursor(next_cursor, "title") == {"value": "Mug 1", "document_id": "doc-1", "direction": "next"}
+    assert calls[0]["pagination[limit]"] == 3
+    assert calls[0]["sort[0]"] == "title:asc"
+    assert calls[0]["sort[1]"] == "documentId:asc"
+    assert "pagination[page]" not in calls[0]
+    assert calls[1]["filters[category][slug][$eq]"] == "kitchen"
+    assert calls[1]["filters[$or][0][title][$gt]"] == "Mug 1"
+    assert calls[1]["filters[$or][1][title][$eq]"] == "Mug 1"
+    assert calls[1]["filters[$or][1][documentId][$gt]"] == "doc-1"
+
+
+@pytest.mark.django_db
+def test_cursor_from_another_ordering_is_rejected(api_client, settings):
+    settings.CATALOG_READ_MODE = "mirror"
+    for index in range(3):
+        _mirror_product(f"p-{index}", f"Item {index}", "10.00")
+    next_cursor = api_client.get("/api/products/?ordering=price&page_size=1&cursor=").json()["pagination"]["next"]
+
+    assert api_client.get(f"/api/products/?ordering=title&cursor={next_cursor}").status_code == 400
+    assert api_client.get("/api/products/?cursor=not-a-cursor").status_code == 400
+
+
+def _strapi_price_products(prices):
+    """Имитирует фильтры и сортировку Strapi по цене, где у части товаров цены нет (NULL)."""
+    calls = []
+
+    def matches(document_id, price, params):
+        if params.get("filters[price][$null]") == "true" and price is not None:
+            return False
+        if params.get("filters[price][$notNull]") == "true" and price is None:
+            return False
+        for op, compare in (("$gt", operator.gt), ("$lt", operator.lt)):
+            after_document = params.get(f"filters[documentId][{op}]")
+            if after_document is not None and not compare(document_id, after_document):
+                return False
+            value = params.get(f"filters[$or][0][price][{op}]")
+            if value is None:
+                continue
+            if price is None:
+                return False
+            after = params[f"filters[$or][1][documentId][{op}]"]
+            same_price = Decimal(price) == Decimal(value)
+            if not (compare(Decimal(price), Decimal(value)) or (same_price and compare(document_id, after))):
+                return False
+        return True
+
+    def fake_list_products(*, page, page_size, params=None):
+        calls.append(params)
+        rows = [(document_id, price) for document_id, price in prices.items() if matches(document_id, price, params)]
+        field, direction = params["sort[0]"].split(":")
+        rows.sort(
+            key=lambda row: (Decimal(row[1]), row[0]) if field == "price" else row[0],
+            reverse=direction == "desc",
+        )
+        products = [
+            {"id": document_id, "title": document_id, "price": price or "0.00", "currency": "RUB"}
+            for document_id, price in rows[: params["pagination[limit]"]]
+        ]
+        return products, {"page": 1, "page_size": page_size, "total": 0}
+
+    return fake_list_products, calls
+
+
+@pytest.mark.django_db
+def test_cursor_pages_keep_strapi_products_without_price_last(api_client, monkeypatch):
+    prices = {"p-1": "100.00", "p-2": None, "p-3": "50.00", "p-4": None, "p-5": "100.00"}
+    fake_list_products, calls = _strapi_price_products(prices)
+    monkeypatch.setattr("online_store_backend.products.api.views.list_products", fake_list_products)
+
+    forward = _walk(api_client, "/api/products/?ordering=price&page_size=2&cursor=", "next", ordering="price")
+
+    assert forward == [["p-3", "p-1"], ["p-5", "p-2"], ["p-4"]]
+
+    last_page = api_client.get("/api/products/?ordering=price&page_size=2&cursor=").json()
+    while last_page["pagination"]["next"]:
+        cursor = last_page["pagination"]["next"]
+        last_page = api_client.get(f"/api/products/?ordering=price&page_size=2&cursor={cursor}").json()
+    prev_cursor = last_page["pagination"]["prev"]
+    backward = _walk(
+        api_client,
+        f"/api/products/?ordering=price&page_size=2&cursor={prev_cursor}",
+        "prev",
+        ordering="price",
+    )
+
+    assert decode_cursor(prev_cursor, "price") == {"value": None, "document_id": "p-4", "direction": "prev"}
+    assert backward == [["p-5", "p-2"], ["p-3", "p-1"]]
+    assert calls[-1]["filters[price][$notNull]"] == "true"
+    assert calls[-1]["sort[0]"] == "price:desc"
+
+
+@pytest.mark.django_db
+def test_cursor_after_mirror_product_without_title_is_accepted(api_client, settings):
+    settings.CATALOG_READ_MODE = "mirror"
+    payload = {"id": "p-0", "title": None, "price": "10.00", "currency": "RUB"}
+    CatalogProduct.objects.create(document_id="p-0", title="", price=Decimal("10.00"), payload=payload)
+    _mirror_product("p-1", "Item 1", "10.00")
+    _mirror_product("p-2", "Item 2", "10.00")
+
+    first = api_client.get("/api/products/?ordering=title&page_size=1&cursor=").json()
+    next_cursor = first["pagination"]["next"]
+    response = api_client.get(f"/api/products/?ordering=title&page_size=1&cursor={next_cursor}")
+
+    assert [product["id"] for product in first["results"]] == ["p-0"]
+    assert decode_cursor(next_cursor, "title")["value"] is None
+    assert response.status_code == 200
+    assert [product["id"] for product in response.json()["results"]] == ["p-1"]
@@ -0,0 +1,215 @@
+import threading
+import time
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from online_store_backend.products.discount_jobs import run_discount_job
+from online_store_backend.products.jobs import apply_bulk_operation
+from online_store_backend.products.strapi_async import map_concurrently
+from online_store_backend.products.strapi_client import StrapiNotFoundError
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def admin_user(db):
+    user_model = get_user_model()
+    return user_model.objects.create_user(
+        username="admin",
+        password="pass12345",
+        is_staff=True,
+        is_superuser=True,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def test_map_concurrently_bounds_concurrency_and_keeps_order():
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def call(value):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        if value == 3:
+            raise StrapiNotFoundError
+        return value * 10
+
+    results = map_concurrently(call, range(8), concurrency=3)
+
+    assert state["peak"] == 3
+    assert results[:3] == [0, 10, 20]
+    assert isinstance(results[3], StrapiNotFoundError)
+    assert results[4:] == [40, 50, 60, 70]
+
+
+@pytest.mark.django_db
+def test_bulk_update_prefetches_in_batches_and_fans_out_writes(api_client, admin_user, settings, monkeypatch):
+    settings.STRAPI_BATCH_SIZE = 5
+    fetched_batches = []
+    updated = {}
+
+    def fake_get_batch(product_ids):
+        time.sleep(0.1)
+        fetched_batches.append(list(product_ids))
+        return {
+            product_id: None
+            if product_id == "missing"
+            else {"title": product_id, "price": "100.00", "currency": "RUB", "category": None}
+            for product_id in product_ids
+        }
+
+    def fake_update_raw(product_id, payload):
+        time.sleep(0.1)
+        updated[product_id] = payload["price"]
+
+    monkeypatch.setattr("online_store_backend.products.jobs.get_products_admin_raw", fake_get_batch)
+    monkeypatch.setattr("online_store_backend.products.jobs.update_product_admin_raw", fake_update_raw)
+    api_client.force_authenticate(user=admin_user)
+    product_ids = [f"p-{index}" for index in range(8)] + ["missing"]
+
+    response = api_client.post(
+        "/api/admin/catalog/products/bulk-update/",
+        {"product_ids": product_ids, "operation": {"type": "increase_price_fixed", "value": "5.00"}},
+        format="json",
+    )
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+
+    started = time.monotonic()
+    call_command("run_job_worker", "--once", stdout=StringIO())
+    assert time.monotonic() - started < 0.6
+
+    job = api_client.get(f"/api/admin/jobs/{response.json()['id']}/").json()
+    assert job["status"] == "succeeded"
+    assert job["result"] == {
+        "updated": 8,
+        "unchanged": [],
+        "failed": [{"id": "missing", "status": 404, "detail": "Not found."}],
+    }
+    assert sorted(fetched_batches) == [["p-0", "p-1", "p-2", "p-3", "p-4"], ["p-5", "p-6", "p-7", "missing"]]
+    assert set(updated.values()) == {"105.00"}
+
+
+def test_bulk_update_skips_writes_for_unchanged_products(monkeypatch):
+    current = {
+        "p-1": {"title": "Mug", "price": "10", "category": {"documentId": "c-1"}},
+        "p-2": {"title": "Pot", "price": "10.00", "category": {"documentId": "c-2"}},
+        "p-3": {"title": "Cup", "price": None, "category": None},
+    }
+    writes = []
+    monkeypatch.setattr(
+        "online_store_backend.products.jobs.get_products_admin_raw",
+        lambda product_ids: {product_id: current.get(product_id) for product_id in product_ids},
+    )
+    monkeypatch.setattr(
+        "online_store_backend.products.jobs.update_product_admin_raw",
+        lambda product_id, payload: writes.append((product_id, payload["category"], payload["price"])),
+    )
+
+    result, states = apply_bulk_operation(["p-1", "p-2", "p-3", "p-1"], {"type": "set_category", "category_id": "c-1"})
+
+    assert result == {
+        "updated": 1,
+        "unchanged": ["p-1"],
+        "failed": [{"id": "p-3", "status": 422, "detail": "Missing price on product."}],
+    }
+    assert writes == [("p-2", "c-1", "10.00")]
+    assert list(states) == ["p-2"]
+
+    writes.clear()
+    result, _states = apply_bulk_operation(["p-1"], {"type": "decrease_price_fixed", "value": "0"})
+    assert (result["updated"], result["unchanged"], writes) == (0, ["p-1"], [])
+
+
+@pytest.mark.django_db
+def test_apply_category_discount_loads_pages_concurrently(api_client, admin_user, monkeypatch):
+    requested_pages = []
+    updated = []
+
+    def fake_list_products_admin(*, page, page_size, params=None):
+        requested_pages.append(page)
+        count = 50 if page == 3 else page_size
+        products = [
+            {"id": f"p-{page}-{index}", "discount_percent": 30 if index == 0 else 0} for index in range(count)
+        ]
+        return products, {"page": page, "page_size": page_size, "total": 250}
+
+    monkeypatch.setattr(
+        "online_store_backend.products.strapi_client.list_products_admin",
+        fake_list_products_admin,
+    )
+    monkeypatch.setattr(
+        "online_store_backend.products.discount_jobs.get_products_admin_raw",
+        lambda product_ids: {
+            product_id: {"title": product_id, "price": "10.00", "discount_percent": 0} for product_id in product_ids
+        },
+    )
+    monkeypatch.setattr(
+        "online_store_backend.products.discount_jobs.update_product_admin_raw",
+        lambda product_id, payload: updated.append((product_id, payload["discount_percent"])),
+    )
+    api_client.force_authenticate(user=admin_user)
+
+    response = api_client.post(
+        "/api/admin/catalog/categories/c-1/apply-discount/",
+        {"discount_percent": 20},
+        format="json",
+    )
+
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    run_discount_job(job_id)
+    assert sorted(requested_pages) == [1, 2, 3]
+    status_response = api_client.get(f"/api/admin/catalog/categories/discount-jobs/{job_id}/")
+    assert status_response.status_code == 200
+    job = status_response.json()
+    assert {key: job[key] for key in ("category_id", "discount_percent", "status")} == {
+        "category_id": "c-1",
+        "discount_percent": 20,
+        "status": "completed",
+    }
+    assert (job["updated_count"], job["skipped_count"], job["failed_count"], job["total_in_category"]) == (
+        247,
+        3,
+        0,
+        250,
+    )
+    assert {discount for _product_id, discount in updated} == {20}
+
+
+def test_benchmark_bulk_update_command_reports_fewer_requests():
+    out = StringIO()
+    call_command("benchmark_bulk_update", "--sizes", "60", "--latency-ms", "0", "--changed-ratio", "0.5", stdout=out)
+
+    lines = out.getvalue().splitlines()
+    assert lines[0].split() == [
+        "ids",
+        "changed",
+        "legacy_ms",
+        "requests",
+        "batched_ms",
+        "requests",
+        "speedup",
+        "identical",
+    ]
+    row = lines[1].split()
+    assert row[0] == "60"
+    assert row[3] == "120"
+    assert int(row[5]) == int(row[1]) + 2
+    assert row[-1] == "True"
@@ -0,0 +1,181 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+from django.core.cache import cache
+
+from online_store_backend.products import strapi_client
+from online_store_backend.products.circuit_breaker import strapi_breaker
+from online_store_backend.products.strapi_session import get_pool_stats
+from online_store_backend.products.strapi_session import get_session
+from online_store_backend.products.strapi_session import reset_session
+
+
+class _StrapiStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    responses: list = []
+    calls: list = []
+
+    def do_GET(self):  # noqa: N802
+        self.calls.append(self.path)
+        status_code, payload = self.responses.pop(0) if self.responses else (200, {"data": []})
+        body = json.dumps(payload).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def strapi_server(settings):
+    _StrapiStubHandler.responses = []
+    _StrapiStubHandler.calls = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StrapiStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    settings.STRAPI_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.STRAPI_READ_API_TOKEN = "read-token"
+    settings.STRAPI_RETRY_BACKOFF_FACTOR = 0
+    settings.STRAPI_RETRY_BACKOFF_JITTER = 0
+    reset_session()
+    strapi_breaker.reset()
+    yield _StrapiStubHandler
+    reset_session()
+    strapi_breaker.reset()
+    server.shutdown()
+    server.server_close()
+
+
+def test_strapi_requests_reuse_pooled_connection(strapi_server):
+    for _ in range(5):
+        strapi_client.list_categories(page=1, page_size=10)
+
+    stats = get_pool_stats()
+    assert len(strapi_server.calls) == 5
+    assert stats["requests"] == 5
+    assert stats["new_connections"] == 1
+    assert stats["reuse_ratio"] == 0.8
+    assert stats["in_flight"] == 0
+    assert get_session() is get_session()
+
+
+def test_strapi_get_retries_transient_gateway_errors(strapi_server):
+    strapi_server.responses = [
+        (503, {"error": "busy"}),
+        (200, {"data": [{"documentId": "cat-1", "slug": "kitchen", "title": "Kitchen"}]}),
+    ]
+
+    results, _pagination = strapi_client.list_categories(page=1, page_size=10)
+
+    assert [item["id"] for item in results] == ["cat-1"]
+    assert len(strapi_server.calls) == 2
+
+
+@pytest.mark.django_db
+def test_catalog_metrics_endpoint_requires_admin(client):
+    response = client.get("/api/admin/catalog/metrics/")
+
+    assert response.status_code in (401, 403)
+
+
+def test_get_products_fetches_in_chunks_and_reports_missing_ids(strapi_server, settings):
+    settings.STRAPI_BATCH_SIZE = 2
+    strapi_server.responses = [
+        (200, {"data": [{"documentId": "p-1", "title": "One", "price": 100}]}),
+        (200, {"data": [{"documentId": "p-3", "title": "Three", "price": "300.5"}]}),
+    ]
+
+    products = strapi_client.get_products(["p-1", "p-2", "p-1", "p-3"])
+
+    assert list(products) == ["p-1", "p-2", "p-3"]
+    assert products["p-1"]["title"] == "One"
+    assert products["p-2"] is None
+    assert products["p-3"]["price"] == "300.50"
+    assert len(strapi_server.calls) == 2
+    assert "filters%5BdocumentId%5D%5B%24in%5D%5B1%5D=p-2" in strapi_server.calls[0]
+
+
+def test_get_products_admin_raw_fetches_in_chunks(strapi_server, settings):
+    settings.STRAPI_BATCH_SIZE = 2
+    settings.STRAPI_ADMIN_API_TOKEN = "admin-token"
+    strapi_server.responses = [
+        (200, {"data": [{"documentId": "p-1", "price": 100, "category": {"documentId": "c-1"}}]}),
+        (200, {"data": [{"id": 3, "documentId": "p-3", "attributes": {"price": "300.5"}}]}),
+    ]
+
+    products = strapi_client.get_products_admin_raw(["p-1", "p-2", "p-1", "p-3"])
+
+    assert list(products) == ["p-1", "p-2", "p-3"]
+    assert products["p-1"]["category"] == {"documentId": "c-1"}
+    assert products["p-2"] is None
+    assert products["p-3"]["price"] == "300.5"
+    assert len(strapi_server.calls) == 2
+    assert "filters%5BdocumentId%5D%5B%24in%5D%5B0%5D=p-3" in strapi_server.calls[1]
+
+
+def test_get_product_uses_read_through_cache_with_negative_entries(strapi_server):
+    strapi_server.responses = [
+        (200, {"data": {"documentId": "p-1", "title": "One", "price": 100}}),
+        (404, {"error": "not found"}),
+        (200, {"data": {"documentId": "p-1", "title": "One v2", "price": 120}}),
+    ]
+
+    assert strapi_client.get_product("p-1")["title"] == "One"
+    assert strapi_client.get_product("p-1")["title"] == "One"
+    for _ in range(2):
+        with pytest.raises(strapi_client.StrapiNotFoundError):
+            strapi_client.get_product("p-missing")
+    assert strapi_client.get_product("p-1", fresh=True)["price"] == "120.00"
+    assert strapi_client.get_products(["p-1", "p-missing"]) == {
+        "p-1": strapi_client.get_product("p-1"),
+        "p-missing": None,
+    }
+    assert len(strapi_server.calls) == 3
+
+
+def test_circuit_breaker_opens_and_fails_fast(strapi_server, settings):
+    settings.STRAPI_RETRY_TOTAL = 0
+    settings.STRAPI_BREAKER_MIN_CALLS = 3
+    reset_session()
+    strapi_server.responses = [(500, {"error": "boom"})] * 3
+
+    for _ in range(3):
+        with pytest.raises(strapi_client.StrapiUnavailableError):
+            strapi_client.list_categories(page=1, page_size=10)
+    with pytest.raises(strapi_client.StrapiCircuitOpenError):
+        strapi_client.list_categories(page=1, page_size=10)
+
+    snapshot = strapi_breaker.snapshot()
+    assert len(strapi_server.calls) == 3
+    assert snapshot["state"] == "open"
+    assert snapshot["short_circuited"] == 1
+    assert snapshot["transitions"] == {"closed->open": 1}
+
+
+def test_circuit_breaker_counts_unexpected_errors(strapi_server, settings, monkeypatch):
+    settings.STRAPI_BREAKER_MIN_CALLS = 2
+
+    class BrokenSession:
+        def request(self, **kwargs):
+            raise RuntimeError("adapter bug")
+
+    monkeypatch.setattr(strapi_client, "get_session", lambda: BrokenSession())
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            strapi_client.list_categories(page=1, page_size=10)
+    with pytest.raises(strapi_client.StrapiCircuitOpenError):
+        strapi_client.list_categories(page=1, page_size=10)
+
+    assert strapi_breaker.snapshot()["state"] == "open"
@@ -0,0 +1,148 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from online_store_backend.products.cache import get_products_cache_version
+from online_store_backend.products.models import CatalogProduct
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def strapi_calls(monkeypatch):
+    calls = []
+
+    def fake_list_products(*, page, page_size, params=None):
+        calls.append(("list", params.get("filters[category][slug][$eq]")))
+        return [], {"page": page, "page_size": page_size, "total": 0}
+
+    def fake_get_product(document_id):
+        calls.append(("detail", document_id))
+        return {"id": document_id, "title": "Mug", "price": "1.00", "currency": "RUB"}
+
+    monkeypatch.setattr("online_store_backend.products.api.views.list_products", fake_list_products)
+    monkeypatch.setattr("online_store_backend.products.api.views.get_product", fake_get_product)
+    return calls
+
+
+def _webhook(api_client, payload, secret="hook-secret"):
+    return api_client.post(
+        "/api/catalog/webhook/strapi/",
+        payload,
+        format="json",
+        HTTP_AUTHORIZATION=f"Bearer {secret}",
+    )
+
+
+@pytest.mark.django_db
+def test_strapi_webhook_rejects_invalid_secret(api_client, settings):
+    settings.STRAPI_WEBHOOK_SECRET = "hook-secret"
+
+    response = _webhook(api_client, {"event": "entry.update", "model": "product"}, secret="wrong")
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_product_webhook_evicts_only_affected_entries(
+    api_client, settings, strapi_calls, django_capture_on_commit_callbacks
+):
+    settings.STRAPI_WEBHOOK_SECRET = "hook-secret"
+    for url in (
+        "/api/products/?category=kitchen",
+        "/api/products/?category=garden",
+        "/api/products/doc-1/",
+        "/api/products/doc-2/",
+    ):
+        assert api_client.get(url).status_code == 200
+    strapi_calls.clear()
+    version = get_products_cache_version()
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        response = _webhook(
+            api_client,
+            {
+                "event": "entry.update",
+                "model": "product",
+                "entry": {"documentId": "doc-1", "slug": "mug", "category": {"documentId": "c-1", "slug": "kitchen"}},
+            },
+        )
+    assert response.status_code == 200
+    assert callbacks
+    assert response.json()["invalidated"]["scope"] == "product"
+
+    for url in (
+        "/api/products/?category=kitchen",
+        "/api/products/?category=garden",
+        "/api/products/doc-1/",
+        "/api/products/doc-2/",
+    ):
+        api_client.get(url)
+
+    assert strapi_calls == [("list", "kitchen"), ("detail", "doc-1")]
+    assert get_products_cache_version() == version
+
+
+@pytest.mark.django_db
+def test_category_webhook_bumps_products_cache_version(api_client, settings):
+    settings.STRAPI_WEBHOOK_SECRET = "hook-secret"
+    version = get_products_cache_version()
+
+    response = _webhook(
+        api_client,
+        {"event": "entry.update", "model": "category", "entry": {"documentId": "c-1", "slug": "kitchen"}},
+    )
+
+    assert response.status_code == 200
+    assert get_products_cache_version() == version + 1
+
+
+@pytest.mark.django_db
+def test_product_webhook_mirrors_only_the_changed_product(
+    api_client, settings, monkeypatch, django_capture_on_commit_callbacks
+):
+    settings.STRAPI_WEBHOOK_SECRET = "hook-secret"
+    settings.CATALOG_READ_MODE = "mirror"
+    published = {
+        "doc-1": {
+            "id": 1,
+            "documentId": "doc-1",
+            "slug": "mug",
+            "title": "Mug",
+            "price": "12.50",
+            "currency": "RUB",
+            "category": {"documentId": "c-1", "slug": "kitchen"},
+            "updatedAt": "2026-01-01T09:00:00.000Z",
+        }
+    }
+    fetched = []
+
+    def fake_get_raw(values):
+        fetched.append(list(values))
+        return {value: published.get(value) for value in values}
+
+    def fail_sync(**kwargs):
+        raise AssertionError("webhook must not run a mirror sync")
+
+    monkeypatch.setattr("online_store_backend.products.webhooks.get_products_admin_raw", fake_get_raw)
+    monkeypatch.setattr("online_store_backend.products.mirror.list_products_raw", fail_sync)
+    entry = {"documentId": "doc-1", "slug": "mug", "category": {"documentId": "c-1", "slug": "kitchen"}}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert _webhook(api_client, {"event": "entry.update", "model": "product", "entry": entry}).status_code == 200
+    product = CatalogProduct.objects.get(document_id="doc-1")
+    assert (product.title, str(product.price), product.category_slug) == ("Mug", "12.50", "kitchen")
+
+    published.clear()
+    with django_capture_on_commit_callbacks(execute=True):
+        assert _webhook(api_client, {"event": "entry.update", "model": "product", "entry": entry}).status_code == 200
+    assert not CatalogProduct.objects.filter(document_id="doc-1").exists()
+    assert fetched == [["doc-1"], ["doc-1"]]
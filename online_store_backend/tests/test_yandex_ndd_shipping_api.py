@@ -98,14 +98,17 @@ def test_yandex_ndd_quote_endpoint_returns_offers(api_client, monkeypatch):
     )
 
     monkeypatch.setattr(
-        "online_store_backend.orders.api.checkout_views.get_product",
-        lambda _product_id: {
-            "id": "p-1",
-            "title": "Product 1",
-            "price": "1000.00",
-            "discount_percent": 0,
-            "currency": "RUB",
-            "image_url": "",
+        "online_store_backend.orders.api.checkout_views.get_products",
+        lambda product_ids, **_kwargs: {
+            product_id: {
+                "id": "p-1",
+                "title": "Product 1",
+                "price": "1000.00",
+                "discount_percent": 0,
+                "currency": "RUB",
+                "image_url": "",
+            }
+            for product_id in product_ids
         },
     )
 
@@ -0,0 +1,56 @@
+/** API-контракты и методы заданий скидки категорий. */
+import { adminApiClient } from "./adminClient";
+
+export type CategoryDiscountJobStatus = "pending" | "running" | "completed" | "failed" | "cancelled";
+
+export type CategoryDiscountJob = {
+  id: number;
+  job_id: number | null;
+  category_id: string;
+  action: "apply" | "remove";
+  discount_percent: number;
+  status: CategoryDiscountJobStatus;
+  total_in_category: number | null;
+  planned_count: number;
+  pending_count: number;
+  updated_count: number;
+  skipped_count: number;
+  failed_count: number;
+  failures: { id: string; detail: string }[];
+  elapsed_seconds: number;
+  throughput_per_second: number | null;
+  error: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+};
+
+const FINISHED_STATUSES: CategoryDiscountJobStatus[] = ["completed", "failed", "cancelled"];
+
+/** Запускает применение скидки ко всем товарам категории; 409, если задание категории уже идет. */
+export const applyCategoryDiscount = (categoryId: string, discountPercent: number) =>
+  adminApiClient.post<CategoryDiscountJob>(`/admin/catalog/categories/${categoryId}/apply-discount/`, {
+    discount_percent: discountPercent
+  });
+
+/** Запускает сброс скидки товаров категории; 409, если задание категории уже идет. */
+export const removeCategoryDiscount = (categoryId: string) =>
+  adminApiClient.post<CategoryDiscountJob>(`/admin/catalog/categories/${categoryId}/remove-discount/`);
+
+/** Загружает прогресс задания скидки. */
+export const getCategoryDiscountJob = (jobId: number) =>
+  adminApiClient.get<CategoryDiscountJob>(`/admin/catalog/categories/discount-jobs/${jobId}/`);
+
+/** Опрашивает задание скидки, пока оно не завершится. */
+export const waitForCategoryDiscountJob = async (
+  jobId: number,
+  intervalMs = 1000
+): Promise<CategoryDiscountJob> => {
+  for (;;) {
+    const { data } = await getCategoryDiscountJob(jobId);
+    if (FINISHED_STATUSES.includes(data.status)) {
+      return data;
+    }
+    await new Promise((resolve) => window.setTimeout(resolve, intervalMs));
+  }
+};
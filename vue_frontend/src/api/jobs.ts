@@ -0,0 +1,44 @@
+/** API-контракты и методы фоновых заданий админки. */
+import { adminApiClient } from "./adminClient";
+
+export type JobStatus = "queued" | "running" | "succeeded" | "failed" | "cancelled";
+
+export type Job = {
+  id: number;
+  kind: string;
+  status: JobStatus;
+  params: Record<string, unknown>;
+  progress: Record<string, unknown>;
+  result: unknown;
+  error: string | null;
+  cancel_requested: boolean;
+  attempts: number;
+  file_url: string | null;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+};
+
+const FINISHED_STATUSES: JobStatus[] = ["succeeded", "failed", "cancelled"];
+
+/** Ставит задание в очередь. */
+export const enqueueJob = (kind: string, params: Record<string, unknown>) =>
+  adminApiClient.post<Job>("/admin/jobs/", { kind, params });
+
+/** Загружает состояние задания. */
+export const getJob = (jobId: number) => adminApiClient.get<Job>(`/admin/jobs/${jobId}/`);
+
+/** Скачивает файл результата задания. */
+export const getJobFile = (jobId: number) =>
+  adminApiClient.get<Blob>(`/admin/jobs/${jobId}/file/`, { responseType: "blob" });
+
+/** Опрашивает задание, пока оно не завершится. */
+export const waitForJob = async (jobId: number, intervalMs = 1000): Promise<Job> => {
+  for (;;) {
+    const { data } = await getJob(jobId);
+    if (FINISHED_STATUSES.includes(data.status)) {
+      return data;
+    }
+    await new Promise((resolve) => window.setTimeout(resolve, intervalMs));
+  }
+};